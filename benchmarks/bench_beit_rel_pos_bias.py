@@ -0,0 +1,73 @@
+"""Forward latency of the BEiT backbone on mixed page sizes, with and without the relative position bias cache.
+
+Pages of different sizes give different patch windows, so the relative position bias is interpolated
+and gathered again for every window. Without the cache, this happens on every forward pass and, with
+per-layer bias (`--pos-type rel`), in every layer. The backbone uses random weights because only the
+latency matters.
+
+Example:
+    python benchmarks/bench_beit_rel_pos_bias.py --pos-type rel --sizes 512x384 384x512 512x352 --repeat 5
+"""
+import time
+import argparse
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+import numpy as np
+import torch
+
+from pdf_extract_kit.tasks.layout_detection.models.layoutlmv3_util import beit
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the BEiT relative position bias cache.")
+    parser.add_argument('--pos-type', type=str, default='rel', choices=['rel', 'shared_rel'],
+                        help='Per-layer or shared relative position bias.')
+    parser.add_argument('--sizes', type=str, nargs='+', default=['512x384', '384x512', '512x352'],
+                        help='Page sizes HxW, visited round-robin.')
+    parser.add_argument('--repeat', type=int, default=5, help='Passes over all sizes per mode.')
+    parser.add_argument('--depth', type=int, default=12)
+    parser.add_argument('--cache-mb', type=int, default=1024, help='Cache budget of the cached mode.')
+    return parser.parse_args()
+
+
+def build_backbone(pos_type, depth):
+    kwargs = {'use_rel_pos_bias': True} if pos_type == 'rel' else {'use_shared_rel_pos_bias': True}
+    model = beit.beit_base_patch16(img_size=[224, 224], depth=depth, use_checkpoint=False,
+                                   out_features=['layer3', 'layer5', 'layer7', 'layer11'], **kwargs)
+    return model.eval()
+
+
+def run(model, inputs, repeat, cached, cache_bytes):
+    beit.RELATIVE_POSITION_BIAS_CACHE.clear()
+    beit.RELATIVE_POSITION_BIAS_CACHE.max_bytes = cache_bytes if cached else 0
+    latencies = []
+    with torch.no_grad():
+        for _ in range(repeat):
+            for x in inputs:
+                if not cached:
+                    # previous behaviour: the position index was rebuilt on every call as well
+                    beit._relative_position_index.cache_clear()
+                start = time.perf_counter()
+                model(x)
+                latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+
+def main(args):
+    model = build_backbone(args.pos_type, args.depth)
+    sizes = [tuple(int(v) for v in size.split('x')) for size in args.sizes]
+    inputs = [torch.randn(1, 3, h, w) for h, w in sizes]
+    print(f"pos type: {args.pos_type}, depth: {args.depth}, sizes: {args.sizes}, torch threads: {torch.get_num_threads()}")
+    print(f"{'mode':<10} {'mean(ms)':>9} {'p50(ms)':>9} {'p95(ms)':>9}")
+    for name, cached in [('uncached', False), ('cached', True)]:
+        latencies = run(model, inputs, args.repeat, cached, args.cache_mb * 2 ** 20)
+        print(f"{name:<10} {latencies.mean():>9.1f} {np.percentile(latencies, 50):>9.1f} {np.percentile(latencies, 95):>9.1f}")
+    cache = beit.RELATIVE_POSITION_BIAS_CACHE
+    print(f"cache: {len(cache.entries)} entries, {cache.nbytes / 2 ** 20:.1f} MiB, hits {cache.hits}, misses {cache.misses}")
+
+
+if __name__ == "__main__":
+    main(parse_args())
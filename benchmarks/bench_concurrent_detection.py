@@ -0,0 +1,85 @@
+"""Per-page latency of layout + formula detection, back-to-back vs concurrent (PDF2MARKDOWN.detect_page).
+
+Run on a multi-core CPU box, both models use the same device as in the config.
+
+Example:
+    python benchmarks/bench_concurrent_detection.py --config project/pdf2markdown/configs/pdf2markdown.yaml \
+        --input assets/demo/formula_detection --threads 0 4
+"""
+import os
+import sys
+import time
+import argparse
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+sys.path.append(os.path.join(ROOT_DIR, 'project', 'pdf2markdown', 'scripts'))
+
+import numpy as np
+import torch
+from PIL import Image
+
+from pdf_extract_kit.utils.config_loader import load_config
+from pdf_extract_kit.utils.data_preprocess import load_pdf
+from pdf_extract_kit.registry.registry import MODEL_REGISTRY
+import pdf_extract_kit.tasks  # noqa: F401  register models
+from pdf2markdown import PDF2MARKDOWN
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent layout and formula detection.")
+    parser.add_argument('--config', type=str, required=True, help='Config with layout_detection and formula_detection tasks.')
+    parser.add_argument('--input', type=str, required=True, help='PDF file, image file or directory of images.')
+    parser.add_argument('--threads', type=int, nargs='+', default=[0],
+                        help='Per-model torch threads for the concurrent mode, 0 splits the cores evenly.')
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over all pages per mode.')
+    return parser.parse_args()
+
+
+def load_inputs(input_path):
+    if os.path.isdir(input_path):
+        files = sorted(os.path.join(input_path, f) for f in os.listdir(input_path)
+                       if f.lower().endswith(('.png', '.jpg', '.jpeg')))
+        return [Image.open(f).convert('RGB') for f in files]
+    if input_path.lower().endswith('.pdf'):
+        return load_pdf(input_path)
+    return [Image.open(input_path).convert('RGB')]
+
+
+def build_model(task_cfg):
+    return MODEL_REGISTRY.get(task_cfg['model'])(task_cfg['model_config'])
+
+
+def page_latencies(task, images, repeat):
+    task.detect_page(images[0], 0)  # warm up
+    latencies = []
+    for _ in range(repeat):
+        for idx, image in enumerate(images):
+            start = time.perf_counter()
+            task.detect_page(image, idx)
+            latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000
+
+
+def main(args):
+    config = load_config(args.config)
+    layout_model = build_model(config['tasks']['layout_detection'])
+    mfd_model = build_model(config['tasks']['formula_detection'])
+    images = load_inputs(args.input)
+    num_threads = torch.get_num_threads()
+
+    modes = [('sequential', False)] + [(f'concurrent({t or "auto"})', t or True) for t in args.threads]
+    print(f"pages: {len(images)}, cpu cores: {os.cpu_count()}, torch threads: {num_threads}")
+    print(f"{'mode':<16} {'mean':>9} {'p50':>9} {'p95':>9}")
+    for name, concurrent_detection in modes:
+        torch.set_num_threads(num_threads)
+        task = PDF2MARKDOWN(layout_model, mfd_model, None, None, concurrent_detection=concurrent_detection)
+        with task:
+            latencies = page_latencies(task, images, args.repeat)
+        print(f"{name:<16} {latencies.mean():>7.1f}ms {np.percentile(latencies, 50):>7.1f}ms "
+              f"{np.percentile(latencies, 95):>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main(parse_args())
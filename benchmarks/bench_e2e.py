@@ -0,0 +1,246 @@
+"""End-to-end throughput of the pdf2markdown library pipeline and the API on synthetic documents.
+
+Scenarios are (page kind, page count) pairs: text-dense, formula-dense, table-heavy and scanned-image
+PDFs from benchmarks/e2e/synthetic.py. By default the models are the registry-registered stubs of
+benchmarks/e2e/stub_models.py with fixed per-call costs, so regressions in the orchestration code
+(rasterization, cropping, batching, span assignment, markdown, upload handling, serialization) show up
+without model weights or a GPU. `--real` runs the models of `--config` instead.
+
+Targets:
+- `library`: PDF2MARKDOWN.process with merge2markdown, latency per document.
+- `api`: the FastAPI app in-process (TestClient), `--endpoints` per document, latency per request.
+  Image-only endpoints (layout/formula detection) get one request per rendered page.
+
+Every scenario runs in a fresh process, so the reported peak RSS belongs to that scenario alone.
+
+Example:
+    python benchmarks/bench_e2e.py --kinds text formula table scanned --pages 1 10 --docs 3
+    python benchmarks/bench_e2e.py --target api --endpoints layout-detection ocr --pages 4
+    python benchmarks/bench_e2e.py --real --config project/pdf2markdown/configs/pdf2markdown.yaml --pages 10
+"""
+import os
+import io
+import sys
+import json
+import time
+import tempfile
+import argparse
+import contextlib
+import multiprocessing
+from queue import Empty
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+sys.path.append(os.path.join(ROOT_DIR, 'project', 'pdf2markdown', 'scripts'))
+
+import numpy as np
+
+from benchmarks.e2e.synthetic import KINDS, STUB_PROFILES, make_corpus
+
+
+# endpoint -> input it accepts
+API_ENDPOINTS = {'layout-detection': 'image', 'formula-detection': 'image', 'ocr': 'pdf'}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark on synthetic documents.")
+    parser.add_argument('--target', type=str, default='library', choices=['library', 'api'])
+    parser.add_argument('--kinds', type=str, nargs='+', default=KINDS, choices=KINDS)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 10], help='Page counts per document.')
+    parser.add_argument('--docs', type=int, default=3, help='Documents per scenario.')
+    parser.add_argument('--warmup', type=int, default=1, help='Untimed documents per scenario.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', type=str, default=os.path.join(tempfile.gettempdir(), 'pdf_extract_kit_bench_e2e'),
+                        help='Cache of the synthetic PDFs.')
+    parser.add_argument('--endpoints', type=str, nargs='+', default=list(API_ENDPOINTS), choices=list(API_ENDPOINTS))
+    # library pipeline options, as in the pdf2markdown config
+    parser.add_argument('--pipeline', action='store_true', help='Pipelined page-streaming mode.')
+    parser.add_argument('--concurrent-detection', action='store_true')
+    # models
+    parser.add_argument('--real', action='store_true', help='Use the models of --config instead of the stubs.')
+    parser.add_argument('--config', type=str, default='project/pdf2markdown/configs/pdf2markdown.yaml')
+    parser.add_argument('--busy', action='store_true', help='Stubs spin instead of sleeping.')
+    parser.add_argument('--init-ms', type=float, default=0, help='Stub model construction cost.')
+    parser.add_argument('--layout-ms', type=float, default=60, help='Stub layout detection cost per page.')
+    parser.add_argument('--mfd-ms', type=float, default=40, help='Stub formula detection cost per page.')
+    parser.add_argument('--mfr-ms', type=float, default=8, help='Stub formula recognition cost per formula.')
+    parser.add_argument('--ocr-ms', type=float, default=12, help='Stub OCR cost per text region.')
+    parser.add_argument('--json', type=str, default=None, help='Also write the results to this JSON file.')
+    return parser.parse_args()
+
+
+def stub_costs(args):
+    return {'init_ms': args.init_ms, 'layout_ms': args.layout_ms, 'mfd_ms': args.mfd_ms,
+            'mfr_ms': args.mfr_ms, 'ocr_ms': args.ocr_ms, 'busy': args.busy}
+
+
+def render_pages(pdf_path, out_dir):
+    """Page PNGs of a PDF for the image-only endpoints, rendered like the library does (144 dpi)."""
+    from pdf_extract_kit.utils.data_preprocess import load_pdf
+
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    paths = []
+    for i, image in enumerate(load_pdf(pdf_path)):
+        path = os.path.join(out_dir, f"{stem}_page_{i + 1:04d}.png")
+        if not os.path.exists(path):
+            image.save(path)
+        paths.append(path)
+    return paths
+
+
+def build_library_task(args):
+    from pdf2markdown import PDF2MARKDOWN
+    from pdf_extract_kit.utils.config_loader import load_config, initialize_tasks_and_models
+    import pdf_extract_kit.tasks  # noqa: F401  register tasks
+
+    if args.real:
+        config = load_config(args.config)
+    else:
+        from benchmarks.e2e.stub_models import stub_config
+        config = stub_config()
+    task_instances = initialize_tasks_and_models(config)
+    models = [task_instances[name].model if name in task_instances else None
+              for name in ['layout_detection', 'formula_detection', 'formula_recognition', 'ocr']]
+    return PDF2MARKDOWN(*models, pipeline={} if args.pipeline else config.get('pipeline'),
+                        concurrent_detection=args.concurrent_detection or config.get('concurrent_detection', False),
+                        mfr_window=config.get('mfr_window'), memory=config.get('memory'))
+
+
+def run_library(args, paths, out_dir):
+    task = build_library_task(args)
+
+    def process(path):
+        # the pipeline prints per-page progress, keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            task.process(path, save_dir=out_dir, merge2markdown=True)
+
+    with task:
+        for path in paths[:args.warmup]:
+            process(path)
+        latencies, errors = [], 0
+        for path in paths[args.warmup:]:
+            start = time.perf_counter()
+            try:
+                process(path)
+            except Exception as e:
+                errors += 1
+                print(f"error on {path}: {e}", file=sys.stderr)
+            latencies.append(time.perf_counter() - start)
+    return latencies, errors
+
+
+def run_api(args, paths, out_dir):
+    from fastapi.testclient import TestClient
+
+    stubs = contextlib.nullcontext()
+    if not args.real:
+        from benchmarks.e2e.stub_models import stub_api_models
+        stubs = stub_api_models()
+    with stubs:
+        from main import app
+        client = TestClient(app)
+
+        requests = []
+        for path in paths:
+            doc_requests = []
+            for endpoint in args.endpoints:
+                inputs = [path] if API_ENDPOINTS[endpoint] == 'pdf' else render_pages(path, out_dir)
+                doc_requests.extend((endpoint, p) for p in inputs)
+            requests.append(doc_requests)
+
+        def post(endpoint, path):
+            with open(path, 'rb') as f:
+                response = client.post(f"/api/v1/{endpoint}", files={'file': (os.path.basename(path), f)})
+            return response.status_code == 200 and response.json().get('success', False)
+
+        for doc_requests in requests[:args.warmup]:
+            for endpoint, path in doc_requests:
+                post(endpoint, path)
+        latencies, errors = [], 0
+        for doc_requests in requests[args.warmup:]:
+            for endpoint, path in doc_requests:
+                start = time.perf_counter()
+                ok = post(endpoint, path)
+                latencies.append(time.perf_counter() - start)
+                errors += not ok
+    return latencies, errors
+
+
+def run_scenario(args, kind, num_pages, paths, queue):
+    """Runs in a fresh process, puts the scenario result on `queue`."""
+    from pdf_extract_kit.utils.memory import get_rss, get_peak_rss
+
+    if not args.real:
+        from benchmarks.e2e import stub_models
+        stub_models.configure(costs=stub_costs(args), profile=STUB_PROFILES[kind])
+    with tempfile.TemporaryDirectory() as out_dir:
+        setup_rss = get_rss()
+        start = time.perf_counter()
+        runner = run_library if args.target == 'library' else run_api
+        latencies, errors = runner(args, paths, out_dir)
+        wall = time.perf_counter() - start
+    timed_docs = len(paths) - args.warmup
+    queue.put({
+        'kind': kind, 'pages': num_pages, 'docs': timed_docs, 'requests': len(latencies), 'errors': errors,
+        'latencies': latencies, 'setup_rss': setup_rss, 'peak_rss': get_peak_rss(),
+        # wall time of the timed documents only, the warmup ran before them
+        'timed_wall': sum(latencies), 'total_wall': wall,
+    })
+
+
+def summarize(result):
+    latencies = np.array(result['latencies']) * 1000 if result['latencies'] else np.zeros(1)
+    pages = result['pages'] * result['docs']
+    return {
+        'scenario': f"{result['kind']}/{result['pages']}p",
+        'pages_per_sec': pages / result['timed_wall'] if result['timed_wall'] else 0.0,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'error_rate': result['errors'] / max(result['requests'], 1),
+        'peak_rss_mb': result['peak_rss'] / 2 ** 20,
+    }
+
+
+def wait_result(process, queue):
+    """Result of a scenario process, None if it died without one."""
+    while True:
+        try:
+            return queue.get(timeout=1)
+        except Empty:
+            if not process.is_alive():
+                return None
+
+
+def main(args):
+    if args.docs < 1:
+        raise ValueError("--docs must be at least 1")
+    corpus = make_corpus(args.workdir, args.kinds, args.pages, args.docs + args.warmup, seed=args.seed)
+    ctx = multiprocessing.get_context('spawn')
+    unit = 'document' if args.target == 'library' else 'request'
+    print(f"target: {args.target}, models: {'real (' + args.config + ')' if args.real else 'stubs'}, "
+          f"latency per {unit}")
+    print(f"{'scenario':<14} {'pages/s':>8} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'errors':>7} {'peak RSS(MiB)':>14}")
+    summaries = []
+    for (kind, num_pages), paths in corpus.items():
+        queue = ctx.Queue()
+        process = ctx.Process(target=run_scenario, args=(args, kind, num_pages, paths, queue))
+        process.start()
+        result = wait_result(process, queue)
+        process.join()
+        if result is None:
+            print(f"{kind}/{num_pages}p: scenario process failed with exit code {process.exitcode}")
+            continue
+        summary = summarize(result)
+        summaries.append(summary)
+        print(f"{summary['scenario']:<14} {summary['pages_per_sec']:>8.2f} {summary['p50_ms']:>9.1f} "
+              f"{summary['p95_ms']:>9.1f} {summary['p99_ms']:>9.1f} {summary['error_rate']:>7.1%} "
+              f"{summary['peak_rss_mb']:>14.0f}", flush=True)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': summaries}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,92 @@
+"""Benchmark span-to-block assignment (fill_spans_in_blocks) on pages with thousands of OCR spans.
+
+Compares the vectorized overlap matrix in pdf_extract_kit.utils.merge_blocks_and_spans against the
+previous per-block scan with list.remove.
+
+Example:
+    python benchmarks/bench_fill_spans.py --spans 1000 5000 10000 --blocks 60
+"""
+import copy
+import time
+import argparse
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+import numpy as np
+
+from pdf_extract_kit.utils.merge_blocks_and_spans import (
+    fill_spans_in_blocks,
+    calculate_overlap_area_in_bbox1_area_ratio,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark span-to-block assignment.")
+    parser.add_argument('--spans', type=int, nargs='+', default=[1000, 2000, 5000, 10000], help='Spans per page.')
+    parser.add_argument('--blocks', type=int, default=60, help='Layout blocks per page.')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed repetitions, best is reported.')
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args()
+
+
+def legacy_fill_spans_in_blocks(blocks, spans, radio):
+    block_with_spans = []
+    for block in blocks:
+        L, U, R, D = block['poly'][0], block['poly'][1], block['poly'][2], block['poly'][5]
+        L, R = min(L, R), max(L, R)
+        U, D = min(U, D), max(U, D)
+        block_bbox = [L, U, R, D]
+        block_spans = [span for span in spans
+                       if calculate_overlap_area_in_bbox1_area_ratio(span["bbox"], block_bbox) > radio]
+        block_with_spans.append({'type': block["category_type"], 'bbox': block_bbox,
+                                 'saved_info': block, 'spans': block_spans})
+        for span in block_spans:
+            spans.remove(span)
+    return block_with_spans, spans
+
+
+def make_page(num_blocks, num_spans, seed):
+    """Blocks tile a 2000x2800 page in a grid, spans are text-line sized and mostly inside blocks."""
+    rng = np.random.default_rng(seed)
+    cols = 3
+    rows = max(1, num_blocks // cols)
+    block_w, block_h = 2000 / cols, 2800 / rows
+    blocks = []
+    for i in range(rows * cols):
+        x0, y0 = (i % cols) * block_w, (i // cols) * block_h
+        blocks.append({'category_type': 'plain text',
+                       'poly': [x0, y0, x0 + block_w, y0, x0 + block_w, y0 + block_h, x0, y0 + block_h]})
+    spans = []
+    for i in range(num_spans):
+        x0, y0 = rng.uniform(0, 1950), rng.uniform(0, 2780)
+        spans.append({'type': 'text', 'bbox': [x0, y0, x0 + rng.uniform(10, 120), y0 + rng.uniform(12, 24)],
+                      'content': str(i)})
+    return blocks, spans
+
+
+def best_time(fn, blocks, spans, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        spans_copy = copy.copy(spans)
+        start = time.perf_counter()
+        result = fn(blocks, spans_copy, 0.6)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(args):
+    print(f"{'spans':>8} {'blocks':>7} {'legacy':>11} {'vectorized':>11} {'speedup':>8} {'unassigned':>11}")
+    for num_spans in args.spans:
+        blocks, spans = make_page(args.blocks, num_spans, args.seed)
+        legacy, (_, legacy_left) = best_time(legacy_fill_spans_in_blocks, blocks, spans, args.repeat)
+        vectorized, (_, left) = best_time(fill_spans_in_blocks, blocks, spans, args.repeat)
+        assert left == legacy_left
+        print(f"{num_spans:>8} {len(blocks):>7} {legacy * 1e3:>9.2f}ms {vectorized * 1e3:>9.2f}ms "
+              f"{legacy / vectorized:>7.1f}x {len(left):>11}")
+
+
+if __name__ == "__main__":
+    main(parse_args())
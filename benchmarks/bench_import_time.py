@@ -0,0 +1,62 @@
+"""Cold-start time of the API (`import main`) with lazy model registration vs resolving every model.
+
+Each measurement runs in a fresh interpreter. The `eager` mode imports `main` and then resolves all
+entries of MODEL_REGISTRY, which is what importing `pdf_extract_kit.tasks` used to do; models whose
+dependencies are not installed are reported and skipped.
+
+Example:
+    python benchmarks/bench_import_time.py --repeat 5
+"""
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+
+SNIPPET = '''
+import json, time
+start = time.perf_counter()
+import main
+app_time = time.perf_counter() - start
+missing = []
+if {eager}:
+    from pdf_extract_kit.registry.registry import MODEL_REGISTRY
+    for name in MODEL_REGISTRY.list_items():
+        try:
+            MODEL_REGISTRY.get(name)
+        except Exception as e:
+            missing.append(f"{{name}}: {{type(e).__name__}}")
+print(json.dumps({{"app": app_time, "total": time.perf_counter() - start, "missing": missing}}))
+'''
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark API cold-start import time.")
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters per mode.')
+    return parser.parse_args()
+
+
+def measure(eager):
+    out = subprocess.run([sys.executable, '-c', SNIPPET.format(eager=eager)], cwd=str(ROOT_DIR),
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(args):
+    measure(False)  # warm the file system cache and .pyc files
+    print(f"{'mode':<8} {'median':>9} {'min':>9}")
+    for name, eager in [('lazy', False), ('eager', True)]:
+        runs = [measure(eager) for _ in range(args.repeat)]
+        totals = [run['total'] for run in runs]
+        print(f"{name:<8} {statistics.median(totals) * 1000:>7.0f}ms {min(totals) * 1000:>7.0f}ms")
+        if runs[-1]['missing']:
+            print(f"         not resolvable here: {', '.join(runs[-1]['missing'])}")
+
+
+if __name__ == "__main__":
+    main(parse_args())
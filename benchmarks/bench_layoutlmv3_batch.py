@@ -0,0 +1,87 @@
+"""Pages/s of LayoutLMv3 layout detection, one image per DefaultPredictor call vs batched inference.
+
+The per-image path is the previous implementation (DefaultPredictor and three `.to("cpu")` per image);
+the batched path runs `VLGeneralizedRCNN.inference` on batches with shared padding. Detections of both
+paths are compared, small differences come from the extra padding of differently sized pages.
+
+Example:
+    python benchmarks/bench_layoutlmv3_batch.py --model-path models/Layout/LayoutLMv3/model_final.pth \
+        --input assets/demo/layout_detection --batch-sizes 1 2 4 8
+"""
+import os
+import time
+import argparse
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+import numpy as np
+from PIL import Image
+
+from pdf_extract_kit.utils.data_preprocess import load_pdf
+from pdf_extract_kit.tasks.layout_detection.models.layoutlmv3_util.model_init import Layoutlmv3_Predictor
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark batched LayoutLMv3 layout detection.")
+    parser.add_argument('--model-path', type=str, default='models/Layout/LayoutLMv3/model_final.pth')
+    parser.add_argument('--input', type=str, required=True, help='PDF file, image file or directory of images.')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=2, help='Passes over all pages per mode.')
+    return parser.parse_args()
+
+
+def load_inputs(input_path):
+    if os.path.isdir(input_path):
+        files = sorted(os.path.join(input_path, f) for f in os.listdir(input_path)
+                       if f.lower().endswith(('.png', '.jpg', '.jpeg')))
+        images = [Image.open(f).convert('RGB') for f in files]
+    elif input_path.lower().endswith('.pdf'):
+        images = load_pdf(input_path)
+    else:
+        images = [Image.open(input_path).convert('RGB')]
+    return [np.asarray(image) for image in images]
+
+
+def legacy_predict(predictor, image):
+    outputs = predictor.predictor(image)
+    boxes = outputs["instances"].to("cpu")._fields["pred_boxes"].tensor.tolist()
+    labels = outputs["instances"].to("cpu")._fields["pred_classes"].tolist()
+    scores = outputs["instances"].to("cpu")._fields["scores"].tolist()
+    return [(b, l, s) for b, l, s in zip(boxes, labels, scores)]
+
+
+def max_box_diff(legacy, batched):
+    diffs = []
+    for ref, res in zip(legacy, batched):
+        if len(ref) != len(res["layout_dets"]):
+            return float('inf')
+        for (box, _, _), det in zip(ref, res["layout_dets"]):
+            diffs.append(np.abs(np.array(box) - np.array(det["poly"])[[0, 1, 4, 5]]).max())
+    return max(diffs, default=0.0)
+
+
+def timed(fn, repeat):
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return (time.perf_counter() - start) / repeat, out
+
+
+def main(args):
+    images = load_inputs(args.input)
+    predictor = Layoutlmv3_Predictor(args.model_path)
+    seconds, legacy = timed(lambda: [legacy_predict(predictor, image) for image in images], args.repeat)
+    print(f"pages: {len(images)}")
+    print(f"{'mode':<12} {'pages/s':>8} {'max box diff':>13}")
+    print(f"{'per-image':<12} {len(images) / seconds:>8.2f} {0.0:>13.2f}")
+    for batch_size in args.batch_sizes:
+        predictor.batch_size = batch_size
+        seconds, batched = timed(lambda: predictor.predict_batch(images), args.repeat)
+        print(f"{f'batch {batch_size}':<12} {len(images) / seconds:>8.2f} {max_box_diff(legacy, batched):>13.2f}")
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,115 @@
+"""Load test of the API by replaying a captured request log.
+
+The log is the JSONL written by the capture middleware: start the server with
+`REQUEST_CAPTURE_DIR=<dir>` and `<dir>/requests.jsonl` plus `<dir>/payloads/` record the live traffic.
+The log is replayed in order (cycled when more requests are asked for than it holds) against a
+running server (`--url`) or the app in-process (FastAPI TestClient on one event loop, like a single
+uvicorn worker), optionally with the stub models of benchmarks/e2e/stub_models.py (`--stubs`).
+
+- `--concurrency N`: closed loop, N clients sending back to back.
+- `--rate R`: open loop, R requests per second (Poisson arrivals, `--arrival uniform` for evenly
+  spaced), at most `--max-inflight` in flight; latency counts from the scheduled arrival.
+
+Reports the latency distribution, error rate and throughput overall and per endpoint, and a
+timeline of throughput, errors and latency per `--interval` seconds; `--json` writes all of it plus
+the per-request results.
+
+Example:
+    REQUEST_CAPTURE_DIR=data/captures/prod python main.py   # capture, then:
+    python benchmarks/bench_load.py data/captures/prod/requests.jsonl --url http://localhost:8000 --concurrency 8 --requests 200
+    python benchmarks/bench_load.py data/captures/prod/requests.jsonl --stubs --rate 5 --duration 60 --json load.json
+"""
+import sys
+import json
+import argparse
+import contextlib
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from benchmarks.load.replay import load_log, run_closed, run_open, summarize, timeline
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay a captured request log against the API.")
+    parser.add_argument('log', type=str, help='JSONL request log.')
+    parser.add_argument('--payloads', type=str, default=None, help='Payload directory, payloads/ next to the log by default.')
+    parser.add_argument('--endpoints', type=str, nargs='+', default=None, help='Replay only these endpoints.')
+    parser.add_argument('--url', type=str, default=None, help='Server URL, the app runs in-process when not given.')
+    parser.add_argument('--stubs', action='store_true', help='In-process app with the stub models.')
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument('--concurrency', type=int, default=None, help='Closed loop with this many clients (default 4).')
+    load.add_argument('--rate', type=float, default=None, help='Open loop with this many requests per second.')
+    parser.add_argument('--arrival', type=str, default='poisson', choices=['poisson', 'uniform'])
+    parser.add_argument('--max-inflight', type=int, default=64, help='Open loop: concurrent requests at most.')
+    parser.add_argument('--requests', type=int, default=None, help='Requests to send, one pass over the log by default.')
+    parser.add_argument('--duration', type=float, default=None, help='Stop sending after this many seconds.')
+    parser.add_argument('--timeout', type=float, default=300, help='Request timeout in seconds (--url).')
+    parser.add_argument('--interval', type=float, default=1.0, help='Timeline bucket in seconds.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', type=str, default=None, help='Also write the results to this JSON file.')
+    return parser.parse_args()
+
+
+@contextlib.contextmanager
+def make_client(args):
+    if args.url:
+        import httpx
+        with httpx.Client(base_url=args.url, timeout=args.timeout) as client:
+            yield client
+        return
+
+    from fastapi.testclient import TestClient
+
+    stubs = contextlib.nullcontext()
+    if args.stubs:
+        from benchmarks.e2e.stub_models import stub_api_models
+        stubs = stub_api_models()
+    with stubs:
+        from main import app
+        # one event loop shared by all requests, as in a uvicorn worker
+        with TestClient(app) as client:
+            yield client
+
+
+def print_report(summary, rows):
+    print(f"\n{'endpoint':<34} {'requests':>8} {'errors':>7} {'req/s':>7} {'p50(ms)':>9} {'p90(ms)':>9} "
+          f"{'p99(ms)':>9} {'max(ms)':>9}")
+    for name, stats in [*summary['endpoints'].items(), ('overall', summary['overall'])]:
+        print(f"{name:<34} {stats['requests']:>8} {stats['error_rate']:>7.1%} {stats['throughput_rps']:>7.2f} "
+              f"{stats['p50_ms']:>9.1f} {stats['p90_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['max_ms']:>9.1f}")
+    print(f"\n{'t(s)':>7} {'done':>5} {'req/s':>7} {'errors':>6} {'p50(ms)':>9} {'p95(ms)':>9}")
+    for row in rows:
+        print(f"{row['start_s']:>7.1f} {row['completed']:>5} {row['throughput_rps']:>7.2f} {row['errors']:>6} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f}")
+
+
+def main(args):
+    records = load_log(args.log, args.payloads, args.endpoints)
+    total = args.requests if args.requests is not None or args.duration is not None else len(records)
+    with make_client(args) as client:
+        if args.rate:
+            mode = f"open loop, {args.rate:g} req/s ({args.arrival}), max {args.max_inflight} in flight"
+            print(f"{len(records)} logged requests, {mode}")
+            results = run_open(client, records, args.rate, total, args.duration, args.max_inflight,
+                               args.arrival, args.seed)
+        else:
+            concurrency = args.concurrency or 4
+            print(f"{len(records)} logged requests, closed loop, {concurrency} clients")
+            results = run_closed(client, records, concurrency, total, args.duration)
+
+    summary = summarize(results)
+    rows = timeline(results, args.interval)
+    print_report(summary, rows)
+    errors = [r for r in results if r['error'] is not None]
+    for r in errors[:5]:
+        print(f"error on {r['endpoint']} (status {r['status']}): {r['error']}", file=sys.stderr)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'summary': summary, 'timeline': rows, 'results': results}, f, indent=2)
+    return 1 if summary['overall']['requests'] == 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
@@ -0,0 +1,173 @@
+"""Microbenchmarks of the geometry and text post-processing between the models and the markdown.
+
+Every case runs on seeded layouts from benchmarks/micro/layouts.py with 10, 100, 1k and 10k spans
+(two-column pages with paragraphs, inline and display formulas, figures and captions):
+
+- `merge_spans_to_line`: merge_blocks_and_spans.merge_spans_to_line on all spans
+- `fill_spans_in_blocks`: spans into the text, title, caption and formula blocks
+- `merge_para_with_text`: text of every block after fix_block_spans
+- `latex_rm_whitespace`: every formula of the layout
+- `sorted_boxes`, `merge_det_boxes`: the OCR detection boxes of the text spans
+- `update_det_boxes`: the OCR line boxes split around the formula boxes
+- `convert2md`: the whole page result to markdown
+
+The time per call is measured over enough calls to last `--min-time`, `--repeat` times; inputs are
+built fresh for every call outside of the timed region since most functions modify them. The best
+and median time per call are reported. `--save` writes them as a JSON baseline, `--baseline` compares
+the run against one and exits with status 1 when a case is more than `--threshold` slower.
+latex_rm_whitespace and convert2md live in the pdf2markdown project script, which imports torch;
+they are skipped when it cannot be imported.
+
+Example:
+    python benchmarks/bench_micro.py --save benchmarks/micro_baseline.json
+    python benchmarks/bench_micro.py --baseline benchmarks/micro_baseline.json --threshold 0.2
+    python benchmarks/bench_micro.py --cases fill_spans_in_blocks convert2md --sizes 1000 10000
+"""
+import os
+import sys
+import copy
+import time
+import argparse
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+sys.path.append(os.path.join(ROOT_DIR, 'project', 'pdf2markdown', 'scripts'))
+
+import numpy as np
+
+from benchmarks.micro import layouts
+from benchmarks.micro.baseline import save_baseline, load_baseline, compare
+from pdf_extract_kit.utils.merge_blocks_and_spans import (
+    merge_spans_to_line,
+    fill_spans_in_blocks,
+    fix_block_spans,
+    merge_para_with_text,
+)
+from pdf_extract_kit.utils.ocr_utils import sorted_boxes, merge_det_boxes, update_det_boxes
+
+
+# block types convert2md fills with spans
+TEXT_BLOCK_TYPES = ["title", "plain text", "figure_caption", "table_caption", "table_footnote",
+                    "isolate_formula", "formula_caption"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the post-processing hot paths.")
+    parser.add_argument('--cases', type=str, nargs='+', default=None, help='Cases to run, all by default.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000], help='Spans per layout.')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed samples, best and median are reported.')
+    parser.add_argument('--min-time', type=float, default=0.05, help='Minimum seconds per sample.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', type=str, default=None, help='Write the results as a JSON baseline.')
+    parser.add_argument('--baseline', type=str, default=None, help='JSON baseline to compare with.')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative slowdown of the best time flagged as a regression.')
+    return parser.parse_args()
+
+
+def text_blocks(layout):
+    return [block for block in layout['blocks'] if block['category_type'] in TEXT_BLOCK_TYPES]
+
+
+def para_blocks(layout):
+    block_with_spans, _ = fill_spans_in_blocks(text_blocks(layout), copy.deepcopy(layout['spans']), 0.6)
+    return fix_block_spans(block_with_spans)
+
+
+def merge_all_paras(blocks):
+    return [merge_para_with_text(block) for block in blocks]
+
+
+def markdown_cases():
+    """Cases of the pdf2markdown script, empty when it cannot be imported (it needs torch)."""
+    try:
+        from pdf2markdown import PDF2MARKDOWN, latex_rm_whitespace
+    except ImportError as e:
+        print(f"skipping latex_rm_whitespace, convert2md: {e}")
+        return {}
+    # convert2md only uses order_blocks, no models are needed
+    task = PDF2MARKDOWN.__new__(PDF2MARKDOWN)
+    return {
+        'latex_rm_whitespace': (lambda layout: (layouts.latex_strings(layout),),
+                                lambda strings: [latex_rm_whitespace(s) for s in strings]),
+        'convert2md': (lambda layout: (layouts.extract_res(layout),), task.convert2md),
+    }
+
+
+def build_cases():
+    """name -> (prepare, fn): `prepare(layout)` builds fresh arguments for one call of `fn`."""
+    cases = {
+        'merge_spans_to_line': (lambda layout: (copy.deepcopy(layout['spans']),), merge_spans_to_line),
+        'fill_spans_in_blocks': (lambda layout: (text_blocks(layout), copy.deepcopy(layout['spans']), 0.6),
+                                 fill_spans_in_blocks),
+        'merge_para_with_text': (lambda layout: (para_blocks(layout),), merge_all_paras),
+        'sorted_boxes': (lambda layout: (layouts.dt_boxes(layout),), sorted_boxes),
+        'merge_det_boxes': (lambda layout: (list(layouts.dt_boxes(layout)),), merge_det_boxes),
+        'update_det_boxes': (lambda layout: (list(layouts.ocr_line_boxes(layout)), layouts.mfd_res(layout)),
+                             update_det_boxes),
+    }
+    cases.update(markdown_cases())
+    return cases
+
+
+def time_case(prepare, fn, layout, repeat, min_time):
+    """Best and median seconds per call, and the number of calls per sample."""
+    # the first call warms up caches and lazy imports, the second sizes the samples
+    fn(*prepare(layout))
+    args = prepare(layout)
+    start = time.perf_counter()
+    fn(*args)
+    single = time.perf_counter() - start
+    loops = max(1, min(1000, int(min_time / max(single, 1e-6))))
+    samples = []
+    for _ in range(repeat):
+        inputs = [prepare(layout) for _ in range(loops)]
+        start = time.perf_counter()
+        for args in inputs:
+            fn(*args)
+        samples.append((time.perf_counter() - start) / loops)
+    return min(samples), float(np.median(samples)), loops
+
+
+def main(args):
+    cases = build_cases()
+    names = args.cases or list(cases)
+    unknown = [name for name in names if name not in cases]
+    if unknown:
+        print(f"unknown or unavailable cases: {unknown}, available: {list(cases)}")
+        return 2
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    results = {}
+    print(f"{'case':<22} {'spans':>6} {'best(ms)':>10} {'median(ms)':>11} {'loops':>6}")
+    for num_spans in args.sizes:
+        layout = layouts.make_layout(num_spans, seed=args.seed)
+        for name in names:
+            prepare, fn = cases[name]
+            best, median, loops = time_case(prepare, fn, layout, args.repeat, args.min_time)
+            results[f"{name}/{num_spans}"] = {'best_ms': best * 1e3, 'median_ms': median * 1e3, 'loops': loops}
+            print(f"{name:<22} {num_spans:>6} {best * 1e3:>10.4f} {median * 1e3:>11.4f} {loops:>6}", flush=True)
+
+    if args.save:
+        save_baseline(args.save, results, settings={'seed': args.seed, 'repeat': args.repeat, 'min_time': args.min_time})
+        print(f"baseline written to {args.save}")
+    if baseline is None:
+        return 0
+
+    rows = compare(results, baseline, args.threshold)
+    print(f"\ncompared with {args.baseline} (threshold {args.threshold:.0%})")
+    print(f"{'case':<30} {'baseline(ms)':>13} {'current(ms)':>12} {'ratio':>7}  status")
+    for row in rows:
+        reference = f"{row['baseline_ms']:.4f}" if row['baseline_ms'] is not None else '-'
+        ratio = f"{row['ratio']:.2f}x" if row['ratio'] is not None else '-'
+        print(f"{row['key']:<30} {reference:>13} {row['current_ms']:>12.4f} {ratio:>7}  {row['status']}")
+    regressions = [row['key'] for row in rows if row['status'] == 'regression']
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
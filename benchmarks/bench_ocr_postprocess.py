@@ -0,0 +1,146 @@
+"""Microbenchmark of the OCR box post-processing (sorted_boxes, merge_det_boxes, update_det_boxes).
+
+Times the NumPy kernels in pdf_extract_kit.utils.ocr_utils against the previous pure-Python
+implementations on synthetic pages with 1k-10k boxes (the range seen on dense CJK pages),
+and the formula masking of update_det_boxes as the formula count grows (math-heavy pages).
+
+Example:
+    python benchmarks/bench_ocr_postprocess.py --sizes 1000 2000 5000 10000 --formulas 10 100 1000
+"""
+import time
+import argparse
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+import numpy as np
+
+from pdf_extract_kit.utils.ocr_utils import (
+    sorted_boxes,
+    merge_det_boxes,
+    update_det_boxes,
+    remove_intervals,
+    merge_spans_to_line,
+    merge_overlapping_spans,
+    points_to_bbox,
+    bbox_to_points,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark OCR box post-processing.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 5000, 10000], help='Boxes per page.')
+    parser.add_argument('--formulas', type=int, nargs='+', default=[10, 100, 500, 1000], help='Formulas per page.')
+    parser.add_argument('--formula-page-boxes', type=int, default=2000, help='Text boxes per page in the formula benchmark.')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed repetitions, best is reported.')
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args()
+
+
+def legacy_sorted_boxes(dt_boxes):
+    num_boxes = dt_boxes.shape[0]
+    _boxes = list(sorted(dt_boxes, key=lambda x: (x[0][1], x[0][0])))
+    for i in range(num_boxes - 1):
+        for j in range(i, -1, -1):
+            if abs(_boxes[j + 1][0][1] - _boxes[j][0][1]) < 10 and \
+                    (_boxes[j + 1][0][0] < _boxes[j][0][0]):
+                _boxes[j], _boxes[j + 1] = _boxes[j + 1], _boxes[j]
+            else:
+                break
+    return _boxes
+
+
+def legacy_merge_det_boxes(dt_boxes):
+    lines = merge_spans_to_line([{'bbox': points_to_bbox(box)} for box in dt_boxes])
+    new_dt_boxes = []
+    for line in lines:
+        for span in merge_overlapping_spans([span['bbox'] for span in line]):
+            new_dt_boxes.append(bbox_to_points(span))
+    return new_dt_boxes
+
+
+def legacy_update_det_boxes(dt_boxes, mfd_res):
+    def is_overlaps_y_exceeds_threshold(bbox1, bbox2, overlap_ratio_threshold=0.8):
+        _, y0_1, _, y1_1 = bbox1
+        _, y0_2, _, y1_2 = bbox2
+        overlap = max(0, min(y1_1, y1_2) - max(y0_1, y0_2))
+        min_height = min(y1_1 - y0_1, y1_2 - y0_2)
+        return (overlap / min_height) > overlap_ratio_threshold
+
+    new_dt_boxes = []
+    for text_box in dt_boxes:
+        text_bbox = points_to_bbox(text_box)
+        masks_list = []
+        for mf_box in mfd_res:
+            mf_bbox = mf_box['bbox']
+            if is_overlaps_y_exceeds_threshold(text_bbox, mf_bbox):
+                masks_list.append([mf_bbox[0], mf_bbox[2]])
+        for text_remove_mask in remove_intervals([text_bbox[0], text_bbox[2]], masks_list):
+            new_dt_boxes.append(bbox_to_points([text_remove_mask[0], text_bbox[1], text_remove_mask[1], text_bbox[3]]))
+    return new_dt_boxes
+
+
+def make_formula_boxes(dt_boxes, num_formulas, seed):
+    rng = np.random.default_rng(seed)
+    mfd_res = []
+    for _ in range(num_formulas):
+        box = dt_boxes[rng.integers(len(dt_boxes))]
+        x0 = int(rng.uniform(box[0][0] - 20, box[1][0]))
+        y0 = int(box[0][1] + rng.normal(0, 2))
+        height = int(box[2][1] - box[0][1] + rng.normal(0, 3))
+        mfd_res.append({'bbox': [x0, y0, x0 + int(rng.uniform(5, 80)), y0 + max(height, 1)]})
+    return mfd_res
+
+
+def make_page_boxes(num_boxes, seed):
+    rng = np.random.default_rng(seed)
+    boxes = []
+    y = 10.0
+    while len(boxes) < num_boxes:
+        height = rng.uniform(12, 30)
+        x = rng.uniform(0, 40)
+        for _ in range(rng.integers(1, 12)):
+            width = rng.uniform(5, 120)
+            x0, y0 = x, y + rng.normal(0, 3)
+            boxes.append([[x0, y0], [x0 + width, y0], [x0 + width, y0 + height], [x0, y0 + height]])
+            x += width + rng.uniform(-10, 25)
+        y += height * rng.uniform(0.3, 1.5)
+    boxes = np.array(boxes[:num_boxes], dtype=np.float32)
+    return boxes[rng.permutation(len(boxes))]
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(args):
+    print(f"{'boxes':>8} {'legacy sort':>12} {'sort':>10} {'legacy merge':>13} {'merge':>10} {'speedup':>8}")
+    for size in args.sizes:
+        dt_boxes = make_page_boxes(size, args.seed)
+        sorted_dt_boxes = sorted_boxes(dt_boxes)
+        legacy_sort = best_time(lambda: legacy_sorted_boxes(dt_boxes), args.repeat)
+        new_sort = best_time(lambda: sorted_boxes(dt_boxes), args.repeat)
+        legacy_merge = best_time(lambda: legacy_merge_det_boxes(sorted_dt_boxes), args.repeat)
+        new_merge = best_time(lambda: merge_det_boxes(sorted_dt_boxes), args.repeat)
+        speedup = (legacy_sort + legacy_merge) / (new_sort + new_merge)
+        print(f"{size:>8} {legacy_sort * 1e3:>10.2f}ms {new_sort * 1e3:>8.2f}ms "
+              f"{legacy_merge * 1e3:>11.2f}ms {new_merge * 1e3:>8.2f}ms {speedup:>7.1f}x")
+
+    dt_boxes = merge_det_boxes(sorted_boxes(make_page_boxes(args.formula_page_boxes, args.seed)))
+    print(f"\nupdate_det_boxes on {len(dt_boxes)} text boxes")
+    print(f"{'formulas':>8} {'legacy':>10} {'indexed':>10} {'speedup':>8}")
+    for num_formulas in args.formulas:
+        mfd_res = make_formula_boxes(dt_boxes, num_formulas, args.seed)
+        legacy = best_time(lambda: legacy_update_det_boxes(dt_boxes, mfd_res), args.repeat)
+        indexed = best_time(lambda: update_det_boxes(dt_boxes, mfd_res), args.repeat)
+        print(f"{num_formulas:>8} {legacy * 1e3:>8.2f}ms {indexed * 1e3:>8.2f}ms {legacy / indexed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,105 @@
+"""Aggregate pdf2markdown throughput for different splits of the cores between concurrent pipelines.
+
+For every split, N worker processes (pipelines) load the models from the config and then process the
+same pages at the same time. With the thread budget, every pipeline gets 1/N of the cores for torch,
+Paddle, OpenCV and BLAS (optionally pinned). Without it (`--unmanaged`), every library in every process
+sizes its pools to all cores. The wall time counts from the moment all pipelines are ready until the
+last one finishes, model loading is not included.
+
+Example:
+    python benchmarks/bench_thread_budget.py --config project/pdf2markdown/configs/pdf2markdown.yaml \
+        --input assets/demo/formula_detection --splits 1 2 4 --unmanaged --pin
+"""
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+sys.path.append(os.path.join(ROOT_DIR, 'project', 'pdf2markdown', 'scripts'))
+
+from pdf_extract_kit.utils.thread_budget import apply_thread_budget, available_cores
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark thread budget splits between concurrent pipelines.")
+    parser.add_argument('--config', type=str, required=True, help='pdf2markdown configuration file.')
+    parser.add_argument('--input', type=str, required=True, help='PDF file, image file or directory of images.')
+    parser.add_argument('--splits', type=int, nargs='+', default=[1, 2, 4], help='Numbers of concurrent pipelines.')
+    parser.add_argument('--repeat', type=int, default=2, help='Passes over all pages per pipeline.')
+    parser.add_argument('--unmanaged', action='store_true', help='Also run every split without a thread budget.')
+    parser.add_argument('--pin', action='store_true', help='Pin every pipeline to its own cores.')
+    return parser.parse_args()
+
+
+def load_inputs(input_path):
+    from PIL import Image
+    from pdf_extract_kit.utils.data_preprocess import load_pdf
+
+    if os.path.isdir(input_path):
+        files = sorted(os.path.join(input_path, f) for f in os.listdir(input_path)
+                       if f.lower().endswith(('.png', '.jpg', '.jpeg')))
+        return [Image.open(f).convert('RGB') for f in files]
+    if input_path.lower().endswith('.pdf'):
+        return load_pdf(input_path)
+    return [Image.open(input_path).convert('RGB')]
+
+
+def run_pipeline(args, index, pipelines, managed, barrier, results):
+    if managed:
+        # before torch / paddle are imported, as in run_batch.py
+        apply_thread_budget({'pipelines': pipelines, 'pipeline_index': index, 'pin_cores': args.pin})
+    from pdf2markdown import PDF2MARKDOWN
+    from pdf_extract_kit.utils.config_loader import load_config, initialize_tasks_and_models
+
+    config = load_config(args.config)
+    config.pop('threads', None)
+    task_instances = initialize_tasks_and_models(config)
+    models = {name: task_instances[name].model if name in task_instances else None
+              for name in ['layout_detection', 'formula_detection', 'formula_recognition', 'ocr']}
+    task = PDF2MARKDOWN(models['layout_detection'], models['formula_detection'],
+                        models['formula_recognition'], models['ocr'])
+    images = load_inputs(args.input)
+    barrier.wait()
+    start = time.time()
+    for _ in range(args.repeat):
+        for page_no, image in enumerate(images):
+            page_res, latex_filling_list, mf_image_list = task.detect_page(image, page_no)
+            task.recognize_formulas(latex_filling_list, mf_image_list)
+            task.ocr_page(image, page_res)
+    results.put((start, time.time(), len(images) * args.repeat))
+
+
+def run_split(args, pipelines, managed):
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(pipelines)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=run_pipeline, args=(args, i, pipelines, managed, barrier, results))
+                 for i in range(pipelines)]
+    for p in processes:
+        p.start()
+    runs = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+    wall = max(end for _, end, _ in runs) - min(start for start, _, _ in runs)
+    pages = sum(num_pages for _, _, num_pages in runs)
+    return pages / wall
+
+
+def main(args):
+    num_cores = len(available_cores())
+    print(f"cores: {num_cores}, pinned: {args.pin}")
+    print(f"{'pipelines':>9} {'threads each':>12} {'budget':>9} {'pages/s':>9}")
+    for pipelines in args.splits:
+        modes = [True, False] if args.unmanaged else [True]
+        for managed in modes:
+            pages_per_sec = run_split(args, pipelines, managed)
+            threads = max(1, num_cores // pipelines) if managed else num_cores
+            print(f"{pipelines:>9} {threads:>12} {'yes' if managed else 'no':>9} {pages_per_sec:>9.2f}", flush=True)
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,105 @@
+"""Latency and LaTeX parity of UniMERNet precision modes (int8 dynamic quantization, bf16 autocast) against fp32 on CPU.
+
+Every mode recognizes the same formula crops in batches, the fp32 output is the reference. Reported per
+mode: mean latency per formula, speedup over fp32, exact-match rate and the mean/max normalized token
+edit distance of the LaTeX output (tokens are the space-separated UniMERNet output tokens).
+
+Example:
+    python benchmarks/bench_unimernet_precision.py --model-path models/MFR/unimernet_tiny \
+        --input assets/demo/formula_recognition --precisions int8 bf16 --threads 8
+"""
+import os
+import time
+import argparse
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+import numpy as np
+import torch
+from PIL import Image
+
+from pdf_extract_kit.registry.registry import MODEL_REGISTRY
+import pdf_extract_kit.tasks  # noqa: F401  register models
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare UniMERNet precision modes against fp32 on CPU.")
+    parser.add_argument('--model-path', type=str, default='models/MFR/unimernet_tiny')
+    parser.add_argument('--cfg-path', type=str, default='pdf_extract_kit/configs/unimernet.yaml')
+    parser.add_argument('--input', type=str, default='assets/demo/formula_recognition', help='Directory of formula crops.')
+    parser.add_argument('--precisions', type=str, nargs='+', default=['int8', 'bf16'], help='Modes compared to fp32.')
+    parser.add_argument('--int8-modules', type=str, nargs='+', default=['encoder', 'decoder'])
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=None, help='torch intra-op threads, default unchanged.')
+    parser.add_argument('--repeat', type=int, default=1, help='Timed passes over the fixture set per mode.')
+    return parser.parse_args()
+
+
+def edit_distance(a, b):
+    """Levenshtein distance between two token sequences."""
+    prev = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        cur = [i]
+        for j, y in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (x != y)))
+        prev = cur
+    return prev[-1]
+
+
+def normalized_edit_distance(ref, pred):
+    ref_tokens, pred_tokens = ref.split(), pred.split()
+    return edit_distance(ref_tokens, pred_tokens) / max(len(ref_tokens), len(pred_tokens), 1)
+
+
+def load_crops(input_dir):
+    files = sorted(f for f in os.listdir(input_dir) if f.lower().endswith(('.png', '.jpg', '.jpeg')))
+    return files, [Image.open(os.path.join(input_dir, f)).convert('RGB') for f in files]
+
+
+def recognize(model, images, batch_size):
+    preds = []
+    for start in range(0, len(images), batch_size):
+        batch = torch.stack([model.vis_processor(image) for image in images[start:start + batch_size]])
+        preds.extend(model.model.generate({'image': batch.to(model.device)})['pred_str'])
+    return preds
+
+
+def run_mode(args, precision, images):
+    config = {'model_path': args.model_path, 'cfg_path': args.cfg_path, 'batch_size': args.batch_size,
+              'precision': precision, 'int8_modules': args.int8_modules}
+    model = MODEL_REGISTRY.get('formula_recognition_unimernet')(config)
+    recognize(model, images[:1], 1)  # warm up
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        preds = recognize(model, images, args.batch_size)
+    latency = (time.perf_counter() - start) / (len(images) * args.repeat)
+    return model.precision, preds, latency
+
+
+def main(args):
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    names, images = load_crops(args.input)
+    print(f"formulas: {len(images)}, torch threads: {torch.get_num_threads()}")
+
+    _, ref_preds, ref_latency = run_mode(args, 'fp32', images)
+    print(f"{'mode':<6} {'ms/formula':>11} {'speedup':>8} {'exact':>7} {'mean NED':>9} {'max NED':>8}")
+    print(f"{'fp32':<6} {ref_latency * 1000:>11.1f} {1.0:>7.2f}x {1.0:>7.3f} {0.0:>9.4f} {0.0:>8.4f}")
+    for precision in args.precisions:
+        applied, preds, latency = run_mode(args, precision, images)
+        if applied != precision:
+            print(f"{precision:<6} not available on this machine, ran as {applied}")
+            continue
+        distances = np.array([normalized_edit_distance(ref, pred) for ref, pred in zip(ref_preds, preds)])
+        exact = np.mean([ref == pred for ref, pred in zip(ref_preds, preds)])
+        print(f"{precision:<6} {latency * 1000:>11.1f} {ref_latency / latency:>7.2f}x {exact:>7.3f} "
+              f"{distances.mean():>9.4f} {distances.max():>8.4f}")
+        worst = int(distances.argmax())
+        if distances[worst] > 0:
+            print(f"  worst: {names[worst]}\n    fp32: {ref_preds[worst]}\n    {precision}: {preds[worst]}")
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,140 @@
+"""Accuracy parity and CPU throughput of the ONNX Runtime YOLO backend against the torch backend.
+
+Both backends run on the same images with the same thresholds. Torch detections are matched to ONNX
+detections of the same class by IoU; recall/precision of the matching, the mean confidence difference
+and the largest box offset are reported together with pages/s of each backend per thread count. The
+ONNX model is exported next to the .pt weights on first use when `--onnx-path` does not exist.
+
+Example:
+    python benchmarks/bench_yolo_onnx.py --task layout_detection \
+        --model-path models/Layout/YOLO/doclayout_yolo_ft.pt --img-size 1024 \
+        --input assets/demo/layout_detection --threads 4 8
+"""
+import os
+import time
+import argparse
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+import numpy as np
+import torch
+from PIL import Image
+
+from pdf_extract_kit.utils.data_preprocess import load_pdf
+from pdf_extract_kit.registry.registry import MODEL_REGISTRY
+import pdf_extract_kit.tasks  # noqa: F401  register models
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare the ONNX Runtime and torch YOLO detectors on CPU.")
+    parser.add_argument('--task', type=str, default='layout_detection', choices=['layout_detection', 'formula_detection'])
+    parser.add_argument('--model-path', type=str, required=True, help='Ultralytics .pt weights of the torch backend.')
+    parser.add_argument('--onnx-path', type=str, default=None, help='ONNX model, exported from --model-path if missing.')
+    parser.add_argument('--input', type=str, required=True, help='PDF file, image file or directory of images.')
+    parser.add_argument('--img-size', type=int, default=1024)
+    parser.add_argument('--conf-thres', type=float, default=0.25)
+    parser.add_argument('--iou-thres', type=float, default=0.45)
+    parser.add_argument('--threads', type=int, nargs='+', default=[os.cpu_count()], help='Thread counts to benchmark.')
+    parser.add_argument('--repeat', type=int, default=3, help='Passes over all pages per backend.')
+    parser.add_argument('--match-iou', type=float, default=0.9, help='IoU for a torch and an ONNX box to count as the same.')
+    return parser.parse_args()
+
+
+def load_inputs(input_path):
+    if os.path.isdir(input_path):
+        files = sorted(os.path.join(input_path, f) for f in os.listdir(input_path)
+                       if f.lower().endswith(('.png', '.jpg', '.jpeg')))
+        return [Image.open(f).convert('RGB') for f in files]
+    if input_path.lower().endswith('.pdf'):
+        return load_pdf(input_path)
+    return [Image.open(input_path).convert('RGB')]
+
+
+def to_numpy(result):
+    boxes = result.boxes
+    return (np.asarray(boxes.xyxy.cpu(), dtype=np.float32), np.asarray(boxes.conf.cpu(), dtype=np.float32),
+            np.asarray(boxes.cls.cpu(), dtype=np.int64))
+
+
+def iou_matrix(a, b):
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = (rb - lt).clip(0).prod(-1)
+    area_a = (a[:, 2:] - a[:, :2]).prod(-1)
+    area_b = (b[:, 2:] - b[:, :2]).prod(-1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-7)
+
+
+def match_detections(ref, test, match_iou):
+    """Greedy same-class matching of reference to test detections by decreasing IoU.
+
+    Returns:
+        tuple: (matches, conf_diffs, box_offsets) for the matched pairs.
+    """
+    ref_boxes, ref_conf, ref_cls = ref
+    test_boxes, test_conf, test_cls = test
+    if len(ref_boxes) == 0 or len(test_boxes) == 0:
+        return 0, [], []
+    ious = iou_matrix(ref_boxes, test_boxes)
+    ious[ref_cls[:, None] != test_cls[None, :]] = 0
+    matches, conf_diffs, box_offsets = 0, [], []
+    while True:
+        i, j = np.unravel_index(np.argmax(ious), ious.shape)
+        if ious[i, j] < match_iou:
+            break
+        matches += 1
+        conf_diffs.append(abs(float(ref_conf[i]) - float(test_conf[j])))
+        box_offsets.append(float(np.abs(ref_boxes[i] - test_boxes[j]).max()))
+        ious[i, :] = 0
+        ious[:, j] = 0
+    return matches, conf_diffs, box_offsets
+
+
+def throughput(model, images, repeat):
+    model.predict(images[:1], None)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        model.predict(images, None)
+    return len(images) * repeat / (time.perf_counter() - start)
+
+
+def main(args):
+    images = load_inputs(args.input)
+    model_config = {'model_path': args.model_path, 'img_size': args.img_size, 'conf_thres': args.conf_thres,
+                    'iou_thres': args.iou_thres, 'device': 'cpu', 'visualize': False}
+    torch_model = MODEL_REGISTRY.get(f"{args.task}_yolo")(model_config)
+    onnx_config = dict(model_config, intra_op_num_threads=args.threads[0])
+    if args.onnx_path:
+        onnx_config['onnx_path'] = args.onnx_path
+    onnx_model = MODEL_REGISTRY.get(f"{args.task}_yolo_onnx")(onnx_config)
+
+    # parity
+    num_ref = num_test = num_matched = 0
+    conf_diffs, box_offsets = [], []
+    for image in images:
+        ref = to_numpy(torch_model.predict([image], None)[0])
+        test = to_numpy(onnx_model.predict([image], None)[0])
+        matched, diffs, offsets = match_detections(ref, test, args.match_iou)
+        num_ref, num_test, num_matched = num_ref + len(ref[0]), num_test + len(test[0]), num_matched + matched
+        conf_diffs += diffs
+        box_offsets += offsets
+    print(f"pages: {len(images)}, onnx model: {onnx_model.onnx_path} (dynamic shapes: {onnx_model.dynamic})")
+    print(f"torch boxes: {num_ref}, onnx boxes: {num_test}, matched at IoU>={args.match_iou}: {num_matched}")
+    print(f"recall: {num_matched / max(num_ref, 1):.4f}, precision: {num_matched / max(num_test, 1):.4f}, "
+          f"mean |conf diff|: {np.mean(conf_diffs) if conf_diffs else 0:.4f}, "
+          f"max box offset: {max(box_offsets, default=0):.1f}px")
+
+    # throughput
+    print(f"{'threads':>7} {'torch pages/s':>14} {'onnx pages/s':>13} {'speedup':>8}")
+    for num_threads in args.threads:
+        torch.set_num_threads(num_threads)
+        onnx_model = MODEL_REGISTRY.get(f"{args.task}_yolo_onnx")(dict(onnx_config, intra_op_num_threads=num_threads))
+        torch_pps = throughput(torch_model, images, args.repeat)
+        onnx_pps = throughput(onnx_model, images, args.repeat)
+        print(f"{num_threads:>7} {torch_pps:>14.2f} {onnx_pps:>13.2f} {onnx_pps / torch_pps:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -0,0 +1,228 @@
+"""Stub models with fixed simulated costs, registered in the model registry.
+
+They implement the interfaces the pipeline uses (`predict` of the detectors returning YOLO-style
+results, `ocr_batch` / `predict` of the OCR model, `vis_processor` + `model.generate` of the formula
+recognizer) and return layouts sized by the page kind's profile (see `synthetic.STUB_PROFILES`), so
+the orchestration code (cropping, batching, span assignment, markdown, API serialization) does its
+real work while every model call costs `call_ms + item_ms * items`.
+
+Costs and profiles are read from the model config first, then from the process-wide defaults set
+with `configure`, so the same stubs can be built by `initialize_tasks_and_models` from a config and by
+the API routes (which pass their own model configs) through `stub_api_models`.
+"""
+import time
+import contextlib
+
+import numpy as np
+from PIL import Image
+
+from pdf_extract_kit.registry.registry import MODEL_REGISTRY
+from pdf_extract_kit.utils.yolo_onnx import YOLOResult
+
+
+LAYOUT_NAMES = {0: 'title', 1: 'plain text', 2: 'abandon', 3: 'figure', 4: 'figure_caption', 5: 'table',
+                6: 'table_caption', 7: 'table_footnote', 8: 'isolate_formula', 9: 'formula_caption'}
+MFD_NAMES = {0: 'inline', 1: 'isolated'}
+
+DEFAULT_COSTS = {
+    'init_ms': 0,            # model construction (the API builds the models on every request)
+    'layout_ms': 60,         # per page
+    'mfd_ms': 40,            # per page
+    'mfr_call_ms': 20,       # per batch
+    'mfr_ms': 8,             # per formula
+    'ocr_call_ms': 10,       # per ocr_batch / predict call
+    'ocr_ms': 12,            # per text region
+    'busy': False,           # spin instead of sleep, to load the cores like real inference
+}
+DEFAULT_PROFILE = {'regions': 14, 'tables': 0, 'formulas': 2, 'isolated_ratio': 0.0, 'ocr_lines': 5}
+
+_costs = dict(DEFAULT_COSTS)
+_profile = dict(DEFAULT_PROFILE)
+
+
+def configure(costs=None, profile=None):
+    """Set the process-wide costs and page profile used when a model config does not set them."""
+    _costs.update(costs or {})
+    _profile.update(profile or {})
+
+
+def simulate(ms, busy=None):
+    """Spend `ms` milliseconds, sleeping (GIL released, like native inference) or spinning."""
+    if ms <= 0:
+        return
+    busy = _costs['busy'] if busy is None else busy
+    if not busy:
+        time.sleep(ms / 1000)
+        return
+    deadline = time.perf_counter() + ms / 1000
+    while time.perf_counter() < deadline:
+        pass
+
+
+def image_size(image):
+    """(width, height) of a PIL image, an ndarray or an image path (header only for paths)."""
+    if isinstance(image, str):
+        with Image.open(image) as img:
+            return img.size
+    if isinstance(image, np.ndarray):
+        return image.shape[1], image.shape[0]
+    return image.size
+
+
+def region_boxes(width, height, profile):
+    """Text regions as horizontal bands down the page, tables take every other band when present."""
+    regions, tables = profile['regions'], profile['tables']
+    total = regions + tables
+    if total == 0:
+        return np.zeros((0, 6), dtype=np.float32)
+    top, bottom = 0.06 * height, 0.95 * height
+    slot = (bottom - top) / total
+    table_slots = set(range(1, 2 * tables, 2)) if tables else set()
+    boxes = []
+    for i in range(total):
+        y0 = top + i * slot
+        cls = 5 if i in table_slots else (0 if i == 0 else 1)
+        boxes.append([0.08 * width, y0, 0.92 * width, y0 + 0.85 * slot, 0.9, cls])
+    return np.array(boxes, dtype=np.float32)
+
+
+def formula_boxes(width, height, profile):
+    """Formula boxes spread over the page, `isolated_ratio` of them centered display formulas."""
+    count = profile['formulas']
+    boxes = []
+    for i in range(count):
+        y0 = 0.08 * height + (i + 0.5) * 0.86 * height / max(count, 1)
+        if i < round(count * profile['isolated_ratio']):
+            boxes.append([0.3 * width, y0, 0.7 * width, y0 + 0.035 * height, 0.92, 1])
+        else:
+            x0 = (0.1 + 0.5 * ((i * 37) % 10) / 10) * width
+            boxes.append([x0, y0, x0 + 0.18 * width, y0 + 0.015 * height, 0.85, 0])
+    return np.array(boxes, dtype=np.float32).reshape(-1, 6)
+
+
+class StubModel:
+    def __init__(self, config=None):
+        self.config = config or {}
+        simulate(self.cost('init_ms'))
+
+    def cost(self, key):
+        return self.config.get(key, _costs[key])
+
+    @property
+    def profile(self):
+        return {**_profile, **self.config.get('profile', {})}
+
+
+@MODEL_REGISTRY.register('layout_detection_stub')
+class StubLayoutDetector(StubModel):
+    id_to_names = LAYOUT_NAMES
+    cost_key = 'layout_ms'
+
+    def boxes(self, width, height):
+        return region_boxes(width, height, self.profile)
+
+    def predict(self, images, result_path, image_ids=None):
+        results = []
+        for image in images:
+            width, height = image_size(image)
+            simulate(self.cost(self.cost_key))
+            results.append(YOLOResult(self.boxes(width, height), (height, width), self.id_to_names))
+        return results
+
+
+@MODEL_REGISTRY.register('formula_detection_stub')
+class StubFormulaDetector(StubLayoutDetector):
+    id_to_names = MFD_NAMES
+    cost_key = 'mfd_ms'
+
+    def boxes(self, width, height):
+        return formula_boxes(width, height, self.profile)
+
+
+class _StubGenerator:
+    def __init__(self, owner):
+        self.owner = owner
+
+    def generate(self, samples):
+        n = len(samples['image'])
+        simulate(self.owner.cost('mfr_call_ms') + self.owner.cost('mfr_ms') * n)
+        return {'pred_str': ['\\frac { a _ { 0 } + x ^ { 2 } } { 1 + e ^ { - x } }'] * n}
+
+
+@MODEL_REGISTRY.register('formula_recognition_stub')
+class StubFormulaRecognizer(StubModel):
+    """Interface of `FormulaRecognitionUniMERNet` used by PDF2MARKDOWN."""
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.batch_size = self.config.get('batch_size', 64)
+        self.device = 'cpu'
+        self.model = _StubGenerator(self)
+
+    def vis_processor(self, image):
+        import torch
+        # fixed-size tensor so that the DataLoader can collate the crops
+        return torch.zeros(1, 8, 8)
+
+    def predict(self, images, result_path, bboxes=None):
+        simulate(self.cost('mfr_call_ms') + self.cost('mfr_ms') * len(images))
+        return ['x ^ { 2 }'] * len(images)
+
+
+@MODEL_REGISTRY.register('ocr_stub')
+class StubOCR(StubModel):
+    """Interface of `ModifiedPaddleOCR` (`ocr_batch`) and of the OCR task model (`predict`)."""
+
+    def lines(self, width, height, num_lines):
+        step = height / max(num_lines, 1)
+        res = []
+        for i in range(num_lines):
+            y0, y1 = i * step + 0.1 * step, i * step + 0.8 * step
+            res.append([[[0.05 * width, y0], [0.95 * width, y0], [0.95 * width, y1], [0.05 * width, y1]],
+                        ("synthetic recognized text line", 0.98)])
+        return res
+
+    def ocr_batch(self, images, mfd_res_list=None):
+        simulate(self.cost('ocr_call_ms') + self.cost('ocr_ms') * len(images))
+        return [self.lines(*image_size(image), self.profile['ocr_lines']) for image in images]
+
+    def predict(self, image):
+        width, height = image_size(image)
+        regions = self.profile['regions']
+        simulate(self.cost('ocr_call_ms') + self.cost('ocr_ms') * regions)
+        res = []
+        for (p1, p2, p3, p4), (text, score) in self.lines(width, height, regions * self.profile['ocr_lines']):
+            res.append({'category_type': 'text', 'poly': p1 + p2 + p3 + p4, 'text': text, 'score': score})
+        return res
+
+
+# model names hardcoded in src/api/routes.py
+API_MODEL_NAMES = {
+    'layout_detection_yolo': StubLayoutDetector,
+    'formula_detection_yolo': StubFormulaDetector,
+    'ocr_paddleocr': StubOCR,
+    'formula_recognition_nougat': StubFormulaRecognizer,
+}
+
+
+@contextlib.contextmanager
+def stub_api_models():
+    """Register the stubs under the model names the API routes build, restored on exit."""
+    # the task packages register the real models lazily on import, override after that
+    import pdf_extract_kit.tasks  # noqa: F401
+    with contextlib.ExitStack() as stack:
+        for name, cls in API_MODEL_NAMES.items():
+            stack.enter_context(MODEL_REGISTRY.override(name, cls))
+        yield
+
+
+def stub_config(**model_config):
+    """pdf2markdown-style `tasks` config that builds the stubs through `initialize_tasks_and_models`."""
+    return {
+        'tasks': {
+            'layout_detection': {'model': 'layout_detection_stub', 'model_config': dict(model_config)},
+            'formula_detection': {'model': 'formula_detection_stub', 'model_config': dict(model_config)},
+            'formula_recognition': {'model': 'formula_recognition_stub', 'model_config': dict(model_config)},
+            'ocr': {'model': 'ocr_stub', 'model_config': dict(model_config)},
+        }
+    }
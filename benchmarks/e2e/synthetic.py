@@ -0,0 +1,155 @@
+"""Seeded synthetic PDFs for the end-to-end benchmark.
+
+Four page kinds stress different parts of the pipeline:
+
+- `text`: two columns of dense body text with headings (many OCR regions)
+- `formula`: text interleaved with display and inline formulas drawn with vector fraction bars
+- `table`: ruled tables with numeric cells between short paragraphs
+- `scanned`: text pages rendered to noisy JPEG images, so rasterization decodes an image per page
+
+Every kind also defines the detection counts the stub models report for its pages (`STUB_PROFILES`),
+so that formula crops, OCR batches and markdown assembly scale like they would on real documents.
+"""
+import io
+import os
+import random
+
+import fitz
+import numpy as np
+from PIL import Image
+
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 48
+
+WORDS = ("the of model layout page formula detection recognition table text region score image "
+         "document layer attention feature network training result method value sample matrix "
+         "vector function parameter distribution estimate error accuracy batch kernel").split()
+FORMULAS = ["f(x) = a0 + a1 x + a2 x^2", "E = m c^2", "sum_i w_i x_i + b", "p(y|x) = exp(s_y) / sum_k exp(s_k)",
+            "L = -1/N sum log p(y_n|x_n)", "||Ax - b||_2 <= eps", "d/dx sin(x) = cos(x)", "int_0^1 x^n dx = 1/(n+1)"]
+
+# per-page detection counts of the stub models, see benchmarks/e2e/stub_models.py
+STUB_PROFILES = {
+    'text': {'regions': 14, 'tables': 0, 'formulas': 2, 'isolated_ratio': 0.0, 'ocr_lines': 5},
+    'formula': {'regions': 8, 'tables': 0, 'formulas': 28, 'isolated_ratio': 0.3, 'ocr_lines': 3},
+    'table': {'regions': 6, 'tables': 3, 'formulas': 0, 'isolated_ratio': 0.0, 'ocr_lines': 3},
+    'scanned': {'regions': 14, 'tables': 0, 'formulas': 2, 'isolated_ratio': 0.0, 'ocr_lines': 5},
+}
+KINDS = list(STUB_PROFILES)
+
+
+def sentence(rng, num_words):
+    return " ".join(rng.choice(WORDS) for _ in range(num_words))
+
+
+def draw_text_page(page, rng, columns=2, font_size=8.5):
+    """Heading plus justified-looking body text in `columns` columns."""
+    page.insert_text((MARGIN, MARGIN + 14), sentence(rng, 5).title(), fontsize=16)
+    column_width = (PAGE_WIDTH - 2 * MARGIN - 16 * (columns - 1)) / columns
+    chars_per_line = int(column_width / (font_size * 0.5))
+    for col in range(columns):
+        x = MARGIN + col * (column_width + 16)
+        y = MARGIN + 44
+        while y < PAGE_HEIGHT - MARGIN:
+            if rng.random() < 0.06:
+                y += font_size
+                page.insert_text((x, y), sentence(rng, 4).title(), fontsize=font_size + 2)
+                y += font_size * 1.6
+                continue
+            page.insert_text((x, y), sentence(rng, 20)[:chars_per_line], fontsize=font_size)
+            y += font_size * 1.35
+
+
+def draw_formula_page(page, rng):
+    y = MARGIN + 14
+    page.insert_text((MARGIN, y), sentence(rng, 4).title(), fontsize=14)
+    y += 30
+    while y < PAGE_HEIGHT - MARGIN - 40:
+        for _ in range(rng.randint(1, 3)):
+            page.insert_text((MARGIN, y), f"{sentence(rng, 8)} {rng.choice(FORMULAS)} {sentence(rng, 5)}", fontsize=9)
+            y += 13
+        # display formula: numerator, fraction bar, denominator
+        x = PAGE_WIDTH / 2 - 80
+        page.insert_text((x, y + 8), rng.choice(FORMULAS), fontsize=10)
+        page.draw_line((x, y + 13), (x + 160, y + 13), width=0.6)
+        page.insert_text((x + 40, y + 26), rng.choice(FORMULAS)[:16], fontsize=10)
+        page.insert_text((PAGE_WIDTH - MARGIN - 20, y + 18), f"({rng.randint(1, 99)})", fontsize=9)
+        y += 44
+
+
+def draw_table_page(page, rng):
+    y = MARGIN + 14
+    page.insert_text((MARGIN, y), sentence(rng, 4).title(), fontsize=14)
+    y += 24
+    while y < PAGE_HEIGHT - MARGIN - 120:
+        for _ in range(3):
+            page.insert_text((MARGIN, y), sentence(rng, 16), fontsize=9)
+            y += 13
+        rows, cols = rng.randint(5, 10), rng.randint(4, 7)
+        cell_w, cell_h = (PAGE_WIDTH - 2 * MARGIN) / cols, 14
+        if y + rows * cell_h > PAGE_HEIGHT - MARGIN:
+            break
+        for r in range(rows + 1):
+            page.draw_line((MARGIN, y + r * cell_h), (PAGE_WIDTH - MARGIN, y + r * cell_h), width=0.5)
+        for c in range(cols + 1):
+            page.draw_line((MARGIN + c * cell_w, y), (MARGIN + c * cell_w, y + rows * cell_h), width=0.5)
+        for r in range(rows):
+            for c in range(cols):
+                cell = sentence(rng, 1) if r == 0 else f"{rng.uniform(0, 100):.2f}"
+                page.insert_text((MARGIN + c * cell_w + 3, y + r * cell_h + 10), cell, fontsize=7.5)
+        y += rows * cell_h + 20
+
+
+def scanned_image(rng, dpi=150, quality=75):
+    """JPEG of a rendered text page with noise and a slight skew, like a scanner output."""
+    doc = fitz.open()
+    draw_text_page(doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT), rng)
+    pix = doc[0].get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72))
+    image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples).convert("L")
+    image = image.rotate(rng.uniform(-0.8, 0.8), fillcolor=255)
+    noise = np.random.default_rng(rng.randint(0, 2 ** 31)).normal(0, 12, (image.height, image.width))
+    image = Image.fromarray(np.clip(np.asarray(image, dtype=np.float32) + noise, 0, 255).astype(np.uint8))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def make_pdf(kind, num_pages, path, seed=0):
+    """Write a `num_pages` page PDF of page kind `kind` to `path`, deterministic for a given seed."""
+    if kind not in STUB_PROFILES:
+        raise ValueError(f"Unknown page kind {kind}, expected one of {KINDS}")
+    rng = random.Random(f"{kind}-{num_pages}-{seed}")
+    doc = fitz.open()
+    for _ in range(num_pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        if kind == 'text':
+            draw_text_page(page, rng)
+        elif kind == 'formula':
+            draw_formula_page(page, rng)
+        elif kind == 'table':
+            draw_table_page(page, rng)
+        else:
+            page.insert_image(page.rect, stream=scanned_image(rng))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    doc.save(path, deflate=True)
+    doc.close()
+    return path
+
+
+def make_corpus(out_dir, kinds, page_counts, docs_per_setting=1, seed=0):
+    """Generate (or reuse) `docs_per_setting` PDFs per (kind, page count).
+
+    Returns:
+        dict: (kind, num_pages) -> list of PDF paths.
+    """
+    corpus = {}
+    for kind in kinds:
+        for num_pages in page_counts:
+            paths = []
+            for i in range(docs_per_setting):
+                path = os.path.join(out_dir, f"{kind}_{num_pages}p_{seed + i}.pdf")
+                if not os.path.exists(path):
+                    make_pdf(kind, num_pages, path, seed=seed + i)
+                paths.append(path)
+            corpus[(kind, num_pages)] = paths
+    return corpus
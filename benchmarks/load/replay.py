@@ -0,0 +1,216 @@
+"""Replay of captured API requests under load.
+
+A request log is the JSONL written by the capture middleware (src/api/capture.py): one record per
+request with the `endpoint`, the form `params` and the uploaded `files` (field, filename, content type
+and the SHA-256 of the content, stored in `payloads/<sha256>` next to the log). Hand-written logs
+may give a file as `path` instead of `sha256`.
+
+Two load models:
+
+- closed loop (`run_closed`): `concurrency` workers each send the next request as soon as their
+  previous one finished, which measures the throughput the server sustains;
+- open loop (`run_open`): requests arrive at `rate` per second (Poisson or evenly spaced) whether or
+  not earlier ones finished, which shows how latency grows with the offered load. Latency is measured
+  from the scheduled arrival, so time spent waiting for a free client slot (`max_inflight`) counts,
+  and an overloaded server cannot hide its queueing by slowing the generator down.
+
+Both take any client with an httpx-style `post(url, data=..., files=...)`: an `httpx.Client` with
+the server URL as `base_url`, or a FastAPI `TestClient` for the in-process app.
+"""
+import os
+import json
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def load_log(path, payload_dir=None, endpoints=None):
+    """Records of a request log, with the payload of every file checked to exist.
+
+    Args:
+        path (str): JSONL request log.
+        payload_dir (str): directory of the payloads, `payloads/` next to the log by default.
+        endpoints (list): keep only the records of these endpoints (path or last path component).
+
+    Returns:
+        list: the records, each file with a resolved `path`.
+    """
+    payload_dir = payload_dir or os.path.join(os.path.dirname(os.path.abspath(path)), 'payloads')
+    records = []
+    with open(path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            endpoint = record['endpoint']
+            if endpoints and endpoint not in endpoints and endpoint.rsplit('/', 1)[-1] not in endpoints:
+                continue
+            for file in record.get('files', []):
+                file.setdefault('path', os.path.join(payload_dir, file['sha256']) if 'sha256' in file else None)
+                if not file['path'] or not os.path.exists(file['path']):
+                    raise FileNotFoundError(f"{path}:{line_no}: payload of {file.get('filename')} not found "
+                                            f"({file['path']})")
+            records.append(record)
+    if not records:
+        raise ValueError(f"No requests to replay in {path}")
+    return records
+
+
+class PayloadCache:
+    """File contents by path, read once and shared by all workers."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        data = self._data.get(path)
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+            with self._lock:
+                self._data[path] = data
+        return data
+
+
+def send(client, record, payloads):
+    """Send one request, returns (status code or None, error message or None)."""
+    files = [(file.get('field', 'file'),
+              (file.get('filename') or os.path.basename(file['path']), payloads.get(file['path']),
+               file.get('content_type') or 'application/octet-stream'))
+             for file in record.get('files', [])]
+    try:
+        response = client.post(record['endpoint'], data=record.get('params', {}), files=files or None)
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    if response.status_code >= 400:
+        return response.status_code, response.text[:200]
+    return response.status_code, None
+
+
+def request_stream(records, total, duration, start):
+    """Records cycled in order until `total` requests were taken or `duration` seconds passed."""
+    i = 0
+    while (total is None or i < total) and (duration is None or time.perf_counter() - start < duration):
+        yield records[i % len(records)]
+        i += 1
+
+
+def _result(record, scheduled, sent, finished, status, error, origin):
+    return {
+        'endpoint': record['endpoint'],
+        'scheduled': scheduled - origin,
+        'sent': sent - origin,
+        'finished': finished - origin,
+        'latency': finished - scheduled,
+        'status': status,
+        'error': error,
+    }
+
+
+def run_closed(client, records, concurrency, total=None, duration=None):
+    """Closed-loop load: `concurrency` workers send back-to-back requests.
+
+    Returns:
+        list: one result dict per request (times in seconds from the start of the run).
+    """
+    payloads = PayloadCache()
+    origin = time.perf_counter()
+    stream = request_stream(records, total, duration, origin)
+    stream_lock = threading.Lock()
+    results = []
+
+    def worker():
+        while True:
+            with stream_lock:
+                record = next(stream, None)
+            if record is None:
+                return
+            sent = time.perf_counter()
+            status, error = send(client, record, payloads)
+            results.append(_result(record, sent, sent, time.perf_counter(), status, error, origin))
+
+    threads = [threading.Thread(target=worker, name=f"load-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def arrival_times(rate, arrival='poisson', seed=0):
+    """Infinite sequence of arrival offsets in seconds for `rate` requests per second."""
+    rng = random.Random(seed)
+    t = 0.0
+    while True:
+        yield t
+        t += rng.expovariate(rate) if arrival == 'poisson' else 1.0 / rate
+
+
+def run_open(client, records, rate, total=None, duration=None, max_inflight=64, arrival='poisson', seed=0):
+    """Open-loop load: requests arrive at `rate` per second, at most `max_inflight` are in flight.
+
+    Returns:
+        list: one result dict per request, latency counted from the scheduled arrival.
+    """
+    payloads = PayloadCache()
+    results = []
+
+    def job(record, scheduled):
+        sent = time.perf_counter()
+        status, error = send(client, record, payloads)
+        results.append(_result(record, scheduled, sent, time.perf_counter(), status, error, origin))
+
+    with ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix='load') as pool:
+        origin = time.perf_counter()
+        for record, offset in zip(request_stream(records, total, duration, origin), arrival_times(rate, arrival, seed)):
+            delay = origin + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(job, record, origin + offset)
+    return results
+
+
+def latency_stats(latencies):
+    latencies = np.asarray(latencies) * 1000
+    if latencies.size == 0:
+        return {'p50_ms': 0.0, 'p90_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0, 'mean_ms': 0.0}
+    p50, p90, p95, p99 = np.percentile(latencies, [50, 90, 95, 99])
+    return {'p50_ms': float(p50), 'p90_ms': float(p90), 'p95_ms': float(p95), 'p99_ms': float(p99),
+            'max_ms': float(latencies.max()), 'mean_ms': float(latencies.mean())}
+
+
+def summarize(results):
+    """Overall and per-endpoint throughput, error rate and latency distribution."""
+    def stats(items):
+        wall = max((r['finished'] for r in items), default=0.0) - min((r['scheduled'] for r in items), default=0.0)
+        errors = sum(r['error'] is not None for r in items)
+        return {'requests': len(items), 'errors': errors, 'error_rate': errors / max(len(items), 1),
+                'throughput_rps': len(items) / wall if wall > 0 else 0.0,
+                **latency_stats([r['latency'] for r in items])}
+
+    by_endpoint = {}
+    for r in results:
+        by_endpoint.setdefault(r['endpoint'], []).append(r)
+    return {'overall': stats(results), 'endpoints': {name: stats(items) for name, items in sorted(by_endpoint.items())}}
+
+
+def timeline(results, interval=1.0):
+    """Completed requests, errors and latency per `interval` seconds of the run (by completion time)."""
+    if not results:
+        return []
+    buckets = {}
+    for r in results:
+        buckets.setdefault(int(r['finished'] // interval), []).append(r)
+    rows = []
+    for index in range(max(buckets) + 1):
+        items = buckets.get(index, [])
+        stats = latency_stats([r['latency'] for r in items])
+        rows.append({'start_s': index * interval, 'completed': len(items),
+                     'throughput_rps': len(items) / interval,
+                     'errors': sum(r['error'] is not None for r in items),
+                     'p50_ms': stats['p50_ms'], 'p95_ms': stats['p95_ms']})
+    return rows
@@ -0,0 +1,62 @@
+"""JSON baselines of the microbenchmarks and regression checks against them.
+
+A baseline maps `<case>/<spans>` to the best and median time per call in milliseconds, together
+with the environment it was measured in. Comparisons use the best time, which is the least noisy
+estimate of the cost of the code itself.
+"""
+import json
+import platform
+import datetime
+
+import numpy as np
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def save_baseline(path, results, settings=None):
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'settings': settings or {}, 'results': results}, f, indent=2)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold=0.2):
+    """Compare `results` with the `results` of a baseline.
+
+    Args:
+        results (dict): `<case>/<spans>` -> {'best_ms': ..., ...} of the current run.
+        baseline (dict): loaded baseline file.
+        threshold (float): relative slowdown of the best time above which a case regresses.
+
+    Returns:
+        list: one dict per current case with `key`, `baseline_ms`, `current_ms`, `ratio` and `status`
+        (`regression`, `improvement`, `ok`, or `new` when the baseline does not have the case).
+    """
+    rows = []
+    for key, result in results.items():
+        current = result['best_ms']
+        reference = baseline['results'].get(key)
+        if reference is None:
+            rows.append({'key': key, 'baseline_ms': None, 'current_ms': current, 'ratio': None, 'status': 'new'})
+            continue
+        ratio = current / reference['best_ms'] if reference['best_ms'] > 0 else float('inf')
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 / (1 + threshold):
+            status = 'improvement'
+        else:
+            status = 'ok'
+        rows.append({'key': key, 'baseline_ms': reference['best_ms'], 'current_ms': current, 'ratio': ratio,
+                     'status': status})
+    return rows
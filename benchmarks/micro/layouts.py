@@ -0,0 +1,187 @@
+"""Seeded page layouts for the post-processing microbenchmarks.
+
+A layout is what the models report for a document before the markdown step: layout blocks (title,
+plain text, isolate_formula, figure, figure_caption) and the spans inside them (OCR text lines split
+around inline formulas, inline and display formulas with their LaTeX). Pages are A4 rendered at
+144 dpi like `load_pdf`, with two columns of paragraphs. Layouts with more spans than a page holds
+continue on further pages stacked below it, so one layout with 10k spans is a long document scanned
+as a single coordinate space, which is the worst case for the geometry code.
+
+The helpers below turn a layout into the inputs of each benchmarked function (`extract_res` for
+convert2md, `dt_boxes` / `mfd_res` for the OCR box post-processing, LaTeX strings for
+latex_rm_whitespace). All of them return fresh objects, since most of the functions modify their
+inputs in place.
+"""
+import copy
+import random
+
+import numpy as np
+
+
+PAGE_WIDTH, PAGE_HEIGHT = 1190, 1684  # A4 at 144 dpi
+MARGIN = 96
+COLUMN_GAP = 40
+COLUMN_WIDTH = (PAGE_WIDTH - 2 * MARGIN - COLUMN_GAP) / 2
+LINE_HEIGHT = 26
+TEXT_HEIGHT = 20
+PARAGRAPH_GAP = 18
+
+WORDS = ("the of model layout page formula detection recognition table text region score image "
+         "document layer attention feature network training result method value sample matrix "
+         "vector function parameter distribution estimate error accuracy batch kernel").split()
+# tokenized like the formula recognizer output, so that latex_rm_whitespace has work to do
+INLINE_LATEX = ["x _ { i }", "\\alpha", "O ( n \\log n )", "\\mathbf { W } x + b", "p ( y | x )",
+                "\\mathrm { s o f t m a x } ( z )", "\\| A x - b \\| _ { 2 }", "\\lambda _ { \\operatorname { m a x } }"]
+DISPLAY_LATEX = [
+    "\\frac { 1 } { N } \\sum _ { n = 1 } ^ { N } \\log p ( y _ { n } | x _ { n } ; \\theta )",
+    "\\mathcal { L } = - \\sum _ { k } y _ { k } \\log \\hat { y } _ { k } + \\lambda \\| \\theta \\| _ { 2 } ^ { 2 }",
+    "\\int _ { 0 } ^ { 1 } x ^ { n } d x = \\frac { 1 } { n + 1 }",
+    "\\mathrm { A t t e n t i o n } ( Q , K , V ) = \\mathrm { s o f t m a x } ( \\frac { Q K ^ { T } } { \\sqrt { d _ { k } } } ) V",
+]
+
+
+def poly(bbox):
+    x0, y0, x1, y1 = bbox
+    return [x0, y0, x1, y0, x1, y1, x0, y1]
+
+
+class _Cursor:
+    """Position of the next line: page, column and y within the page."""
+
+    def __init__(self):
+        self.page, self.column, self.y = 0, 0, MARGIN
+
+    @property
+    def x(self):
+        return MARGIN + self.column * (COLUMN_WIDTH + COLUMN_GAP)
+
+    def new_page(self):
+        self.page, self.column, self.y = self.page + 1, 0, MARGIN
+
+    def take(self, height):
+        """Top of a `height` tall slot in page coordinates, moving to the next column or page if needed."""
+        if self.y + height > PAGE_HEIGHT - MARGIN:
+            if self.column == 0:
+                self.column, self.y = 1, MARGIN
+            else:
+                self.new_page()
+        top = self.page * PAGE_HEIGHT + self.y
+        self.y += height
+        return top
+
+
+def make_layout(num_spans, seed=0):
+    """Layout with exactly `num_spans` spans, deterministic for a given seed.
+
+    Returns:
+        dict: `blocks` (layout detections with `category_type`, `poly`, `score`), `spans` (dicts with
+        `type` in text/inline/isolated, `bbox` and `content`) and `num_pages`.
+    """
+    rng = random.Random(f"{num_spans}-{seed}")
+    blocks, spans = [], []
+    cursor = _Cursor()
+
+    def add_span(span_type, bbox, content):
+        if len(spans) < num_spans:
+            spans.append({'type': span_type, 'bbox': [float(v) for v in bbox], 'content': content})
+
+    def add_block(category_type, bbox):
+        blocks.append({'category_type': category_type, 'poly': poly([float(v) for v in bbox]),
+                       'score': round(rng.uniform(0.8, 0.99), 3)})
+
+    def text_line(top, width):
+        """One line of text, split into text spans around 0-2 inline formulas."""
+        x = cursor.x
+        end = x + width
+        for _ in range(rng.choice([0, 0, 0, 1, 1, 2])):
+            text_w, formula_w = rng.uniform(60, 180), rng.uniform(40, 110)
+            if x + text_w + formula_w + 20 > end:
+                break
+            add_span('text', (x, top, x + text_w, top + TEXT_HEIGHT), " ".join(rng.choices(WORDS, k=4)))
+            x += text_w + 6
+            add_span('inline', (x, top - 2, x + formula_w, top + TEXT_HEIGHT + 2), rng.choice(INLINE_LATEX))
+            x += formula_w + 6
+        add_span('text', (x, top, end, top + TEXT_HEIGHT), " ".join(rng.choices(WORDS, k=max(1, int((end - x) / 45)))))
+
+    while len(spans) < num_spans:
+        if not blocks:
+            # document title across both columns
+            top = cursor.take(2 * LINE_HEIGHT)
+            bbox = (MARGIN, top, MARGIN + rng.uniform(0.4, 0.8) * (PAGE_WIDTH - 2 * MARGIN), top + 32)
+            add_block('title', bbox)
+            add_span('text', bbox, " ".join(rng.choices(WORDS, k=5)).title())
+            continue
+        kind = rng.random()
+        if kind < 0.1:
+            # display formula, detected both as a layout block and as a formula
+            top = cursor.take(3 * LINE_HEIGHT)
+            x0 = cursor.x + rng.uniform(0.1, 0.25) * COLUMN_WIDTH
+            bbox = (x0, top + 8, x0 + rng.uniform(0.45, 0.7) * COLUMN_WIDTH, top + 3 * LINE_HEIGHT - 8)
+            add_block('isolate_formula', bbox)
+            add_span('isolated', bbox, rng.choice(DISPLAY_LATEX))
+        elif kind < 0.15:
+            # figure with a one-line caption, no spans inside the figure itself
+            top = cursor.take(10 * LINE_HEIGHT)
+            add_block('figure', (cursor.x, top, cursor.x + COLUMN_WIDTH, top + 9 * LINE_HEIGHT))
+            top = cursor.take(LINE_HEIGHT + PARAGRAPH_GAP)
+            bbox = (cursor.x, top, cursor.x + COLUMN_WIDTH, top + TEXT_HEIGHT)
+            add_block('figure_caption', bbox)
+            add_span('text', bbox, "Figure: " + " ".join(rng.choices(WORDS, k=8)))
+        else:
+            # paragraph, a new block whenever it continues in the next column
+            num_lines = rng.randint(3, 10)
+            block_top = block_column = None
+            for i in range(num_lines):
+                top = cursor.take(LINE_HEIGHT)
+                if block_column != (cursor.page, cursor.column):
+                    if block_top is not None:
+                        add_block('plain text', (block_x, block_top, block_x + COLUMN_WIDTH, block_bottom))
+                    block_top, block_x, block_column = top, cursor.x, (cursor.page, cursor.column)
+                width = COLUMN_WIDTH if i < num_lines - 1 else rng.uniform(0.3, 1.0) * COLUMN_WIDTH
+                text_line(top, width)
+                block_bottom = top + TEXT_HEIGHT
+            add_block('plain text', (block_x, block_top, block_x + COLUMN_WIDTH, block_bottom))
+            cursor.y += PARAGRAPH_GAP
+    return {'blocks': blocks, 'spans': spans, 'num_pages': cursor.page + 1}
+
+
+def extract_res(layout):
+    """Page result as PDF2MARKDOWN builds it before convert2md: layout, formula and OCR detections."""
+    layout_dets = copy.deepcopy(layout['blocks'])
+    for span in layout['spans']:
+        item = {'category_type': span['type'], 'poly': poly(span['bbox']), 'score': 0.9}
+        item['text' if span['type'] == 'text' else 'latex'] = span['content']
+        layout_dets.append(item)
+    return {'layout_dets': layout_dets}
+
+
+def dt_boxes(layout):
+    """OCR detection boxes (4 corner points each) of the text spans, in detection order (shuffled)."""
+    boxes = np.array([poly(span['bbox']) for span in layout['spans'] if span['type'] == 'text'],
+                     dtype=np.float32).reshape(-1, 4, 2)
+    return boxes[np.random.default_rng(len(boxes)).permutation(len(boxes))]
+
+
+def ocr_line_boxes(layout):
+    """Detection boxes of whole text lines, before they are split around the inline formulas."""
+    lines = {}
+    for span in layout['spans']:
+        if span['type'] in ('text', 'inline'):
+            x0, y0, x1, y1 = span['bbox']
+            # inline formulas stick out 2px above the text line
+            top = y0 + 2 if span['type'] == 'inline' else y0
+            key = (int((x0 - MARGIN) // (COLUMN_WIDTH + COLUMN_GAP)), round(top))
+            line = lines.setdefault(key, [x0, top, x1, top + TEXT_HEIGHT])
+            line[0], line[2] = min(line[0], x0), max(line[2], x1)
+    boxes = [poly(bbox) for bbox in lines.values()]
+    return np.array(boxes, dtype=np.float32).reshape(-1, 4, 2)
+
+
+def mfd_res(layout):
+    """Formula detections as passed to update_det_boxes."""
+    return [{'bbox': [int(v) for v in span['bbox']]} for span in layout['spans'] if span['type'] != 'text']
+
+
+def latex_strings(layout):
+    """LaTeX of every formula span, as returned by the formula recognizer."""
+    return [span['content'] for span in layout['spans'] if span['type'] != 'text']
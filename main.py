@@ -1,5 +1,10 @@
 import os
 import logging
+
+# 启动性能分析 (PROFILE_STARTUP 环境变量或 --profile-startup 参数), 导入钩子需在其他模块导入之前安装
+from pdf_extract_kit.utils.startup_profiler import maybe_start_profiler
+startup_profiler = maybe_start_profiler()
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
@@ -12,16 +17,25 @@ ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=
 
 load_dotenv(ROOT_DIR / ".env")
 
+# 线程预算 (THREAD_BUDGET_* 环境变量), 需在 torch/paddle 导入之前设置
+from pdf_extract_kit.utils.thread_budget import apply_thread_budget
+thread_budget = apply_thread_budget()
+
 # 获取IS_PROD环境变量，默认为False
 IS_PROD = bool(distutils.util.strtobool(os.getenv("IS_PROD", "False")))
 
 from src.api.routes import router
 from src.api.router_upload import router as upload_router
+from src.api.router_debug import router as debug_router, debug_enabled, profile_request_middleware
+from src.api.capture import capture_enabled, capture_request_middleware
+from src.api.uploads import UploadLimitMiddleware
 from src.api.utils import setup_logging
 
 # 配置日志
 logger = setup_logging()
 logger.info(f"运行模式: {'生产环境' if IS_PROD else '开发环境'}")
+if thread_budget is not None:
+    logger.info(f"线程预算: {thread_budget.summary()}")
 
 # 创建FastAPI应用
 app = FastAPI(
@@ -43,6 +57,22 @@ app.add_middleware(
 # 注册路由
 app.include_router(router, prefix="/api/v1")
 app.include_router(upload_router, prefix="/api/v1")
+if debug_enabled():
+    # 调试端点(采样分析等)，需设置DEBUG_ADMIN_TOKEN并在请求头X-Admin-Token中提供
+    app.include_router(debug_router, prefix="/debug")
+    # 单请求cProfile分析，仅在启用调试端点时注册，避免为每个请求增加中间件开销
+    app.middleware("http")(profile_request_middleware)
+
+if capture_enabled():
+    # 记录线上请求(REQUEST_CAPTURE_DIR)，供 benchmarks/bench_load.py 回放
+    app.middleware("http")(capture_request_middleware)
+
+# 最后注册的中间件最先执行，按接收的字节数限制请求体(UPLOAD_MAX_BYTES)，超过时返回413
+app.add_middleware(UploadLimitMiddleware)
+
+if startup_profiler is not None:
+    # 服务就绪时写出启动报告, 之后首次构建模型/首次推理时会自动更新
+    app.router.add_event_handler("startup", startup_profiler.mark_ready)
 
 
 @app.get("/docs", include_in_schema=False)
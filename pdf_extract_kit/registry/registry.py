@@ -1,23 +1,92 @@
+import importlib
+import contextlib
+
+
 class Registry:
     def __init__(self):
         self._registry = {}
+        # name -> module path, imported on first `get`; the module registers the item itself
+        self._lazy = {}
 
     def register(self, name):
         def decorator(item):
             if name in self._registry:
                 raise ValueError(f"Item {name} already registered.")
             self._registry[name] = item
+            self._lazy.pop(name, None)
             return item
         return decorator
 
+    def register_lazy(self, name, module_path):
+        """Register `name` without importing it, `module_path` is imported on the first `get(name)`.
+
+        The module must register `name` with `register` when it is imported. This keeps heavy
+        optional dependencies (torch, paddle, ultralytics, ...) out of the import of the package.
+        """
+        if name in self._registry or name in self._lazy:
+            raise ValueError(f"Item {name} already registered.")
+        self._lazy[name] = module_path
+
     def get(self, name):
+        if name not in self._registry and name in self._lazy:
+            module_path = self._lazy[name]
+            importlib.import_module(module_path)
+            if name not in self._registry:
+                raise ValueError(f"Item {name} was not registered by module {module_path}.")
         if name not in self._registry:
             raise ValueError(f"Item {name} not found in registry.")
         return self._registry[name]
 
+    @contextlib.contextmanager
+    def override(self, name, item):
+        """Temporarily register `item` as `name`, replacing a registered or lazy item of that name.
+
+        Meant for stubs in tests and benchmarks, e.g. to run the API routes (which build their models
+        by name) without model weights. The previous registration is restored on exit.
+        """
+        had_item, old_item = name in self._registry, self._registry.get(name)
+        lazy_module = self._lazy.pop(name, None)
+        self._registry[name] = item
+        try:
+            yield item
+        finally:
+            if had_item:
+                self._registry[name] = old_item
+            else:
+                self._registry.pop(name, None)
+            if lazy_module is not None:
+                self._lazy[name] = lazy_module
+
+    def is_loaded(self, name):
+        return name in self._registry
+
     def list_items(self):
-        return list(self._registry.keys())
+        return list(self._registry.keys()) + [name for name in self._lazy if name not in self._registry]
+
+
+def register_lazy_models(registry, module_name, lazy_models):
+    """Register the models of a task package lazily and return the package's module `__getattr__`.
+
+    Args:
+        registry (Registry): Registry of the models, usually `MODEL_REGISTRY`.
+        module_name (str): `__name__` of the task package, used in the AttributeError message.
+        lazy_models (dict): Class name -> (registered model name, module path).
+
+    Example:
+        __getattr__ = register_lazy_models(MODEL_REGISTRY, __name__, {
+            "LayoutDetectionYOLO": ("layout_detection_yolo", "pdf_extract_kit.tasks.layout_detection.models.yolo"),
+        })
+    """
+    for model_name, module_path in lazy_models.values():
+        registry.register_lazy(model_name, module_path)
+
+    def __getattr__(name):
+        if name in lazy_models:
+            return registry.get(lazy_models[name][0])
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    return __getattr__
 
 # Create global registries for tasks and models
 TASK_REGISTRY = Registry()
-MODEL_REGISTRY = Registry()
\ No newline at end of file
+MODEL_REGISTRY = Registry()
@@ -1,5 +1,5 @@
 import os
-from pdf_extract_kit.utils.data_preprocess import load_pdf
+from pdf_extract_kit.utils.data_preprocess import IMAGE_EXTENSIONS, is_in_memory, is_pdf_bytes, load_image, load_pdf
 
 
 class BaseTask:
@@ -8,14 +8,32 @@ class BaseTask:
 
     def load_images(self, input_data):
         """
-        Loads images from a single image path or a directory containing multiple images.
+        Loads images from a single image path or a directory containing multiple images, or takes
+        in-memory images as they are.
 
         Args:
-            input_data (str): Path to a single image file or a directory containing image files.
+            input_data (str | bytes | np.ndarray | PIL.Image.Image | list): Path to a single image file or a
+                directory containing image files, an in-memory image (encoded file contents, a BGR array or
+                a PIL image), or a list of image paths and in-memory images.
 
         Returns:
-            list: List of paths to all images to be predicted.
+            list: List of image paths and in-memory images to be predicted. Encoded file contents are
+                decoded to PIL images, since not every model backend reads bytes.
         """
+        if isinstance(input_data, (list, tuple)):
+            images = []
+            for item in input_data:
+                if not is_in_memory(item) and os.path.isdir(item):
+                    raise ValueError("Input list should not contain directories: {}".format(item))
+                images.extend(self.load_images(item))
+            return images
+        if is_in_memory(input_data):
+            if is_pdf_bytes(input_data):
+                raise ValueError("Input data is a PDF, use the PDF prediction of the task instead")
+            if isinstance(input_data, (bytes, bytearray, memoryview)):
+                return [load_image(input_data)]
+            return [input_data]
+
         images = []
 
         if os.path.isdir(input_data):
@@ -24,27 +42,39 @@ class BaseTask:
                 if dirs:
                     raise ValueError("Input directory should not contain nested directories: {}".format(input_data))
                 for file in files:
-                    if file.lower().endswith(('.png', '.jpg', '.jpeg')):
+                    if file.lower().endswith(IMAGE_EXTENSIONS):
                         image_path = os.path.join(root, file)
                         images.append(image_path)
                 images = sorted(images)
                 break  # Only process the top-level directory
         else:
             # Determine the type of input data and process accordingly
-            if input_data.lower().endswith(('.png', '.jpg', '.jpeg')):
+            if input_data.lower().endswith(IMAGE_EXTENSIONS):
                 # If input is a single image file
                 images = [input_data]
+            elif os.path.isfile(input_data):
+                # Other image formats and files without an extension (e.g. spooled uploads) are decoded here,
+                # so that a file accepts the same contents as in-memory bytes
+                with open(input_data, 'rb') as f:
+                    if is_pdf_bytes(f.read(1024)):
+                        raise ValueError("Input data is a PDF, use the PDF prediction of the task instead")
+                try:
+                    images = [load_image(input_data)]
+                except OSError:
+                    raise ValueError("Unsupported input data format: {}".format(input_data))
             else:
                 raise ValueError("Unsupported input data format: {}".format(input_data))
 
         return images
 
-    def load_pdf_images(self, input_data):
+    def load_pdf_images(self, input_data, name='document'):
         """
         Loads images from a single PDF file or directory containing multiple PDF files.
 
         Args:
-            input_data (str): Path to a single PDF file or a directory containing PDF files.
+            input_data (str | bytes): Path to a single PDF file or a directory containing PDF files, or the
+                contents of a PDF file.
+            name (str): Name used in the image IDs of a PDF given by its contents.
 
         Returns:
             dict: Dictionary with image IDs (formed by PDF path and page number) as keys and corresponding PIL.Image objects as values.
@@ -52,7 +82,12 @@ class BaseTask:
         """
         pdf_images = {}
 
-        if os.path.isdir(input_data):
+        if is_in_memory(input_data):
+            if not is_pdf_bytes(input_data):
+                raise ValueError("Unsupported input data format: in-memory input is not a PDF")
+            for i, img in enumerate(load_pdf(input_data)):
+                pdf_images[f"{name}_page_{i+1:04d}"] = img
+        elif os.path.isdir(input_data):
             # If input_data is a directory, check for nested directories
             for root, dirs, files in os.walk(input_data):
                 if dirs:
@@ -1,7 +1,13 @@
-from pdf_extract_kit.tasks.formula_detection.models.yolo import FormulaDetectionYOLO
+from pdf_extract_kit.registry.registry import MODEL_REGISTRY, register_lazy_models
 
-from pdf_extract_kit.registry.registry import MODEL_REGISTRY
+# Models are imported on first use (MODEL_REGISTRY.get or attribute access), so importing
+# the task package does not pull in the heavy model dependencies.
+__getattr__ = register_lazy_models(MODEL_REGISTRY, __name__, {
+    "FormulaDetectionYOLO": ("formula_detection_yolo", "pdf_extract_kit.tasks.formula_detection.models.yolo"),
+    "FormulaDetectionYOLOOnnx": ("formula_detection_yolo_onnx", "pdf_extract_kit.tasks.formula_detection.models.yolo_onnx"),
+})
 
 __all__ = [
-    "FurmulaDetectionYOLO",
+    "FormulaDetectionYOLO",
+    "FormulaDetectionYOLOOnnx",
 ]
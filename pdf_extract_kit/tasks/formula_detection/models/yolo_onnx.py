@@ -0,0 +1,23 @@
+from pdf_extract_kit.registry import MODEL_REGISTRY
+from pdf_extract_kit.utils.yolo_onnx import YOLOOnnxDetector
+
+
+@MODEL_REGISTRY.register('formula_detection_yolo_onnx')
+class FormulaDetectionYOLOOnnx(YOLOOnnxDetector):
+    result_suffix = 'MFD'
+
+    def __init__(self, config):
+        """
+        Initialize the FormulaDetectionYOLOOnnx class, the ONNX Runtime (CPU) variant of FormulaDetectionYOLO.
+
+        Args:
+            config (dict): Configuration dictionary containing model parameters, see YOLOOnnxDetector.
+        """
+        # Mapping from class IDs to class names
+        id_to_names = {
+            0: 'inline',
+            1: 'isolated'
+        }
+        super().__init__(config, id_to_names)
+        self.pdf_dpi = config.get('pdf_dpi', 200)
+        self.batch_size = config.get('batch_size', 1)
@@ -1,7 +1,11 @@
-from pdf_extract_kit.tasks.formula_recognition.models.unimernet import FormulaRecognitionUniMERNet
+from pdf_extract_kit.registry.registry import MODEL_REGISTRY, register_lazy_models
 
-from pdf_extract_kit.registry.registry import MODEL_REGISTRY
+# Models are imported on first use (MODEL_REGISTRY.get or attribute access), so importing
+# the task package does not pull in the heavy model dependencies.
+__getattr__ = register_lazy_models(MODEL_REGISTRY, __name__, {
+    "FormulaRecognitionUniMERNet": ("formula_recognition_unimernet", "pdf_extract_kit.tasks.formula_recognition.models.unimernet"),
+})
 
 __all__ = [
-    "FurmulaRecognitionUniMERNet",
+    "FormulaRecognitionUniMERNet",
 ]
@@ -2,15 +2,32 @@ import os
 import logging
 import argparse
 
-import cv2
 import torch
 import numpy as np
-from PIL import Image
 import unimernet.tasks as tasks
 from unimernet.common.config import Config
 from unimernet.processors import load_processor
 
 from pdf_extract_kit.registry import MODEL_REGISTRY
+from pdf_extract_kit.utils.data_preprocess import input_name, load_image
+
+
+PRECISIONS = ('fp32', 'int8', 'bf16')
+INT8_MODULES = ('encoder', 'decoder')
+
+
+def cpu_supports_bf16():
+    """True if the CPU has native bf16 instructions (AVX512-BF16 or AMX), otherwise bf16 is emulated and slow."""
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        pass
+    try:
+        with open('/proc/cpuinfo') as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return 'avx512_bf16' in flags or 'amx_bf16' in flags
 
 
 @MODEL_REGISTRY.register('formula_recognition_unimernet')
@@ -26,9 +43,18 @@ class FormulaRecognitionUniMERNet:
         self.model_dir = config['model_path']
         self.cfg_path = config.get('cfg_path', "pdf_extract_kit/configs/unimernet.yaml")
         self.batch_size = config.get('batch_size', 1)
+        # CPU only: 'int8' dynamically quantizes the linear layers of `int8_modules`, 'bf16' runs under bf16 autocast
+        self.precision = config.get('precision', 'fp32')
+        self.int8_modules = config.get('int8_modules', ['encoder', 'decoder'])
+        if self.precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {PRECISIONS}, got {self.precision!r}")
+        unknown = [name for name in self.int8_modules if name not in INT8_MODULES]
+        if unknown:
+            raise ValueError(f"int8_modules must be a subset of {INT8_MODULES}, got {unknown}")
 
         # Load the UniMERNet model
         self.model, self.vis_processor = self.load_model_and_processor()
+        self.apply_precision()
 
     def load_model_and_processor(self):
         try:
@@ -45,16 +71,47 @@ class FormulaRecognitionUniMERNet:
             logging.error(f"Error loading model and processor: {e}")
             raise
     
+    def apply_precision(self):
+        if self.precision == 'fp32':
+            return
+        if self.device.type != 'cpu':
+            logging.warning(f"precision {self.precision!r} is only applied on CPU, running {self.device} in fp32")
+            self.precision = 'fp32'
+            return
+        self.model.eval()
+        if self.precision == 'int8':
+            # weights are quantized once, activations per batch at run time
+            encoder_decoder = self.model.model.model
+            submodules = {'encoder': encoder_decoder.get_encoder(), 'decoder': encoder_decoder.get_decoder()}
+            for name in self.int8_modules:
+                torch.ao.quantization.quantize_dynamic(submodules[name], {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        elif self.precision == 'bf16':
+            if not cpu_supports_bf16():
+                logging.warning("CPU has no native bf16 support, running formula recognition in fp32")
+                self.precision = 'fp32'
+                return
+            # UniMERModel.generate runs inside maybe_autocast, which is a no-op on CPU upstream
+            self.model.maybe_autocast = lambda dtype=None: torch.autocast('cpu', dtype=torch.bfloat16)
+
     def predict(self, images, result_path):
+        """
+        Recognize the formula in each image.
+
+        Args:
+            images (list): Formula images: paths, encoded image bytes, BGR arrays or PIL images (e.g. crops).
+            result_path (str): Path to save the prediction results (unused).
+
+        Returns:
+            list: LaTeX string of every image that could be read.
+        """
         results = []
-        for image_path in images:
-            # Read the image using OpenCV
-            open_cv_image = cv2.imread(image_path)
-            if open_cv_image is None:
-                logging.error(f"Error: Unable to open image at {image_path}")
+        for idx, image_input in enumerate(images):
+            image_name = image_input if isinstance(image_input, str) else input_name(image_input, idx)
+            try:
+                raw_image = load_image(image_input)
+            except Exception as e:
+                logging.error(f"Error: Unable to open image {image_name}: {e}")
                 continue
-            # Convert the OpenCV image to PIL.Image format
-            raw_image = Image.fromarray(cv2.cvtColor(open_cv_image, cv2.COLOR_BGR2RGB))
 
             try:
                 # Process the image using the visual processor and prepare it for the model
@@ -63,14 +120,10 @@ class FormulaRecognitionUniMERNet:
                 # Generate the prediction using the model
                 output = self.model.generate({"image": image})
                 pred = output["pred_str"][0]
-                logging.info(f'Prediction for {image_path}:\n{pred}')
-
-                # cv2.imshow('Original Image', open_cv_image)
-                # cv2.waitKey(0)
-                # cv2.destroyAllWindows()
+                logging.info(f'Prediction for {image_name}:\n{pred}')
 
                 results.append(pred)
             except Exception as e:
-                logging.error(f"Error processing image {image_path}: {e}")
+                logging.error(f"Error processing image {image_name}: {e}")
     
         return results
\ No newline at end of file
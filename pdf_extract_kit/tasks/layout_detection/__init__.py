@@ -1,9 +1,15 @@
-from pdf_extract_kit.tasks.layout_detection.models.yolo import LayoutDetectionYOLO
-# from pdf_extract_kit.tasks.layout_detection.models.layoutlmv3 import LayoutDetectionLayoutlmv3
-from pdf_extract_kit.registry.registry import MODEL_REGISTRY
+from pdf_extract_kit.registry.registry import MODEL_REGISTRY, register_lazy_models
 
+# Models are imported on first use (MODEL_REGISTRY.get or attribute access), so importing
+# the task package does not pull in the heavy model dependencies.
+__getattr__ = register_lazy_models(MODEL_REGISTRY, __name__, {
+    "LayoutDetectionYOLO": ("layout_detection_yolo", "pdf_extract_kit.tasks.layout_detection.models.yolo"),
+    "LayoutDetectionLayoutlmv3": ("layout_detection_layoutlmv3", "pdf_extract_kit.tasks.layout_detection.models.layoutlmv3"),
+    "LayoutDetectionYOLOOnnx": ("layout_detection_yolo_onnx", "pdf_extract_kit.tasks.layout_detection.models.yolo_onnx"),
+})
 
 __all__ = [
     "LayoutDetectionYOLO",
-    # "LayoutDetectionLayoutlmv3",
+    "LayoutDetectionLayoutlmv3",
+    "LayoutDetectionYOLOOnnx",
 ]
@@ -4,8 +4,10 @@ import numpy as np
 from PIL import Image
 
 from pdf_extract_kit.registry.registry import MODEL_REGISTRY
+from pdf_extract_kit.utils.data_preprocess import input_name, load_image
 from pdf_extract_kit.utils.visualization import visualize_bbox
 
+from .layoutlmv3_util.beit import RELATIVE_POSITION_BIAS_CACHE
 from .layoutlmv3_util.model_init import Layoutlmv3_Predictor
 
 @MODEL_REGISTRY.register("layout_detection_layoutlmv3")
@@ -30,52 +32,64 @@ class LayoutDetectionLayoutlmv3:
             8: 'isolate_formula', 
             9: 'formula_caption'
         }
-        self.model = Layoutlmv3_Predictor(config.get('model_path', None))
+        # images per forward pass, padded to the largest image of the batch
+        self.batch_size = config.get('batch_size', 4)
+        # process-wide cache of the relative position bias per page window size, off by default
+        cache_mb = config.get('rel_pos_bias_cache_mb', 0)
+        if cache_mb:
+            RELATIVE_POSITION_BIAS_CACHE.max_bytes = cache_mb * 2 ** 20
+        self.model = Layoutlmv3_Predictor(config.get('model_path', None), batch_size=self.batch_size)
         self.visualize = config.get('visualize', False)
 
+    @staticmethod
+    def load_image(im_file):
+        # paths, encoded bytes and BGR arrays are decoded to RGB; extracted PDF pages are RGB already,
+        # asarray avoids a copy
+        return np.asarray(load_image(im_file))
+
     def predict(self, images, result_path, image_ids=None):
         """
         Predict layouts in images.
 
         Args:
-            images (list): List of images to be predicted.
+            images (list): List of images to be predicted: paths, encoded image bytes, BGR arrays or PIL images.
             result_path (str): Path to save the prediction results.
             image_ids (list, optional): List of image IDs corresponding to the images.
 
         Returns:
             list: List of prediction results.
         """
-        if not os.path.exists(result_path):
+        if self.visualize and not os.path.exists(result_path):
             os.makedirs(result_path)
         
         results = []
-        for idx, im_file in enumerate(images):
-            if isinstance(im_file, Image.Image):
-                im = im_file.convert("RGB")  # extracted PDF pages
-            elif isinstance(im_file, str):
-                im = Image.open(im_file).convert("RGB")  # image path
-            layout_res = self.model(np.array(im), ignore_catids=[])
-            poly = np.array([det["poly"] for det in layout_res["layout_dets"]])
-            boxes = poly[:, [0,1,4,5]] 
-            scores = np.array([det["score"] for det in layout_res["layout_dets"]])
-            classes = np.array([det["category_id"] for det in layout_res["layout_dets"]])
-            
-            if self.visualize:
-                vis_result = visualize_bbox(im_file, boxes, classes, scores, self.id_to_names)
-                # Determine the base name of the image
-                if image_ids:
-                    base_name = image_ids[idx]
-                else:
-                    base_name = os.path.splitext(os.path.basename(im_file))[0]  # Remove file extension
-                result_name = f"{base_name}_layout.png"
-                # Save the visualized result                
-                cv2.imwrite(os.path.join(result_path, result_name), vis_result)
-
-            # append result
-            results.append({
-                "im_path": im_file,
-                "boxes": boxes,
-                "scores": scores,
-                "classes": classes,
-            })
+        for start in range(0, len(images), self.batch_size):
+            batch = images[start:start + self.batch_size]
+            layout_results = self.model.predict_batch([self.load_image(im_file) for im_file in batch], ignore_catids=[])
+            for idx, im_file, layout_res in zip(range(start, start + len(batch)), batch, layout_results):
+                results.append(self.convert_result(im_file, layout_res, idx, result_path, image_ids))
         return results
+
+    def convert_result(self, im_file, layout_res, idx, result_path, image_ids=None):
+        poly = np.array([det["poly"] for det in layout_res["layout_dets"]]).reshape(-1, 8)
+        boxes = poly[:, [0,1,4,5]]
+        scores = np.array([det["score"] for det in layout_res["layout_dets"]])
+        classes = np.array([det["category_id"] for det in layout_res["layout_dets"]])
+        
+        if self.visualize:
+            vis_result = visualize_bbox(im_file, boxes, classes, scores, self.id_to_names)
+            # Determine the base name of the image
+            if image_ids:
+                base_name = image_ids[idx]
+            else:
+                base_name = input_name(im_file, idx)  # file name without extension, or image_<n> in memory
+            result_name = f"{base_name}_layout.png"
+            # Save the visualized result                
+            cv2.imwrite(os.path.join(result_path, result_name), vis_result)
+
+        return {
+            "im_path": im_file,
+            "boxes": boxes,
+            "scores": scores,
+            "classes": classes,
+        }
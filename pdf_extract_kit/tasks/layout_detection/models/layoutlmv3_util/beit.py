@@ -22,8 +22,12 @@ Hacked together by / Copyright 2020 Ross Wightman
 """
 import warnings
 import math
+import itertools
+import threading
+import weakref
 import torch
-from functools import partial
+from collections import OrderedDict, deque
+from functools import partial, lru_cache
 import torch.nn as nn
 import torch.nn.functional as F
 import torch.utils.checkpoint as checkpoint
@@ -40,6 +44,152 @@ def _cfg(url='', **kwargs):
     }
 
 
+@lru_cache(maxsize=2)
+def _relative_position_index(window_size):
+    """Pair-wise relative position index of the tokens (cls token first) of a Wh x Ww window, on CPU."""
+    num_relative_distance = (2 * window_size[0] - 1) * (2 * window_size[1] - 1) + 3
+    coords_h = torch.arange(window_size[0])
+    coords_w = torch.arange(window_size[1])
+    coords = torch.stack(torch.meshgrid([coords_h, coords_w]))  # 2, Wh, Ww
+    coords_flatten = torch.flatten(coords, 1)  # 2, Wh*Ww
+    relative_coords = coords_flatten[:, :, None] - coords_flatten[:, None, :]  # 2, Wh*Ww, Wh*Ww
+    relative_coords = relative_coords.permute(1, 2, 0).contiguous()  # Wh*Ww, Wh*Ww, 2
+    relative_coords[:, :, 0] += window_size[0] - 1  # shift to start from 0
+    relative_coords[:, :, 1] += window_size[1] - 1
+    relative_coords[:, :, 0] *= 2 * window_size[1] - 1
+    relative_position_index = \
+        torch.zeros(size=(window_size[0] * window_size[1] + 1,) * 2, dtype=relative_coords.dtype)
+    relative_position_index[1:, 1:] = relative_coords.sum(-1)  # Wh*Ww, Wh*Ww
+    relative_position_index[0, 0:] = num_relative_distance - 3
+    relative_position_index[0:, 0] = num_relative_distance - 2
+    relative_position_index[0, 0] = num_relative_distance - 1
+    return relative_position_index
+
+
+def compute_relative_position_bias(table, index, window_size, num_heads, training_window_size):
+    """Relative position bias (nH, Wh*Ww+1, Wh*Ww+1) for `training_window_size`, the bias table of
+    `window_size` is bicubically interpolated when the sizes differ."""
+    if training_window_size == tuple(window_size):
+        relative_position_bias = table[index.view(-1)].view(
+            window_size[0] * window_size[1] + 1, window_size[0] * window_size[1] + 1, -1)  # Wh*Ww,Wh*Ww,nH
+        return relative_position_bias.permute(2, 0, 1).contiguous()  # nH, Wh*Ww, Wh*Ww
+
+    new_num_relative_distance = (2 * training_window_size[0] - 1) * (2 * training_window_size[1] - 1) + 3
+    # new_num_relative_dis 为 所有可能的相对位置选项，包含cls-cls，tok-cls，与cls-tok
+    new_relative_position_bias_table = F.interpolate(
+        table[:-3, :].permute(1, 0).view(1, num_heads, 2 * window_size[0] - 1, 2 * window_size[1] - 1),
+        size=(2 * training_window_size[0] - 1, 2 * training_window_size[1] - 1), mode='bicubic',
+        align_corners=False)
+    new_relative_position_bias_table = new_relative_position_bias_table.view(
+        num_heads, new_num_relative_distance - 3).permute(1, 0)
+    new_relative_position_bias_table = torch.cat([new_relative_position_bias_table, table[-3::]], dim=0)
+
+    relative_position_index = _relative_position_index(training_window_size).to(table.device)
+    relative_position_bias = new_relative_position_bias_table[relative_position_index.view(-1)].view(
+        training_window_size[0] * training_window_size[1] + 1,
+        training_window_size[0] * training_window_size[1] + 1, -1)  # Wh*Ww,Wh*Ww,nH
+    return relative_position_bias.permute(2, 0, 1).contiguous()  # nH, Wh*Ww, Wh*Ww
+
+
+class RelativePositionBiasCache:
+    """LRU cache of relative position bias tensors, bounded by their total size in bytes.
+
+    At inference the bias only depends on the bias table and the window size of the page, so it is
+    computed once per (module, window size) instead of on every forward pass of every layer. Entries
+    are keyed by the table's version counter, in-place updates of the weights invalidate them.
+
+    Off by default (`max_bytes=0`): one bias holds (Wh*Ww+1)^2 * num_heads floats, about 800 MB for a
+    1024x1024 page with 16 pixel patches and 12 heads, so the budget has to be sized for the model
+    and the page sizes (`rel_pos_bias_cache_mb` in the LayoutLMv3 model config). Safe to share
+    between threads.
+    """
+
+    def __init__(self, max_bytes=0):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # owners of collected modules, dropped under the lock on the next access
+        self._dropped_owners = deque()
+
+    def get_or_compute(self, key, compute):
+        if self.max_bytes <= 0:
+            return compute()
+        with self._lock:
+            self._drop_collected_owners()
+            bias = self.entries.get(key)
+            if bias is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return bias
+            self.misses += 1
+        # computed outside the lock, a concurrent miss on the same key keeps the first result
+        bias = compute()
+        size = bias.numel() * bias.element_size()
+        with self._lock:
+            if size <= self.max_bytes and key not in self.entries:
+                self.entries[key] = bias
+                self.nbytes += size
+                while self.nbytes > self.max_bytes:
+                    _, evicted = self.entries.popitem(last=False)
+                    self.nbytes -= evicted.numel() * evicted.element_size()
+        return bias
+
+    def drop_owner(self, owner):
+        """Forget the entries of a collected module.
+
+        Called by a weakref finalizer, which can run in any thread in the middle of a cache operation
+        (even one holding the lock), so the owner is only queued here.
+        """
+        if self.entries:
+            self._dropped_owners.append(owner)
+
+    def _drop_collected_owners(self):
+        while self._dropped_owners:
+            owner = self._dropped_owners.popleft()
+            for key in [key for key in self.entries if key[0] == owner]:
+                bias = self.entries.pop(key)
+                self.nbytes -= bias.numel() * bias.element_size()
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self._dropped_owners.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+# shared by all BEiT modules of the process, off until max_bytes is set
+RELATIVE_POSITION_BIAS_CACHE = RelativePositionBiasCache()
+_bias_cache_owners = itertools.count()
+
+
+class CachedRelativePositionBiasMixin:
+    """`relative_position_bias(training_window_size)` for modules with `relative_position_bias_table`,
+    `relative_position_index`, `window_size` and `num_heads`, cached at inference (eval mode, no grad)."""
+
+    def _init_bias_cache(self):
+        self._bias_cache_owner = next(_bias_cache_owners)
+        weakref.finalize(self, RELATIVE_POSITION_BIAS_CACHE.drop_owner, self._bias_cache_owner)
+
+    def relative_position_bias(self, training_window_size):
+        window = tuple(self.window_size) if training_window_size is None else \
+            tuple(int(v) for v in training_window_size)
+        table = self.relative_position_bias_table
+
+        def compute():
+            return compute_relative_position_bias(table, self.relative_position_index, self.window_size,
+                                                  self.num_heads, window)
+
+        if self.training or torch.is_grad_enabled():
+            return compute()
+        key = (self._bias_cache_owner, table._version, window, table.device, table.dtype)
+        return RELATIVE_POSITION_BIAS_CACHE.get_or_compute(key, compute)
+
+
 class DropPath(nn.Module):
     """Drop paths (Stochastic Depth) per sample  (when applied in main path of residual blocks).
     """
@@ -75,7 +225,7 @@ class Mlp(nn.Module):
         return x
 
 
-class Attention(nn.Module):
+class Attention(CachedRelativePositionBiasMixin, nn.Module):
     def __init__(
             self, dim, num_heads=8, qkv_bias=False, qk_scale=None, attn_drop=0.,
             proj_drop=0., window_size=None, attn_head_dim=None):
@@ -127,6 +277,7 @@ class Attention(nn.Module):
             self.window_size = None
             self.relative_position_bias_table = None
             self.relative_position_index = None
+        self._init_bias_cache()
 
         self.attn_drop = nn.Dropout(attn_drop)
         self.proj = nn.Linear(all_head_dim, dim)
@@ -146,53 +297,7 @@ class Attention(nn.Module):
         attn = (q @ k.transpose(-2, -1))
 
         if self.relative_position_bias_table is not None:
-            if training_window_size == self.window_size:
-                relative_position_bias = \
-                    self.relative_position_bias_table[self.relative_position_index.view(-1)].view(
-                        self.window_size[0] * self.window_size[1] + 1,
-                        self.window_size[0] * self.window_size[1] + 1, -1)  # Wh*Ww,Wh*Ww,nH
-                relative_position_bias = relative_position_bias.permute(2, 0, 1).contiguous()  # nH, Wh*Ww, Wh*Ww
-                attn = attn + relative_position_bias.unsqueeze(0)
-            else:
-                training_window_size = tuple(training_window_size.tolist())
-                new_num_relative_distance = (2 * training_window_size[0] - 1) * (2 * training_window_size[1] - 1) + 3
-                # new_num_relative_dis 为 所有可能的相对位置选项，包含cls-cls，tok-cls，与cls-tok
-                new_relative_position_bias_table = F.interpolate(
-                    self.relative_position_bias_table[:-3, :].permute(1, 0).view(1, self.num_heads,
-                                                                                 2 * self.window_size[0] - 1,
-                                                                                 2 * self.window_size[1] - 1),
-                    size=(2 * training_window_size[0] - 1, 2 * training_window_size[1] - 1), mode='bicubic',
-                    align_corners=False)
-                new_relative_position_bias_table = new_relative_position_bias_table.view(self.num_heads,
-                                                                                         new_num_relative_distance - 3).permute(
-                    1, 0)
-                new_relative_position_bias_table = torch.cat(
-                    [new_relative_position_bias_table, self.relative_position_bias_table[-3::]], dim=0)
-
-                # get pair-wise relative position index for each token inside the window
-                coords_h = torch.arange(training_window_size[0])
-                coords_w = torch.arange(training_window_size[1])
-                coords = torch.stack(torch.meshgrid([coords_h, coords_w]))  # 2, Wh, Ww
-                coords_flatten = torch.flatten(coords, 1)  # 2, Wh*Ww
-                relative_coords = coords_flatten[:, :, None] - coords_flatten[:, None, :]  # 2, Wh*Ww, Wh*Ww
-                relative_coords = relative_coords.permute(1, 2, 0).contiguous()  # Wh*Ww, Wh*Ww, 2
-                relative_coords[:, :, 0] += training_window_size[0] - 1  # shift to start from 0
-                relative_coords[:, :, 1] += training_window_size[1] - 1
-                relative_coords[:, :, 0] *= 2 * training_window_size[1] - 1
-                relative_position_index = \
-                    torch.zeros(size=(training_window_size[0] * training_window_size[1] + 1,) * 2,
-                                dtype=relative_coords.dtype)
-                relative_position_index[1:, 1:] = relative_coords.sum(-1)  # Wh*Ww, Wh*Ww
-                relative_position_index[0, 0:] = new_num_relative_distance - 3
-                relative_position_index[0:, 0] = new_num_relative_distance - 2
-                relative_position_index[0, 0] = new_num_relative_distance - 1
-
-                relative_position_bias = \
-                    new_relative_position_bias_table[relative_position_index.view(-1)].view(
-                        training_window_size[0] * training_window_size[1] + 1,
-                        training_window_size[0] * training_window_size[1] + 1, -1)  # Wh*Ww,Wh*Ww,nH
-                relative_position_bias = relative_position_bias.permute(2, 0, 1).contiguous()  # nH, Wh*Ww, Wh*Ww
-                attn = attn + relative_position_bias.unsqueeze(0)
+            attn = attn + self.relative_position_bias(training_window_size).unsqueeze(0)
 
         if rel_pos_bias is not None:
             attn = attn + rel_pos_bias
@@ -313,7 +418,7 @@ class HybridEmbed(nn.Module):
         return x
 
 
-class RelativePositionBias(nn.Module):
+class RelativePositionBias(CachedRelativePositionBiasMixin, nn.Module):
 
     def __init__(self, window_size, num_heads):
         super().__init__()
@@ -342,57 +447,12 @@ class RelativePositionBias(nn.Module):
         relative_position_index[0, 0] = self.num_relative_distance - 1
 
         self.register_buffer("relative_position_index", relative_position_index)
+        self._init_bias_cache()
 
         # trunc_normal_(self.relative_position_bias_table, std=.02)
 
     def forward(self, training_window_size):
-        if training_window_size == self.window_size:
-            relative_position_bias = \
-                self.relative_position_bias_table[self.relative_position_index.view(-1)].view(
-                    self.window_size[0] * self.window_size[1] + 1,
-                    self.window_size[0] * self.window_size[1] + 1, -1)  # Wh*Ww,Wh*Ww,nH
-            relative_position_bias = relative_position_bias.permute(2, 0, 1).contiguous()  # nH, Wh*Ww, Wh*Ww
-        else:
-            training_window_size = tuple(training_window_size.tolist())
-            new_num_relative_distance = (2 * training_window_size[0] - 1) * (2 * training_window_size[1] - 1) + 3
-            # new_num_relative_dis 为 所有可能的相对位置选项，包含cls-cls，tok-cls，与cls-tok
-            new_relative_position_bias_table = F.interpolate(
-                self.relative_position_bias_table[:-3, :].permute(1, 0).view(1, self.num_heads,
-                                                                             2 * self.window_size[0] - 1,
-                                                                             2 * self.window_size[1] - 1),
-                size=(2 * training_window_size[0] - 1, 2 * training_window_size[1] - 1), mode='bicubic',
-                align_corners=False)
-            new_relative_position_bias_table = new_relative_position_bias_table.view(self.num_heads,
-                                                                                     new_num_relative_distance - 3).permute(
-                1, 0)
-            new_relative_position_bias_table = torch.cat(
-                [new_relative_position_bias_table, self.relative_position_bias_table[-3::]], dim=0)
-
-            # get pair-wise relative position index for each token inside the window
-            coords_h = torch.arange(training_window_size[0])
-            coords_w = torch.arange(training_window_size[1])
-            coords = torch.stack(torch.meshgrid([coords_h, coords_w]))  # 2, Wh, Ww
-            coords_flatten = torch.flatten(coords, 1)  # 2, Wh*Ww
-            relative_coords = coords_flatten[:, :, None] - coords_flatten[:, None, :]  # 2, Wh*Ww, Wh*Ww
-            relative_coords = relative_coords.permute(1, 2, 0).contiguous()  # Wh*Ww, Wh*Ww, 2
-            relative_coords[:, :, 0] += training_window_size[0] - 1  # shift to start from 0
-            relative_coords[:, :, 1] += training_window_size[1] - 1
-            relative_coords[:, :, 0] *= 2 * training_window_size[1] - 1
-            relative_position_index = \
-                torch.zeros(size=(training_window_size[0] * training_window_size[1] + 1,) * 2,
-                            dtype=relative_coords.dtype)
-            relative_position_index[1:, 1:] = relative_coords.sum(-1)  # Wh*Ww, Wh*Ww
-            relative_position_index[0, 0:] = new_num_relative_distance - 3
-            relative_position_index[0:, 0] = new_num_relative_distance - 2
-            relative_position_index[0, 0] = new_num_relative_distance - 1
-
-            relative_position_bias = \
-                new_relative_position_bias_table[relative_position_index.view(-1)].view(
-                    training_window_size[0] * training_window_size[1] + 1,
-                    training_window_size[0] * training_window_size[1] + 1, -1)  # Wh*Ww,Wh*Ww,nH
-            relative_position_bias = relative_position_bias.permute(2, 0, 1).contiguous()  # nH, Wh*Ww, Wh*Ww
-
-        return relative_position_bias
+        return self.relative_position_bias(training_window_size)
 
 
 class BEiT(nn.Module):
@@ -1,3 +1,5 @@
+import torch
+
 from .visualizer import Visualizer
 from .rcnn_vl import *
 from .backbone import *
@@ -99,7 +101,7 @@ class DotDict(dict):
         self[key] = value
         
 class Layoutlmv3_Predictor(object):
-    def __init__(self, weights):
+    def __init__(self, weights, batch_size=4):
         layout_args = {
             "config_file": "pdf_extract_kit/tasks/layout_detection/models/layoutlmv3_util/layoutlmv3_base_inference.yaml",
             "resume": False,
@@ -116,26 +118,56 @@ class Layoutlmv3_Predictor(object):
         self.mapping = ["title", "plain text", "abandon", "figure", "figure_caption", "table", "table_caption", "table_footnote", "isolate_formula", "formula_caption"]
         MetadataCatalog.get(cfg.DATASETS.TRAIN[0]).thing_classes = self.mapping
         self.predictor = DefaultPredictor(cfg)
-        
-    def __call__(self, image, ignore_catids=[]):
+        self.batch_size = batch_size
+
+    def preprocess(self, image):
+        """Same input dict as DefaultPredictor.__call__ builds for one image."""
+        if self.predictor.input_format == "RGB":
+            image = image[:, :, ::-1]
+        height, width = image.shape[:2]
+        image = self.predictor.aug.get_transform(image).apply_image(image)
+        image = torch.as_tensor(image.astype("float32").transpose(2, 0, 1))
+        return {"image": image, "height": height, "width": width}
+
+    def predict_batch(self, images, ignore_catids=[]):
+        """Layout detection on a list of HWC uint8 arrays, `batch_size` images per forward pass.
+
+        Images are grouped by their resized shape so that a batch shares (almost) the same padding,
+        the results keep the input order.
+        """
+        inputs = [self.preprocess(image) for image in images]
+        order = sorted(range(len(inputs)), key=lambda i: tuple(inputs[i]["image"].shape[1:]))
+        results = [None] * len(inputs)
+        with torch.no_grad():
+            for start in range(0, len(order), self.batch_size):
+                batch_ids = order[start:start + self.batch_size]
+                outputs = self.predictor.model.inference([inputs[i] for i in batch_ids])
+                # one device to host copy per batch: boxes, class and score of all images in one tensor
+                fields = [torch.cat([inst.pred_boxes.tensor, inst.pred_classes[:, None].to(inst.scores.dtype),
+                                     inst.scores[:, None]], dim=1)
+                          for inst in (output["instances"] for output in outputs)]
+                rows = torch.cat(fields).cpu().tolist()
+                offset = 0
+                for i, field in zip(batch_ids, fields):
+                    results[i] = self.to_layout_result(rows[offset:offset + len(field)], ignore_catids)
+                    offset += len(field)
+        return results
+
+    @staticmethod
+    def to_layout_result(rows, ignore_catids):
         page_layout_result = {
             "layout_dets": []
         }
-        outputs = self.predictor(image)
-        boxes = outputs["instances"].to("cpu")._fields["pred_boxes"].tensor.tolist()
-        labels = outputs["instances"].to("cpu")._fields["pred_classes"].tolist()
-        scores = outputs["instances"].to("cpu")._fields["scores"].tolist()
-        for bbox_idx in range(len(boxes)):
-            if labels[bbox_idx] in ignore_catids:
+        for x0, y0, x1, y1, label, score in rows:
+            label = int(label)
+            if label in ignore_catids:
                 continue
             page_layout_result["layout_dets"].append({
-                "category_id": labels[bbox_idx],
-                "poly": [
-                    boxes[bbox_idx][0], boxes[bbox_idx][1],
-                    boxes[bbox_idx][2], boxes[bbox_idx][1],
-                    boxes[bbox_idx][2], boxes[bbox_idx][3],
-                    boxes[bbox_idx][0], boxes[bbox_idx][3],
-                ],
-                "score": scores[bbox_idx]
+                "category_id": label,
+                "poly": [x0, y0, x1, y0, x1, y1, x0, y1],
+                "score": score
             })
-        return page_layout_result
\ No newline at end of file
+        return page_layout_result
+
+    def __call__(self, image, ignore_catids=[]):
+        return self.predict_batch([image], ignore_catids)[0]
@@ -2,6 +2,7 @@ import os
 import cv2
 import torch
 from pdf_extract_kit.registry import MODEL_REGISTRY
+from pdf_extract_kit.utils.data_preprocess import input_name, load_image
 from pdf_extract_kit.utils.visualization import visualize_bbox
 from pdf_extract_kit.dataset.dataset import ImageDataset
 
@@ -54,7 +55,7 @@ class LayoutDetectionYOLO:
         Predict formulas in images.
 
         Args:
-            images (list): List of images to be predicted.
+            images (list): List of images to be predicted: paths, encoded image bytes, BGR arrays or PIL images.
             result_path (str): Path to save the prediction results.
             image_ids (list, optional): List of image IDs corresponding to the images.
 
@@ -63,6 +64,9 @@ class LayoutDetectionYOLO:
         """
         results = []
         for idx, image in enumerate(images):
+            if isinstance(image, (bytes, bytearray, memoryview)):
+                # ultralytics reads paths, PIL images and arrays but not encoded bytes
+                image = load_image(image)
             result = self.model.predict(image, imgsz=self.img_size, conf=self.conf_thres, iou=self.iou_thres, verbose=False, device=self.device)[0]
             if self.visualize:
                 if not os.path.exists(result_path):
@@ -85,8 +89,7 @@ class LayoutDetectionYOLO:
                 if image_ids:
                     base_name = image_ids[idx]
                 else:
-                    # base_name = os.path.basename(image)
-                    base_name = os.path.splitext(os.path.basename(image))[0]  # Remove file extension
+                    base_name = input_name(image, idx)  # file name without extension, or image_<n> in memory
                 
                 result_name = f"{base_name}_layout.png"
                 
@@ -0,0 +1,37 @@
+from pdf_extract_kit.registry import MODEL_REGISTRY
+from pdf_extract_kit.utils.yolo_onnx import YOLOOnnxDetector
+
+
+@MODEL_REGISTRY.register('layout_detection_yolo_onnx')
+class LayoutDetectionYOLOOnnx(YOLOOnnxDetector):
+    result_suffix = 'layout'
+
+    def __init__(self, config):
+        """
+        Initialize the LayoutDetectionYOLOOnnx class, the ONNX Runtime (CPU) variant of LayoutDetectionYOLO.
+
+        Args:
+            config (dict): Configuration dictionary containing model parameters, see YOLOOnnxDetector.
+        """
+        # Mapping from class IDs to class names
+        id_to_names = {
+            0: 'title',
+            1: 'plain text',
+            2: 'abandon',
+            3: 'figure',
+            4: 'figure_caption',
+            5: 'table',
+            6: 'table_caption',
+            7: 'table_footnote',
+            8: 'isolate_formula',
+            9: 'formula_caption'
+        }
+        super().__init__(config, id_to_names)
+
+    def load_torch_model(self, model_path):
+        try:
+            from doclayout_yolo import YOLOv10
+            return YOLOv10(model_path)
+        except (ImportError, AttributeError):
+            from ultralytics import YOLO
+            return YOLO(model_path)
@@ -1,6 +1,10 @@
-from pdf_extract_kit.tasks.ocr.models.paddle_ocr import ModifiedPaddleOCR
-# from pdf_extract_kit.registry.registry import MODEL_REGISTRY
+from pdf_extract_kit.registry.registry import MODEL_REGISTRY, register_lazy_models
 
+# Models are imported on first use (MODEL_REGISTRY.get or attribute access), so importing
+# the task package does not pull in the heavy model dependencies.
+__getattr__ = register_lazy_models(MODEL_REGISTRY, __name__, {
+    "ModifiedPaddleOCR": ("ocr_ppocr", "pdf_extract_kit.tasks.ocr.models.paddle_ocr"),
+})
 
 __all__ = [
     "ModifiedPaddleOCR",
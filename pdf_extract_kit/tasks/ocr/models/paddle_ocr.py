@@ -8,10 +8,13 @@ from io import BytesIO
 from PIL import Image
 
 from paddleocr import PaddleOCR
+from ppocr.data import transform
 from ppocr.utils.logging import get_logger
 from ppocr.utils.utility import check_and_read, alpha_to_color, binarize_img
 from tools.infer.utility import draw_ocr_box_txt, get_rotate_crop_image, get_minarea_rect_crop
 from pdf_extract_kit.registry import MODEL_REGISTRY
+from pdf_extract_kit.utils.ocr_utils import sorted_boxes, merge_det_boxes, update_det_boxes
+from pdf_extract_kit.utils.thread_budget import get_thread_budget
 logger = get_logger()
 
 def img_decode(content: bytes):
@@ -54,243 +57,34 @@ def check_img(img):
         img = cv2.cvtColor(np.asarray(img), cv2.COLOR_RGB2BGR)
     return img
 
-def sorted_boxes(dt_boxes):
-    """
-    Sort text boxes in order from top to bottom, left to right
-    args:
-        dt_boxes(array):detected text boxes with shape [4, 2]
-    return:
-        sorted boxes(array) with shape [4, 2]
-    """
-    num_boxes = dt_boxes.shape[0]
-    sorted_boxes = sorted(dt_boxes, key=lambda x: (x[0][1], x[0][0]))
-    _boxes = list(sorted_boxes)
-
-    for i in range(num_boxes - 1):
-        for j in range(i, -1, -1):
-            if abs(_boxes[j + 1][0][1] - _boxes[j][0][1]) < 10 and \
-                    (_boxes[j + 1][0][0] < _boxes[j][0][0]):
-                tmp = _boxes[j]
-                _boxes[j] = _boxes[j + 1]
-                _boxes[j + 1] = tmp
-            else:
-                break
-    return _boxes
-
-
-def __is_overlaps_y_exceeds_threshold(bbox1, bbox2, overlap_ratio_threshold=0.8):
-    """Check if two bounding boxes overlap on the y-axis, and if the height of the overlapping region exceeds 80% of the height of the shorter bounding box."""
-    _, y0_1, _, y1_1 = bbox1
-    _, y0_2, _, y1_2 = bbox2
-
-    overlap = max(0, min(y1_1, y1_2) - max(y0_1, y0_2))
-    height1, height2 = y1_1 - y0_1, y1_2 - y0_2
-    max_height = max(height1, height2)
-    min_height = min(height1, height2)
-
-    return (overlap / min_height) > overlap_ratio_threshold
-
-
-def bbox_to_points(bbox):
-    """ change bbox(shape: N * 4) to polygon(shape: N * 8) """
-    x0, y0, x1, y1 = bbox
-    return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]]).astype('float32')
-
-
-def points_to_bbox(points):
-    """ change polygon(shape: N * 8) to bbox(shape: N * 4) """
-    x0, y0 = points[0]
-    x1, _ = points[1]
-    _, y1 = points[2]
-    return [x0, y0, x1, y1]
-
-
-def merge_intervals(intervals):
-    # Sort the intervals based on the start value
-    intervals.sort(key=lambda x: x[0])
-
-    merged = []
-    for interval in intervals:
-        # If the list of merged intervals is empty or if the current
-        # interval does not overlap with the previous, simply append it.
-        if not merged or merged[-1][1] < interval[0]:
-            merged.append(interval)
-        else:
-            # Otherwise, there is overlap, so we merge the current and previous intervals.
-            merged[-1][1] = max(merged[-1][1], interval[1])
-
-    return merged
-
-
-def remove_intervals(original, masks):
-    # Merge all mask intervals
-    merged_masks = merge_intervals(masks)
-
-    result = []
-    original_start, original_end = original
-
-    for mask in merged_masks:
-        mask_start, mask_end = mask
-
-        # If the mask starts after the original range, ignore it
-        if mask_start > original_end:
-            continue
-
-        # If the mask ends before the original range starts, ignore it
-        if mask_end < original_start:
-            continue
-
-        # Remove the masked part from the original range
-        if original_start < mask_start:
-            result.append([original_start, mask_start - 1])
-
-        original_start = max(mask_end + 1, original_start)
-
-    # Add the remaining part of the original range, if any
-    if original_start <= original_end:
-        result.append([original_start, original_end])
-
-    return result
-
-
-def update_det_boxes(dt_boxes, mfd_res):
-    new_dt_boxes = []
-    for text_box in dt_boxes:
-        text_bbox = points_to_bbox(text_box)
-        masks_list = []
-        for mf_box in mfd_res:
-            mf_bbox = mf_box['bbox']
-            if __is_overlaps_y_exceeds_threshold(text_bbox, mf_bbox):
-                masks_list.append([mf_bbox[0], mf_bbox[2]])
-        text_x_range = [text_bbox[0], text_bbox[2]]
-        text_remove_mask_range = remove_intervals(text_x_range, masks_list)
-        temp_dt_box = []
-        for text_remove_mask in text_remove_mask_range:
-            temp_dt_box.append(bbox_to_points([text_remove_mask[0], text_bbox[1], text_remove_mask[1], text_bbox[3]]))
-        if len(temp_dt_box) > 0:
-            new_dt_boxes.extend(temp_dt_box)
-    return new_dt_boxes
-
-
-def merge_spans_to_line(spans):
-    """
-    Merge given spans into lines. Spans are considered based on their position in the document.
-    If spans overlap sufficiently on the Y-axis, they are merged into the same line; otherwise, a new line is started.
-
-    Parameters:
-    spans (list): A list of spans, where each span is a dictionary containing at least the key 'bbox',
-                  which itself is a list of four integers representing the bounding box:
-                  [x0, y0, x1, y1], where (x0, y0) is the top-left corner and (x1, y1) is the bottom-right corner.
-
-    Returns:
-    list: A list of lines, where each line is a list of spans.
-    """
-    # Return an empty list if the spans list is empty
-    if len(spans) == 0:
-        return []
-    else:
-        # Sort spans by the Y0 coordinate
-        spans.sort(key=lambda span: span['bbox'][1])
-
-        lines = []
-        current_line = [spans[0]]
-        for span in spans[1:]:
-            # If the current span overlaps with the last span in the current line on the Y-axis, add it to the current line
-            if __is_overlaps_y_exceeds_threshold(span['bbox'], current_line[-1]['bbox']):
-                current_line.append(span)
-            else:
-                # Otherwise, start a new line
-                lines.append(current_line)
-                current_line = [span]
-
-        # Add the last line if it exists
-        if current_line:
-            lines.append(current_line)
-
-        return lines
-
-
-def merge_overlapping_spans(spans):
-    """
-    Merges overlapping spans on the same line.
-
-    :param spans: A list of span coordinates [(x1, y1, x2, y2), ...]
-    :return: A list of merged spans
-    """
-    # Return an empty list if the input spans list is empty
-    if not spans:
-        return []
-
-    # Sort spans by their starting x-coordinate
-    spans.sort(key=lambda x: x[0])
-
-    # Initialize the list of merged spans
-    merged = []
-    for span in spans:
-        # Unpack span coordinates
-        x1, y1, x2, y2 = span
-        # If the merged list is empty or there's no horizontal overlap, add the span directly
-        if not merged or merged[-1][2] < x1:
-            merged.append(span)
-        else:
-            # If there is horizontal overlap, merge the current span with the previous one
-            last_span = merged.pop()
-            # Update the merged span's top-left corner to the smaller (x1, y1) and bottom-right to the larger (x2, y2)
-            x1 = min(last_span[0], x1)
-            y1 = min(last_span[1], y1)
-            x2 = max(last_span[2], x2)
-            y2 = max(last_span[3], y2)
-            # Add the merged span back to the list
-            merged.append((x1, y1, x2, y2))
-
-    # Return the list of merged spans
-    return merged
-
-
-def merge_det_boxes(dt_boxes):
-    """
-    Merge detection boxes.
-
-    This function takes a list of detected bounding boxes, each represented by four corner points.
-    The goal is to merge these bounding boxes into larger text regions.
-
-    Parameters:
-    dt_boxes (list): A list containing multiple text detection boxes, where each box is defined by four corner points.
-
-    Returns:
-    list: A list containing the merged text regions, where each region is represented by four corner points.
-    """
-    # Convert the detection boxes into a dictionary format with bounding boxes and type
-    dt_boxes_dict_list = []
-    for text_box in dt_boxes:
-        text_bbox = points_to_bbox(text_box)
-        text_box_dict = {
-            'bbox': text_bbox,
-        }
-        dt_boxes_dict_list.append(text_box_dict)
-
-    # Merge adjacent text regions into lines
-    lines = merge_spans_to_line(dt_boxes_dict_list)
-
-    # Initialize a new list for storing the merged text regions
-    new_dt_boxes = []
-    for line in lines:
-        line_bbox_list = []
-        for span in line:
-            line_bbox_list.append(span['bbox'])
-
-        # Merge overlapping text regions within the same line
-        merged_spans = merge_overlapping_spans(line_bbox_list)
-
-        # Convert the merged text regions back to point format and add them to the new detection box list
-        for span in merged_spans:
-            new_dt_boxes.append(bbox_to_points(span))
-
-    return new_dt_boxes
+def check_images(imgs):
+    """check_img on a list of single images; a PDF would expand to several pages and is rejected."""
+    checked = []
+    for img in imgs:
+        img = check_img(img)
+        if isinstance(img, list):
+            raise ValueError("PDF inputs are not supported in a list of images, pass the PDF path to ocr() instead")
+        checked.append(img)
+    return checked
+
+def preprocess_img(img, alpha_color=(255, 255, 255), inv=False, bin=False):
+    img = alpha_to_color(img, alpha_color)
+    if inv:
+        img = cv2.bitwise_not(img)
+    if bin:
+        img = binarize_img(img)
+    return img
 
 @MODEL_REGISTRY.register('ocr_ppocr')
 class ModifiedPaddleOCR(PaddleOCR):
     def __init__(self, config):
+        config = dict(config)
+        budget = get_thread_budget()
+        if budget is not None:
+            # cpu_threads / enable_mkldnn from the process thread budget unless set explicitly
+            config = budget.paddle_config(config)
+        # number of same-sized images run together in one text detection forward pass
+        self.det_batch_num = config.pop('det_batch_num', 4)
         super().__init__(**config)
         
     def predict(self, img, **kwargs):
@@ -317,56 +111,46 @@ class ModifiedPaddleOCR(PaddleOCR):
             cls: use angle classifier or not. Default is True. If True, the text with rotation of 180 degrees can be recognized. If no text is rotated by 180 degrees, use cls=False to get better performance. Text with rotation of 90 or 270 degrees can be recognized even if cls=False.
             bin: binarize image to black and white. Default is False.
             inv: invert image colors. Default is False.
+            mfd_res: formula boxes used to split text boxes. For a list of images with det=True, one list of formula boxes per image.
             alpha_color: set RGB color Tuple for transparent parts replacement. Default is pure white.
+        return:
+            list with one result per input image (or pdf page)
         """
         assert isinstance(img, (np.ndarray, list, str, bytes, Image.Image))
-        if isinstance(img, list) and det == True:
-            logger.error('When input a list of images, det must be false')
-            exit(0)
         if cls == True and self.use_angle_cls == False:
             logger.warning(
                 'Since the angle classifier is not initialized, it will not be used during the forward process'
             )
 
-        img = check_img(img)
-        # for infer pdf file
-        if isinstance(img, list):
-            if self.page_num > len(img) or self.page_num == 0:
-                self.page_num = len(img)
-            imgs = img[:self.page_num]
+        if isinstance(img, list) and det:
+            # a list of images, detected in batches of same-sized images
+            imgs = check_images(img)
+            mfd_res_list = mfd_res if mfd_res is not None else [None] * len(imgs)
         else:
-            imgs = [img]
+            img = check_img(img)
+            # for infer pdf file
+            if isinstance(img, list):
+                if self.page_num > len(img) or self.page_num == 0:
+                    self.page_num = len(img)
+                imgs = img[:self.page_num]
+            else:
+                imgs = [img]
+            mfd_res_list = [mfd_res] * len(imgs)
 
         def preprocess_image(_image):
-            _image = alpha_to_color(_image, alpha_color)
-            if inv:
-                _image = cv2.bitwise_not(_image)
-            if bin:
-                _image = binarize_img(_image)
-            return _image
+            return preprocess_img(_image, alpha_color, inv, bin)
 
         if det and rec:
-            ocr_res = []
-            for idx, img in enumerate(imgs):
-                img = preprocess_image(img)
-                dt_boxes, rec_res, _ = self.__call__(img, cls, mfd_res=mfd_res)
-                if not dt_boxes and not rec_res:
-                    ocr_res.append(None)
-                    continue
-                tmp_res = [[box.tolist(), res]
-                           for box, res in zip(dt_boxes, rec_res)]
-                ocr_res.append(tmp_res)
-            return ocr_res
+            # images are already checked here, ocr_batch would check them a second time
+            return self.ocr_images([preprocess_image(_img) if _img is not None else None for _img in imgs],
+                                   cls=cls, mfd_res_list=mfd_res_list)
         elif det and not rec:
-            ocr_res = []
-            for idx, img in enumerate(imgs):
-                img = preprocess_image(img)
-                dt_boxes, elapse = self.text_detector(img)
-                if not dt_boxes:
-                    ocr_res.append(None)
-                    continue
-                tmp_res = [box.tolist() for box in dt_boxes]
-                ocr_res.append(tmp_res)
+            valid_idx = [idx for idx, _img in enumerate(imgs) if _img is not None]
+            dt_boxes_list = self.detect_batch([preprocess_image(imgs[idx]) for idx in valid_idx])
+            ocr_res = [None] * len(imgs)
+            for idx, dt_boxes in zip(valid_idx, dt_boxes_list):
+                if dt_boxes is not None and len(dt_boxes) > 0:
+                    ocr_res[idx] = [box.tolist() for box in dt_boxes]
             return ocr_res
         else:
             ocr_res = []
@@ -384,28 +168,90 @@ class ModifiedPaddleOCR(PaddleOCR):
             if not rec:
                 return cls_res
             return ocr_res
-        
-    def __call__(self, img, cls=True, mfd_res=None):
-        time_dict = {'det': 0, 'rec': 0, 'cls': 0, 'all': 0}
 
-        if img is None:
-            logger.debug("no valid image provided")
-            return None, None, time_dict
+    def detect_batch(self, imgs):
+        """
+        Text detection on several images, running images of the same size in shared batches.
+
+        Images are resized by the detector's own preprocessing and grouped by resized shape;
+        each group runs in forward passes of up to `det_batch_num` images. Images are never
+        padded to a common size, since padding changes the probability map near the padded
+        border: the boxes are the same as with one `text_detector(img)` call per image.
+        Pages of one document usually share their size, so they batch fully.
+        Detectors or images the batched path does not cover (ONNX, non-DB algorithms,
+        very long images that paddle splits itself) fall back to `text_detector(img)`.
+
+        args:
+            imgs: list of preprocessed BGR ndarray
+        return:
+            list of dt_boxes (one per image, in input order)
+        """
+        detector = self.text_detector
+        dt_boxes_list = [None] * len(imgs)
+        if self.det_batch_num <= 1 or len(imgs) <= 1 or getattr(detector, 'use_onnx', False) \
+                or detector.det_algorithm not in ['DB', 'DB++']:
+            for idx, img in enumerate(imgs):
+                dt_boxes_list[idx], _ = detector(img)
+            return dt_boxes_list
+
+        prepared = []
+        for idx, img in enumerate(imgs):
+            h, w = img.shape[:2]
+            if max(h, w) / min(h, w) > 2 and max(h, w) > detector.args.det_limit_side_len:
+                dt_boxes_list[idx], _ = detector(img)
+                continue
+            data = transform({'image': img}, detector.preprocess_op)
+            if data is None or data[0] is None:
+                continue
+            prepared.append((idx, data[0], data[1]))
+
+        groups = {}
+        for item in prepared:
+            groups.setdefault(item[1].shape, []).append(item)
+        batches = [group[beg:beg + self.det_batch_num]
+                   for group in groups.values() for beg in range(0, len(group), self.det_batch_num)]
+        for batch in batches:
+            batch_img = np.stack([norm_img for _, norm_img, _ in batch]).astype(np.float32, copy=False)
+            detector.input_tensor.copy_from_cpu(batch_img)
+            detector.predictor.run()
+            maps = detector.output_tensors[0].copy_to_cpu()
+
+            for bno, (idx, norm_img, shape_list) in enumerate(batch):
+                pred = maps[bno:bno + 1]
+                post_result = detector.postprocess_op({'maps': pred}, np.expand_dims(shape_list, axis=0))
+                dt_boxes = post_result[0]['points']
+                if detector.args.det_box_type == 'poly':
+                    dt_boxes = detector.filter_tag_det_res_only_clip(dt_boxes, imgs[idx].shape)
+                else:
+                    dt_boxes = detector.filter_tag_det_res(dt_boxes, imgs[idx].shape)
+                dt_boxes_list[idx] = dt_boxes
+        return dt_boxes_list
+
+    def detect_and_crop(self, img, mfd_res=None):
+        """
+        Run text detection on one preprocessed image and crop every detected box.
 
-        start = time.time()
-        ori_im = img.copy()
+        args:
+            img: BGR ndarray
+            mfd_res: formula boxes used to split text boxes, list of {"bbox": [x0, y0, x1, y1]}
+        return:
+            dt_boxes(list), img_crop_list(list), det elapse(float)
+        """
         dt_boxes, elapse = self.text_detector(img)
-        time_dict['det'] = elapse
+        dt_boxes, img_crop_list = self.crop_det_boxes(img, dt_boxes, mfd_res=mfd_res)
+        return dt_boxes, img_crop_list, elapse
+
+    def crop_det_boxes(self, img, dt_boxes, mfd_res=None):
+        """
+        Sort and merge raw detected boxes, split them by formulas and crop them from the image.
 
+        return:
+            dt_boxes(list), img_crop_list(list)
+        """
         if dt_boxes is None:
-            logger.debug("no dt_boxes found, elapsed : {}".format(elapse))
-            end = time.time()
-            time_dict['all'] = end - start
-            return None, None, time_dict
-        else:
-            logger.debug("dt_boxes num : {}, elapsed : {}".format(
-                len(dt_boxes), elapse))
-        img_crop_list = []
+            logger.debug("no dt_boxes found")
+            return [], []
+        logger.debug("dt_boxes num : {}".format(len(dt_boxes)))
 
         dt_boxes = sorted_boxes(dt_boxes)
 
@@ -418,13 +264,34 @@ class ModifiedPaddleOCR(PaddleOCR):
             logger.debug("split text box by formula, new dt_boxes num : {}, elapsed : {}".format(
                 len(dt_boxes), aft-bef))
 
+        img_crop_list = []
         for bno in range(len(dt_boxes)):
             tmp_box = copy.deepcopy(dt_boxes[bno])
             if self.args.det_box_type == "quad":
-                img_crop = get_rotate_crop_image(ori_im, tmp_box)
+                img_crop = get_rotate_crop_image(img, tmp_box)
             else:
-                img_crop = get_minarea_rect_crop(ori_im, tmp_box)
+                img_crop = get_minarea_rect_crop(img, tmp_box)
             img_crop_list.append(img_crop)
+        return dt_boxes, img_crop_list
+
+    def recognize_crops(self, img_crop_list, cls=True):
+        """
+        Recognize text crops gathered from any number of regions and pages.
+
+        Crops are sorted by width/height ratio over the whole list, so that every
+        `text_recognizer` call gets a full `rec_batch_num` batch of similarly shaped
+        crops (minimum padding), and results are scattered back to the input order.
+
+        args:
+            img_crop_list: list of BGR ndarray crops
+            cls: use angle classifier or not
+        return:
+            rec_res(list of (text, score)) in input order, time_dict
+        """
+        time_dict = {'cls': 0, 'rec': 0}
+        if not img_crop_list:
+            return [], time_dict
+
         if self.use_angle_cls and cls:
             img_crop_list, angle_list, elapse = self.text_classifier(
                 img_crop_list)
@@ -432,19 +299,111 @@ class ModifiedPaddleOCR(PaddleOCR):
             logger.debug("cls num  : {}, elapsed : {}".format(
                 len(img_crop_list), elapse))
 
-        rec_res, elapse = self.text_recognizer(img_crop_list)
-        time_dict['rec'] = elapse
+        width_ratios = [crop.shape[1] / float(crop.shape[0]) for crop in img_crop_list]
+        order = np.argsort(width_ratios, kind='stable')
+        batch_num = self.args.rec_batch_num
+        rec_res = [None] * len(img_crop_list)
+        for beg in range(0, len(order), batch_num):
+            batch_idx = order[beg:beg + batch_num]
+            batch_res, elapse = self.text_recognizer([img_crop_list[i] for i in batch_idx])
+            time_dict['rec'] += elapse
+            for i, res in zip(batch_idx, batch_res):
+                rec_res[i] = res
         logger.debug("rec_res num  : {}, elapsed : {}".format(
-            len(rec_res), elapse))
+            len(rec_res), time_dict['rec']))
         if self.args.save_crop_res:
             self.draw_crop_rec_res(self.args.crop_res_save_dir, img_crop_list,
                                    rec_res)
+        return rec_res, time_dict
+
+    def filter_rec_res(self, dt_boxes, rec_res):
         filter_boxes, filter_rec_res = [], []
         for box, rec_result in zip(dt_boxes, rec_res):
             text, score = rec_result
             if score >= self.drop_score:
                 filter_boxes.append(box)
                 filter_rec_res.append(rec_result)
+        return filter_boxes, filter_rec_res
+
+    def ocr_batch(self, imgs, cls=True, mfd_res_list=None, bin=False, inv=False, alpha_color=(255, 255, 255)):
+        """
+        Detect text in every image, then recognize the crops of all images together.
+
+        Use this instead of calling `ocr` per region: detection runs in batches of same-sized
+        images (see `detect_batch`) and recognition runs over the crops of the whole batch (e.g. every OCR region of a
+        page or a document), sorted by width in full `rec_batch_num` batches.
+
+        args:
+            imgs: list of images, each support ndarray, img_path, bytes or PIL.Image (not PDF)
+            cls: use angle classifier or not
+            mfd_res_list: optional list (one per image) of formula boxes, see `ocr`
+        return:
+            list with one entry per image, same format as `ocr(img)[0]`
+        """
+        prepared = [preprocess_img(img, alpha_color, inv, bin) if img is not None else None
+                    for img in check_images(imgs)]
+        return self.ocr_images(prepared, cls=cls, mfd_res_list=mfd_res_list)
+
+    def ocr_images(self, prepared, cls=True, mfd_res_list=None):
+        """
+        `ocr_batch` on images that already went through `check_img` and preprocessing.
+
+        args:
+            prepared: list of BGR ndarray (None for images that failed to load)
+            cls: use angle classifier or not
+            mfd_res_list: optional list (one per image) of formula boxes, see `ocr`
+        return:
+            list with one entry per image, same format as `ocr(img)[0]`
+        """
+        if mfd_res_list is None:
+            mfd_res_list = [None] * len(prepared)
+        assert len(mfd_res_list) == len(prepared), "mfd_res_list must have one entry per image"
+
+        valid_idx = [idx for idx, img in enumerate(prepared) if img is not None]
+        raw_boxes_list = self.detect_batch([prepared[idx] for idx in valid_idx])
+
+        boxes_per_img = [[] for _ in prepared]
+        all_crops = []
+        for idx, raw_boxes in zip(valid_idx, raw_boxes_list):
+            dt_boxes, img_crop_list = self.crop_det_boxes(prepared[idx], raw_boxes, mfd_res=mfd_res_list[idx])
+            boxes_per_img[idx] = dt_boxes
+            all_crops.extend(img_crop_list)
+
+        rec_res, _ = self.recognize_crops(all_crops, cls=cls)
+
+        ocr_res = []
+        beg = 0
+        for dt_boxes in boxes_per_img:
+            img_rec_res = rec_res[beg:beg + len(dt_boxes)]
+            beg += len(dt_boxes)
+            filter_boxes, filter_rec_res = self.filter_rec_res(dt_boxes, img_rec_res)
+            if not filter_boxes and not filter_rec_res:
+                ocr_res.append(None)
+                continue
+            ocr_res.append([[box.tolist(), res]
+                            for box, res in zip(filter_boxes, filter_rec_res)])
+        return ocr_res
+
+    def __call__(self, img, cls=True, mfd_res=None):
+        time_dict = {'det': 0, 'rec': 0, 'cls': 0, 'all': 0}
+
+        if img is None:
+            logger.debug("no valid image provided")
+            return None, None, time_dict
+
+        start = time.time()
+        ori_im = img.copy()
+        dt_boxes, img_crop_list, elapse = self.detect_and_crop(ori_im, mfd_res=mfd_res)
+        time_dict['det'] = elapse
+
+        if not dt_boxes:
+            end = time.time()
+            time_dict['all'] = end - start
+            return None, None, time_dict
+
+        rec_res, rec_time_dict = self.recognize_crops(img_crop_list, cls=cls)
+        time_dict.update(rec_time_dict)
+        filter_boxes, filter_rec_res = self.filter_rec_res(dt_boxes, rec_res)
         end = time.time()
         time_dict['all'] = end - start
-        return filter_boxes, filter_rec_res, time_dict
\ No newline at end of file
+        return filter_boxes, filter_rec_res, time_dict
@@ -3,7 +3,7 @@ import json
 import random
 from PIL import Image, ImageDraw
 from pdf_extract_kit.registry.registry import TASK_REGISTRY
-from pdf_extract_kit.utils.data_preprocess import load_pdf
+from pdf_extract_kit.utils.data_preprocess import input_name, is_in_memory, is_pdf_bytes, load_image, load_pdf
 from pdf_extract_kit.tasks.base_task import BaseTask
 
 
@@ -22,6 +22,7 @@ class OCRTask(BaseTask):
         
         Args:
             image: PIL.Image.Image, (if the model.predict function support other types, remenber add change-format-function in model.predict)
+                ModifiedPaddleOCR also takes image paths, encoded image bytes and BGR arrays.
             
         Returns:
             List[dict]: list of text bbox with it's content
@@ -49,6 +50,10 @@ class OCRTask(BaseTask):
         return self.model.predict(image)
         
     def prepare_input_files(self, input_path):
+        if is_in_memory(input_path):
+            return [input_path]
+        if isinstance(input_path, (list, tuple)):
+            return list(input_path)
         if os.path.isdir(input_path):
             file_list = [os.path.join(input_path, fname) for fname in os.listdir(input_path)]
         else:
@@ -56,11 +61,24 @@ class OCRTask(BaseTask):
         return file_list
             
     def process(self, input_path, save_dir=None, visualize=False):
+        """OCR on image and PDF files.
+
+        Args:
+            input_path: a file path, a directory of files, an in-memory input (PDF or image bytes, BGR array
+                or PIL image), or a list of paths and in-memory inputs. In-memory inputs are named
+                `image_<n>` in the saved results.
+            save_dir: directory of the json results (and visualizations), nothing is saved if None.
+            visualize: also save the images with the text boxes drawn.
+
+        Returns:
+            list: per input, the text boxes of an image or the list of per-page text boxes of a PDF.
+        """
         file_list = self.prepare_input_files(input_path)
         res_list = []
-        for fpath in file_list:
-            basename = os.path.basename(fpath)[:-4]
-            if fpath.endswith(".pdf") or fpath.endswith(".PDF"):
+        for idx, fpath in enumerate(file_list):
+            in_memory = is_in_memory(fpath)
+            basename = input_name(fpath, idx) if in_memory else os.path.basename(fpath)[:-4]
+            if is_pdf_bytes(fpath) or (not in_memory and (fpath.endswith(".pdf") or fpath.endswith(".PDF"))):
                 images = load_pdf(fpath)
                 pdf_res = []
                 for page, img in enumerate(images):
@@ -74,7 +92,7 @@ class OCRTask(BaseTask):
                         
                 res_list.append(pdf_res)
             else:
-                image = Image.open(fpath)
+                image = load_image(fpath) if in_memory else Image.open(fpath)
                 img_res = self.predict_image(image)
                 res_list.append(img_res)
                 if save_dir:
@@ -1,6 +1,10 @@
-from pdf_extract_kit.tasks.table_parsing.models.struct_eqtable import TableParsingStructEqTable
+from pdf_extract_kit.registry.registry import MODEL_REGISTRY, register_lazy_models
 
-from pdf_extract_kit.registry.registry import MODEL_REGISTRY
+# Models are imported on first use (MODEL_REGISTRY.get or attribute access), so importing
+# the task package does not pull in the heavy model dependencies.
+__getattr__ = register_lazy_models(MODEL_REGISTRY, __name__, {
+    "TableParsingStructEqTable": ("table_parsing_struct_eqtable", "pdf_extract_kit.tasks.table_parsing.models.struct_eqtable"),
+})
 
 __all__ = [
     "TableParsingStructEqTable",
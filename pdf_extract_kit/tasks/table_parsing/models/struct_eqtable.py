@@ -1,8 +1,8 @@
 import torch
 
-from PIL import Image
 from struct_eqtable import build_model
 from pdf_extract_kit.registry.registry import MODEL_REGISTRY
+from pdf_extract_kit.utils.data_preprocess import load_image
 
 
 @MODEL_REGISTRY.register("table_parsing_struct_eqtable")
@@ -35,9 +35,19 @@ class TableParsingStructEqTable:
             batch_size=self.batch_size,
         ).cuda()
 
-    def predict(self, images, result_path, output_format=None, **kwargs):        
+    def predict(self, images, result_path, output_format=None, **kwargs):
+        """
+        Parse the table in each image.
+
+        Args:
+            images (list): Table images: paths, encoded image bytes, BGR arrays or PIL images.
+            result_path (str): Path to save the prediction results (unused).
+            output_format (str, optional): 'latex', 'markdown' or 'html', the configured format by default.
 
-        load_images = [Image.open(image_path) for image_path in images]
+        Returns:
+            list: Table of every image in the output format.
+        """
+        load_images = [load_image(image) for image in images]
 
         if output_format is None:
             output_format = self.default_format
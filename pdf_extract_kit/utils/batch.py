@@ -0,0 +1,199 @@
+import os
+import json
+import time
+import sqlite3
+import tempfile
+
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def atomic_write_text(path, text):
+    """Write `text` to `path` so that readers see either the old file or the complete new one.
+
+    The content goes to a temporary file in the same directory which is fsynced and then
+    renamed over `path` with `os.replace` (atomic on POSIX and Windows).
+    """
+    dirname = os.path.dirname(os.path.abspath(path))
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_json(path, obj):
+    atomic_write_text(path, json.dumps(obj, indent=2, ensure_ascii=False))
+
+
+class Manifest:
+    """On-disk SQLite manifest of per-document and per-page processing status.
+
+    The manifest makes batch runs resumable: documents and pages that are `done` are skipped on
+    restart, documents left `running` by a crashed run go back to `pending`, and `failed` documents
+    are retried until they reach the attempt limit. Every worker process opens its own connection;
+    WAL mode lets the progress reporter read while workers write.
+
+    Args:
+        db_path (str): Path of the SQLite file, created if missing.
+        timeout (float): Seconds to wait for a write lock held by another process.
+
+    Example:
+        manifest = Manifest('outputs/manifest.sqlite')
+        manifest.add_documents(pdf_paths)
+        for path in manifest.pending_documents(max_attempts=3):
+            ...
+    """
+
+    def __init__(self, db_path, timeout=60):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # check_same_thread=False: the progress reporter thread reads through the same connection
+        self.conn = sqlite3.connect(db_path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS documents (
+                path TEXT PRIMARY KEY,
+                status TEXT NOT NULL DEFAULT 'pending',
+                num_pages INTEGER,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                output TEXT,
+                started_at REAL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                path TEXT NOT NULL,
+                page_no INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                finished_at REAL,
+                PRIMARY KEY (path, page_no)
+            );
+            CREATE INDEX IF NOT EXISTS documents_status ON documents (status);
+        ''')
+
+    def close(self):
+        self.conn.close()
+
+    def add_documents(self, paths):
+        """Register documents, already known paths keep their status. Returns the number of new documents."""
+        before = self.conn.total_changes
+        self.conn.execute('BEGIN')
+        self.conn.executemany('INSERT OR IGNORE INTO documents (path) VALUES (?)', ((p,) for p in paths))
+        self.conn.execute('COMMIT')
+        return self.conn.total_changes - before
+
+    def reset_running(self, max_attempts=None):
+        """Put documents left `running` by an interrupted run back to `pending`.
+
+        A document stays `running` when its worker died (killed, out of memory, crashed in native
+        code). Documents that already used `max_attempts` attempts are marked `failed` instead, so a
+        document that kills its worker is not retried forever. Returns the number of documents that
+        were `running`.
+        """
+        self.conn.execute('BEGIN')
+        failed = 0
+        if max_attempts is not None:
+            failed = self.conn.execute(
+                'UPDATE documents SET status=?, error=?, finished_at=? WHERE status=? AND attempts>=?',
+                (FAILED, 'interrupted while running', time.time(), RUNNING, max_attempts)).rowcount
+        reset = self.conn.execute('UPDATE documents SET status=? WHERE status=?', (PENDING, RUNNING)).rowcount
+        self.conn.execute('COMMIT')
+        return failed + reset
+
+    def pending_documents(self, max_attempts=3):
+        rows = self.conn.execute(
+            'SELECT path FROM documents WHERE status=? OR (status=? AND attempts<?) ORDER BY path',
+            (PENDING, FAILED, max_attempts))
+        return [row[0] for row in rows]
+
+    def status(self, path):
+        row = self.conn.execute('SELECT status FROM documents WHERE path=?', (path,)).fetchone()
+        return row[0] if row else None
+
+    def start_document(self, path, num_pages):
+        self.conn.execute(
+            'UPDATE documents SET status=?, num_pages=?, attempts=attempts+1, error=NULL, started_at=? WHERE path=?',
+            (RUNNING, num_pages, time.time(), path))
+
+    def done_pages(self, path):
+        rows = self.conn.execute('SELECT page_no FROM pages WHERE path=? AND status=?', (path, DONE))
+        return {row[0] for row in rows}
+
+    def page_done(self, path, page_no):
+        self.conn.execute('INSERT OR REPLACE INTO pages (path, page_no, status, finished_at) VALUES (?, ?, ?, ?)',
+                          (path, page_no, DONE, time.time()))
+
+    def finish_document(self, path, output=None):
+        self.conn.execute('UPDATE documents SET status=?, output=?, finished_at=? WHERE path=?',
+                          (DONE, output, time.time(), path))
+
+    def fail_document(self, path, error):
+        self.conn.execute('UPDATE documents SET status=?, error=?, finished_at=? WHERE path=?',
+                          (FAILED, error, time.time(), path))
+
+    def counts(self):
+        """Document counts per status and page totals.
+
+        Returns:
+            dict: `documents` ({status: count}), `pages_done`, `pages_known` (pages of documents whose
+                page count is known) and `documents_known` (documents whose page count is known).
+        """
+        documents = dict(self.conn.execute('SELECT status, COUNT(*) FROM documents GROUP BY status').fetchall())
+        pages_done = self.conn.execute('SELECT COUNT(*) FROM pages WHERE status=?', (DONE,)).fetchone()[0]
+        pages_known, documents_known = self.conn.execute(
+            'SELECT COALESCE(SUM(num_pages), 0), COUNT(num_pages) FROM documents').fetchone()
+        return {
+            'documents': documents,
+            'pages_done': pages_done,
+            'pages_known': pages_known,
+            'documents_known': documents_known,
+        }
+
+
+class ProgressReporter:
+    """Pages/sec and ETA of a batch run, computed from the manifest counts.
+
+    Documents whose page count is not known yet are estimated with the average page count of the
+    documents opened so far.
+    """
+
+    def __init__(self, manifest):
+        self.manifest = manifest
+        self.start_time = time.time()
+        self.start_pages = manifest.counts()['pages_done']
+
+    def snapshot(self):
+        counts = self.manifest.counts()
+        elapsed = max(time.time() - self.start_time, 1e-6)
+        pages_per_sec = (counts['pages_done'] - self.start_pages) / elapsed
+        total_documents = sum(counts['documents'].values())
+        avg_pages = counts['pages_known'] / counts['documents_known'] if counts['documents_known'] else 0
+        pages_total = counts['pages_known'] + (total_documents - counts['documents_known']) * avg_pages
+        pages_left = max(pages_total - counts['pages_done'], 0)
+        eta = pages_left / pages_per_sec if pages_per_sec > 0 else None
+        return dict(counts, pages_per_sec=pages_per_sec, pages_left=pages_left, eta=eta, elapsed=elapsed)
+
+    def format(self):
+        s = self.snapshot()
+        docs = s['documents']
+        total = sum(docs.values())
+        if s['eta'] is not None:
+            minutes, seconds = divmod(int(s['eta']), 60)
+            hours, minutes = divmod(minutes, 60)
+            eta = f"{hours}:{minutes:02d}:{seconds:02d}"
+        else:
+            eta = '--:--:--'
+        return (f"docs {docs.get(DONE, 0)}/{total} (failed {docs.get(FAILED, 0)}, running {docs.get(RUNNING, 0)}) | "
+                f"pages {s['pages_done']} | {s['pages_per_sec']:.2f} pages/s | ETA {eta}")
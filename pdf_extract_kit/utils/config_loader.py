@@ -1,6 +1,8 @@
 import yaml
 import warnings
 from pdf_extract_kit.registry.registry import TASK_REGISTRY, MODEL_REGISTRY
+from pdf_extract_kit.utils.startup_profiler import profile_span, profile_model_construction, watch_first_inference
+from pdf_extract_kit.utils.thread_budget import get_thread_budget
 
 
 def load_config(config_path):
@@ -30,6 +32,10 @@ def load_config(config_path):
 
 def initialize_tasks_and_models(config):
 
+    # thread budget of the process, PaddleOCR reads it when it is built. The `threads` block of the config is
+    # applied by the command line entry points only, a config never changes the budget of a running server.
+    budget = get_thread_budget()
+
     task_instances = {}
     for task_name in config['tasks']:
 
@@ -37,11 +43,17 @@ def initialize_tasks_and_models(config):
         model_config = config['tasks'][task_name]['model_config']
 
         TaskClass = TASK_REGISTRY.get(task_name)
-        ModelClass = MODEL_REGISTRY.get(model_name)
+        with profile_span('registry_resolve', model_name):
+            ModelClass = MODEL_REGISTRY.get(model_name)
 
-        model_instance = ModelClass(model_config)
+        with profile_model_construction(model_name):
+            model_instance = ModelClass(model_config)
+        watch_first_inference(model_instance, model_name)
         task_instance = TaskClass(model_instance)
 
         task_instances[task_name] = task_instance
 
+    if budget is not None:
+        # torch / opencv are imported by the model modules, size their pools now
+        budget.apply_libraries()
     return task_instances
\ No newline at end of file
@@ -1,6 +1,70 @@
+import io
+import os
+
+import cv2
 import fitz
+import numpy as np
 from PIL import Image
 
+from pdf_extract_kit.utils.stage_timer import timed
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+# in-memory inputs accepted by the tasks and models next to file paths
+IN_MEMORY_TYPES = (bytes, bytearray, memoryview, np.ndarray, Image.Image)
+
+
+def is_in_memory(data):
+    """True for encoded file contents (bytes), decoded arrays and PIL images, False for paths."""
+    return isinstance(data, IN_MEMORY_TYPES)
+
+
+def is_pdf_bytes(data):
+    """True if `data` holds the contents of a PDF file (the header may follow some leading junk)."""
+    return isinstance(data, (bytes, bytearray, memoryview)) and b'%PDF-' in bytes(data[:1024])
+
+
+def input_name(data, idx):
+    """Name of an input for result files: the file name without extension for paths, `image_<n>` otherwise."""
+    if isinstance(data, (str, os.PathLike)):
+        return os.path.splitext(os.path.basename(data))[0]
+    return f"image_{idx + 1:04d}"
+
+
+def load_image(image):
+    """
+    Load an image from a path, encoded file contents, a NumPy array or a PIL image.
+
+    Arrays follow the OpenCV convention (BGR or BGRA, or single-channel grayscale), like the arrays
+    returned by `cv2.imread`.
+
+    Args:
+        image (str | bytes | np.ndarray | PIL.Image.Image): the image.
+
+    Returns:
+        PIL.Image.Image: the image in RGB mode.
+    """
+    if isinstance(image, Image.Image):
+        return image if image.mode == 'RGB' else image.convert('RGB')
+    if isinstance(image, np.ndarray):
+        if image.ndim == 2:
+            return Image.fromarray(image).convert('RGB')
+        return Image.fromarray(np.ascontiguousarray(image[..., 2::-1]))
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        with Image.open(io.BytesIO(image)) as img:
+            return img.convert('RGB')
+    if isinstance(image, (str, os.PathLike)):
+        with Image.open(image) as img:
+            return img.convert('RGB')
+    raise TypeError(f"Unsupported image type: {type(image)}")
+
+
+def load_image_bgr(image):
+    """Like `load_image`, as a BGR array for OpenCV based code. Arrays are returned as they are (grayscale is expanded)."""
+    if isinstance(image, np.ndarray):
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if image.ndim == 2 else image
+    return cv2.cvtColor(np.asarray(load_image(image)), cv2.COLOR_RGB2BGR)
+
 
 def load_pdf_page(page, dpi):
     pix = page.get_pixmap(matrix=fitz.Matrix(dpi/72, dpi/72))
@@ -10,11 +74,20 @@ def load_pdf_page(page, dpi):
         image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
     return image
 
+
+def open_pdf(pdf):
+    """Open a PDF from a path or from its contents (bytes)."""
+    if isinstance(pdf, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=bytes(pdf), filetype='pdf')
+    return fitz.open(pdf)
+
+
 def load_pdf(pdf_path, dpi=144):
     images = []
-    doc = fitz.open(pdf_path)
-    for i in range(len(doc)):
-        page = doc[i]
-        image = load_pdf_page(page, dpi)
-        images.append(image)
-    return images
\ No newline at end of file
+    with timed('rasterization'):
+        doc = open_pdf(pdf_path)
+        for i in range(len(doc)):
+            page = doc[i]
+            image = load_pdf_page(page, dpi)
+            images.append(image)
+    return images
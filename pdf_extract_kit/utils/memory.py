@@ -0,0 +1,237 @@
+import gc
+import os
+import sys
+import time
+import threading
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def get_rss():
+    """Current resident set size of this process in bytes, 0 if it cannot be determined."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def get_peak_rss():
+    """Peak resident set size of this process since start in bytes, 0 if it cannot be determined."""
+    if resource is None:
+        return psutil.Process().memory_info().peak_wset if psutil is not None else 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class PeakRSSTracker:
+    """Track the peak RSS over a section of work (e.g. one document) by sampling at checkpoints.
+
+    `get_peak_rss` only reports the lifetime peak of the process, which does not go down between
+    documents. Call `update()` at points where memory is expected to be high (after a page, before
+    a batch is released) to get a per-section peak.
+
+    Example:
+        tracker = PeakRSSTracker()
+        for page in pages:
+            process(page)
+            tracker.update()
+        print(f"peak rss: {tracker.peak / 2**20:.0f} MiB")
+    """
+
+    def __init__(self):
+        self.start = get_rss()
+        self.peak = self.start
+
+    def update(self):
+        rss = get_rss()
+        self.peak = max(self.peak, rss)
+        return rss
+
+
+def image_nbytes(image):
+    """Uncompressed size in bytes of a PIL image."""
+    return image.width * image.height * len(image.getbands())
+
+
+def get_total_memory():
+    """Physical memory of the machine in bytes, 0 if it cannot be determined."""
+    if psutil is not None:
+        return psutil.virtual_memory().total
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return 0
+
+
+def get_device_memory():
+    """(reserved, total) bytes of the current CUDA device, (0, 0) without torch or CUDA."""
+    torch = sys.modules.get('torch')
+    if torch is None or not torch.cuda.is_available():
+        return 0, 0
+    device = torch.cuda.current_device()
+    return torch.cuda.memory_reserved(device), torch.cuda.get_device_properties(device).total_memory
+
+
+class MemoryManager:
+    """Run `gc.collect()` / `torch.cuda.empty_cache()` only when memory crosses a high-water mark.
+
+    A full collection after every page is expensive on large heaps, and the CUDA caching allocator
+    reuses freed blocks anyway. `maybe_cleanup()` is cheap (one RSS read) and only collects when
+    the process RSS or the reserved device memory is above its high-water mark. RSS rarely drops
+    after a collection (freed memory stays with the allocator), so when a cleanup leaves memory above
+    the mark the following checks are skipped, 1, 2, 4, ... up to `max_backoff` of them, instead of
+    collecting on every page. The time spent in garbage collection, explicit and automatic, is
+    accounted per document; automatic collections count only when they start on a thread working on
+    the document (the thread that called `start_document` and those added with `track_thread`), not
+    when other work in the process, e.g. concurrent API requests, triggers them.
+
+    Args:
+        rss_high_water (int, optional): RSS in bytes above which a cleanup runs.
+            Defaults to `rss_fraction` of the physical memory.
+        device_high_water (int, optional): Reserved CUDA memory in bytes above which a cleanup runs.
+            Defaults to `device_fraction` of the device memory.
+        rss_fraction (float): Used when `rss_high_water` is not given.
+        device_fraction (float): Used when `device_high_water` is not given.
+        max_backoff (int): Most checks skipped after a cleanup that left memory above the mark.
+
+    Example:
+        manager = MemoryManager.from_config({'rss_high_water_mb': 8192})
+        manager.start_document()
+        for page in pages:
+            process(page)
+            manager.maybe_cleanup()
+        print(manager.end_document())
+    """
+
+    def __init__(self, rss_high_water=None, device_high_water=None, rss_fraction=0.75, device_fraction=0.8,
+                 max_backoff=64):
+        if rss_high_water is None:
+            rss_high_water = int(get_total_memory() * rss_fraction) or float('inf')
+        self.rss_high_water = rss_high_water
+        self.device_high_water = device_high_water
+        self.device_fraction = device_fraction
+        self.max_backoff = max_backoff
+        self._threads = set()
+        self._reset()
+        self._gc_start = {}
+
+    @classmethod
+    def from_config(cls, config=None):
+        """Build from a config dict with optional `rss_high_water_mb`, `device_high_water_mb`,
+        `rss_fraction`, `device_fraction` and `max_backoff`."""
+        config = config or {}
+        mb = 2 ** 20
+        rss = config.get('rss_high_water_mb')
+        device = config.get('device_high_water_mb')
+        return cls(rss_high_water=rss * mb if rss is not None else None,
+                   device_high_water=device * mb if device is not None else None,
+                   rss_fraction=config.get('rss_fraction', 0.75),
+                   device_fraction=config.get('device_fraction', 0.8),
+                   max_backoff=config.get('max_backoff', 64))
+
+    def _reset(self):
+        self.cleanups = 0
+        self.checks = 0
+        self.cleanup_time = 0.0
+        self.auto_gc_time = 0.0
+        self.peak_rss = 0
+        self._skip = 0
+        self._backoff = 1
+
+    def _gc_callback(self, phase, info):
+        thread = threading.get_ident()
+        if thread not in self._threads:
+            return
+        if phase == 'start':
+            self._gc_start[thread] = time.perf_counter()
+        else:
+            start = self._gc_start.pop(thread, None)
+            if start is not None:
+                self.auto_gc_time += time.perf_counter() - start
+
+    def start_document(self):
+        """Reset the per-document counters and start accounting automatic collections on this thread."""
+        self._reset()
+        self._threads = {threading.get_ident()}
+        self._gc_start = {}
+        if self._gc_callback not in gc.callbacks:
+            gc.callbacks.append(self._gc_callback)
+
+    def track_thread(self):
+        """Also account the automatic collections of the calling thread (e.g. a pipeline stage worker)."""
+        self._threads.add(threading.get_ident())
+
+    def end_document(self):
+        """Stop accounting and return the per-document statistics."""
+        if self._gc_callback in gc.callbacks:
+            gc.callbacks.remove(self._gc_callback)
+        self._threads = set()
+        return self.stats()
+
+    def stats(self):
+        return {
+            'checks': self.checks,
+            'cleanups': self.cleanups,
+            'cleanup_time': round(self.cleanup_time, 4),
+            'auto_gc_time': round(self.auto_gc_time, 4),
+            'peak_rss': self.peak_rss,
+        }
+
+    def over_high_water(self):
+        rss = get_rss()
+        self.peak_rss = max(self.peak_rss, rss)
+        if rss > self.rss_high_water:
+            return True
+        reserved, total = get_device_memory()
+        if reserved:
+            device_high_water = self.device_high_water if self.device_high_water is not None else total * self.device_fraction
+            return reserved > device_high_water
+        return False
+
+    def maybe_cleanup(self):
+        """Clean up if memory is above a high-water mark. Returns True if a cleanup ran."""
+        self.checks += 1
+        if self._skip > 0:
+            self._skip -= 1
+            return False
+        if not self.over_high_water():
+            self._backoff = 1
+            return False
+        self.cleanup()
+        if self.over_high_water():
+            # the collection did not bring memory under the mark, collecting again right away would not either
+            self._skip = self._backoff
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+        else:
+            self._backoff = 1
+        return True
+
+    def cleanup(self):
+        """Unconditional full collection and CUDA cache release, timed as `cleanup_time`."""
+        start = time.perf_counter()
+        # the explicit collection is counted in cleanup_time, not as automatic gc
+        callback_registered = self._gc_callback in gc.callbacks
+        if callback_registered:
+            gc.callbacks.remove(self._gc_callback)
+        try:
+            gc.collect()
+            torch = sys.modules.get('torch')
+            if torch is not None and torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        finally:
+            if callback_registered:
+                gc.callbacks.append(self._gc_callback)
+        self.cleanups += 1
+        self.cleanup_time += time.perf_counter() - start
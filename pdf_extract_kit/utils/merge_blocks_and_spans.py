@@ -3,6 +3,8 @@
 # import unicodedata
 import re
 
+import numpy as np
+
 
 def __is_overlaps_y_exceeds_threshold(bbox1, bbox2, overlap_ratio_threshold=0.8):
     """检查两个bbox在y轴上是否有重叠，并且该重叠区域的高度占两个bbox高度更低的那个超过80%"""
@@ -108,11 +110,51 @@ def calculate_overlap_area_in_bbox1_area_ratio(bbox1, bbox2):
     else:
         return intersection_area / bbox1_area
 
+def calculate_overlap_area_in_bbox1_area_ratio_matrix(bboxes1, bboxes2):
+    """
+    批量计算 bboxes1 (N, 4) 中每个框与 bboxes2 (M, 4) 中每个框的重叠面积占 bbox1 面积的比例, 返回 (N, M)
+    逐元素语义与 calculate_overlap_area_in_bbox1_area_ratio 一致
+    """
+    bboxes1 = np.asarray(bboxes1, dtype=np.float64).reshape(-1, 4)
+    bboxes2 = np.asarray(bboxes2, dtype=np.float64).reshape(-1, 4)
+    x_left = np.maximum(bboxes1[:, None, 0], bboxes2[None, :, 0])
+    y_top = np.maximum(bboxes1[:, None, 1], bboxes2[None, :, 1])
+    x_right = np.minimum(bboxes1[:, None, 2], bboxes2[None, :, 2])
+    y_bottom = np.minimum(bboxes1[:, None, 3], bboxes2[None, :, 3])
+
+    intersect = (x_right >= x_left) & (y_bottom >= y_top)
+    intersection_area = np.where(intersect, (x_right - x_left) * (y_bottom - y_top), 0.0)
+    bbox1_area = ((bboxes1[:, 2] - bboxes1[:, 0]) * (bboxes1[:, 3] - bboxes1[:, 1]))[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = intersection_area / bbox1_area
+    return np.where(bbox1_area != 0, ratio, 0.0)
+
+def assign_spans_to_blocks(span_bboxes, block_bboxes, radio, chunk_size=4096):
+    """
+    为每个span找到第一个满足 重叠面积/span面积 > radio 的block, 没有则为 -1
+    按span分块计算重叠矩阵, 避免超大页面上 S x B 矩阵占用过多内存
+    """
+    num_spans = len(span_bboxes)
+    assignment = np.full(num_spans, -1, dtype=np.int64)
+    if num_spans == 0 or len(block_bboxes) == 0:
+        return assignment
+    span_bboxes = np.asarray(span_bboxes, dtype=np.float64).reshape(-1, 4)
+    block_bboxes = np.asarray(block_bboxes, dtype=np.float64).reshape(-1, 4)
+    for start in range(0, num_spans, chunk_size):
+        matched = calculate_overlap_area_in_bbox1_area_ratio_matrix(
+            span_bboxes[start:start + chunk_size], block_bboxes) > radio
+        # argmax 返回第一个 True 的位置, 即按 blocks 顺序的首次匹配
+        first_block = matched.argmax(axis=1)
+        assignment[start:start + chunk_size] = np.where(matched.any(axis=1), first_block, -1)
+    return assignment
+
 def fill_spans_in_blocks(blocks, spans, radio):
     '''
     将allspans中的span按位置关系，放入blocks中
+    每个span归入按blocks顺序第一个满足重叠比例的block, 未归入任何block的span留在spans中
     '''
     block_with_spans = []
+    block_bboxes = []
     for block in blocks:
         block_type = block["category_type"]
         L = block['poly'][0]
@@ -122,35 +164,35 @@ def fill_spans_in_blocks(blocks, spans, radio):
         L, R = min(L, R), max(L, R)
         U, D = min(U, D), max(U, D)
         block_bbox = [L, U, R, D]
-        block_dict = {
+        block_bboxes.append(block_bbox)
+        block_with_spans.append({
             'type': block_type,
             'bbox': block_bbox,
-            'saved_info': block
-        }
-        block_spans = []
-        for span in spans:
-            span_bbox = span["bbox"]
-            if calculate_overlap_area_in_bbox1_area_ratio(span_bbox, block_bbox) > radio:
-                block_spans.append(span)
-
-        '''行内公式调整, 高度调整至与同行文字高度一致(优先左侧, 其次右侧)'''
-        # displayed_list = []
-        # text_inline_lines = []
-        # modify_y_axis(block_spans, displayed_list, text_inline_lines)
-
-        '''模型识别错误的行间公式, type类型转换成行内公式'''
-        # block_spans = modify_inline(block_spans, displayed_list, text_inline_lines)
-
-        '''bbox去除粘连'''  # 去粘连会影响span的bbox，导致后续fill的时候出错
-        # block_spans = remove_overlap_between_bbox_for_span(block_spans)
-
-        block_dict['spans'] = block_spans
-        block_with_spans.append(block_dict)
-
-        # 从spans删除已经放入block_spans中的span
-        if len(block_spans) > 0:
-            for span in block_spans:
-                spans.remove(span)
+            'saved_info': block,
+            'spans': [],
+        })
+
+    '''行内公式调整, 高度调整至与同行文字高度一致(优先左侧, 其次右侧)'''
+    # displayed_list = []
+    # text_inline_lines = []
+    # modify_y_axis(block_spans, displayed_list, text_inline_lines)
+
+    '''模型识别错误的行间公式, type类型转换成行内公式'''
+    # block_spans = modify_inline(block_spans, displayed_list, text_inline_lines)
+
+    '''bbox去除粘连'''  # 去粘连会影响span的bbox，导致后续fill的时候出错
+    # block_spans = remove_overlap_between_bbox_for_span(block_spans)
+
+    assignment = assign_spans_to_blocks([span["bbox"] for span in spans], block_bboxes, radio)
+    remaining_spans = []
+    for span, block_idx in zip(spans, assignment.tolist()):
+        if block_idx >= 0:
+            block_with_spans[block_idx]['spans'].append(span)
+        else:
+            remaining_spans.append(span)
+
+    # 从spans删除已经放入block中的span (原地修改, 与逐个 remove 的行为一致)
+    spans[:] = remaining_spans
 
     return block_with_spans, spans
 
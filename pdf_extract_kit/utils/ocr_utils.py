@@ -0,0 +1,331 @@
+import numpy as np
+
+
+def sorted_boxes(dt_boxes):
+    """
+    Sort text boxes in order from top to bottom, left to right
+    args:
+        dt_boxes(array):detected text boxes with shape [4, 2]
+    return:
+        sorted boxes(array) with shape [4, 2]
+    """
+    num_boxes = dt_boxes.shape[0]
+    if num_boxes == 0:
+        return []
+    ys = dt_boxes[:, 0, 1]
+    xs = dt_boxes[:, 0, 0]
+    y_order = np.lexsort((xs, ys))
+    ys_sorted = ys[y_order]
+
+    # Lines: runs of the (y, x) order whose consecutive top-left y differ by less than 10.
+    # Inside a line spanning less than 10 in y every pair is "on the same line", so the
+    # original insertion pass over adjacent pairs is a stable sort by x.
+    line_start = np.concatenate([[True], np.diff(ys_sorted) >= 10])
+    line_id = np.cumsum(line_start) - 1
+    order = y_order[np.lexsort((xs[y_order], line_id))]
+
+    # A chain of boxes spanning 10 or more in y (boxes a and c on different lines, both on
+    # the same line as b) is not a plain sort; such runs get the insertion pass itself. It
+    # never moves a box across a line boundary, so each run is handled on its own.
+    starts = np.flatnonzero(line_start)
+    ends = np.append(starts[1:], num_boxes)
+    for beg, end in zip(starts, ends):
+        if ys_sorted[end - 1] - ys_sorted[beg] < 10:
+            continue
+        run = y_order[beg:end].tolist()
+        for i in range(len(run) - 1):
+            for j in range(i, -1, -1):
+                cur, nxt = run[j], run[j + 1]
+                if abs(ys[nxt] - ys[cur]) < 10 and xs[nxt] < xs[cur]:
+                    run[j], run[j + 1] = nxt, cur
+                else:
+                    break
+        order[beg:end] = run
+    return list(dt_boxes[order])
+
+
+def __is_overlaps_y_exceeds_threshold(bbox1, bbox2, overlap_ratio_threshold=0.8):
+    """Check if two bounding boxes overlap on the y-axis, and if the height of the overlapping region exceeds 80% of the height of the shorter bounding box."""
+    _, y0_1, _, y1_1 = bbox1
+    _, y0_2, _, y1_2 = bbox2
+
+    overlap = max(0, min(y1_1, y1_2) - max(y0_1, y0_2))
+    height1, height2 = y1_1 - y0_1, y1_2 - y0_2
+    max_height = max(height1, height2)
+    min_height = min(height1, height2)
+
+    return (overlap / min_height) > overlap_ratio_threshold
+
+
+def bbox_to_points(bbox):
+    """ change bbox(shape: N * 4) to polygon(shape: N * 8) """
+    x0, y0, x1, y1 = bbox
+    return np.array([[x0, y0], [x1, y0], [x1, y1], [x0, y1]]).astype('float32')
+
+
+def points_to_bbox(points):
+    """ change polygon(shape: N * 8) to bbox(shape: N * 4) """
+    x0, y0 = points[0]
+    x1, _ = points[1]
+    _, y1 = points[2]
+    return [x0, y0, x1, y1]
+
+
+def merge_intervals(intervals):
+    # Sort the intervals based on the start value
+    intervals.sort(key=lambda x: x[0])
+
+    merged = []
+    for interval in intervals:
+        # If the list of merged intervals is empty or if the current
+        # interval does not overlap with the previous, simply append it.
+        if not merged or merged[-1][1] < interval[0]:
+            merged.append(interval)
+        else:
+            # Otherwise, there is overlap, so we merge the current and previous intervals.
+            merged[-1][1] = max(merged[-1][1], interval[1])
+
+    return merged
+
+
+def remove_intervals(original, masks):
+    # Merge all mask intervals
+    merged_masks = merge_intervals(masks)
+
+    result = []
+    original_start, original_end = original
+
+    for mask in merged_masks:
+        mask_start, mask_end = mask
+
+        # If the mask starts after the original range, ignore it
+        if mask_start > original_end:
+            continue
+
+        # If the mask ends before the original range starts, ignore it
+        if mask_end < original_start:
+            continue
+
+        # Remove the masked part from the original range
+        if original_start < mask_start:
+            result.append([original_start, mask_start - 1])
+
+        original_start = max(mask_end + 1, original_start)
+
+    # Add the remaining part of the original range, if any
+    if original_start <= original_end:
+        result.append([original_start, original_end])
+
+    return result
+
+
+def update_det_boxes(dt_boxes, mfd_res):
+    """
+    Split text boxes by the formula boxes on the same line.
+
+    A formula box masks a text box when they overlap on the y-axis by more than 80% of the
+    shorter height; the masked x-ranges are cut out of the text box. Formula boxes are
+    indexed by y0, so every text box only tests the formulas whose y-range can reach its
+    own, and the overlap test runs on all candidate pairs at once. Text boxes without a
+    mask are rebuilt in one pass; only masked boxes go through `remove_intervals`.
+
+    Parameters:
+    dt_boxes (list): text boxes, each defined by four corner points.
+    mfd_res (list): formula boxes, each a dict with 'bbox': [x0, y0, x1, y1].
+
+    Returns:
+    list: the split text boxes, each defined by four corner points.
+    """
+    num_boxes = len(dt_boxes)
+    if num_boxes == 0:
+        return []
+    boxes = np.asarray(dt_boxes)
+    tx0, ty0, tx1, ty1 = boxes[:, 0, 0], boxes[:, 0, 1], boxes[:, 1, 0], boxes[:, 2, 1]
+
+    masks_per_box = {}
+    if mfd_res:
+        mf_bboxes = np.array([mf_box['bbox'] for mf_box in mfd_res], dtype=np.float64).reshape(-1, 4)
+        mf_order = np.argsort(mf_bboxes[:, 1], kind='stable')
+        my0, my1 = mf_bboxes[mf_order, 1], mf_bboxes[mf_order, 3]
+        max_height = max(float((my1 - my0).max()), 0.0)
+
+        # Candidate formulas of a text box have ty0 - max_height < y0 <= ty1 (the bounds are
+        # loosened by one pixel, the exact overlap test below decides).
+        lo = np.searchsorted(my0, ty0.astype(np.float64) - max_height - 1, side='left')
+        hi = np.searchsorted(my0, ty1.astype(np.float64) + 1, side='right')
+        counts = np.maximum(hi - lo, 0)
+        starts = np.cumsum(counts) - counts
+        pair_text = np.repeat(np.arange(num_boxes), counts)
+        pair_mf = np.repeat(lo - starts, counts) + np.arange(counts.sum())
+
+        p_ty0, p_ty1 = ty0[pair_text].astype(np.float64), ty1[pair_text].astype(np.float64)
+        p_my0, p_my1 = my0[pair_mf], my1[pair_mf]
+        overlap = np.maximum(0, np.minimum(p_ty1, p_my1) - np.maximum(p_ty0, p_my0))
+        min_height = np.minimum(p_ty1 - p_ty0, p_my1 - p_my0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hit = overlap / min_height > 0.8
+        for text_idx, mf_idx in zip(pair_text[hit].tolist(), mf_order[pair_mf[hit]].tolist()):
+            masks_per_box.setdefault(text_idx, []).append(mf_idx)
+
+    # Boxes without masks keep their bbox, boxes with masks are split around the formulas
+    unmasked_points = np.stack([
+        np.stack([tx0, ty0], axis=1),
+        np.stack([tx1, ty0], axis=1),
+        np.stack([tx1, ty1], axis=1),
+        np.stack([tx0, ty1], axis=1),
+    ], axis=1).astype('float32')
+    keep = (tx0 <= tx1).tolist()
+
+    new_dt_boxes = []
+    for idx in range(num_boxes):
+        if idx not in masks_per_box:
+            if keep[idx]:
+                new_dt_boxes.append(unmasked_points[idx])
+            continue
+        text_bbox = points_to_bbox(dt_boxes[idx])
+        masks_list = []
+        for mf_idx in sorted(masks_per_box[idx]):
+            mf_bbox = mfd_res[mf_idx]['bbox']
+            masks_list.append([mf_bbox[0], mf_bbox[2]])
+        text_x_range = [text_bbox[0], text_bbox[2]]
+        for text_remove_mask in remove_intervals(text_x_range, masks_list):
+            new_dt_boxes.append(bbox_to_points([text_remove_mask[0], text_bbox[1], text_remove_mask[1], text_bbox[3]]))
+    return new_dt_boxes
+
+
+def merge_spans_to_line(spans):
+    """
+    Merge given spans into lines. Spans are considered based on their position in the document.
+    If spans overlap sufficiently on the Y-axis, they are merged into the same line; otherwise, a new line is started.
+
+    Parameters:
+    spans (list): A list of spans, where each span is a dictionary containing at least the key 'bbox',
+                  which itself is a list of four integers representing the bounding box:
+                  [x0, y0, x1, y1], where (x0, y0) is the top-left corner and (x1, y1) is the bottom-right corner.
+
+    Returns:
+    list: A list of lines, where each line is a list of spans.
+    """
+    # Return an empty list if the spans list is empty
+    if len(spans) == 0:
+        return []
+    else:
+        # Sort spans by the Y0 coordinate
+        spans.sort(key=lambda span: span['bbox'][1])
+
+        lines = []
+        current_line = [spans[0]]
+        for span in spans[1:]:
+            # If the current span overlaps with the last span in the current line on the Y-axis, add it to the current line
+            if __is_overlaps_y_exceeds_threshold(span['bbox'], current_line[-1]['bbox']):
+                current_line.append(span)
+            else:
+                # Otherwise, start a new line
+                lines.append(current_line)
+                current_line = [span]
+
+        # Add the last line if it exists
+        if current_line:
+            lines.append(current_line)
+
+        return lines
+
+
+def merge_overlapping_spans(spans):
+    """
+    Merges overlapping spans on the same line.
+
+    :param spans: A list of span coordinates [(x1, y1, x2, y2), ...]
+    :return: A list of merged spans
+    """
+    # Return an empty list if the input spans list is empty
+    if not spans:
+        return []
+
+    # Sort spans by their starting x-coordinate
+    spans.sort(key=lambda x: x[0])
+
+    # Initialize the list of merged spans
+    merged = []
+    for span in spans:
+        # Unpack span coordinates
+        x1, y1, x2, y2 = span
+        # If the merged list is empty or there's no horizontal overlap, add the span directly
+        if not merged or merged[-1][2] < x1:
+            merged.append(span)
+        else:
+            # If there is horizontal overlap, merge the current span with the previous one
+            last_span = merged.pop()
+            # Update the merged span's top-left corner to the smaller (x1, y1) and bottom-right to the larger (x2, y2)
+            x1 = min(last_span[0], x1)
+            y1 = min(last_span[1], y1)
+            x2 = max(last_span[2], x2)
+            y2 = max(last_span[3], y2)
+            # Add the merged span back to the list
+            merged.append((x1, y1, x2, y2))
+
+    # Return the list of merged spans
+    return merged
+
+
+def merge_det_boxes(dt_boxes):
+    """
+    Merge detection boxes.
+
+    This function takes a list of detected bounding boxes, each represented by four corner points.
+    The goal is to merge these bounding boxes into larger text regions.
+
+    It gives the same result as grouping the boxes into lines with `merge_spans_to_line`
+    and merging each line with `merge_overlapping_spans`, computed on arrays: a box starts
+    a new line when it does not overlap the previous box (in y0 order) on the y-axis, and
+    a new region when its x0 is right of every box before it (in x0 order) on its line.
+    Boxes are expected to have x1 >= x0, which holds for detector output.
+
+    Parameters:
+    dt_boxes (list): A list containing multiple text detection boxes, where each box is defined by four corner points.
+
+    Returns:
+    list: A list containing the merged text regions, where each region is represented by four corner points.
+    """
+    num_boxes = len(dt_boxes)
+    if num_boxes == 0:
+        return []
+    boxes = np.asarray(dt_boxes)
+
+    # points_to_bbox on every box, sorted by y0
+    order = np.argsort(boxes[:, 0, 1], kind='stable')
+    x0, y0 = boxes[order, 0, 0], boxes[order, 0, 1]
+    x1, y1 = boxes[order, 1, 0], boxes[order, 2, 1]
+
+    # Merge adjacent text regions into lines
+    overlap = np.maximum(0, np.minimum(y1[1:], y1[:-1]) - np.maximum(y0[1:], y0[:-1]))
+    min_height = np.minimum(y1[1:] - y0[1:], y1[:-1] - y0[:-1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        same_line = overlap / min_height > 0.8
+    line_id = np.concatenate([[0], np.cumsum(~same_line)])
+
+    # Sort each line left to right (stable, as list.sort)
+    order = np.lexsort((x0, line_id))
+    x0, y0, x1, y1, line_id = x0[order], y0[order], x1[order], y1[order], line_id[order]
+
+    # Merge overlapping text regions within the same line. A running max of x1 per line is
+    # taken over value ranks shifted by line, so one accumulate never crosses a line.
+    ranks = np.unique(np.concatenate([x0, x1]), return_inverse=True)[1].reshape(-1)
+    shift = line_id * (2 * num_boxes)
+    run_max_x1 = np.maximum.accumulate(ranks[num_boxes:] + shift)
+    new_region = np.ones(num_boxes, dtype=bool)
+    new_region[1:] = (line_id[1:] != line_id[:-1]) | (run_max_x1[:-1] < ranks[1:num_boxes] + shift[1:])
+    starts = np.flatnonzero(new_region)
+    mx0 = np.minimum.reduceat(x0, starts)
+    my0 = np.minimum.reduceat(y0, starts)
+    mx1 = np.maximum.reduceat(x1, starts)
+    my1 = np.maximum.reduceat(y1, starts)
+
+    # Convert the merged text regions back to point format
+    points = np.stack([
+        np.stack([mx0, my0], axis=1),
+        np.stack([mx1, my0], axis=1),
+        np.stack([mx1, my1], axis=1),
+        np.stack([mx0, my1], axis=1),
+    ], axis=1).astype('float32')
+    return list(points)
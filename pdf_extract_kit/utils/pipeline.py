@@ -0,0 +1,224 @@
+import time
+import queue
+import threading
+
+
+_SENTINEL = object()
+
+
+class Stage:
+    """One step of a `Pipeline`.
+
+    Args:
+        name (str): Stage name used in the utilization report.
+        fn (callable): Function applied to every item, its return value is passed to the next stage.
+        num_workers (int): Worker threads for this stage. Only use more than one worker when `fn`
+            is thread-safe (e.g. pure Python post-processing); model stages should keep one worker.
+    """
+
+    def __init__(self, name, fn, num_workers=1):
+        if num_workers < 1:
+            raise ValueError(f"Stage {name} needs at least one worker, got {num_workers}")
+        self.name = name
+        self.fn = fn
+        self.num_workers = num_workers
+        self.items = 0
+        self.busy_time = 0.0
+        self._lock = threading.Lock()
+        self._finished_workers = 0
+
+    def _record(self, elapsed, items=1):
+        with self._lock:
+            self.items += items
+            self.busy_time += elapsed
+
+    def _worker_done(self):
+        """Returns True for the last worker of the stage to finish."""
+        with self._lock:
+            self._finished_workers += 1
+            return self._finished_workers == self.num_workers
+
+    def reset(self):
+        self.items = 0
+        self.busy_time = 0.0
+        self._finished_workers = 0
+
+
+class BatchStage(Stage):
+    """A `Stage` that processes its items in groups.
+
+    Items are collected until `full(items)` returns True or the input ends, then `fn` is called once
+    with the list of collected items and must return one result per item, in the same order. Use it to
+    batch model inference over several items while the other stages keep streaming; the items held
+    back delay the next stage, so `full` bounds both the batch and that delay.
+
+    Args:
+        name (str): Stage name used in the utilization report.
+        fn (callable): Function applied to a list of items, returns the list of results.
+        full (callable): Called with the pending items after each new one, True flushes them.
+        num_workers (int): Worker threads, each collects its own batches.
+    """
+
+    def __init__(self, name, fn, full, num_workers=1):
+        super().__init__(name, fn, num_workers)
+        self.full = full
+
+
+class Pipeline:
+    """Run items through a sequence of stages, each in its own worker threads, connected by bounded queues.
+
+    Items flow as soon as a stage finishes them, so stage k of item N+1 overlaps stage k+1 of item N.
+    Bounded queues provide back-pressure: a fast producer (e.g. page rasterization) cannot run more than
+    `queue_size` items ahead of the stage consuming it, which keeps memory flat on long documents.
+    Model inference (torch / paddle) releases the GIL, so threads are enough to overlap stages.
+
+    Args:
+        stages (List[Stage]): Stages in execution order.
+        queue_size (int): Capacity of the queue in front of every stage.
+
+    Example:
+        pipeline = Pipeline([Stage('load', load_page), Stage('detect', detect), Stage('ocr', ocr)], queue_size=2)
+        results = pipeline.run(range(num_pages))
+        print(pipeline.report())
+    """
+
+    def __init__(self, stages, queue_size=2):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.wall_time = 0.0
+        self._error = None
+        self._error_lock = threading.Lock()
+
+    def _set_error(self, exc):
+        with self._error_lock:
+            if self._error is None:
+                self._error = exc
+
+    def _feed(self, items, out_queue):
+        try:
+            for idx, item in enumerate(items):
+                if self._error is not None:
+                    break
+                out_queue.put((idx, item))
+        except Exception as e:
+            self._set_error(e)
+        finally:
+            out_queue.put(_SENTINEL)
+
+    def _run_tasks(self, stage, tasks, out_queue):
+        start = time.perf_counter()
+        try:
+            if isinstance(stage, BatchStage):
+                results = stage.fn([item for _, item in tasks])
+                if len(results) != len(tasks):
+                    raise ValueError(f"Stage {stage.name} returned {len(results)} results for {len(tasks)} items")
+            else:
+                results = [stage.fn(tasks[0][1])]
+        except Exception as e:
+            self._set_error(e)
+            return
+        finally:
+            stage._record(time.perf_counter() - start, len(tasks))
+        for (idx, _), result in zip(tasks, results):
+            out_queue.put((idx, result))
+
+    def _work(self, stage, in_queue, out_queue):
+        pending = []
+        while True:
+            task = in_queue.get()
+            if task is _SENTINEL:
+                if pending and self._error is None:
+                    self._run_tasks(stage, pending, out_queue)
+                if stage._worker_done():
+                    out_queue.put(_SENTINEL)
+                else:
+                    # let the sibling workers see the end of the stream too
+                    in_queue.put(_SENTINEL)
+                return
+            if self._error is not None:
+                # keep draining so upstream stages never block on a full queue
+                pending = []
+                continue
+            if isinstance(stage, BatchStage):
+                pending.append(task)
+                if stage.full([item for _, item in pending]):
+                    self._run_tasks(stage, pending, out_queue)
+                    pending = []
+                continue
+            self._run_tasks(stage, [task], out_queue)
+
+    def run(self, items):
+        """Process `items` through all stages.
+
+        Args:
+            items (Iterable): Inputs of the first stage, consumed lazily.
+
+        Returns:
+            list: Outputs of the last stage, in input order.
+
+        Raises:
+            Exception: The first exception raised by any stage (or by iterating `items`).
+        """
+        self._error = None
+        for stage in self.stages:
+            stage.reset()
+
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        # the main thread collects the output, no need to bound it
+        queues.append(queue.Queue())
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0]), daemon=True)]
+        for i, stage in enumerate(self.stages):
+            for _ in range(stage.num_workers):
+                threads.append(threading.Thread(target=self._work, args=(stage, queues[i], queues[i + 1]), daemon=True))
+        for t in threads:
+            t.start()
+
+        results = {}
+        while True:
+            task = queues[-1].get()
+            if task is _SENTINEL:
+                break
+            idx, result = task
+            results[idx] = result
+        for t in threads:
+            t.join()
+        self.wall_time = time.perf_counter() - start
+
+        if self._error is not None:
+            raise self._error
+        return [results[idx] for idx in sorted(results)]
+
+    def stats(self):
+        """Per-stage statistics of the last `run`.
+
+        Returns:
+            List[dict]: name, workers, items, busy_time (s), utilization (busy time over wall time per worker).
+        """
+        stats = []
+        for stage in self.stages:
+            capacity = self.wall_time * stage.num_workers
+            stats.append({
+                'name': stage.name,
+                'workers': stage.num_workers,
+                'items': stage.items,
+                'busy_time': round(stage.busy_time, 3),
+                'utilization': round(stage.busy_time / capacity, 3) if capacity > 0 else 0.0,
+            })
+        return stats
+
+    def report(self):
+        """Human readable utilization table, the busiest stage is marked as the bottleneck."""
+        stats = self.stats()
+        bottleneck = max(stats, key=lambda s: s['utilization'])['name']
+        lines = [f"pipeline wall time: {self.wall_time:.2f}s",
+                 f"{'stage':<12} {'workers':>7} {'items':>6} {'busy(s)':>9} {'ms/item':>9} {'util':>7}"]
+        for s in stats:
+            per_item = s['busy_time'] / s['items'] * 1000 if s['items'] else 0.0
+            mark = '  <- bottleneck' if s['name'] == bottleneck else ''
+            lines.append(f"{s['name']:<12} {s['workers']:>7} {s['items']:>6} {s['busy_time']:>9.2f} "
+                         f"{per_item:>9.1f} {s['utilization'] * 100:>6.1f}%{mark}")
+        return "\n".join(lines)
@@ -0,0 +1,287 @@
+import os
+import json
+import time
+import uuid
+import socket
+
+from pdf_extract_kit.utils.batch import atomic_write_json, atomic_write_text
+
+
+class LeaseLost(Exception):
+    """The lease of a shard expired and was claimed by another worker."""
+
+
+class Lease:
+    """Exclusive, expiring claim of one shard by one worker, see `ShardQueue.claim`."""
+
+    def __init__(self, queue, shard_id, worker_id, token, expires_at):
+        self.queue = queue
+        self.shard_id = shard_id
+        self.worker_id = worker_id
+        self.token = token
+        self.expires_at = expires_at
+
+    @property
+    def path(self):
+        return self.queue._lease_path(self.shard_id)
+
+    def documents(self):
+        return self.queue.shard_documents(self.shard_id)
+
+    def renew(self):
+        """Extend the lease, call it well within `lease_seconds` while the shard is processed.
+
+        The lease file is moved away, checked to still be ours, rewritten and linked back, so a
+        lease that was taken over in the meantime is never overwritten.
+
+        Raises:
+            LeaseLost: the lease expired and another worker claimed the shard.
+        """
+        taken_path = self.queue._take_lease(self.shard_id, lambda lease: lease.get('token') == self.token)
+        if taken_path is None:
+            current = self.queue._read_lease(self.shard_id)
+            raise LeaseLost(f"lease of {self.shard_id} was taken over by {current and current.get('worker')}")
+        expires_at = time.time() + self.queue.lease_seconds
+        try:
+            atomic_write_json(taken_path, self.queue._lease_info(self.worker_id, self.token, expires_at))
+            os.link(taken_path, self.path)
+        except FileExistsError:
+            raise LeaseLost(f"lease of {self.shard_id} was claimed by another worker while it was renewed")
+        finally:
+            os.remove(taken_path)
+        self.expires_at = expires_at
+
+    def complete(self, records):
+        """Write the shard results and mark the shard done.
+
+        Args:
+            records (List[dict]): one JSON-serializable record per document, merged by `ShardQueue.merge`.
+        """
+        lines = [json.dumps(record, ensure_ascii=False) for record in records]
+        atomic_write_text(self.queue._result_path(self.shard_id), "".join(line + "\n" for line in lines))
+        atomic_write_json(self.queue._done_path(self.shard_id), {'worker': self.worker_id, 'finished_at': time.time()})
+        self.release()
+
+    def release(self):
+        """Give the shard back without completing it (e.g. on shutdown)."""
+        taken_path = self.queue._take_lease(self.shard_id, lambda lease: lease.get('token') == self.token)
+        if taken_path is not None:
+            os.remove(taken_path)
+
+
+class ShardQueue:
+    """Work queue of document shards on a shared file system (e.g. NFS), without a server.
+
+    Layout of `root`::
+
+        shards/<shard>.json    list of document paths, written once by `create`
+        leases/<shard>.lease   held by the worker processing the shard, with an expiry time
+        results/<shard>.jsonl  one record per document, written when the shard completes
+        done/<shard>.json      completion marker
+
+    A lease is created with `O_CREAT | O_EXCL`, which is atomic on local file systems and NFSv3+,
+    so only one worker can claim a shard. Workers renew their lease while processing; a lease that
+    is not renewed before it expires (dead or partitioned worker) is taken over by renaming it away.
+    Renaming is the only compare-and-swap a shared file system offers: only one worker can move a
+    given lease file, and the moved file is checked to be the one that was seen expired (a lease
+    renewed in the meantime is linked back). Processing is therefore at-least-once: a worker that
+    lost its lease may still finish the shard, results are written atomically so the last writer
+    wins with a complete file. Expiry compares wall clocks of different nodes, keep them in sync (NTP).
+
+    Args:
+        root (str): Queue directory on the shared file system.
+        lease_seconds (float): Lease duration without renewal.
+
+    Example:
+        queue = ShardQueue('/nfs/jobs/run1')
+        queue.create(pdf_paths, shard_size=50)          # once, on any node
+        while (lease := queue.claim()) is not None:    # on every worker
+            records = [process(path) for path in lease.documents()]
+            lease.complete(records)
+        queue.merge('/nfs/jobs/run1/results.jsonl')     # once, when all shards are done
+    """
+
+    def __init__(self, root, lease_seconds=600):
+        self.root = root
+        self.lease_seconds = lease_seconds
+        for sub in ['shards', 'leases', 'results', 'done']:
+            os.makedirs(os.path.join(root, sub), exist_ok=True)
+
+    def _shard_path(self, shard_id):
+        return os.path.join(self.root, 'shards', f"{shard_id}.json")
+
+    def _lease_path(self, shard_id):
+        return os.path.join(self.root, 'leases', f"{shard_id}.lease")
+
+    def _result_path(self, shard_id):
+        return os.path.join(self.root, 'results', f"{shard_id}.jsonl")
+
+    def _done_path(self, shard_id):
+        return os.path.join(self.root, 'done', f"{shard_id}.json")
+
+    @staticmethod
+    def default_worker_id():
+        return f"{socket.gethostname()}-{os.getpid()}"
+
+    @staticmethod
+    def _lease_info(worker_id, token, expires_at):
+        return {'worker': worker_id, 'token': token, 'expires_at': expires_at}
+
+    def _read_lease_file(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            # being written by its creator right now, or left incomplete by a creator that died:
+            # held until lease_seconds after the last write
+            try:
+                return {'worker': None, 'token': None, 'expires_at': os.path.getmtime(path) + self.lease_seconds}
+            except FileNotFoundError:
+                return None
+
+    def _read_lease(self, shard_id):
+        return self._read_lease_file(self._lease_path(shard_id))
+
+    def _take_lease(self, shard_id, matches):
+        """Move the lease file of `shard_id` away if its content satisfies `matches`.
+
+        Only one worker can rename a given file. The moved lease is checked afterwards and linked
+        back if it does not match, i.e. it changed since the caller read it. If a new lease was
+        created in the short window where none existed, the moved one is dropped and its owner
+        gets `LeaseLost` on the next renewal.
+
+        Returns:
+            str or None: path of the moved lease, to be removed by the caller; None if there was no
+                lease or it did not match.
+        """
+        path = self._lease_path(shard_id)
+        taken_path = f"{path}.taken.{uuid.uuid4().hex}"
+        try:
+            os.rename(path, taken_path)
+        except FileNotFoundError:
+            return None
+        lease = self._read_lease_file(taken_path)
+        if lease is not None and matches(lease):
+            return taken_path
+        try:
+            os.link(taken_path, path)
+        except FileExistsError:
+            pass
+        os.remove(taken_path)
+        return None
+
+    def create(self, paths, shard_size=100):
+        """Split `paths` into shards. Existing shards are kept, so calling it again on restart is a no-op.
+
+        Returns:
+            int: number of shards written by this call.
+        """
+        created = 0
+        for start in range(0, len(paths), shard_size):
+            shard_id = f"shard_{start // shard_size:06d}"
+            shard_path = self._shard_path(shard_id)
+            if os.path.exists(shard_path):
+                continue
+            atomic_write_json(shard_path, list(paths[start:start + shard_size]))
+            created += 1
+        return created
+
+    def shard_ids(self):
+        return sorted(fname[:-len('.json')] for fname in os.listdir(os.path.join(self.root, 'shards'))
+                      if fname.endswith('.json'))
+
+    def shard_documents(self, shard_id):
+        with open(self._shard_path(shard_id), encoding='utf-8') as f:
+            return json.load(f)
+
+    def is_done(self, shard_id):
+        return os.path.exists(self._done_path(shard_id))
+
+    def _try_create_lease(self, shard_id, worker_id):
+        token = uuid.uuid4().hex
+        expires_at = time.time() + self.lease_seconds
+        try:
+            fd = os.open(self._lease_path(shard_id), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            return None
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self._lease_info(worker_id, token, expires_at), f)
+            f.flush()
+            os.fsync(f.fileno())
+        return Lease(self, shard_id, worker_id, token, expires_at)
+
+    def _break_expired_lease(self, shard_id):
+        lease = self._read_lease(shard_id)
+        if lease is None:
+            return True
+        if lease.get('expires_at', 0) > time.time():
+            return False
+        # another worker may have broken it and claimed the shard, or the owner renewed it, since it
+        # was read: only remove the lease if it is still the expired one
+        taken_path = self._take_lease(shard_id, lambda current: current == lease)
+        if taken_path is None:
+            return False
+        os.remove(taken_path)
+        return True
+
+    def claim(self, worker_id=None):
+        """Claim the first shard that is neither done nor held by a live lease.
+
+        Returns:
+            Lease or None: None when every shard is done or leased.
+        """
+        worker_id = worker_id or self.default_worker_id()
+        for shard_id in self.shard_ids():
+            if self.is_done(shard_id):
+                continue
+            lease = self._try_create_lease(shard_id, worker_id)
+            if lease is None and self._break_expired_lease(shard_id):
+                lease = self._try_create_lease(shard_id, worker_id)
+            if lease is None:
+                continue
+            if self.is_done(shard_id):
+                # completed between the check and the claim
+                lease.release()
+                continue
+            return lease
+        return None
+
+    def status(self):
+        """Counts of shards by state: total, done, leased (live lease), expired (lease past expiry), pending."""
+        counts = {'total': 0, 'done': 0, 'leased': 0, 'expired': 0, 'pending': 0}
+        now = time.time()
+        for shard_id in self.shard_ids():
+            counts['total'] += 1
+            if self.is_done(shard_id):
+                counts['done'] += 1
+                continue
+            lease = self._read_lease(shard_id)
+            if lease is None:
+                counts['pending'] += 1
+            elif lease.get('expires_at', 0) > now:
+                counts['leased'] += 1
+            else:
+                counts['expired'] += 1
+        return counts
+
+    def merge(self, output_path):
+        """Concatenate the per-shard result files in shard order into one JSONL file.
+
+        Returns:
+            int: number of records written.
+
+        Raises:
+            RuntimeError: some shards are not done yet.
+        """
+        shard_ids = self.shard_ids()
+        missing = [shard_id for shard_id in shard_ids if not self.is_done(shard_id)]
+        if missing:
+            raise RuntimeError(f"{len(missing)} shards are not done yet, e.g. {missing[0]}")
+        lines = []
+        for shard_id in shard_ids:
+            with open(self._result_path(shard_id), encoding='utf-8') as f:
+                lines.extend(line for line in f if line.strip())
+        atomic_write_text(output_path, "".join(lines))
+        return len(lines)
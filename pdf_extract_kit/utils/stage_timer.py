@@ -0,0 +1,89 @@
+"""Opt-in per-request stage timings.
+
+A `StageTimer` is activated for the current context (an API request, a script run). Code at any depth
+wraps its work in `timed(name)`. With no active timer, that costs one context variable lookup and
+returns a shared no-op context manager, so library code (e.g. `load_pdf`) can be instrumented
+unconditionally.
+
+Stage times are exclusive: time spent in a nested stage is not counted again in the enclosing one,
+so the stages add up to (at most) the total.
+
+Example:
+    timer = StageTimer().activate()
+    with timed('rasterization'):
+        images = load_pdf(path)
+    timer.count('pages', len(images))
+    timer.deactivate()
+    timer.as_dict()  # {'total_ms': ..., 'stages_ms': {'rasterization': ...}, 'counts': {'pages': 3}}
+"""
+import time
+import contextlib
+import contextvars
+
+
+_current = contextvars.ContextVar('stage_timer', default=None)
+_null = contextlib.nullcontext()
+
+
+class StageTimer:
+    """Exclusive wall time per stage name and counters of one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = {}
+        self.counts = {}
+        self._children = []  # time of nested stages, one accumulator per open stage
+        self._token = None
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time the block as `name`. Stages with the same name accumulate."""
+        start = time.perf_counter()
+        self._children.append(0.0)
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._children.pop()
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed - nested
+            if self._children:
+                self._children[-1] += elapsed
+
+    def count(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + int(n)
+
+    def activate(self):
+        """Make this the timer of the current context. Returns self."""
+        self._token = _current.set(self)
+        return self
+
+    def deactivate(self):
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+
+    def as_dict(self):
+        """Milliseconds per stage (in the order the stages first ran), total and counts."""
+        return {
+            'total_ms': round((time.perf_counter() - self.start) * 1000, 3),
+            'stages_ms': {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            'counts': dict(self.counts),
+        }
+
+
+def current_timer():
+    """The active timer of this context, or None."""
+    return _current.get()
+
+
+def timed(name):
+    """Context manager timing the block as stage `name` if a timer is active, a no-op otherwise."""
+    timer = _current.get()
+    return _null if timer is None else timer.stage(name)
+
+
+def count(name, n=1):
+    """Add `n` to counter `name` of the active timer, if any."""
+    timer = _current.get()
+    if timer is not None:
+        timer.count(name, n)
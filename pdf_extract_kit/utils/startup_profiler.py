@@ -0,0 +1,342 @@
+"""Startup profiler: import time per module, model construction, weight loading and first inference.
+
+Enabled with the `PROFILE_STARTUP` environment variable (report path prefix) or `--profile-startup` on
+`main.py`. Only the standard library is imported here so that the import hook can be installed before
+anything else.
+
+Report files (`<prefix>.json` and `<prefix>.txt`) are rewritten whenever a new kind of event is seen
+(first construction of a model, first inference, ...) and when `write_report` is called, so they can be
+diffed between releases.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import threading
+import functools
+import contextlib
+import contextvars
+import importlib.abc
+
+
+PROFILE_ENV = 'PROFILE_STARTUP'
+DEFAULT_REPORT_PREFIX = 'outputs/startup_profile'
+
+# functions that load weights from disk, patched (when their module is imported) during model construction
+WEIGHT_LOADERS = [
+    ('torch', 'load'),
+    ('torch.jit', 'load'),
+    ('safetensors.torch', 'load_file'),
+    ('paddle.inference', 'create_predictor'),
+    ('onnxruntime', 'InferenceSession'),
+]
+# model methods whose first call is recorded as first inference
+INFERENCE_METHODS = ['predict', 'ocr', 'ocr_batch']
+
+_profiler = None
+# model under construction in the current context, weight loads are attributed to it
+_constructing_model = contextvars.ContextVar('constructing_model', default=None)
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps the loader of a module spec and times `exec_module`."""
+
+    def __init__(self, loader, profiler):
+        self.loader = loader
+        self.profiler = profiler
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.profiler._import_started(module.__name__)
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.profiler._import_finished(module.__name__)
+
+    def __getattr__(self, name):
+        # get_data, get_filename, is_package, ... used by importlib.resources and friends
+        return getattr(self.loader, name)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, 'busy', False):
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.busy = False
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, self.profiler)
+        return spec
+
+
+class StartupProfiler:
+    """Collects startup timings, see the module docstring.
+
+    Args:
+        report_prefix (str): Reports are written to `<report_prefix>.json` and `<report_prefix>.txt`.
+    """
+
+    def __init__(self, report_prefix=DEFAULT_REPORT_PREFIX):
+        self.report_prefix = report_prefix
+        self.start_time = time.perf_counter()
+        self.started_at = time.time()
+        self.ready_time = None
+        self.imports = {}
+        self.events = {}
+        self._lock = threading.Lock()
+        self._import_stack = threading.local()
+        self._finder = None
+        # timed weight loaders, shared by concurrent model constructions
+        self._loaders_lock = threading.Lock()
+        self._loaders_users = 0
+        self._patched_loaders = {}
+
+    # ---- imports ----
+    def install_import_hook(self):
+        if self._finder is None:
+            self._finder = _ImportTimer(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def remove_import_hook(self):
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    def _import_started(self, name):
+        stack = self._import_stack.__dict__.setdefault('frames', [])
+        stack.append([name, time.perf_counter(), 0.0])
+
+    def _import_finished(self, name):
+        stack = self._import_stack.frames
+        _, start, children = stack.pop()
+        cumulative = time.perf_counter() - start
+        if stack:
+            stack[-1][2] += cumulative
+        with self._lock:
+            self.imports[name] = {'module': name, 'self': cumulative - children, 'cumulative': cumulative}
+
+    # ---- events ----
+    def record(self, category, name, seconds, **info):
+        """Record a timed event. A report is written the first time a (category, name) pair is seen."""
+        with self._lock:
+            entries = self.events.setdefault(category, {})
+            is_new = name not in entries
+            entry = entries.setdefault(name, {'name': name, 'count': 0, 'first': seconds, 'total': 0.0,
+                                              'at': time.perf_counter() - self.start_time})
+            entry['count'] += 1
+            entry['total'] += seconds
+            if info and 'info' not in entry:
+                entry['info'] = info
+        if is_new:
+            self.write_report()
+
+    @contextlib.contextmanager
+    def span(self, category, name, **info):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, name, time.perf_counter() - start, **info)
+
+    @contextlib.contextmanager
+    def model_construction(self, model_name):
+        """Time the construction of a model, including the weight loaders called meanwhile."""
+        with self._patch_weight_loaders(model_name), self.span('model_construction', model_name):
+            yield
+
+    @contextlib.contextmanager
+    def _patch_weight_loaders(self, model_name):
+        """Time the weight loaders while `model_name` is built.
+
+        Module attributes are process-wide, so the wrappers are installed by the first of overlapping
+        constructions (in any thread) and removed by the last one; each load is attributed to the model
+        built in the calling context.
+        """
+        with self._loaders_lock:
+            # loaders imported since the wrappers were installed are patched too
+            self._install_weight_loaders()
+            self._loaders_users += 1
+        token = _constructing_model.set(model_name)
+        try:
+            yield
+        finally:
+            _constructing_model.reset(token)
+            with self._loaders_lock:
+                self._loaders_users -= 1
+                if self._loaders_users == 0:
+                    self._remove_weight_loaders()
+
+    def _install_weight_loaders(self):
+        for module_name, attr in WEIGHT_LOADERS:
+            module = sys.modules.get(module_name)
+            original = getattr(module, attr, None) if module is not None else None
+            if original is None or (module_name, attr) in self._patched_loaders:
+                continue
+            wrapper = self._timed_loader(original, f"{module_name}.{attr}")
+            setattr(module, attr, wrapper)
+            self._patched_loaders[(module_name, attr)] = (module, original, wrapper)
+
+    def _remove_weight_loaders(self):
+        for (_, attr), (module, original, wrapper) in self._patched_loaders.items():
+            # leave it alone if something else replaced the wrapper meanwhile
+            if getattr(module, attr, None) is wrapper:
+                setattr(module, attr, original)
+        self._patched_loaders = {}
+
+    def _timed_loader(self, fn, loader_name):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            model_name = _constructing_model.get()
+            if model_name is None:
+                # called outside a model construction, e.g. by another thread meanwhile
+                return fn(*args, **kwargs)
+            source = args[0] if args and isinstance(args[0], (str, os.PathLike)) else None
+            with self.span('weight_load', f"{model_name}:{loader_name}", path=str(source) if source else None):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def watch_first_inference(self, model, model_name):
+        """Time the first call of the model's inference methods, then restore them."""
+        wrapped = [m for m in INFERENCE_METHODS if callable(getattr(model, m, None))]
+
+        def restore():
+            for method in wrapped:
+                model.__dict__.pop(method, None)
+
+        def make_wrapper(method_name, method):
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                restore()
+                with self.span('first_inference', f"{model_name}.{method_name}"):
+                    return method(*args, **kwargs)
+            return wrapper
+
+        for method_name in wrapped:
+            setattr(model, method_name, make_wrapper(method_name, getattr(model, method_name)))
+
+    def mark_ready(self):
+        """Mark the application as ready to serve (e.g. from the startup event) and write the report."""
+        if self.ready_time is None:
+            self.ready_time = time.perf_counter() - self.start_time
+        self.write_report()
+
+    # ---- report ----
+    def report(self):
+        with self._lock:
+            imports = sorted(self.imports.values(), key=lambda x: x['cumulative'], reverse=True)
+            events = {category: sorted(entries.values(), key=lambda x: x['total'], reverse=True)
+                      for category, entries in self.events.items()}
+        return {
+            'started_at': self.started_at,
+            'ready_after': self.ready_time,
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'num_imports': len(imports),
+            'import_time_total': sum(x['self'] for x in imports),
+            'imports': [dict(x, self=round(x['self'], 6), cumulative=round(x['cumulative'], 6)) for x in imports],
+            'events': {category: [dict(x, first=round(x['first'], 6), total=round(x['total'], 6), at=round(x['at'], 3))
+                                  for x in entries]
+                       for category, entries in events.items()},
+        }
+
+    def text_report(self, top=30):
+        report = self.report()
+        ready = f"{report['ready_after']:.3f}s" if report['ready_after'] is not None else 'n/a'
+        lines = [f"ready after: {ready}, imports: {report['num_imports']} modules, "
+                 f"{report['import_time_total']:.3f}s",
+                 "",
+                 f"top {top} imports by cumulative time",
+                 f"{'cumulative(s)':>13} {'self(s)':>9}  module"]
+        for x in report['imports'][:top]:
+            lines.append(f"{x['cumulative']:>13.3f} {x['self']:>9.3f}  {x['module']}")
+        lines += ["", f"top {top} imports by self time", f"{'self(s)':>13}  module"]
+        for x in sorted(report['imports'], key=lambda x: x['self'], reverse=True)[:top]:
+            lines.append(f"{x['self']:>13.3f}  {x['module']}")
+        for category, entries in report['events'].items():
+            lines += ["", category, f"{'first(s)':>13} {'total(s)':>9} {'count':>6}  name"]
+            for x in entries:
+                lines.append(f"{x['first']:>13.3f} {x['total']:>9.3f} {x['count']:>6}  {x['name']}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.report_prefix)), exist_ok=True)
+        with open(f"{self.report_prefix}.json", 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        with open(f"{self.report_prefix}.txt", 'w', encoding='utf-8') as f:
+            f.write(self.text_report())
+
+
+def get_profiler():
+    """The active profiler, or None when startup profiling is disabled."""
+    return _profiler
+
+
+def start_profiler(report_prefix=DEFAULT_REPORT_PREFIX):
+    """Start profiling (idempotent) and install the import hook."""
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler(report_prefix)
+        _profiler.install_import_hook()
+    return _profiler
+
+
+def maybe_start_profiler(argv=None):
+    """Start the profiler if `--profile-startup[=PREFIX]` is in `argv` or `PROFILE_STARTUP` is set.
+
+    The flag is exported to the environment so that processes started by uvicorn (reload, workers)
+    profile their startup too.
+    """
+    argv = sys.argv if argv is None else argv
+    for arg in argv:
+        if arg == '--profile-startup' or arg.startswith('--profile-startup='):
+            prefix = arg.split('=', 1)[1] if '=' in arg else DEFAULT_REPORT_PREFIX
+            os.environ.setdefault(PROFILE_ENV, prefix)
+    prefix = os.environ.get(PROFILE_ENV)
+    if not prefix:
+        return None
+    if prefix.lower() in ('1', 'true', 'yes'):
+        prefix = DEFAULT_REPORT_PREFIX
+    return start_profiler(prefix)
+
+
+@contextlib.contextmanager
+def profile_model_construction(model_name):
+    """No-op unless the profiler is active."""
+    if _profiler is None:
+        yield
+    else:
+        with _profiler.model_construction(model_name):
+            yield
+
+
+@contextlib.contextmanager
+def profile_span(category, name):
+    """No-op unless the profiler is active."""
+    if _profiler is None:
+        yield
+    else:
+        with _profiler.span(category, name):
+            yield
+
+
+def watch_first_inference(model, model_name):
+    """No-op unless the profiler is active."""
+    if _profiler is not None:
+        _profiler.watch_first_inference(model, model_name)
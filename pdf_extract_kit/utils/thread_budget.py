@@ -0,0 +1,211 @@
+"""Central thread budget for torch, PaddlePaddle, OpenCV and the BLAS / OpenMP runtimes.
+
+Every library sizes its thread pools to all cores by default, so a process that hosts YOLO and
+UniMERNet (torch), PaddleOCR and OpenCV, or several such processes on one machine, runs many more
+threads than cores. A `ThreadBudget` gives one pipeline (a process, or a thread group inside one) a
+share of the cores and applies it to all libraries consistently:
+
+- `OMP_NUM_THREADS`, `MKL_NUM_THREADS`, `OPENBLAS_NUM_THREADS`, ... (read when the runtimes are loaded,
+  so apply the budget before importing numpy / torch / paddle where possible)
+- torch intra-op and inter-op threads
+- `cv2.setNumThreads`
+- PaddleOCR `cpu_threads` / `enable_mkldnn` (see `paddle_config`, applied at model construction)
+- optionally the CPU affinity of the process (`pin_cores`), so that pipelines do not share cores
+
+Config (`threads` in the pdf2markdown config; the `THREAD_BUDGET_<KEY>` environment variables override
+single keys and configure the API server)::
+
+    threads:
+      cores: 16              # cores of the deployment, default: all cores available to the process
+      pipelines: 2           # concurrent pipelines sharing them
+      pipeline_index: 0      # which share this process gets, needed for pin_cores
+      interop_threads: 1
+      opencv_threads: 1      # default: the share of the pipeline
+      paddle_mkldnn: True
+      pin_cores: False
+"""
+import os
+import sys
+import threading
+
+
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'NUMEXPR_NUM_THREADS',
+                   'VECLIB_MAXIMUM_THREADS')
+ENV_PREFIX = 'THREAD_BUDGET_'
+
+_budget = None
+_lock = threading.Lock()
+
+
+def available_cores():
+    """Ids of the cores this process may run on (respects the affinity mask set by taskset / cgroups)."""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:  # macOS, Windows
+        return list(range(os.cpu_count() or 1))
+
+
+def split_cores(cores, parts):
+    """Split `cores` into `parts` contiguous groups whose sizes differ by at most one.
+
+    With fewer cores than parts, groups share cores round-robin so that every part gets one.
+    """
+    cores = list(cores)
+    if parts <= len(cores):
+        base, extra = divmod(len(cores), parts)
+        groups, start = [], 0
+        for i in range(parts):
+            size = base + (i < extra)
+            groups.append(cores[start:start + size])
+            start += size
+        return groups
+    return [[cores[i % len(cores)]] for i in range(parts)]
+
+
+class ThreadBudget:
+    """Thread settings of one pipeline, see the module docstring.
+
+    Args:
+        cores (list, optional): Core ids shared by all pipelines, defaults to `available_cores()`.
+        pipelines (int): Number of concurrent pipelines sharing `cores`.
+        pipeline_index (int, optional): Share of this pipeline, only needed to pin distinct cores.
+        interop_threads (int): torch inter-op threads.
+        opencv_threads (int, optional): OpenCV threads, defaults to the pipeline's share.
+        paddle_mkldnn (bool): Enable MKLDNN (oneDNN) in Paddle inference.
+        pin_cores (bool): Restrict the process to the cores of its share.
+
+    Example:
+        budget = ThreadBudget(pipelines=2, pipeline_index=0).apply()
+        ocr_config = budget.paddle_config(ocr_config)
+    """
+
+    def __init__(self, cores=None, pipelines=1, pipeline_index=None, interop_threads=1, opencv_threads=None,
+                 paddle_mkldnn=True, pin_cores=False):
+        self.all_cores = list(cores) if cores is not None else available_cores()
+        self.pipelines = max(1, int(pipelines))
+        self.pipeline_index = pipeline_index
+        self.cores = split_cores(self.all_cores, self.pipelines)[pipeline_index or 0]
+        self.threads = len(self.cores)
+        self.interop_threads = interop_threads
+        self.opencv_threads = opencv_threads if opencv_threads is not None else self.threads
+        self.paddle_mkldnn = paddle_mkldnn
+        self.pin_cores = pin_cores and pipeline_index is not None
+
+    @classmethod
+    def from_config(cls, config=None):
+        """Build from a config dict (keys of the module docstring), `cores` may be a count or a list of ids."""
+        config = config or {}
+        cores = config.get('cores')
+        if isinstance(cores, int):
+            cores = available_cores()[:cores] if cores <= len(available_cores()) else list(range(cores))
+        return cls(cores=cores,
+                   pipelines=config.get('pipelines', 1),
+                   pipeline_index=config.get('pipeline_index'),
+                   interop_threads=config.get('interop_threads', 1),
+                   opencv_threads=config.get('opencv_threads'),
+                   paddle_mkldnn=config.get('paddle_mkldnn', True),
+                   pin_cores=config.get('pin_cores', False))
+
+    def split(self, parts):
+        """Budgets for `parts` shares of this pipeline's cores (e.g. concurrently running models).
+
+        torch's intra-op setting is process-wide, so threads inside one process cannot apply different
+        shares to torch; use the `threads` of a share to size the setting for all of them.
+        """
+        return [ThreadBudget(cores=self.cores, pipelines=parts, pipeline_index=i, interop_threads=self.interop_threads,
+                             paddle_mkldnn=self.paddle_mkldnn)
+                for i in range(parts)]
+
+    def env(self):
+        return {name: str(self.threads) for name in THREAD_ENV_VARS}
+
+    def apply_env(self):
+        os.environ.update(self.env())
+
+    def apply_affinity(self):
+        if self.pin_cores and hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, self.cores)
+
+    def apply_torch(self):
+        """Set torch intra-op and inter-op threads (both process-wide), if torch is imported."""
+        torch = sys.modules.get('torch')
+        if torch is None:
+            return
+        torch.set_num_threads(self.threads)
+        try:
+            torch.set_num_interop_threads(self.interop_threads)
+        except RuntimeError:
+            # can only be set once, before the first inter-op parallel work
+            pass
+
+    def apply_opencv(self):
+        cv2 = sys.modules.get('cv2')
+        if cv2 is not None:
+            cv2.setNumThreads(self.opencv_threads)
+
+    def apply_libraries(self):
+        """Size the pools of the already imported libraries, call again once the models are imported."""
+        self.apply_torch()
+        self.apply_opencv()
+
+    def apply(self):
+        """Apply the budget to the environment, the process affinity and the imported libraries. Returns self.
+
+        Libraries are not imported here (startup stays lazy); torch picks up `OMP_NUM_THREADS` when it is
+        imported later, `apply_libraries` sets the rest.
+        """
+        self.apply_env()
+        self.apply_affinity()
+        self.apply_libraries()
+        return self
+
+    def paddle_config(self, model_config):
+        """PaddleOCR model config with `cpu_threads` / `enable_mkldnn` from the budget; explicit keys win."""
+        return dict({'cpu_threads': self.threads, 'enable_mkldnn': self.paddle_mkldnn}, **model_config)
+
+    def summary(self):
+        share = f"pipeline {self.pipeline_index} of {self.pipelines}" if self.pipeline_index is not None \
+            else f"1/{self.pipelines} of {len(self.all_cores)} cores"
+        pinned = f", pinned to {self.cores[0]}-{self.cores[-1]}" if self.pin_cores else ""
+        return (f"{share}: {self.threads} threads (torch inter-op {self.interop_threads}, "
+                f"opencv {self.opencv_threads}, paddle mkldnn {self.paddle_mkldnn}){pinned}")
+
+
+def _parse_bool(value):
+    return str(value).lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_config(environ=None):
+    """Budget keys set through `THREAD_BUDGET_CORES`, `THREAD_BUDGET_PIPELINES`, `THREAD_BUDGET_PIPELINE_INDEX`, ..."""
+    environ = os.environ if environ is None else environ
+    config = {}
+    for key, cast in [('cores', int), ('pipelines', int), ('pipeline_index', int), ('interop_threads', int),
+                      ('opencv_threads', int), ('paddle_mkldnn', _parse_bool), ('pin_cores', _parse_bool)]:
+        value = environ.get(ENV_PREFIX + key.upper())
+        if value not in (None, ''):
+            config[key] = cast(value)
+    return config
+
+
+def get_thread_budget():
+    """The budget applied in this process, or None."""
+    return _budget
+
+
+def apply_thread_budget(config=None, **defaults):
+    """Build a budget and apply it to this process.
+
+    Keys are taken from `defaults`, then the `threads` config block, then the `THREAD_BUDGET_*` environment
+    variables, so one config can be shared by processes started with different `THREAD_BUDGET_PIPELINE_INDEX`.
+
+    Returns:
+        ThreadBudget or None: None when neither a config nor the environment defines a budget.
+    """
+    global _budget
+    overrides = env_config()
+    if config is None and not overrides:
+        return None
+    budget = ThreadBudget.from_config({**defaults, **(config or {}), **overrides})
+    with _lock:
+        _budget = budget.apply()
+    return _budget
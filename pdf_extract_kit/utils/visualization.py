@@ -2,6 +2,8 @@ import numpy as np
 import cv2
 from PIL import Image
 
+from pdf_extract_kit.utils.data_preprocess import load_image_bgr
+
 def colormap(N=256, normalized=False):
     """
     Generate the color map.
@@ -47,7 +49,8 @@ def visualize_bbox(image_path, bboxes, classes, scores, id_to_names, alpha=0.3):
     Visualize layout detection results on an image.
 
     Args:
-        image_path (str): Path to the input image.
+        image_path (str | bytes | np.ndarray | PIL.Image.Image): Path to the input image, or the image in memory
+            (encoded bytes, BGR array or PIL image).
         bboxes (list): List of bounding boxes, each represented as [x_min, y_min, x_max, y_max].
         classes (list): List of class IDs corresponding to the bounding boxes.
         id_to_names (dict): Dictionary mapping class IDs to class names.
@@ -56,12 +59,11 @@ def visualize_bbox(image_path, bboxes, classes, scores, id_to_names, alpha=0.3):
     Returns:
         np.ndarray: Image with visualized layout detection results.
     """
-    # Check if image_path is a PIL.Image.Image object
-    if isinstance(image_path, Image.Image):
-        image = np.array(image_path)
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)  # Convert RGB to BGR for OpenCV
-    else:
+    if isinstance(image_path, str):
         image = cv2.imread(image_path)
+    else:
+        # In-memory image as BGR for OpenCV, copied since the boxes are drawn in place
+        image = np.array(load_image_bgr(image_path))
 
     overlay = image.copy()
     
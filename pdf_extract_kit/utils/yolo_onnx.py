@@ -0,0 +1,302 @@
+"""YOLO detection on ONNX Runtime with NumPy pre- and post-processing (CPU inference without torch).
+
+Preprocessing (letterbox), box decoding, NMS and the rescaling to the original image follow
+ultralytics so that the results match the torch backend. Both ONNX output layouts are supported:
+
+- end-to-end models (YOLOv10 / DocLayout-YOLO): `(batch, max_det, 6)` rows of `x1, y1, x2, y2, score, cls`,
+  already free of duplicates, only the confidence threshold is applied.
+- YOLOv8 style models: `(batch, 4 + nc, anchors)` with `cx, cy, w, h` and per-class scores, decoded and
+  filtered with a class-aware NMS.
+"""
+import os
+
+import cv2
+import numpy as np
+
+from pdf_extract_kit.utils import data_preprocess
+from pdf_extract_kit.utils.data_preprocess import input_name
+from pdf_extract_kit.utils.visualization import visualize_bbox
+
+
+# same constants as ultralytics.utils.ops.non_max_suppression
+MAX_WH = 7680
+MAX_NMS = 30000
+PAD_VALUE = (114, 114, 114)
+
+
+class HostArray(np.ndarray):
+    """NumPy array with the `cpu()` / `numpy()` methods of a torch tensor, so code written for the
+    torch results (`boxes.xyxy.cpu()`, `conf.item()`) works unchanged."""
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return np.asarray(self)
+
+
+class YOLOBoxes:
+    """Detections of one image, the subset of `ultralytics.engine.results.Boxes` used in this repo.
+
+    Args:
+        data (np.ndarray): (N, 6) array of `x1, y1, x2, y2, conf, cls` in original image coordinates.
+        orig_shape (tuple): (height, width) of the original image.
+    """
+
+    def __init__(self, data, orig_shape):
+        self.data = np.asarray(data, dtype=np.float32).reshape(-1, 6).view(HostArray)
+        self.orig_shape = orig_shape
+
+    @property
+    def xyxy(self):
+        return self.data[:, :4]
+
+    @property
+    def conf(self):
+        return self.data[:, 4]
+
+    @property
+    def cls(self):
+        return self.data[:, 5]
+
+    def __len__(self):
+        return len(self.data)
+
+
+class YOLOResult:
+    """Result of one image, mirrors `ultralytics.engine.results.Results` (`boxes`, `orig_shape`, `names`)."""
+
+    def __init__(self, boxes, orig_shape, names):
+        self.boxes = YOLOBoxes(boxes, orig_shape)
+        self.orig_shape = orig_shape
+        self.names = names
+
+    def __len__(self):
+        return len(self.boxes)
+
+
+def load_image(image):
+    """Load an image path, encoded image bytes, PIL image or BGR array (ultralytics convention) as an RGB uint8 array."""
+    return np.asarray(data_preprocess.load_image(image))
+
+
+def letterbox(image, new_shape, auto=False, stride=32):
+    """Resize keeping the aspect ratio and pad to `new_shape`, as `ultralytics.data.augment.LetterBox`.
+
+    Args:
+        image (np.ndarray): HWC image.
+        new_shape (int or tuple): target (height, width).
+        auto (bool): pad only up to a multiple of `stride` (rectangular inference, dynamic-shape models).
+        stride (int): model stride.
+
+    Returns:
+        np.ndarray: the letterboxed image.
+    """
+    if isinstance(new_shape, int):
+        new_shape = (new_shape, new_shape)
+    shape = image.shape[:2]
+    r = min(new_shape[0] / shape[0], new_shape[1] / shape[1])
+    new_unpad = int(round(shape[1] * r)), int(round(shape[0] * r))
+    dw, dh = new_shape[1] - new_unpad[0], new_shape[0] - new_unpad[1]
+    if auto:
+        dw, dh = np.mod(dw, stride), np.mod(dh, stride)
+    dw /= 2
+    dh /= 2
+    if shape[::-1] != new_unpad:
+        image = cv2.resize(image, new_unpad, interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    return cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=PAD_VALUE)
+
+
+def scale_boxes(boxes, input_shape, orig_shape):
+    """Map xyxy boxes from the letterboxed `input_shape` back to `orig_shape` (both (height, width)) and clip."""
+    gain = min(input_shape[0] / orig_shape[0], input_shape[1] / orig_shape[1])
+    pad_x = round((input_shape[1] - orig_shape[1] * gain) / 2 - 0.1)
+    pad_y = round((input_shape[0] - orig_shape[0] * gain) / 2 - 0.1)
+    boxes = boxes.copy()
+    boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad_x) / gain
+    boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad_y) / gain
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, orig_shape[1])
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, orig_shape[0])
+    return boxes
+
+
+def nms(boxes, scores, iou_thres):
+    """Greedy non-maximum suppression.
+
+    Args:
+        boxes (np.ndarray): (N, 4) xyxy boxes.
+        scores (np.ndarray): (N,) scores.
+        iou_thres (float): boxes overlapping a kept box by more than this IoU are dropped.
+
+    Returns:
+        np.ndarray: indices of the kept boxes, by decreasing score.
+    """
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+    order = np.argsort(-scores, kind='stable')
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = (np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest])).clip(0)
+        h = (np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest])).clip(0)
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-7)
+        order = rest[iou <= iou_thres]
+    return np.array(keep, dtype=np.int64)
+
+
+def is_end2end_output(output, nc):
+    """True for `(batch, max_det, 6)` end-to-end outputs, False for `(batch, 4 + nc, anchors)`."""
+    return output.shape[-1] == 6 and output.shape[1] != 4 + nc
+
+
+def decode_predictions(output, nc, conf_thres=0.25, iou_thres=0.45, max_det=300, agnostic=False):
+    """Decode the raw output of one image into detections in letterboxed input coordinates.
+
+    Args:
+        output (np.ndarray): `(max_det, 6)` end-to-end rows or `(4 + nc, anchors)` YOLOv8 predictions.
+        nc (int): number of classes.
+        conf_thres (float): confidence threshold.
+        iou_thres (float): NMS IoU threshold, only used for YOLOv8 outputs.
+        max_det (int): maximum number of detections.
+        agnostic (bool): class-agnostic NMS.
+
+    Returns:
+        np.ndarray: (N, 6) rows of `x1, y1, x2, y2, conf, cls` by decreasing confidence.
+    """
+    if is_end2end_output(output[None], nc):
+        dets = output[output[:, 4] > conf_thres][:max_det]
+        return dets[np.argsort(-dets[:, 4], kind='stable')].astype(np.float32)
+
+    preds = output.T  # (anchors, 4 + nc)
+    scores = preds[:, 4:4 + nc]
+    cls = scores.argmax(1)
+    conf = scores[np.arange(len(scores)), cls]
+    mask = conf > conf_thres
+    if not mask.any():
+        return np.zeros((0, 6), dtype=np.float32)
+    xywh, conf, cls = preds[mask, :4], conf[mask], cls[mask]
+    boxes = np.empty_like(xywh)
+    boxes[:, 0] = xywh[:, 0] - xywh[:, 2] / 2
+    boxes[:, 1] = xywh[:, 1] - xywh[:, 3] / 2
+    boxes[:, 2] = xywh[:, 0] + xywh[:, 2] / 2
+    boxes[:, 3] = xywh[:, 1] + xywh[:, 3] / 2
+    if len(conf) > MAX_NMS:
+        top = np.argsort(-conf, kind='stable')[:MAX_NMS]
+        boxes, conf, cls = boxes[top], conf[top], cls[top]
+    # offset boxes by class so that NMS only suppresses boxes of the same class
+    offsets = 0 if agnostic else cls[:, None].astype(boxes.dtype) * MAX_WH
+    keep = nms(boxes + offsets, conf, iou_thres)[:max_det]
+    return np.concatenate([boxes[keep], conf[keep, None], cls[keep, None].astype(boxes.dtype)], axis=1).astype(np.float32)
+
+
+class YOLOOnnxDetector:
+    """Base class of the `*_yolo_onnx` models: loads (or exports) an ONNX model and runs it on ONNX Runtime.
+
+    Config keys, in addition to the ones of the torch models (`img_size`, `conf_thres`, `iou_thres`, `visualize`):
+
+    - `model_path`: `.onnx` file, or ultralytics `.pt` weights which are exported to ONNX on first use.
+    - `onnx_path`: where the exported model is written / looked up, defaults to `model_path` with `.onnx`.
+    - `dynamic` (default True): export with dynamic input shapes, pages are then letterboxed to the
+      smallest stride multiple like the torch backend instead of a full `img_size` square.
+    - `intra_op_num_threads` / `inter_op_num_threads` (default 0, ONNX Runtime picks): session threads.
+    - `max_det` (default 300), `agnostic_nms` (default False).
+
+    Subclasses set `id_to_names` and `result_suffix` and may override `load_torch_model` for the export.
+    """
+
+    result_suffix = 'det'
+
+    def __init__(self, config, id_to_names):
+        import onnxruntime
+
+        self.id_to_names = id_to_names
+        self.nc = len(id_to_names)
+        self.img_size = config.get('img_size', 1280)
+        self.conf_thres = config.get('conf_thres', 0.25)
+        self.iou_thres = config.get('iou_thres', 0.45)
+        self.max_det = config.get('max_det', 300)
+        self.agnostic_nms = config.get('agnostic_nms', False)
+        self.visualize = config.get('visualize', False)
+        self.stride = config.get('stride', 32)
+
+        self.onnx_path = self.resolve_onnx_path(config)
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = config.get('intra_op_num_threads', 0)
+        options.inter_op_num_threads = config.get('inter_op_num_threads', 0)
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(self.onnx_path, sess_options=options,
+                                                    providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        height, width = model_input.shape[2:4]
+        # symbolic dimensions (str / None) mean the model accepts any input size
+        self.dynamic = not (isinstance(height, int) and isinstance(width, int))
+        self.input_shape = (self.img_size, self.img_size) if self.dynamic else (height, width)
+
+    def resolve_onnx_path(self, config):
+        model_path = config['model_path']
+        if model_path.endswith('.onnx'):
+            return model_path
+        onnx_path = config.get('onnx_path', os.path.splitext(model_path)[0] + '.onnx')
+        if not os.path.exists(onnx_path):
+            self.export_onnx(model_path, onnx_path, dynamic=config.get('dynamic', True))
+        return onnx_path
+
+    def load_torch_model(self, model_path):
+        from ultralytics import YOLO
+        return YOLO(model_path)
+
+    def export_onnx(self, model_path, onnx_path, dynamic=True):
+        """Export the torch weights with ultralytics (needs torch and the onnx package, only done once)."""
+        exported = self.load_torch_model(model_path).export(format='onnx', imgsz=self.img_size, dynamic=dynamic)
+        if os.path.abspath(exported) != os.path.abspath(onnx_path):
+            os.makedirs(os.path.dirname(os.path.abspath(onnx_path)), exist_ok=True)
+            os.replace(exported, onnx_path)
+
+    def preprocess(self, image):
+        """RGB HWC uint8 image -> (1, 3, H, W) float32 blob in [0, 1]."""
+        image = letterbox(image, self.input_shape, auto=self.dynamic, stride=self.stride)
+        blob = image.transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+        return np.ascontiguousarray(blob)
+
+    def detect(self, image):
+        """Run the model on one image (path, encoded bytes, PIL image or BGR array) and return a `YOLOResult`."""
+        image = load_image(image)
+        blob = self.preprocess(image)
+        output = self.session.run(None, {self.input_name: blob})[0][0]
+        dets = decode_predictions(output, self.nc, conf_thres=self.conf_thres, iou_thres=self.iou_thres,
+                                  max_det=self.max_det, agnostic=self.agnostic_nms)
+        orig_shape = image.shape[:2]
+        dets[:, :4] = scale_boxes(dets[:, :4], blob.shape[2:], orig_shape)
+        return YOLOResult(dets, orig_shape, self.id_to_names)
+
+    def predict(self, images, result_path, image_ids=None):
+        """
+        Predict boxes in images.
+
+        Args:
+            images (list): List of images to be predicted.
+            result_path (str): Path to save the visualized results.
+            image_ids (list, optional): List of image IDs corresponding to the images.
+
+        Returns:
+            list: List of `YOLOResult`, with the same `boxes.xyxy / conf / cls` as the torch models.
+        """
+        results = []
+        for idx, image in enumerate(images):
+            result = self.detect(image)
+            if self.visualize:
+                if not os.path.exists(result_path):
+                    os.makedirs(result_path)
+                boxes = result.boxes
+                vis_result = visualize_bbox(image, boxes.xyxy, boxes.cls, boxes.conf, self.id_to_names)
+                base_name = image_ids[idx] if image_ids else input_name(image, idx)
+                cv2.imwrite(os.path.join(result_path, f"{base_name}_{self.result_suffix}.png"), vis_result)
+            results.append(result)
+        return results
@@ -1,15 +1,23 @@
 import os
 import re
-import gc
 import sys
+import copy
 import time
+import logging
+import threading
+import contextlib
+import fitz
 import torch
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image, ImageDraw
 from torchvision import transforms
 from torch.utils.data import DataLoader
 
 sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
-from pdf_extract_kit.utils.data_preprocess import load_pdf
+from pdf_extract_kit.utils.data_preprocess import load_pdf, load_pdf_page
+from pdf_extract_kit.utils.pipeline import Pipeline, Stage, BatchStage
+from pdf_extract_kit.utils.memory import PeakRSSTracker, MemoryManager, image_nbytes
+from pdf_extract_kit.utils.thread_budget import ThreadBudget, get_thread_budget
 from pdf_extract_kit.tasks.ocr.task import OCRTask
 from pdf_extract_kit.dataset.dataset import MathDataset
 from pdf_extract_kit.registry.registry import TASK_REGISTRY
@@ -19,6 +27,30 @@ from pdf_extract_kit.utils.merge_blocks_and_spans import (
     merge_para_with_text
 )
 
+logger = logging.getLogger(__name__)
+
+# torch.set_num_threads is process-wide: overlapping detections (of one or several tasks) share the saved
+# thread count, which is restored when the last of them finishes
+_detection_threads_lock = threading.Lock()
+_detection_threads_state = {'active': 0, 'saved': None}
+
+
+@contextlib.contextmanager
+def detection_torch_threads(num_threads):
+    """Set the torch intra-op threads of the process to `num_threads` while concurrent detection runs."""
+    with _detection_threads_lock:
+        if _detection_threads_state['active'] == 0:
+            _detection_threads_state['saved'] = torch.get_num_threads()
+        _detection_threads_state['active'] += 1
+        torch.set_num_threads(num_threads)
+    try:
+        yield
+    finally:
+        with _detection_threads_lock:
+            _detection_threads_state['active'] -= 1
+            if _detection_threads_state['active'] == 0:
+                torch.set_num_threads(_detection_threads_state['saved'])
+
 
 def latex_rm_whitespace(s: str):
     """Remove unnecessary whitespace from LaTeX code.
@@ -55,11 +87,31 @@ def crop_img(input_res, input_pil_img, padding_x=0, padding_y=0):
 
 @TASK_REGISTRY.register("pdf2markdown")
 class PDF2MARKDOWN(OCRTask):
-    def __init__(self, layout_model, mfd_model, mfr_model, ocr_model):
+    def __init__(self, layout_model, mfd_model, mfr_model, ocr_model, pipeline=None, concurrent_detection=False,
+                 mfr_window=None, memory=None):
         self.layout_model = layout_model
         self.mfd_model = mfd_model
         self.mfr_model = mfr_model
         self.ocr_model = ocr_model
+        # pipeline config, e.g. {'queue_size': 2, 'workers': {'markdown': 2}}; None keeps the stage-by-stage mode
+        self.pipeline_config = pipeline
+        # run layout and formula detection of a page at the same time, True splits the cpu cores
+        # of the thread budget between the two models, an int sets the torch intra-op threads of each model
+        # flush formula recognition whenever the pending crops reach either budget instead of once per
+        # document, e.g. {'max_crops': 2048, 'max_bytes': 268435456}; None recognizes the whole document at once
+        self.mfr_window = mfr_window
+        self.peak_rss = 0
+        # gc / cuda cache cleanup only above the high-water marks, e.g. {'rss_high_water_mb': 8192}
+        self.memory_manager = MemoryManager.from_config(memory)
+        self.memory_stats = None
+        self.detect_executor = None
+        self.detect_threads = None
+        if concurrent_detection and layout_model is not None and mfd_model is not None:
+            if concurrent_detection is True:
+                self.detect_threads = (get_thread_budget() or ThreadBudget()).split(2)[0].threads
+            else:
+                self.detect_threads = int(concurrent_detection)
+            self.detect_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="detect")
         if self.mfr_model is not None:
             assert self.mfd_model is not None, "formula recognition based on formula detection, mfd_model can not be None."
             self.mfr_transform = transforms.Compose([self.mfr_model.vis_processor, ])
@@ -80,6 +132,18 @@ class PDF2MARKDOWN(OCRTask):
             'text': (255, 0, 0)
         }
 
+    def close(self):
+        """Shut down the detection threads."""
+        if self.detect_executor is not None:
+            self.detect_executor.shutdown()
+            self.detect_executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def convert_format(self, yolo_res, id_to_names, ):
         """
         convert yolo format to pdf-extract format.
@@ -138,126 +202,197 @@ class PDF2MARKDOWN(OCRTask):
         pdf_extract_res = []
         mf_image_list = []
         latex_filling_list = []
+        mf_bytes = 0
+        rss_tracker = PeakRSSTracker()
+        self.memory_manager.start_document()
         for idx, image in enumerate(image_list):
-            img_W, img_H = image.size
-            if self.layout_model is not None:
-                ori_layout_res = self.layout_model.predict([image], "")[0]
-                layout_res = self.convert_format(ori_layout_res, self.layout_model.id_to_names)
-            else:
-                layout_res = []
-            single_page_res = {'layout_dets': layout_res}
-            single_page_res['page_info'] = dict(
-                page_no = idx,
-                height = img_H,
-                width = img_W
-            )
-            if self.mfd_model is not None:
-                mfd_res = self.mfd_model.predict([image], "")[0]
-                for xyxy, conf, cla in zip(mfd_res.boxes.xyxy.cpu(), mfd_res.boxes.conf.cpu(), mfd_res.boxes.cls.cpu()):
-                    xmin, ymin, xmax, ymax = [int(p.item()) for p in xyxy]
-                    new_item = {
-                        'category_type': self.mfd_model.id_to_names[int(cla.item())],
-                        'poly': [xmin, ymin, xmax, ymin, xmax, ymax, xmin, ymax],
-                        'score': round(float(conf.item()), 2),
-                        'latex': '',
-                    }
-                    single_page_res['layout_dets'].append(new_item)
-                    if self.mfr_model is not None:
-                        latex_filling_list.append(new_item)
-                        bbox_img = image.crop((xmin, ymin, xmax, ymax))
-                        mf_image_list.append(bbox_img)
-                    
-                pdf_extract_res.append(single_page_res)
-                
-                del mfd_res
-                torch.cuda.empty_cache()
-                gc.collect()
-            
-        # Formula recognition, collect all formula images in whole pdf file, then batch infer them.
-        if self.mfr_model is not None:
-            a = time.time()
-            dataset = MathDataset(mf_image_list, transform=self.mfr_transform)
-            dataloader = DataLoader(dataset, batch_size=self.mfr_model.batch_size, num_workers=0)
-
-            mfr_res = []
-            for imgs in dataloader:
-                imgs = imgs.to(self.mfr_model.device)
-                output = self.mfr_model.model.generate({'image': imgs})
-                mfr_res.extend(output['pred_str'])
-            for res, latex in zip(latex_filling_list, mfr_res):
-                res['latex'] = latex_rm_whitespace(latex)
-            b = time.time()
-            print("formula nums:", len(mf_image_list), "mfr time:", round(b-a, 2))
-        
-        # ocr_res = self.ocr_model.predict(image)
-            
+            single_page_res, page_latex_filling, page_mf_images = self.detect_page(image, idx)
+            pdf_extract_res.append(single_page_res)
+            latex_filling_list.extend(page_latex_filling)
+            mf_image_list.extend(page_mf_images)
+            mf_bytes += sum(image_nbytes(img) for img in page_mf_images)
+            rss_tracker.update()
+            # Windowed mode: the formula items are referenced from layout_dets, so latex is filled in place
+            if self.mfr_window_full(len(mf_image_list), mf_bytes):
+                self.recognize_formulas(latex_filling_list, mf_image_list)
+                mf_image_list, latex_filling_list, mf_bytes = [], [], 0
+
+        # Formula recognition, collect all (remaining) formula images in whole pdf file, then batch infer them.
+        rss_tracker.update()
+        self.recognize_formulas(latex_filling_list, mf_image_list)
+        del mf_image_list, latex_filling_list
+
         # ocr and table recognition
-        for idx, image in enumerate(image_list):
-            layout_res = pdf_extract_res[idx]['layout_dets']
-            pil_img = image.copy()
-
-            ocr_res_list = []
-            table_res_list = []
-            single_page_mfdetrec_res = []
-
-            for res in layout_res:
-                if res['category_type'] in self.mfd_model.id_to_names.values():
-                    single_page_mfdetrec_res.append({
-                        "bbox": [int(res['poly'][0]), int(res['poly'][1]),
-                                 int(res['poly'][4]), int(res['poly'][5])],
-                    })
-                elif res['category_type'] in [self.layout_model.id_to_names[cid] for cid in [0, 1, 2, 4, 6, 7]]:
-                    ocr_res_list.append(res)
-                elif res['category_type'] in [self.layout_model.id_to_names[5]]:
-                    table_res_list.append(res)
-
-            ocr_start = time.time()
-            # Process each area that requires OCR processing
-            for res in ocr_res_list:
-                new_image, useful_list = crop_img(res, pil_img, padding_x=25, padding_y=25)
-                paste_x, paste_y, xmin, ymin, xmax, ymax, new_width, new_height = useful_list
-                # Adjust the coordinates of the formula area
-                adjusted_mfdetrec_res = []
-                for mf_res in single_page_mfdetrec_res:
-                    mf_xmin, mf_ymin, mf_xmax, mf_ymax = mf_res["bbox"]
-                    # Adjust the coordinates of the formula area to the coordinates relative to the cropping area
-                    x0 = mf_xmin - xmin + paste_x
-                    y0 = mf_ymin - ymin + paste_y
-                    x1 = mf_xmax - xmin + paste_x
-                    y1 = mf_ymax - ymin + paste_y
-                    # Filter formula blocks outside the graph
-                    if any([x1 < 0, y1 < 0]) or any([x0 > new_width, y0 > new_height]):
-                        continue
-                    else:
-                        adjusted_mfdetrec_res.append({
-                            "bbox": [x0, y0, x1, y1],
-                        })
-
-                # OCR recognition
-                ocr_res = self.ocr_model.ocr(new_image, mfd_res=adjusted_mfdetrec_res)[0]
-
-                # Integration results
-                if ocr_res:
-                    for box_ocr_res in ocr_res:
-                        p1, p2, p3, p4 = box_ocr_res[0]
-                        text, score = box_ocr_res[1]
-
-                        # Convert the coordinates back to the original coordinate system
-                        p1 = [p1[0] - paste_x + xmin, p1[1] - paste_y + ymin]
-                        p2 = [p2[0] - paste_x + xmin, p2[1] - paste_y + ymin]
-                        p3 = [p3[0] - paste_x + xmin, p3[1] - paste_y + ymin]
-                        p4 = [p4[0] - paste_x + xmin, p4[1] - paste_y + ymin]
-
-                        layout_res.append({
-                            'category_type': 'text',
-                            'poly': p1 + p2 + p3 + p4,
-                            'score': round(score, 2),
-                            'text': text,
-                        })
-
-            ocr_cost = round(time.time() - ocr_start, 2)
-            print(f"ocr cost: {ocr_cost}")
+        for image, single_page_res in zip(image_list, pdf_extract_res):
+            self.ocr_page(image, single_page_res)
+            rss_tracker.update()
+        self.peak_rss = rss_tracker.peak
+        self.memory_stats = self.memory_manager.end_document()
+        self.log_memory_stats()
         return pdf_extract_res
+
+    def log_memory_stats(self):
+        """Log the peak RSS and the memory cleanup statistics of the last document."""
+        logger.info("peak rss: %.0f MiB, memory cleanups: %d, gc time: %.2fs", self.peak_rss / 2**20,
+                    self.memory_stats['cleanups'], self.memory_stats['cleanup_time'] + self.memory_stats['auto_gc_time'])
+
+    def detect_page(self, image, page_no):
+        """Layout and formula detection on one page.
+
+        Args:
+            image (PIL.Image.Image): page image.
+            page_no (int): page index written to `page_info`.
+
+        Returns:
+            tuple: (single_page_res, latex_filling_list, mf_image_list). The formula items in
+                `latex_filling_list` are the dicts inside `single_page_res['layout_dets']`, their
+                `latex` is filled by `recognize_formulas` from the matching crops in `mf_image_list`.
+        """
+        img_W, img_H = image.size
+        if self.detect_executor is not None:
+            # the thread count cannot be set per detection thread, both models get the share only while they run
+            with detection_torch_threads(self.detect_threads):
+                layout_future = self.detect_executor.submit(self.layout_model.predict, [image], "")
+                mfd_future = self.detect_executor.submit(self.mfd_model.predict, [image], "")
+                ori_layout_res, mfd_res = layout_future.result()[0], mfd_future.result()[0]
+        else:
+            ori_layout_res = self.layout_model.predict([image], "")[0] if self.layout_model is not None else None
+            mfd_res = self.mfd_model.predict([image], "")[0] if self.mfd_model is not None else None
+        if ori_layout_res is not None:
+            layout_res = self.convert_format(ori_layout_res, self.layout_model.id_to_names)
+        else:
+            layout_res = []
+        single_page_res = {'layout_dets': layout_res}
+        single_page_res['page_info'] = dict(
+            page_no = page_no,
+            height = img_H,
+            width = img_W
+        )
+        latex_filling_list = []
+        mf_image_list = []
+        if mfd_res is not None:
+            for xyxy, conf, cla in zip(mfd_res.boxes.xyxy.cpu(), mfd_res.boxes.conf.cpu(), mfd_res.boxes.cls.cpu()):
+                xmin, ymin, xmax, ymax = [int(p.item()) for p in xyxy]
+                new_item = {
+                    'category_type': self.mfd_model.id_to_names[int(cla.item())],
+                    'poly': [xmin, ymin, xmax, ymin, xmax, ymax, xmin, ymax],
+                    'score': round(float(conf.item()), 2),
+                    'latex': '',
+                }
+                single_page_res['layout_dets'].append(new_item)
+                if self.mfr_model is not None:
+                    latex_filling_list.append(new_item)
+                    bbox_img = image.crop((xmin, ymin, xmax, ymax))
+                    mf_image_list.append(bbox_img)
+
+            del mfd_res
+            self.memory_manager.maybe_cleanup()
+        return single_page_res, latex_filling_list, mf_image_list
+
+    def mfr_window_full(self, num_crops, num_bytes):
+        """Whether the pending formula crops reached a `mfr_window` budget (never without a window)."""
+        if not self.mfr_window:
+            return False
+        return num_crops >= self.mfr_window.get('max_crops', float('inf')) or \
+            num_bytes >= self.mfr_window.get('max_bytes', float('inf'))
+
+    def recognize_formulas(self, latex_filling_list, mf_image_list):
+        """Batch formula recognition, fills `latex` of the items in `latex_filling_list` in place."""
+        if self.mfr_model is None or not mf_image_list:
+            return
+        a = time.time()
+        dataset = MathDataset(mf_image_list, transform=self.mfr_transform)
+        dataloader = DataLoader(dataset, batch_size=self.mfr_model.batch_size, num_workers=0)
+
+        mfr_res = []
+        for imgs in dataloader:
+            imgs = imgs.to(self.mfr_model.device)
+            output = self.mfr_model.model.generate({'image': imgs})
+            mfr_res.extend(output['pred_str'])
+        for res, latex in zip(latex_filling_list, mfr_res):
+            res['latex'] = latex_rm_whitespace(latex)
+        b = time.time()
+        print("formula nums:", len(mf_image_list), "mfr time:", round(b-a, 2))
+
+    def ocr_page(self, image, single_page_res):
+        """OCR on the text regions of one page, appends the text lines to `single_page_res['layout_dets']`."""
+        if self.ocr_model is None:
+            return single_page_res
+        layout_res = single_page_res['layout_dets']
+        pil_img = image.copy()
+
+        ocr_res_list = []
+        table_res_list = []
+        single_page_mfdetrec_res = []
+        mfd_names = self.mfd_model.id_to_names.values() if self.mfd_model is not None else []
+        layout_names = self.layout_model.id_to_names if self.layout_model is not None else {}
+
+        for res in layout_res:
+            if res['category_type'] in mfd_names:
+                single_page_mfdetrec_res.append({
+                    "bbox": [int(res['poly'][0]), int(res['poly'][1]),
+                             int(res['poly'][4]), int(res['poly'][5])],
+                })
+            elif res['category_type'] in [layout_names.get(cid) for cid in [0, 1, 2, 4, 6, 7]]:
+                ocr_res_list.append(res)
+            elif res['category_type'] in [layout_names.get(5)]:
+                table_res_list.append(res)
+
+        ocr_start = time.time()
+        # Crop each area that requires OCR processing, then recognize all areas of the page in one batch
+        ocr_images = []
+        ocr_mfd_res = []
+        ocr_useful_lists = []
+        for res in ocr_res_list:
+            new_image, useful_list = crop_img(res, pil_img, padding_x=25, padding_y=25)
+            paste_x, paste_y, xmin, ymin, xmax, ymax, new_width, new_height = useful_list
+            # Adjust the coordinates of the formula area
+            adjusted_mfdetrec_res = []
+            for mf_res in single_page_mfdetrec_res:
+                mf_xmin, mf_ymin, mf_xmax, mf_ymax = mf_res["bbox"]
+                # Adjust the coordinates of the formula area to the coordinates relative to the cropping area
+                x0 = mf_xmin - xmin + paste_x
+                y0 = mf_ymin - ymin + paste_y
+                x1 = mf_xmax - xmin + paste_x
+                y1 = mf_ymax - ymin + paste_y
+                # Filter formula blocks outside the graph
+                if any([x1 < 0, y1 < 0]) or any([x0 > new_width, y0 > new_height]):
+                    continue
+                else:
+                    adjusted_mfdetrec_res.append({
+                        "bbox": [x0, y0, x1, y1],
+                    })
+            ocr_images.append(new_image)
+            ocr_mfd_res.append(adjusted_mfdetrec_res)
+            ocr_useful_lists.append(useful_list)
+
+        # OCR recognition
+        ocr_batch_res = self.ocr_model.ocr_batch(ocr_images, mfd_res_list=ocr_mfd_res)
+
+        # Integration results
+        for ocr_res, useful_list in zip(ocr_batch_res, ocr_useful_lists):
+            paste_x, paste_y, xmin, ymin, xmax, ymax, new_width, new_height = useful_list
+            if ocr_res:
+                for box_ocr_res in ocr_res:
+                    p1, p2, p3, p4 = box_ocr_res[0]
+                    text, score = box_ocr_res[1]
+
+                    # Convert the coordinates back to the original coordinate system
+                    p1 = [p1[0] - paste_x + xmin, p1[1] - paste_y + ymin]
+                    p2 = [p2[0] - paste_x + xmin, p2[1] - paste_y + ymin]
+                    p3 = [p3[0] - paste_x + xmin, p3[1] - paste_y + ymin]
+                    p4 = [p4[0] - paste_x + xmin, p4[1] - paste_y + ymin]
+
+                    layout_res.append({
+                        'category_type': 'text',
+                        'poly': p1 + p2 + p3 + p4,
+                        'score': round(score, 2),
+                        'text': text,
+                    })
+
+        ocr_cost = round(time.time() - ocr_start, 2)
+        print(f"ocr cost: {ocr_cost}")
+        return single_page_res
     
     def order_blocks(self, blocks):
         def calculate_oder(poly):
@@ -323,26 +458,120 @@ class PDF2MARKDOWN(OCRTask):
                 continue
         return md_text
         
+    def process_single_pdf_pipelined(self, fpath, merge2markdown=False, keep_images=False):
+        """Pipelined version of `process_single_pdf`, pages stream through
+        rasterize -> detect (layout + MFD) -> mfr -> ocr -> markdown, each stage in its own thread(s)
+        with bounded queues in between, so page N+1 is detected while page N is in OCR.
+        Without `mfr_window` formula recognition runs per page, since collecting the crops of the
+        whole document would hold every page back from OCR until the last one is detected. With
+        `mfr_window` the crops of consecutive pages are recognized together until a budget is
+        reached (as in `process_single_pdf`); the pages of a batch wait for it before OCR.
+
+        Args:
+            fpath (str): PDF or image path.
+            merge2markdown (bool): also convert every page to markdown in the last stage.
+            keep_images (bool): keep the page images in the results (needed for visualization).
+
+        Returns:
+            List[dict]: one item per page with keys `page_res` (same format as `process_single_pdf`),
+                `markdown` (str or None) and `image` (PIL image or None).
+        """
+        config = self.pipeline_config if isinstance(self.pipeline_config, dict) else {}
+        workers = config.get('workers', {})
+        is_pdf = fpath.endswith(".pdf") or fpath.endswith(".PDF")
+        if is_pdf:
+            doc = fitz.open(fpath)
+            page_nos = range(len(doc))
+        else:
+            doc = None
+            page_nos = [0]
+
+        def rasterize(page_no):
+            image = load_pdf_page(doc[page_no], config.get('dpi', 144)) if is_pdf else Image.open(fpath)
+            return {'page_no': page_no, 'image': image}
+
+        def detect(item):
+            self.memory_manager.track_thread()
+            item['page_res'], item['latex_filling'], item['mf_images'] = self.detect_page(item['image'], item['page_no'])
+            item['mf_bytes'] = sum(image_nbytes(img) for img in item['mf_images'])
+            return item
+
+        def mfr(items):
+            self.memory_manager.track_thread()
+            latex_filling_list, mf_image_list = [], []
+            for item in items:
+                latex_filling_list.extend(item.pop('latex_filling'))
+                mf_image_list.extend(item.pop('mf_images'))
+                item.pop('mf_bytes')
+            self.recognize_formulas(latex_filling_list, mf_image_list)
+            return items
+
+        def mfr_full(items):
+            if not self.mfr_window:
+                return True
+            return self.mfr_window_full(sum(len(item['mf_images']) for item in items),
+                                        sum(item['mf_bytes'] for item in items))
+
+        def ocr(item):
+            self.memory_manager.track_thread()
+            self.ocr_page(item['image'], item['page_res'])
+            rss_tracker.update()
+            return item
+
+        def markdown(item):
+            # convert2md rewrites category types in place, keep the saved json untouched
+            item['markdown'] = self.convert2md(copy.deepcopy(item['page_res'])) if merge2markdown else None
+            if not keep_images:
+                item['image'] = None
+            return item
+
+        stages = [Stage(name, fn, workers.get(name, 1)) for name, fn in
+                  [('rasterize', rasterize), ('detect', detect), ('ocr', ocr), ('markdown', markdown)]]
+        stages.insert(2, BatchStage('mfr', mfr, mfr_full, workers.get('mfr', 1)))
+        pipeline = Pipeline(stages, queue_size=config.get('queue_size', 2))
+        rss_tracker = PeakRSSTracker()
+        self.memory_manager.start_document()
+        try:
+            results = pipeline.run(page_nos)
+        finally:
+            self.memory_stats = self.memory_manager.end_document()
+            if doc is not None:
+                doc.close()
+        logger.info("%s", pipeline.report())
+        self.pipeline_stats = pipeline.stats()
+        self.peak_rss = rss_tracker.peak
+        self.log_memory_stats()
+        return results
+
     def process(self, input_path, save_dir=None, visualize=False, merge2markdown=False):
         file_list = self.prepare_input_files(input_path)
         res_list = []
         for fpath in file_list:
             basename = os.path.basename(fpath)[:-4]
-            if fpath.endswith(".pdf") or fpath.endswith(".PDF"):
-                images = load_pdf(fpath)
+            md_content = None
+            if self.pipeline_config:
+                page_results = self.process_single_pdf_pipelined(fpath, merge2markdown=merge2markdown, keep_images=visualize)
+                pdf_extract_res = [item['page_res'] for item in page_results]
+                images = [item['image'] for item in page_results]
+                if merge2markdown:
+                    md_content = [item['markdown'] for item in page_results]
             else:
-                images = [Image.open(fpath)]
-            pdf_extract_res = self.process_single_pdf(images)
+                if fpath.endswith(".pdf") or fpath.endswith(".PDF"):
+                    images = load_pdf(fpath)
+                else:
+                    images = [Image.open(fpath)]
+                pdf_extract_res = self.process_single_pdf(images)
             res_list.append(pdf_extract_res)
             if save_dir:
                 os.makedirs(save_dir, exist_ok=True)
                 self.save_json_result(pdf_extract_res, os.path.join(save_dir, f"{basename}.json"))
                 
                 if merge2markdown:
-                    md_content = []
-                    for extract_res in pdf_extract_res:
-                        md_text = self.convert2md(extract_res)
-                        md_content.append(md_text)
+                    if md_content is None:
+                        md_content = []
+                        for extract_res in pdf_extract_res:
+                            md_text = self.convert2md(extract_res)
+                            md_content.append(md_text)
                     with open(os.path.join(save_dir, f"{basename}.md"), "w") as f:
                         f.write("\n\n".join(md_content))
                         
@@ -356,7 +585,3 @@ class PDF2MARKDOWN(OCRTask):
                         images[0].save(os.path.join(save_dir, f"{basename}.png"))
 
         return res_list
-        
-        
-        
-        
\ No newline at end of file
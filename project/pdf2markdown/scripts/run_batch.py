@@ -0,0 +1,207 @@
+"""Resumable batch pdf2markdown over a large corpus.
+
+Every document and page is tracked in an SQLite manifest. Killing the run and starting it again with
+the same arguments skips finished documents, resumes partially processed documents from the last
+finished page and retries failed documents up to `--max-attempts`. Results are committed atomically,
+a `<name>.json` / `<name>.md` next to each other in the output directory is always complete.
+
+Example:
+    python project/pdf2markdown/scripts/run_batch.py --config project/pdf2markdown/configs/pdf2markdown.yaml \
+        --input /data/pdfs --output outputs/batch --workers 4
+"""
+import os
+import sys
+import copy
+import json
+import time
+import shutil
+import argparse
+import threading
+import traceback
+import collections
+import multiprocessing
+import os.path as osp
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+sys.path.append(osp.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from pdf_extract_kit.utils.config_loader import load_config, initialize_tasks_and_models
+from pdf_extract_kit.utils.batch import PENDING, Manifest, ProgressReporter, atomic_write_json, atomic_write_text
+from pdf_extract_kit.utils.thread_budget import apply_thread_budget
+
+
+TASK_NAME = 'pdf2markdown'
+PDF_EXTENSIONS = ('.pdf',)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# per worker process state, filled by init_worker
+_worker = {}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Resumable batch pdf2markdown with a manifest.")
+    parser.add_argument('--config', type=str, required=True, help='Path to the pdf2markdown configuration file.')
+    parser.add_argument('--input', type=str, required=True, help='Directory searched recursively for PDFs and images.')
+    parser.add_argument('--output', type=str, required=True, help='Output directory, mirrors the input tree.')
+    parser.add_argument('--manifest', type=str, default=None, help='Manifest path, defaults to <output>/manifest.sqlite.')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes, each loads its own models.')
+    parser.add_argument('--max-attempts', type=int, default=3, help='Attempts per document before it stays failed.')
+    parser.add_argument('--dpi', type=int, default=144, help='Rasterization dpi of PDF pages.')
+    parser.add_argument('--report-interval', type=float, default=10, help='Seconds between progress lines.')
+    return parser.parse_args()
+
+
+def discover_documents(input_dir):
+    paths = []
+    for root, _, files in os.walk(input_dir):
+        for fname in files:
+            if fname.lower().endswith(PDF_EXTENSIONS + IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, fname))
+    return sorted(paths)
+
+
+def output_stem(path, input_dir, output_dir):
+    rel = os.path.relpath(path, input_dir)
+    return os.path.join(output_dir, os.path.splitext(rel)[0])
+
+
+def init_worker(config_path, manifest_path, input_dir, output_dir, dpi, num_workers):
+    config = load_config(config_path)
+    # the workers share the cores, apply the budget before torch / paddle are imported
+    config['threads'] = dict({'pipelines': num_workers}, **(config.get('threads') or {}))
+    apply_thread_budget(config['threads'])
+    from pdf2markdown import PDF2MARKDOWN
+
+    task_instances = initialize_tasks_and_models(config)
+    models = {name: task_instances[name].model if name in task_instances else None
+              for name in ['layout_detection', 'formula_detection', 'formula_recognition', 'ocr']}
+    _worker['task'] = PDF2MARKDOWN(models['layout_detection'], models['formula_detection'],
+                                   models['formula_recognition'], models['ocr'],
+                                   memory=config.get('memory', None))
+    _worker['merge2markdown'] = config.get('merge2markdown', True)
+    _worker['manifest'] = Manifest(manifest_path)
+    _worker['input_dir'] = input_dir
+    _worker['output_dir'] = output_dir
+    _worker['dpi'] = dpi
+
+
+def process_document(path):
+    """Process one document page by page, every finished page is checkpointed in the manifest."""
+    import fitz
+    from PIL import Image
+    from pdf_extract_kit.utils.data_preprocess import load_pdf_page
+
+    task = _worker['task']
+    manifest = _worker['manifest']
+    stem = output_stem(path, _worker['input_dir'], _worker['output_dir'])
+    page_dir = os.path.join(os.path.dirname(stem), '.pages', os.path.basename(stem))
+    doc = None
+    start = time.time()
+    try:
+        is_pdf = path.lower().endswith(PDF_EXTENSIONS)
+        if is_pdf:
+            doc = fitz.open(path)
+            num_pages = len(doc)
+        else:
+            num_pages = 1
+        manifest.start_document(path, num_pages)
+        done_pages = manifest.done_pages(path)
+
+        task.memory_manager.start_document()
+        for page_no in range(num_pages):
+            page_file = os.path.join(page_dir, f"{page_no}.json")
+            if page_no in done_pages and os.path.exists(page_file):
+                continue
+            image = load_pdf_page(doc[page_no], _worker['dpi']) if is_pdf else Image.open(path).convert('RGB')
+            page_res, latex_filling_list, mf_image_list = task.detect_page(image, page_no)
+            task.recognize_formulas(latex_filling_list, mf_image_list)
+            task.ocr_page(image, page_res)
+            atomic_write_json(page_file, page_res)
+            manifest.page_done(path, page_no)
+
+        pdf_extract_res = []
+        for page_no in range(num_pages):
+            with open(os.path.join(page_dir, f"{page_no}.json"), encoding='utf-8') as f:
+                pdf_extract_res.append(json.load(f))
+        atomic_write_json(f"{stem}.json", pdf_extract_res)
+        if _worker['merge2markdown']:
+            # convert2md rewrites category types in place, keep the json results untouched
+            md_content = [task.convert2md(copy.deepcopy(page_res)) for page_res in pdf_extract_res]
+            atomic_write_text(f"{stem}.md", "\n\n".join(md_content))
+        manifest.finish_document(path, f"{stem}.json")
+        shutil.rmtree(page_dir, ignore_errors=True)
+        return path, True, num_pages, time.time() - start
+    except Exception:
+        manifest.fail_document(path, traceback.format_exc())
+        return path, False, 0, time.time() - start
+    finally:
+        task.memory_manager.end_document()
+        if doc is not None:
+            doc.close()
+
+
+def report_progress(reporter, stop_event, interval):
+    while not stop_event.wait(interval):
+        print(reporter.format(), flush=True)
+
+
+def make_executor(args, manifest_path):
+    # spawn: CUDA can not be used in forked children
+    return ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=init_worker,
+                               initargs=(args.config, manifest_path, args.input, args.output, args.dpi, args.workers))
+
+
+def main(args):
+    manifest_path = args.manifest or os.path.join(args.output, 'manifest.sqlite')
+    manifest = Manifest(manifest_path)
+    new_docs = manifest.add_documents(discover_documents(args.input))
+    interrupted_docs = manifest.reset_running(args.max_attempts)
+    pending = manifest.pending_documents(args.max_attempts)
+    print(f"manifest: {manifest_path}, new documents: {new_docs}, interrupted: {interrupted_docs}, "
+          f"to process: {len(pending)}")
+
+    reporter = ProgressReporter(manifest)
+    stop_event = threading.Event()
+    report_thread = threading.Thread(target=report_progress, args=(reporter, stop_event, args.report_interval), daemon=True)
+    report_thread.start()
+
+    executor = make_executor(args, manifest_path)
+    try:
+        # keep a bounded number of documents in flight instead of submitting the whole corpus at once
+        queue = collections.deque(pending)
+        in_flight = {}
+        while True:
+            while len(in_flight) < args.workers * 2 and queue:
+                path = queue.popleft()
+                in_flight[executor.submit(process_document, path)] = path
+            if not in_flight:
+                break
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            try:
+                for future in finished:
+                    path, ok, num_pages, elapsed = future.result()
+                    del in_flight[future]
+                    status = f"{num_pages} pages in {elapsed:.1f}s" if ok else "failed"
+                    print(f"{path}: {status}", flush=True)
+            except BrokenProcessPool:
+                # A worker died and took the pool down, all workers are gone. Documents they were
+                # processing count the attempt, documents that were not started yet stay pending.
+                executor.shutdown(cancel_futures=True)
+                if manifest.reset_running(args.max_attempts) == 0:
+                    raise RuntimeError("worker pool broke before any document was started, see the worker error above")
+                retry = [path for path in in_flight.values() if manifest.status(path) == PENDING]
+                print(f"worker process died, retrying {len(retry)} of {len(in_flight)} documents in flight", flush=True)
+                queue.extendleft(reversed(retry))
+                in_flight = {}
+                executor = make_executor(args, manifest_path)
+    finally:
+        executor.shutdown(cancel_futures=True)
+        stop_event.set()
+        report_thread.join()
+    print(reporter.format())
+    print(f'Batch done, results can be found at {args.output}')
+
+
+if __name__ == "__main__":
+    main(parse_args())
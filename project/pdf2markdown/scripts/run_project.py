@@ -6,6 +6,7 @@ from pdf2markdown import PDF2MARKDOWN
 
 sys.path.append(osp.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
 from pdf_extract_kit.utils.config_loader import load_config, initialize_tasks_and_models
+from pdf_extract_kit.utils.thread_budget import apply_thread_budget
 from pdf_extract_kit.registry.registry import TASK_REGISTRY
 
 
@@ -18,6 +19,7 @@ def parse_args():
 
 def main(config_path):
     config = load_config(config_path)
+    apply_thread_budget(config.get('threads'))
     task_instances = initialize_tasks_and_models(config)
 
     # get input and output path from config
@@ -25,14 +27,20 @@ def main(config_path):
     result_path = config.get('outputs', 'outputs/pdf_extract')
     visualize = config.get('visualize', False)
     merge2markdown = config.get('merge2markdown', False)
+    pipeline = config.get('pipeline', None)
+    concurrent_detection = config.get('concurrent_detection', False)
+    mfr_window = config.get('mfr_window', None)
+    memory = config.get('memory', None)
 
     layout_model = task_instances['layout_detection'].model if 'layout_detection' in task_instances else None
     mfd_model = task_instances['formula_detection'].model if 'formula_detection' in task_instances else None
     mfr_model = task_instances['formula_recognition'].model if 'formula_recognition' in task_instances else None
     ocr_model = task_instances['ocr'].model if 'ocr' in task_instances else None
     
-    pdf_extract_task = TASK_REGISTRY.get(TASK_NAME)(layout_model, mfd_model, mfr_model, ocr_model)
-    extract_results = pdf_extract_task.process(input_data, save_dir=result_path, visualize=visualize, merge2markdown=merge2markdown)
+    pdf_extract_task = TASK_REGISTRY.get(TASK_NAME)(layout_model, mfd_model, mfr_model, ocr_model, pipeline=pipeline, concurrent_detection=concurrent_detection,
+                                                    mfr_window=mfr_window, memory=memory)
+    with pdf_extract_task:
+        extract_results = pdf_extract_task.process(input_data, save_dir=result_path, visualize=visualize, merge2markdown=merge2markdown)
 
     print(f'Task done, results can be found at {result_path}')
 
@@ -0,0 +1,163 @@
+"""Distributed pdf2markdown over several nodes sharing a file system (e.g. NFS).
+
+Documents are split into shards in a queue directory, every worker process claims shards through
+lease files, renews its lease while working, and writes one result file per shard. Leases of dead
+workers expire and their shards are claimed again. Run several `work` processes against the same
+queue directory to try it on one machine.
+
+Example:
+    # once
+    python project/pdf2markdown/scripts/run_shards.py init --queue /nfs/jobs/run1 --input /nfs/pdfs --shard-size 50
+    # on every node, as many times as there are GPUs / core groups
+    python project/pdf2markdown/scripts/run_shards.py work --queue /nfs/jobs/run1 \
+        --config project/pdf2markdown/configs/pdf2markdown.yaml --output /nfs/outputs/run1
+    # progress, and merge when all shards are done
+    python project/pdf2markdown/scripts/run_shards.py status --queue /nfs/jobs/run1
+    python project/pdf2markdown/scripts/run_shards.py merge --queue /nfs/jobs/run1 --output /nfs/outputs/run1/results.jsonl
+"""
+import os
+import sys
+import copy
+import time
+import argparse
+import threading
+import traceback
+import os.path as osp
+
+sys.path.append(osp.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+from pdf_extract_kit.utils.config_loader import load_config, initialize_tasks_and_models
+from pdf_extract_kit.utils.thread_budget import apply_thread_budget
+from pdf_extract_kit.utils.shard_queue import ShardQueue, LeaseLost
+from pdf_extract_kit.utils.batch import atomic_write_json, atomic_write_text
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Distributed pdf2markdown through a shared file-system queue.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    init_parser = subparsers.add_parser('init', help='Split the input documents into shards.')
+    init_parser.add_argument('--queue', type=str, required=True, help='Queue directory on the shared file system.')
+    init_parser.add_argument('--input', type=str, required=True, help='Directory searched recursively for PDFs and images.')
+    init_parser.add_argument('--shard-size', type=int, default=50, help='Documents per shard.')
+
+    work_parser = subparsers.add_parser('work', help='Claim and process shards until none is left.')
+    work_parser.add_argument('--queue', type=str, required=True, help='Queue directory on the shared file system.')
+    work_parser.add_argument('--config', type=str, required=True, help='Path to the pdf2markdown configuration file.')
+    work_parser.add_argument('--output', type=str, required=True, help='Directory for the per-document json/md files.')
+    work_parser.add_argument('--lease-seconds', type=float, default=600, help='Lease duration, renewed every third of it.')
+    work_parser.add_argument('--worker-id', type=str, default=None, help='Defaults to <hostname>-<pid>.')
+
+    status_parser = subparsers.add_parser('status', help='Print shard counts.')
+    status_parser.add_argument('--queue', type=str, required=True)
+
+    merge_parser = subparsers.add_parser('merge', help='Merge the per-shard result files.')
+    merge_parser.add_argument('--queue', type=str, required=True)
+    merge_parser.add_argument('--output', type=str, required=True, help='Merged JSONL file.')
+    return parser.parse_args()
+
+
+def discover_documents(input_dir):
+    paths = []
+    for root, _, files in os.walk(input_dir):
+        for fname in files:
+            if fname.lower().endswith(('.pdf', '.png', '.jpg', '.jpeg')):
+                paths.append(os.path.abspath(os.path.join(root, fname)))
+    return sorted(paths)
+
+
+def build_task(config_path):
+    from pdf2markdown import PDF2MARKDOWN
+
+    config = load_config(config_path)
+    apply_thread_budget(config.get('threads'))
+    task_instances = initialize_tasks_and_models(config)
+    models = {name: task_instances[name].model if name in task_instances else None
+              for name in ['layout_detection', 'formula_detection', 'formula_recognition', 'ocr']}
+    task = PDF2MARKDOWN(models['layout_detection'], models['formula_detection'],
+                        models['formula_recognition'], models['ocr'],
+                        mfr_window=config.get('mfr_window', None), memory=config.get('memory', None))
+    return task, config.get('merge2markdown', True)
+
+
+def process_document(task, path, output_dir, merge2markdown):
+    """Run pdf2markdown on one document and return its result record."""
+    from PIL import Image
+    from pdf_extract_kit.utils.data_preprocess import load_pdf
+
+    start = time.time()
+    # output names are derived from the absolute path so that documents with equal names do not collide
+    stem = os.path.join(output_dir, os.path.splitext(path.lstrip(os.sep))[0])
+    try:
+        images = load_pdf(path) if path.lower().endswith('.pdf') else [Image.open(path).convert('RGB')]
+        pdf_extract_res = task.process_single_pdf(images)
+        atomic_write_json(f"{stem}.json", pdf_extract_res)
+        record = {'path': path, 'status': 'done', 'pages': len(images), 'json': f"{stem}.json"}
+        if merge2markdown:
+            md_content = [task.convert2md(copy.deepcopy(page_res)) for page_res in pdf_extract_res]
+            atomic_write_text(f"{stem}.md", "\n\n".join(md_content))
+            record['markdown'] = f"{stem}.md"
+    except Exception:
+        record = {'path': path, 'status': 'failed', 'error': traceback.format_exc()}
+    record['seconds'] = round(time.time() - start, 2)
+    return record
+
+
+def keep_alive(lease, stop_event, interval, lost_event):
+    while not stop_event.wait(interval):
+        try:
+            lease.renew()
+        except LeaseLost as e:
+            print(f"warning: {e}", flush=True)
+            lost_event.set()
+            return
+
+
+def work(args):
+    queue = ShardQueue(args.queue, lease_seconds=args.lease_seconds)
+    worker_id = args.worker_id or queue.default_worker_id()
+    task, merge2markdown = build_task(args.config)
+    while True:
+        lease = queue.claim(worker_id)
+        if lease is None:
+            break
+        print(f"{worker_id}: claimed {lease.shard_id}", flush=True)
+        stop_event, lost_event = threading.Event(), threading.Event()
+        heartbeat = threading.Thread(target=keep_alive, args=(lease, stop_event, args.lease_seconds / 3, lost_event), daemon=True)
+        heartbeat.start()
+        try:
+            records = []
+            for path in lease.documents():
+                if lost_event.is_set():
+                    break
+                records.append(process_document(task, path, args.output, merge2markdown))
+        except BaseException:
+            stop_event.set()
+            lease.release()
+            raise
+        stop_event.set()
+        heartbeat.join()
+        if lost_event.is_set():
+            # another worker owns the shard now and will write its results
+            continue
+        lease.complete(records)
+        failed = sum(record['status'] != 'done' for record in records)
+        print(f"{worker_id}: finished {lease.shard_id} ({len(records)} documents, {failed} failed)", flush=True)
+    print(f"{worker_id}: no shards left, {queue.status()}")
+
+
+def main(args):
+    if args.command == 'init':
+        queue = ShardQueue(args.queue)
+        created = queue.create(discover_documents(args.input), shard_size=args.shard_size)
+        print(f"created {created} shards, {queue.status()}")
+    elif args.command == 'work':
+        work(args)
+    elif args.command == 'status':
+        print(ShardQueue(args.queue).status())
+    elif args.command == 'merge':
+        num_records = ShardQueue(args.queue).merge(args.output)
+        print(f"merged {num_records} records into {args.output}")
+
+
+if __name__ == "__main__":
+    main(parse_args())
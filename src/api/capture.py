@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import shutil
+import threading
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import FormData
+
+from src.api.uploads import ON_FORM_SCOPE_KEY, SpooledUpload, SpooledUploadFile
+
+# 设置后记录 /api/v1 下的POST请求，供 benchmarks/bench_load.py 回放
+CAPTURE_DIR_ENV = "REQUEST_CAPTURE_DIR"
+CAPTURE_PREFIX = "/api/v1/"
+CAPTURE_LOG = "requests.jsonl"
+PAYLOAD_DIR = "payloads"
+
+_write_lock = threading.Lock()
+
+
+def capture_dir() -> Optional[str]:
+    """请求记录目录(REQUEST_CAPTURE_DIR)，未设置时不记录。
+
+    Returns:
+        Optional[str]: 记录目录
+    """
+    return os.getenv(CAPTURE_DIR_ENV) or None
+
+
+def capture_enabled() -> bool:
+    """是否启用请求记录。
+
+    Returns:
+        bool: 是否设置了REQUEST_CAPTURE_DIR
+    """
+    return capture_dir() is not None
+
+
+def store_payload(directory: str, upload: SpooledUpload) -> str:
+    """按SHA-256保存上传文件内容，相同内容只保存一份。
+
+    Args:
+        directory: 记录目录
+        upload: 接收完成的上传文件(内存中的内容或落盘文件)
+
+    Returns:
+        str: 内容的SHA-256
+    """
+    digest = upload.sha256
+    payload_dir = os.path.join(directory, PAYLOAD_DIR)
+    path = os.path.join(payload_dir, digest)
+    if not os.path.exists(path):
+        os.makedirs(payload_dir, exist_ok=True)
+        # 先写临时文件再改名，并发的相同上传不会留下不完整的文件
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        if upload.in_memory:
+            with open(tmp_path, "wb") as f:
+                f.write(upload.data)
+        else:
+            shutil.copyfile(upload.path, tmp_path)
+        os.replace(tmp_path, path)
+    return digest
+
+
+def append_record(directory: str, record: Dict[str, Any]) -> None:
+    """向requests.jsonl追加一条记录。
+
+    Args:
+        directory: 记录目录
+        record: 请求记录
+    """
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _write_lock:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, CAPTURE_LOG), "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+async def read_form(form: FormData, directory: str) -> Dict[str, Any]:
+    """保存表单中的上传文件并返回参数和文件记录。
+
+    Args:
+        form: 路由解析的表单，上传文件已接收完成(SpooledUploadFile)
+        directory: 记录目录
+
+    Returns:
+        Dict[str, Any]: {"params": {...}, "files": [{"field", "filename", "content_type", "sha256", "size"}]}
+    """
+    params: Dict[str, str] = {}
+    files: List[Dict[str, Any]] = []
+    for field, value in form.multi_items():
+        if isinstance(value, SpooledUploadFile):
+            # 表单由SpoolingRequest解析，直接使用已接收的内容
+            upload = value.upload
+            await upload.finish()
+            digest = await run_in_threadpool(store_payload, directory, upload)
+            files.append({
+                "field": field,
+                "filename": value.filename,
+                "content_type": value.content_type,
+                "sha256": digest,
+                "size": upload.size,
+            })
+        else:
+            params[field] = value
+    return {"params": params, "files": files}
+
+
+async def capture_request_middleware(request: Request, call_next):
+    """记录 /api/v1 下的POST请求(端点、表单参数、上传文件)及响应状态和耗时。
+
+    记录追加到 REQUEST_CAPTURE_DIR/requests.jsonl，上传文件按SHA-256保存在
+    REQUEST_CAPTURE_DIR/payloads/ 下，可用 benchmarks/bench_load.py 回放。
+    中间件不读取请求体：路由(SpoolingRoute)解析表单后回调保存上传文件，上传文件不会因记录
+    而多一份内存中的副本；没有解析表单的请求不记录。保存文件的时间不计入耗时，
+    记录失败不影响请求本身。
+
+    Args:
+        request: 请求
+        call_next: 下一个处理器
+
+    Returns:
+        Response: 原响应
+
+    Example:
+        REQUEST_CAPTURE_DIR=data/captures/2024-06-01 python main.py
+    """
+    directory = capture_dir()
+    if directory is None or request.method != "POST" or not request.url.path.startswith(CAPTURE_PREFIX):
+        return await call_next(request)
+
+    state: Dict[str, Any] = {"captured": None, "capture_seconds": 0.0}
+
+    async def on_form(form: FormData) -> None:
+        capture_start = time.perf_counter()
+        try:
+            state["captured"] = await read_form(form, directory)
+        except Exception:
+            state["captured"] = None
+        state["capture_seconds"] += time.perf_counter() - capture_start
+
+    request.scope[ON_FORM_SCOPE_KEY] = on_form
+    start = time.perf_counter()
+    response = await call_next(request)
+    captured = state["captured"]
+    if captured is not None:
+        record = {
+            "time": time.time(),
+            "endpoint": request.url.path,
+            **captured,
+            "status": response.status_code,
+            "latency_ms": (time.perf_counter() - start - state["capture_seconds"]) * 1000,
+        }
+        try:
+            await run_in_threadpool(append_record, directory, record)
+        except OSError:
+            pass
+    return response
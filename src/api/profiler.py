@@ -0,0 +1,171 @@
+import os
+import sys
+import time
+import cProfile
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+
+def frame_label(code) -> str:
+    """生成调用栈中一帧的名称，格式为 `函数名 (文件:定义行号)`。
+
+    项目内的文件使用相对路径，第三方库使用site-packages之后的路径，其余使用文件名。
+    按定义行号而非当前行号命名，使同一函数的采样能合并到一起。
+
+    Args:
+        code: 帧的code对象
+
+    Returns:
+        str: 帧名称(不含分号，可直接用于折叠栈格式)
+    """
+    path = code.co_filename
+    root = str(ROOT_DIR) + os.sep
+    if path.startswith(root):
+        path = path[len(root):]
+    elif "site-packages" + os.sep in path:
+        path = path.rsplit("site-packages" + os.sep, 1)[1]
+    else:
+        path = os.path.basename(path)
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+
+class StackSampler:
+    """采样分析器：按固定频率采集进程内所有线程的Python调用栈。
+
+    只使用标准库(sys._current_frames)，不需要在被分析的代码中安装钩子，
+    因此对正在处理的请求几乎没有影响。结果为折叠栈格式
+    (`线程名;外层帧;...;内层帧 次数`)，可直接交给flamegraph.pl或speedscope生成火焰图。
+
+    Args:
+        rate: 每秒采样次数
+
+    Example:
+        >>> sampler = StackSampler(rate=100)
+        >>> sampler.run(30)
+        >>> print(sampler.collapsed())
+    """
+
+    def __init__(self, rate: float = 100):
+        self.interval = 1.0 / rate
+        self.stacks = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._labels = {}
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = frame_label(code)
+        return label
+
+    def sample(self, skip_thread: Optional[int] = None) -> None:
+        """采集一次所有线程(skip_thread除外)的调用栈。
+
+        Args:
+            skip_thread: 不采集的线程ID，通常是采样线程自身
+        """
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip_thread:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}").replace(";", ":"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self, seconds: float) -> "StackSampler":
+        """在当前线程中采样seconds秒，返回self。
+
+        Args:
+            seconds: 采样时长(秒)
+
+        Returns:
+            StackSampler: 自身，便于链式调用
+        """
+        me = threading.get_ident()
+        start = time.perf_counter()
+        deadline = start + seconds
+        next_sample = start
+        while next_sample < deadline:
+            self.sample(skip_thread=me)
+            # 按固定节拍采样，采样本身的耗时不累积到间隔中
+            next_sample += self.interval
+            delay = next_sample - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_sample = time.perf_counter()
+        self.duration = time.perf_counter() - start
+        return self
+
+    def collapsed(self) -> str:
+        """按次数从高到低输出折叠栈文本。
+
+        Returns:
+            str: 每行一个调用栈，`帧;帧;... 次数`
+        """
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+    def summary(self) -> Dict[str, float]:
+        """采样统计信息。
+
+        Returns:
+            Dict[str, float]: 采样次数、实际时长和实际采样频率
+        """
+        return {
+            "samples": self.samples,
+            "duration": round(self.duration, 3),
+            "rate": round(self.samples / self.duration, 1) if self.duration else 0.0,
+        }
+
+
+def sample_stacks(seconds: float, rate: float = 100) -> StackSampler:
+    """采样所有线程seconds秒。
+
+    Args:
+        seconds: 采样时长(秒)
+        rate: 每秒采样次数
+
+    Returns:
+        StackSampler: 采样结果
+
+    Example:
+        >>> print(sample_stacks(10, rate=200).collapsed())
+    """
+    return StackSampler(rate).run(seconds)
+
+
+class RequestProfile:
+    """单个请求的cProfile分析，结束后写出可用pstats/snakeviz打开的.prof文件。
+
+    cProfile只分析启用它的线程；API的路由为async函数，模型推理在事件循环线程中运行，
+    因此能覆盖整个请求，但同一时间在事件循环上运行的其他请求也会被计入。
+
+    Args:
+        dump_path: .prof文件路径
+
+    Example:
+        >>> with RequestProfile("data/profiles/request.prof"):
+        ...     handle_request()
+    """
+
+    def __init__(self, dump_path: str):
+        self.dump_path = dump_path
+        self.profiler = cProfile.Profile()
+
+    def __enter__(self) -> "RequestProfile":
+        self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.profiler.disable()
+        os.makedirs(os.path.dirname(self.dump_path) or ".", exist_ok=True)
+        self.profiler.dump_stats(self.dump_path)
@@ -0,0 +1,180 @@
+import os
+import re
+import hmac
+import uuid
+import threading
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from src.api.profiler import RequestProfile, sample_stacks
+from src.api.utils import ensure_data_dir
+
+router = APIRouter()
+
+# 管理员令牌，未设置时调试端点全部关闭
+ADMIN_TOKEN_ENV = "DEBUG_ADMIN_TOKEN"
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+# 带此请求头(且令牌正确)的请求会被cProfile分析
+PROFILE_REQUEST_HEADER = "X-Profile-Request"
+PROFILE_DUMP_HEADER = "X-Profile-Dump"
+PROFILE_DIR = "data/profiles"
+# 保留的单请求分析结果数量，超过时删除最旧的
+MAX_DUMPS = 20
+
+MAX_SECONDS = 300
+MAX_RATE = 1000
+
+_sampling_lock = threading.Lock()
+_request_profile_lock = threading.Lock()
+_dump_name = re.compile(r"^[0-9a-f]{32}\.prof$")
+
+
+def debug_enabled() -> bool:
+    """是否配置了管理员令牌(DEBUG_ADMIN_TOKEN)。
+
+    Returns:
+        bool: 调试端点是否启用
+    """
+    return bool(os.getenv(ADMIN_TOKEN_ENV))
+
+
+def check_admin_token(token: Optional[str]) -> None:
+    """校验管理员令牌。
+
+    Args:
+        token: 请求头X-Admin-Token的值
+
+    Raises:
+        HTTPException: 未配置令牌时返回404，令牌错误时返回403
+    """
+    expected = os.getenv(ADMIN_TOKEN_ENV)
+    if not expected:
+        raise HTTPException(status_code=404, detail="调试端点未启用")
+    if not token or not hmac.compare_digest(token.encode("utf-8"), expected.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="管理员令牌无效")
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(30, gt=0, le=MAX_SECONDS),
+    rate: float = Query(100, gt=0, le=MAX_RATE),
+    x_admin_token: Optional[str] = Header(None)
+) -> PlainTextResponse:
+    """采样所有线程的调用栈，返回折叠栈格式的结果，用于生成火焰图。
+
+    采样在线程池中进行，事件循环和正在处理的请求照常运行并被采样。同一时间只允许一次采样。
+
+    Args:
+        seconds: 采样时长(秒)
+        rate: 每秒采样次数
+        x_admin_token: 管理员令牌(请求头X-Admin-Token)
+
+    Returns:
+        PlainTextResponse: 折叠栈文本，每行 `线程;帧;...;帧 次数`
+
+    Raises:
+        HTTPException: 令牌无效，或已有采样正在进行(409)
+
+    Example:
+        curl -H "X-Admin-Token: $DEBUG_ADMIN_TOKEN" "http://localhost:8000/debug/profile?seconds=30" > stacks.txt
+        flamegraph.pl stacks.txt > profile.svg
+    """
+    check_admin_token(x_admin_token)
+    if not _sampling_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="已有采样正在进行")
+    try:
+        sampler = await run_in_threadpool(sample_stacks, seconds, rate)
+    finally:
+        _sampling_lock.release()
+
+    summary = sampler.summary()
+    return PlainTextResponse(
+        sampler.collapsed(),
+        headers={
+            "X-Profile-Samples": str(summary["samples"]),
+            "X-Profile-Duration": str(summary["duration"]),
+        }
+    )
+
+
+@router.get("/profile/requests/{name}")
+async def profile_dump(name: str, x_admin_token: Optional[str] = Header(None)) -> FileResponse:
+    """下载单个请求的cProfile结果(.prof)。
+
+    Args:
+        name: 响应头X-Profile-Dump中返回的文件名
+        x_admin_token: 管理员令牌(请求头X-Admin-Token)
+
+    Returns:
+        FileResponse: .prof文件，可用 `python -m pstats` 或 snakeviz 打开
+
+    Raises:
+        HTTPException: 令牌无效或文件不存在
+    """
+    check_admin_token(x_admin_token)
+    path = os.path.join(PROFILE_DIR, name)
+    if not _dump_name.match(name) or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"分析结果不存在: {name}")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
+
+
+def prune_dumps(directory: str, keep: int = MAX_DUMPS) -> int:
+    """删除最旧的分析结果，只保留最新的keep个。
+
+    Args:
+        directory: 分析结果目录
+        keep: 保留的数量
+
+    Returns:
+        int: 删除的文件数
+    """
+    dumps = [entry for entry in os.scandir(directory) if entry.is_file() and _dump_name.match(entry.name)]
+    dumps.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in dumps[keep:]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+    return max(len(dumps) - keep, 0)
+
+
+async def profile_request_middleware(request: Request, call_next):
+    """对带有X-Profile-Request请求头的单个请求进行cProfile分析。
+
+    结果写入data/profiles/<id>.prof，文件名通过响应头X-Profile-Dump返回，
+    可通过 /debug/profile/requests/{name} 下载。同一时间只分析一个请求，只保留最新的MAX_DUMPS个结果。
+
+    Args:
+        request: 请求
+        call_next: 下一个处理器
+
+    Returns:
+        Response: 原响应(附带X-Profile-Dump)，令牌无效时为错误响应
+    """
+    if PROFILE_REQUEST_HEADER.lower() not in request.headers:
+        return await call_next(request)
+
+    try:
+        check_admin_token(request.headers.get(ADMIN_TOKEN_HEADER))
+    except HTTPException as e:
+        return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+    if not _request_profile_lock.acquire(blocking=False):
+        return JSONResponse(status_code=409, content={"detail": "已有请求正在被分析"})
+
+    try:
+        name = f"{uuid.uuid4().hex}.prof"
+        with RequestProfile(os.path.join(ensure_data_dir(PROFILE_DIR), name)):
+            response = await call_next(request)
+        await run_in_threadpool(prune_dumps, PROFILE_DIR)
+    finally:
+        _request_profile_lock.release()
+
+    response.headers[PROFILE_DUMP_HEADER] = name
+    return response
@@ -10,9 +10,11 @@ import rootutils
 
 ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
 
-from src.api.utils import save_upload_file_temp, encode_image_to_base64, cleanup_temp_dir
+from src.api.utils import encode_image_to_base64
+from src.api.uploads import spool_upload, SpoolingRoute, UploadTooLargeError
 
-router = APIRouter()
+# 上传文件在表单解析时只接收一份(内存或UPLOAD_SPOOL_DIR)
+router = APIRouter(route_class=SpoolingRoute)
 
 
 class UploadResponse(BaseModel):
@@ -57,14 +59,12 @@ async def upload_file(file: UploadFile = File(...)):
                 detail=f"不支持的文件类型: {ext}。只允许PDF或图像文件。"
             )
         
-        # 保存到临时文件
-        temp_dir, temp_file = await save_upload_file_temp(file)
+        # 接收上传文件，小文件只保存在内存中
+        upload = await spool_upload(file)
         
         try:
             # 将文件转换为Base64
-            file_content = ""
-            with open(temp_file, "rb") as f:
-                file_content = base64.b64encode(f.read()).decode("utf-8")
+            file_content = base64.b64encode(await upload.read()).decode("utf-8")
             
             return {
                 "success": True,
@@ -74,11 +74,13 @@ async def upload_file(file: UploadFile = File(...)):
                 "file_type": ext.lower().lstrip(".")
             }
         finally:
-            # 清理临时文件
-            cleanup_temp_dir(temp_dir)
+            # 清理落盘文件
+            upload.close()
     
     except HTTPException as e:
         raise e
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"文件上传失败: {str(e)}")
     finally:
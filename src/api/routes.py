@@ -4,7 +4,6 @@ import importlib.util
 import tempfile
 import base64
 import json
-import shutil
 from typing import Dict, List, Union
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
@@ -33,9 +32,14 @@ from src.api.models import (
     Base64Image,
     PDFToImagesRequest,
 )
-from src.api.utils import ensure_data_dir, save_upload_file_temp, encode_image_to_base64, cleanup_temp_dir, convert_pdf_to_images
+from src.api.utils import ensure_data_dir, encode_image_to_base64, cleanup_temp_dir, convert_pdf_to_images
+from src.api.utils import create_temp_output_dir
+from src.api.uploads import spool_upload, SpoolingRoute, UploadTooLargeError
+from src.api.utils import start_timer, stop_timer, attach_timings, count_detections
+from pdf_extract_kit.utils.stage_timer import timed, count
 
-router = APIRouter()
+# 上传文件在表单解析时只接收一份(内存或UPLOAD_SPOOL_DIR)
+router = APIRouter(route_class=SpoolingRoute)
 
 # 检查某个模块是否可用
 def check_module_available(module_name):
@@ -48,7 +52,8 @@ async def layout_detection(
     img_size: int = Form(1024),
     conf_thres: float = Form(0.25),
     iou_thres: float = Form(0.45),
-    visualize: bool = Form(False)
+    visualize: bool = Form(False),
+    timings: bool = Form(False)
 ) -> Dict:
     """布局检测API。临时处理文件，不保存在服务器上。
     
@@ -58,23 +63,26 @@ async def layout_detection(
         conf_thres: 置信度阈值
         iou_thres: IOU阈值
         visualize: 是否可视化结果
+        timings: 是否在results中返回各阶段耗时(timings)
     
     Returns:
         TaskResponse: 任务响应
     """
+    timer = start_timer(timings)
     temp_dir = None
+    upload = None
     
     try:
-        # 保存上传的文件到临时目录
-        temp_dir, temp_file = await save_upload_file_temp(file)
+        # 小文件直接在内存中交给任务处理，大文件写入落盘目录(UPLOAD_SPOOL_DIR)后传路径
+        with timed("upload_read"):
+            upload = await spool_upload(file)
         
-        # 创建临时输出目录
-        temp_output_dir = os.path.join(temp_dir, "output")
-        os.makedirs(temp_output_dir, exist_ok=True)
+        # 创建临时输出目录(可视化结果等)
+        temp_dir, temp_output_dir = create_temp_output_dir()
         
         # 创建配置
         config = {
-            "inputs": temp_file,
+            "inputs": file.filename,
             "outputs": temp_output_dir,
             "tasks": {
                 "layout_detection": {
@@ -91,73 +99,83 @@ async def layout_detection(
         }
         
         # 初始化任务和模型
-        task_instances = initialize_tasks_and_models(config)
+        with timed("model_init"):
+            task_instances = initialize_tasks_and_models(config)
         
         # 执行任务
         model = task_instances["layout_detection"]
-        model_results = model.predict_images(temp_file, temp_output_dir)
-        
-        # 获取id_to_names映射
-        id_to_names = {
-            0: 'title', 
-            1: 'plain text',
-            2: 'abandon', 
-            3: 'figure', 
-            4: 'figure_caption', 
-            5: 'table', 
-            6: 'table_caption', 
-            7: 'table_footnote', 
-            8: 'isolate_formula', 
-            9: 'formula_caption'
-        }
+        with timed("layout_detection"):
+            model_results = model.predict_images(upload.source, temp_output_dir)
+        
+        with timed("postprocess"):
+            # 获取id_to_names映射
+            id_to_names = {
+                0: 'title', 
+                1: 'plain text',
+                2: 'abandon', 
+                3: 'figure', 
+                4: 'figure_caption', 
+                5: 'table', 
+                6: 'table_caption', 
+                7: 'table_footnote', 
+                8: 'isolate_formula', 
+                9: 'formula_caption'
+            }
         
-        # 将YOLO模型结果转换为可序列化格式
-        results = []
-        for res in model_results:
-            if hasattr(res, '__dict__'):
-                # 获取YOLO结果的boxes, classes, scores
-                boxes = res.__dict__['boxes'].xyxy.tolist() if hasattr(res.__dict__['boxes'], 'xyxy') else []
-                classes = res.__dict__['boxes'].cls.tolist() if hasattr(res.__dict__['boxes'], 'cls') else []
-                scores = res.__dict__['boxes'].conf.tolist() if hasattr(res.__dict__['boxes'], 'conf') else []
+            # 将YOLO模型结果转换为可序列化格式
+            results = []
+            for res in model_results:
+                if hasattr(res, '__dict__'):
+                    # 获取YOLO结果的boxes, classes, scores
+                    boxes = res.__dict__['boxes'].xyxy.tolist() if hasattr(res.__dict__['boxes'], 'xyxy') else []
+                    classes = res.__dict__['boxes'].cls.tolist() if hasattr(res.__dict__['boxes'], 'cls') else []
+                    scores = res.__dict__['boxes'].conf.tolist() if hasattr(res.__dict__['boxes'], 'conf') else []
                 
-                # 构建结构化的检测结果
-                detections = []
-                for i in range(len(boxes)):
-                    if i < len(classes) and i < len(scores):
-                        detections.append({
-                            "box": boxes[i],
-                            "class": int(classes[i]),
-                            "class_name": id_to_names.get(int(classes[i]), "unknown"),
-                            "score": float(scores[i])
-                        })
+                    # 构建结构化的检测结果
+                    detections = []
+                    for i in range(len(boxes)):
+                        if i < len(classes) and i < len(scores):
+                            detections.append({
+                                "box": boxes[i],
+                                "class": int(classes[i]),
+                                "class_name": id_to_names.get(int(classes[i]), "unknown"),
+                                "score": float(scores[i])
+                            })
                 
-                results.append({
-                    "detections": detections
-                })
-            else:
-                # 如果结果已经是字典格式，直接添加
-                results.append(res)
-        
-        # 如果生成了可视化结果，则转换为Base64
-        if visualize:
-            # 查找可视化图像文件
-            visualization_results = []
-            for root, _, files in os.walk(temp_output_dir):
-                for file in files:
-                    if file.lower().endswith(('.png', '.jpg', '.jpeg')):
-                        img_path = os.path.join(root, file)
-                        base64_data = encode_image_to_base64(img_path)
-                        visualization_results.append(base64_data)
+                    results.append({
+                        "detections": detections
+                    })
+                else:
+                    # 如果结果已经是字典格式，直接添加
+                    results.append(res)
+        
+        if timer:
+            count("pages", len(results))
+            count("regions", count_detections(results))
+        
+        with timed("visualization"):
+            # 如果生成了可视化结果，则转换为Base64
+            if visualize:
+                # 查找可视化图像文件
+                visualization_results = []
+                for root, _, files in os.walk(temp_output_dir):
+                    for file in files:
+                        if file.lower().endswith(('.png', '.jpg', '.jpeg')):
+                            img_path = os.path.join(root, file)
+                            base64_data = encode_image_to_base64(img_path)
+                            visualization_results.append(base64_data)
             
-            # 添加可视化结果到返回数据
-            if results:
-                results[0]["visualizations"] = visualization_results
+                # 添加可视化结果到返回数据
+                if results:
+                    results[0]["visualizations"] = visualization_results
         
-        return {
+        return attach_timings({
             "success": True,
             "message": "布局检测任务完成",
             "results": results
-        }
+        }, timer)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         return {
             "success": False,
@@ -165,9 +183,12 @@ async def layout_detection(
             "results": None
         }
     finally:
+        stop_timer(timer)
         # 清理临时目录
         if temp_dir and os.path.exists(temp_dir):
             cleanup_temp_dir(temp_dir)
+        if upload is not None:
+            upload.close()
 
 
 @router.post("/ocr", response_model=TaskResponse)
@@ -178,7 +199,8 @@ async def ocr(
     det: bool = Form(True),
     rec: bool = Form(True),
     cls: bool = Form(True),
-    visualize: bool = Form(False)
+    visualize: bool = Form(False),
+    timings: bool = Form(False)
 ) -> Dict:
     """OCR文字识别API。临时处理文件，不保存在服务器上。
     
@@ -190,23 +212,26 @@ async def ocr(
         rec: 是否进行识别
         cls: 是否进行分类
         visualize: 是否可视化结果
+        timings: 是否在results中返回各阶段耗时(timings)
     
     Returns:
         TaskResponse: 任务响应
     """
+    timer = start_timer(timings)
     temp_dir = None
+    upload = None
     
     try:
-        # 保存上传的文件到临时目录
-        temp_dir, temp_file = await save_upload_file_temp(file)
+        # 小文件直接在内存中交给任务处理，大文件写入落盘目录(UPLOAD_SPOOL_DIR)后传路径
+        with timed("upload_read"):
+            upload = await spool_upload(file)
         
-        # 创建临时输出目录
-        temp_output_dir = os.path.join(temp_dir, "output")
-        os.makedirs(temp_output_dir, exist_ok=True)
+        # 创建临时输出目录(可视化结果等)
+        temp_dir, temp_output_dir = create_temp_output_dir()
         
         # 创建配置
         config = {
-            "inputs": temp_file,
+            "inputs": file.filename,
             "outputs": temp_output_dir,
             "visualize": visualize,
             "tasks": {
@@ -224,33 +249,44 @@ async def ocr(
         }
         
         # 初始化任务和模型
-        task_instances = initialize_tasks_and_models(config)
+        with timed("model_init"):
+            task_instances = initialize_tasks_and_models(config)
         
         # 执行任务
         task = task_instances["ocr"]
-        results = task.process(temp_file, save_dir=temp_output_dir, visualize=visualize)
-        
-        # 如果生成了可视化结果，则转换为Base64
-        if visualize:
-            # 查找可视化图像文件
-            visualization_results = []
-            for root, _, files in os.walk(temp_output_dir):
-                for file in files:
-                    if file.lower().endswith(('.png', '.jpg', '.jpeg')):
-                        img_path = os.path.join(root, file)
-                        base64_data = encode_image_to_base64(img_path)
-                        visualization_results.append(base64_data)
+        with timed("ocr"):
+            results = task.process(upload.source, save_dir=temp_output_dir, visualize=visualize)
+        
+        if timer:
+            # 图像输入每个文件一页，PDF输入每个文件为逐页结果的列表
+            pages = [page for res in results for page in (res if res and isinstance(res[0], list) else [res])]
+            count("pages", len(pages))
+            count("ocr_boxes", sum(len(page) for page in pages))
+        
+        with timed("visualization"):
+            # 如果生成了可视化结果，则转换为Base64
+            if visualize:
+                # 查找可视化图像文件
+                visualization_results = []
+                for root, _, files in os.walk(temp_output_dir):
+                    for file in files:
+                        if file.lower().endswith(('.png', '.jpg', '.jpeg')):
+                            img_path = os.path.join(root, file)
+                            base64_data = encode_image_to_base64(img_path)
+                            visualization_results.append(base64_data)
             
-            # 添加可视化结果到返回数据
-            if results is None:
-                results = {}
-            results["visualizations"] = visualization_results
+                # 添加可视化结果到返回数据
+                if results is None:
+                    results = {}
+                results["visualizations"] = visualization_results
         
-        return {
+        return attach_timings({
             "success": True,
             "message": "OCR任务完成",
             "results": results
-        }
+        }, timer)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         return {
             "success": False,
@@ -258,9 +294,12 @@ async def ocr(
             "results": None
         }
     finally:
+        stop_timer(timer)
         # 清理临时目录
         if temp_dir and os.path.exists(temp_dir):
             cleanup_temp_dir(temp_dir)
+        if upload is not None:
+            upload.close()
 
 
 @router.post("/formula-detection", response_model=TaskResponse)
@@ -269,7 +308,8 @@ async def formula_detection(
     img_size: int = Form(1024),
     conf_thres: float = Form(0.25),
     iou_thres: float = Form(0.45),
-    visualize: bool = Form(False)
+    visualize: bool = Form(False),
+    timings: bool = Form(False)
 ) -> Dict:
     """公式检测API。临时处理文件，不保存在服务器上。
     
@@ -279,23 +319,26 @@ async def formula_detection(
         conf_thres: 置信度阈值
         iou_thres: IOU阈值
         visualize: 是否可视化结果
+        timings: 是否在results中返回各阶段耗时(timings)
     
     Returns:
         TaskResponse: 任务响应
     """
+    timer = start_timer(timings)
     temp_dir = None
+    upload = None
     
     try:
-        # 保存上传的文件到临时目录
-        temp_dir, temp_file = await save_upload_file_temp(file)
+        # 小文件直接在内存中交给任务处理，大文件写入落盘目录(UPLOAD_SPOOL_DIR)后传路径
+        with timed("upload_read"):
+            upload = await spool_upload(file)
         
-        # 创建临时输出目录
-        temp_output_dir = os.path.join(temp_dir, "output")
-        os.makedirs(temp_output_dir, exist_ok=True)
+        # 创建临时输出目录(可视化结果等)
+        temp_dir, temp_output_dir = create_temp_output_dir()
         
         # 创建配置
         config = {
-            "inputs": temp_file,
+            "inputs": file.filename,
             "outputs": temp_output_dir,
             "tasks": {
                 "formula_detection": {
@@ -312,67 +355,77 @@ async def formula_detection(
         }
         
         # 初始化任务和模型
-        task_instances = initialize_tasks_and_models(config)
+        with timed("model_init"):
+            task_instances = initialize_tasks_and_models(config)
         
         # 执行任务
         model = task_instances["formula_detection"]
-        model_results = model.predict_images(temp_file, temp_output_dir)
-        
-        # 获取id_to_names映射
-        id_to_names = {
-            0: 'inline',
-            1: 'isolated'
-        }
+        with timed("formula_detection"):
+            model_results = model.predict_images(upload.source, temp_output_dir)
+        
+        with timed("postprocess"):
+            # 获取id_to_names映射
+            id_to_names = {
+                0: 'inline',
+                1: 'isolated'
+            }
         
-        # 将YOLO模型结果转换为可序列化格式
-        results = []
-        for res in model_results:
-            if hasattr(res, '__dict__'):
-                # 获取YOLO结果的boxes, classes, scores
-                boxes = res.__dict__['boxes'].xyxy.tolist() if hasattr(res.__dict__['boxes'], 'xyxy') else []
-                classes = res.__dict__['boxes'].cls.tolist() if hasattr(res.__dict__['boxes'], 'cls') else []
-                scores = res.__dict__['boxes'].conf.tolist() if hasattr(res.__dict__['boxes'], 'conf') else []
+            # 将YOLO模型结果转换为可序列化格式
+            results = []
+            for res in model_results:
+                if hasattr(res, '__dict__'):
+                    # 获取YOLO结果的boxes, classes, scores
+                    boxes = res.__dict__['boxes'].xyxy.tolist() if hasattr(res.__dict__['boxes'], 'xyxy') else []
+                    classes = res.__dict__['boxes'].cls.tolist() if hasattr(res.__dict__['boxes'], 'cls') else []
+                    scores = res.__dict__['boxes'].conf.tolist() if hasattr(res.__dict__['boxes'], 'conf') else []
                 
-                # 构建结构化的检测结果
-                detections = []
-                for i in range(len(boxes)):
-                    if i < len(classes) and i < len(scores):
-                        detections.append({
-                            "box": boxes[i],
-                            "class": int(classes[i]),
-                            "class_name": id_to_names.get(int(classes[i]), "unknown"),
-                            "score": float(scores[i])
-                        })
+                    # 构建结构化的检测结果
+                    detections = []
+                    for i in range(len(boxes)):
+                        if i < len(classes) and i < len(scores):
+                            detections.append({
+                                "box": boxes[i],
+                                "class": int(classes[i]),
+                                "class_name": id_to_names.get(int(classes[i]), "unknown"),
+                                "score": float(scores[i])
+                            })
                 
-                results.append({
-                    "detections": detections
-                })
-            else:
-                # 如果结果已经是字典格式，直接添加
-                results.append(res)
-        
-        # 如果生成了可视化结果，则转换为Base64
-        if visualize:
-            # 查找可视化图像文件
-            visualization_results = []
-            for root, _, files in os.walk(temp_output_dir):
-                for file in files:
-                    if file.lower().endswith(('.png', '.jpg', '.jpeg')):
-                        img_path = os.path.join(root, file)
-                        base64_data = encode_image_to_base64(img_path)
-                        visualization_results.append(base64_data)
+                    results.append({
+                        "detections": detections
+                    })
+                else:
+                    # 如果结果已经是字典格式，直接添加
+                    results.append(res)
+        
+        if timer:
+            count("pages", len(results))
+            count("formulas", count_detections(results))
+        
+        with timed("visualization"):
+            # 如果生成了可视化结果，则转换为Base64
+            if visualize:
+                # 查找可视化图像文件
+                visualization_results = []
+                for root, _, files in os.walk(temp_output_dir):
+                    for file in files:
+                        if file.lower().endswith(('.png', '.jpg', '.jpeg')):
+                            img_path = os.path.join(root, file)
+                            base64_data = encode_image_to_base64(img_path)
+                            visualization_results.append(base64_data)
             
-            # 添加可视化结果到返回数据
-            if results:
-                results[0]["visualizations"] = visualization_results
-            elif len(visualization_results) > 0:
-                results = [{"visualizations": visualization_results}]
+                # 添加可视化结果到返回数据
+                if results:
+                    results[0]["visualizations"] = visualization_results
+                elif len(visualization_results) > 0:
+                    results = [{"visualizations": visualization_results}]
         
-        return {
+        return attach_timings({
             "success": True,
             "message": "公式检测任务完成",
             "results": results
-        }
+        }, timer)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         return {
             "success": False,
@@ -380,9 +433,12 @@ async def formula_detection(
             "results": None
         }
     finally:
+        stop_timer(timer)
         # 清理临时目录
         if temp_dir and os.path.exists(temp_dir):
             cleanup_temp_dir(temp_dir)
+        if upload is not None:
+            upload.close()
 
 
 @router.post("/formula-recognition", response_model=TaskResponse)
@@ -390,7 +446,8 @@ async def formula_recognition(
     file: UploadFile = File(...),
     beam_size: int = Form(5),
     max_seq_length: int = Form(400),
-    visualize: bool = Form(False)
+    visualize: bool = Form(False),
+    timings: bool = Form(False)
 ) -> Dict:
     """公式识别API。临时处理文件，不保存在服务器上。
     
@@ -399,23 +456,26 @@ async def formula_recognition(
         beam_size: 束搜索大小
         max_seq_length: 最大序列长度
         visualize: 是否可视化结果
+        timings: 是否在results中返回各阶段耗时(timings)
     
     Returns:
         TaskResponse: 任务响应
     """
+    timer = start_timer(timings)
     temp_dir = None
+    upload = None
     
     try:
-        # 保存上传的文件到临时目录
-        temp_dir, temp_file = await save_upload_file_temp(file)
+        # 小文件直接在内存中交给任务处理，大文件写入落盘目录(UPLOAD_SPOOL_DIR)后传路径
+        with timed("upload_read"):
+            upload = await spool_upload(file)
         
-        # 创建临时输出目录
-        temp_output_dir = os.path.join(temp_dir, "output")
-        os.makedirs(temp_output_dir, exist_ok=True)
+        # 创建临时输出目录(可视化结果等)
+        temp_dir, temp_output_dir = create_temp_output_dir()
         
         # 创建配置
         config = {
-            "inputs": temp_file,
+            "inputs": file.filename,
             "outputs": temp_output_dir,
             "tasks": {
                 "formula_recognition": {
@@ -429,33 +489,41 @@ async def formula_recognition(
         }
         
         # 初始化任务和模型
-        task_instances = initialize_tasks_and_models(config)
+        with timed("model_init"):
+            task_instances = initialize_tasks_and_models(config)
         
         # 执行任务
         model = task_instances["formula_recognition"]
-        results = model.predict_images(temp_file, temp_output_dir)
-        
-        # 如果生成了可视化结果，则转换为Base64
-        if visualize:
-            # 查找可视化图像文件
-            visualization_results = []
-            for root, _, files in os.walk(temp_output_dir):
-                for file in files:
-                    if file.lower().endswith(('.png', '.jpg', '.jpeg')):
-                        img_path = os.path.join(root, file)
-                        base64_data = encode_image_to_base64(img_path)
-                        visualization_results.append(base64_data)
+        with timed("formula_recognition"):
+            results = model.predict_images(upload.source, temp_output_dir)
+        
+        if timer and isinstance(results, list):
+            count("formulas", len(results))
+        
+        with timed("visualization"):
+            # 如果生成了可视化结果，则转换为Base64
+            if visualize:
+                # 查找可视化图像文件
+                visualization_results = []
+                for root, _, files in os.walk(temp_output_dir):
+                    for file in files:
+                        if file.lower().endswith(('.png', '.jpg', '.jpeg')):
+                            img_path = os.path.join(root, file)
+                            base64_data = encode_image_to_base64(img_path)
+                            visualization_results.append(base64_data)
             
-            # 添加可视化结果到返回数据
-            if results is None:
-                results = {}
-            results["visualizations"] = visualization_results
+                # 添加可视化结果到返回数据
+                if results is None:
+                    results = {}
+                results["visualizations"] = visualization_results
         
-        return {
+        return attach_timings({
             "success": True,
             "message": "公式识别任务完成",
             "results": results
-        }
+        }, timer)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         return {
             "success": False,
@@ -463,38 +531,45 @@ async def formula_recognition(
             "results": None
         }
     finally:
+        stop_timer(timer)
         # 清理临时目录
         if temp_dir and os.path.exists(temp_dir):
             cleanup_temp_dir(temp_dir)
+        if upload is not None:
+            upload.close()
 
 
 @router.post("/table-parsing", response_model=TaskResponse)
 async def table_parsing(
     file: UploadFile = File(...),
-    visualize: bool = Form(False)
+    visualize: bool = Form(False),
+    timings: bool = Form(False)
 ) -> Dict:
     """表格解析API。临时处理文件，不保存在服务器上。
     
     Args:
         file: 要上传的PDF或图像文件
         visualize: 是否可视化结果
+        timings: 是否在results中返回各阶段耗时(timings)
     
     Returns:
         TaskResponse: 任务响应
     """
+    timer = start_timer(timings)
     temp_dir = None
+    upload = None
     
     try:
-        # 保存上传的文件到临时目录
-        temp_dir, temp_file = await save_upload_file_temp(file)
+        # 小文件直接在内存中交给任务处理，大文件写入落盘目录(UPLOAD_SPOOL_DIR)后传路径
+        with timed("upload_read"):
+            upload = await spool_upload(file)
         
-        # 创建临时输出目录
-        temp_output_dir = os.path.join(temp_dir, "output")
-        os.makedirs(temp_output_dir, exist_ok=True)
+        # 创建临时输出目录(可视化结果等)
+        temp_dir, temp_output_dir = create_temp_output_dir()
         
         # 创建配置
         config = {
-            "inputs": temp_file,
+            "inputs": file.filename,
             "outputs": temp_output_dir,
             "tasks": {
                 "table_parsing": {
@@ -509,33 +584,38 @@ async def table_parsing(
         }
         
         # 初始化任务和模型
-        task_instances = initialize_tasks_and_models(config)
+        with timed("model_init"):
+            task_instances = initialize_tasks_and_models(config)
         
         # 执行任务
         model = task_instances["table_parsing"]
-        results = model.predict_images(temp_file, temp_output_dir)
-        
-        # 如果生成了可视化结果，则转换为Base64
-        if visualize:
-            # 查找可视化图像文件
-            visualization_results = []
-            for root, _, files in os.walk(temp_output_dir):
-                for file in files:
-                    if file.lower().endswith(('.png', '.jpg', '.jpeg')):
-                        img_path = os.path.join(root, file)
-                        base64_data = encode_image_to_base64(img_path)
-                        visualization_results.append(base64_data)
+        with timed("table_parsing"):
+            results = model.predict_images(upload.source, temp_output_dir)
+        
+        with timed("visualization"):
+            # 如果生成了可视化结果，则转换为Base64
+            if visualize:
+                # 查找可视化图像文件
+                visualization_results = []
+                for root, _, files in os.walk(temp_output_dir):
+                    for file in files:
+                        if file.lower().endswith(('.png', '.jpg', '.jpeg')):
+                            img_path = os.path.join(root, file)
+                            base64_data = encode_image_to_base64(img_path)
+                            visualization_results.append(base64_data)
             
-            # 添加可视化结果到返回数据
-            if results is None:
-                results = {}
-            results["visualizations"] = visualization_results
+                # 添加可视化结果到返回数据
+                if results is None:
+                    results = {}
+                results["visualizations"] = visualization_results
         
-        return {
+        return attach_timings({
             "success": True,
             "message": "表格解析任务完成",
             "results": results
-        }
+        }, timer)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         return {
             "success": False,
@@ -543,38 +623,45 @@ async def table_parsing(
             "results": None
         }
     finally:
+        stop_timer(timer)
         # 清理临时目录
         if temp_dir and os.path.exists(temp_dir):
             cleanup_temp_dir(temp_dir)
+        if upload is not None:
+            upload.close()
 
 
 @router.post("/pdf2markdown", response_model=TaskResponse)
 async def pdf2markdown(
     file: UploadFile = File(...),
-    merge2markdown: bool = Form(True)
+    merge2markdown: bool = Form(True),
+    timings: bool = Form(False)
 ) -> Dict:
     """PDF转Markdown API。临时处理文件，不保存在服务器上。
     
     Args:
         file: 要上传的PDF文件
         merge2markdown: 是否合并为Markdown
+        timings: 是否在results中返回各阶段耗时(timings)
     
     Returns:
         TaskResponse: 任务响应
     """
+    timer = start_timer(timings)
     temp_dir = None
+    upload = None
     
     try:
-        # 保存上传的文件到临时目录
-        temp_dir, temp_file = await save_upload_file_temp(file)
+        # 小文件直接在内存中交给任务处理，大文件写入落盘目录(UPLOAD_SPOOL_DIR)后传路径
+        with timed("upload_read"):
+            upload = await spool_upload(file)
         
-        # 创建临时输出目录
-        temp_output_dir = os.path.join(temp_dir, "output")
-        os.makedirs(temp_output_dir, exist_ok=True)
+        # 创建临时输出目录(可视化结果等)
+        temp_dir, temp_output_dir = create_temp_output_dir()
         
         # 创建配置
         config = {
-            "inputs": temp_file,
+            "inputs": file.filename,
             "outputs": temp_output_dir,
             "tasks": {
                 "layout_detection": {
@@ -604,23 +691,28 @@ async def pdf2markdown(
         }
         
         # 初始化任务和模型
-        task_instances = initialize_tasks_and_models(config)
+        with timed("model_init"):
+            task_instances = initialize_tasks_and_models(config)
         
         # 执行布局检测
         layout_detection_task = task_instances["layout_detection"]
-        layout_results = layout_detection_task.predict_images(temp_file, temp_output_dir)
+        with timed("layout_detection"):
+            layout_results = layout_detection_task.predict_images(upload.source, temp_output_dir)
         
         # 执行文字识别
         ocr_task = task_instances["ocr"]
-        ocr_results = ocr_task.process(temp_file, save_dir=temp_output_dir)
+        with timed("ocr"):
+            ocr_results = ocr_task.process(upload.source, save_dir=temp_output_dir)
         
         # 执行公式检测
         formula_detection_task = task_instances["formula_detection"]
-        formula_detection_results = formula_detection_task.predict_images(temp_file, temp_output_dir)
+        with timed("formula_detection"):
+            formula_detection_results = formula_detection_task.predict_images(upload.source, temp_output_dir)
         
         # 执行公式识别
         formula_recognition_task = task_instances["formula_recognition"]
-        formula_recognition_results = formula_recognition_task.predict_images(temp_file, temp_output_dir)
+        with timed("formula_recognition"):
+            formula_recognition_results = formula_recognition_task.predict_images(upload.source, temp_output_dir)
         
         # 合并结果
         results = {
@@ -631,29 +723,37 @@ async def pdf2markdown(
         }
         
         # 合并为Markdown
-        if merge2markdown:
-            # 这里假设有一个函数来合并结果为Markdown
-            from pdf_extract_kit.utils.pdf2markdown import merge_to_markdown
-            markdown_path = os.path.join(temp_output_dir, "output.md")
-            markdown_content = merge_to_markdown(
-                layout_results, 
-                ocr_results, 
-                formula_detection_results, 
-                formula_recognition_results,
-                save_path=markdown_path
-            )
-            
-            # 读取Markdown内容
-            with open(markdown_path, "r", encoding="utf-8") as f:
-                markdown_content = f.read()
-            
-            results["markdown"] = markdown_content
+        with timed("postprocess"):
+            if merge2markdown:
+                # 这里假设有一个函数来合并结果为Markdown
+                from pdf_extract_kit.utils.pdf2markdown import merge_to_markdown
+                markdown_path = os.path.join(temp_output_dir, "output.md")
+                markdown_content = merge_to_markdown(
+                    layout_results, 
+                    ocr_results, 
+                    formula_detection_results, 
+                    formula_recognition_results,
+                    save_path=markdown_path
+                )
+                
+                # 读取Markdown内容
+                with open(markdown_path, "r", encoding="utf-8") as f:
+                    markdown_content = f.read()
+                
+                results["markdown"] = markdown_content
         
-        return {
+        if timer:
+            count("pages", len(layout_results))
+            count("regions", sum(len(getattr(res, "boxes", None) or []) for res in layout_results))
+            count("formulas", sum(len(getattr(res, "boxes", None) or []) for res in formula_detection_results))
+        
+        return attach_timings({
             "success": True,
             "message": "PDF转Markdown任务完成",
             "results": results
-        }
+        }, timer)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         return {
             "success": False,
@@ -661,34 +761,41 @@ async def pdf2markdown(
             "results": None
         }
     finally:
+        stop_timer(timer)
         # 清理临时目录
         if temp_dir and os.path.exists(temp_dir):
             cleanup_temp_dir(temp_dir)
+        if upload is not None:
+            upload.close()
 
 
 @router.post("/run-project", response_model=TaskResponse)
 async def run_project(
     file: UploadFile = File(...),
-    config_content: str = Form("")
+    config_content: str = Form(""),
+    timings: bool = Form(False)
 ) -> Dict:
     """通过配置运行整个项目。临时处理文件，不保存在服务器上。
     
     Args:
         file: 要上传的PDF文件
         config_content: YAML格式的配置内容字符串
+        timings: 是否在results中返回各阶段耗时(timings)
     
     Returns:
         TaskResponse: 任务响应
     """
+    timer = start_timer(timings)
     temp_dir = None
+    upload = None
     
     try:
-        # 保存上传的文件到临时目录
-        temp_dir, temp_file = await save_upload_file_temp(file)
+        # 小文件直接在内存中交给任务处理，大文件写入落盘目录(UPLOAD_SPOOL_DIR)后传路径
+        with timed("upload_read"):
+            upload = await spool_upload(file)
         
-        # 创建临时输出目录
-        temp_output_dir = os.path.join(temp_dir, "output")
-        os.makedirs(temp_output_dir, exist_ok=True)
+        # 创建临时输出目录(可视化结果等)
+        temp_dir, temp_output_dir = create_temp_output_dir()
         
         # 如果提供了配置内容，则保存为临时配置文件
         if config_content:
@@ -698,7 +805,7 @@ async def run_project(
         else:
             # 使用默认配置
             config = {
-                "inputs": temp_file,
+                "inputs": file.filename,
                 "outputs": temp_output_dir,
                 "tasks": {
                     "layout_detection": {
@@ -733,58 +840,66 @@ async def run_project(
         # 加载配置
         config = load_config(temp_config_path)
         
+        # 线程预算只由服务的环境变量(THREAD_BUDGET_*)决定，客户端配置不能修改整个进程的线程数
+        config.pop("threads", None)
         # 修改输入和输出路径为临时路径
-        config["inputs"] = temp_file
+        config["inputs"] = file.filename
         config["outputs"] = temp_output_dir
         
         # 初始化任务和模型
-        task_instances = initialize_tasks_and_models(config)
+        with timed("model_init"):
+            task_instances = initialize_tasks_and_models(config)
         
         # 执行任务并收集结果
         results = {}
         for task_name, task in task_instances.items():
-            if hasattr(task, "predict_images"):
-                task_results = task.predict_images(temp_file, temp_output_dir)
-            elif hasattr(task, "process"):
-                task_results = task.process(temp_file, save_dir=temp_output_dir)
-            else:
-                task_results = {"error": f"任务{task_name}没有可用的执行方法"}
+            with timed(task_name):
+                if hasattr(task, "predict_images"):
+                    task_results = task.predict_images(upload.source, temp_output_dir)
+                elif hasattr(task, "process"):
+                    task_results = task.process(upload.source, save_dir=temp_output_dir)
+                else:
+                    task_results = {"error": f"任务{task_name}没有可用的执行方法"}
             
             results[task_name] = task_results
         
         # 检查输出目录中的所有图像文件，并转换为Base64
-        visualization_results = []
-        for root, _, files in os.walk(temp_output_dir):
-            for file in files:
-                if file.lower().endswith(('.png', '.jpg', '.jpeg')):
-                    img_path = os.path.join(root, file)
-                    base64_data = encode_image_to_base64(img_path)
-                    visualization_results.append({"filename": file, "data": base64_data})
+        with timed("visualization"):
+            visualization_results = []
+            for root, _, files in os.walk(temp_output_dir):
+                for file in files:
+                    if file.lower().endswith(('.png', '.jpg', '.jpeg')):
+                        img_path = os.path.join(root, file)
+                        base64_data = encode_image_to_base64(img_path)
+                        visualization_results.append({"filename": file, "data": base64_data})
         
         # 添加可视化结果到返回数据
         results["visualizations"] = visualization_results
         
         # 收集所有文本文件内容
-        text_results = []
-        for root, _, files in os.walk(temp_output_dir):
-            for file in files:
-                if file.lower().endswith(('.txt', '.md', '.json')):
-                    file_path = os.path.join(root, file)
-                    try:
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            content = f.read()
-                        text_results.append({"filename": file, "content": content})
-                    except Exception as e:
-                        text_results.append({"filename": file, "error": str(e)})
+        with timed("postprocess"):
+            text_results = []
+            for root, _, files in os.walk(temp_output_dir):
+                for file in files:
+                    if file.lower().endswith(('.txt', '.md', '.json')):
+                        file_path = os.path.join(root, file)
+                        try:
+                            with open(file_path, "r", encoding="utf-8") as f:
+                                content = f.read()
+                            text_results.append({"filename": file, "content": content})
+                        except Exception as e:
+                            text_results.append({"filename": file, "error": str(e)})
         
         # 添加文本文件内容到返回数据
         results["text_files"] = text_results
         
-        return {
+        return attach_timings({
             "success": True,
             "message": "项目运行完成",
             "results": results
-        }
+        }, timer)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         return {
             "success": False,
@@ -792,16 +907,20 @@ async def run_project(
             "results": None
         }
     finally:
+        stop_timer(timer)
         # 清理临时目录
         if temp_dir and os.path.exists(temp_dir):
             cleanup_temp_dir(temp_dir)
+        if upload is not None:
+            upload.close()
 
 
 @router.post("/pdf-to-images", response_model=TaskResponse)
 async def pdf_to_images(
     file: UploadFile = File(...),
     dpi: int = Form(200),
-    output_format: str = Form("png")
+    output_format: str = Form("png"),
+    timings: bool = Form(False)
 ) -> Dict:
     """将PDF转换为图像API。
     
@@ -809,11 +928,14 @@ async def pdf_to_images(
         file: 要上传的PDF文件
         dpi: 图像DPI
         output_format: 输出图像格式(png或jpg)
+        timings: 是否在results中返回各阶段耗时(timings)
     
     Returns:
         TaskResponse: 任务响应，包含生成的图像信息
     """
+    timer = start_timer(timings)
     temp_dir = None
+    upload = None
     
     try:
         # 检查文件扩展名是否为PDF
@@ -825,11 +947,12 @@ async def pdf_to_images(
             }
         
         # 保存上传的文件到临时目录
-        temp_dir, temp_file = await save_upload_file_temp(file)
+        with timed("upload_read"):
+            upload = await spool_upload(file)
+            temp_file = await upload.to_path()
         
         # 创建临时输出目录
-        temp_output_dir = os.path.join(temp_dir, "output")
-        os.makedirs(temp_output_dir, exist_ok=True)
+        temp_dir, temp_output_dir = create_temp_output_dir()
         
         # 检查输出格式是否有效
         if output_format.lower() not in ["png", "jpg", "jpeg"]:
@@ -844,23 +967,27 @@ async def pdf_to_images(
         )
         
         # 将图像转换为Base64
-        images_base64 = []
-        for image_path in image_paths:
-            base64_data = encode_image_to_base64(image_path)
-            images_base64.append({
-                "filename": os.path.basename(image_path),
-                "format": base64_data["format"],
-                "data": base64_data["data"]
-            })
+        with timed("visualization"):
+            images_base64 = []
+            for image_path in image_paths:
+                base64_data = encode_image_to_base64(image_path)
+                images_base64.append({
+                    "filename": os.path.basename(image_path),
+                    "format": base64_data["format"],
+                    "data": base64_data["data"]
+                })
+        count("pages", len(image_paths))
         
-        return {
+        return attach_timings({
             "success": True,
             "message": f"PDF已成功转换为{len(image_paths)}张图像",
             "results": {
                 "page_count": len(image_paths),
                 "images": images_base64
             }
-        }
+        }, timer)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         return {
             "success": False,
@@ -868,16 +995,20 @@ async def pdf_to_images(
             "results": None
         }
     finally:
+        stop_timer(timer)
         # 清理临时目录
         if temp_dir and os.path.exists(temp_dir):
             cleanup_temp_dir(temp_dir)
+        if upload is not None:
+            upload.close()
 
 
 @router.post("/pdf-to-images-save", response_model=TaskResponse)
 async def pdf_to_images_save(
     file: UploadFile = File(...),
     dpi: int = Form(200),
-    output_format: str = Form("png")
+    output_format: str = Form("png"),
+    timings: bool = Form(False)
 ) -> Dict:
     """将PDF转换为图像API（持久化版本）。图像保存在服务器上，不返回Base64数据。
     
@@ -885,10 +1016,14 @@ async def pdf_to_images_save(
         file: 要上传的PDF文件
         dpi: 图像DPI
         output_format: 输出图像格式(png或jpg)
+        timings: 是否在results中返回各阶段耗时(timings)
     
     Returns:
         TaskResponse: 任务响应，包含保存的图像文件路径
     """
+    timer = start_timer(timings)
+    upload = None
+    
     try:
         # 检查文件扩展名是否为PDF
         if not file.filename.lower().endswith(".pdf"):
@@ -906,9 +1041,10 @@ async def pdf_to_images_save(
         output_dir = ensure_data_dir(f"data/outputs/pdf_to_images/{task_id}")
         
         # 保存上传的PDF文件
-        file_path = os.path.join(upload_dir, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        file_path = os.path.join(upload_dir, os.path.basename(file.filename))
+        with timed("upload_read"):
+            upload = await spool_upload(file)
+            await upload.save(file_path)
         
         # 检查输出格式是否有效
         if output_format.lower() not in ["png", "jpg", "jpeg"]:
@@ -924,8 +1060,9 @@ async def pdf_to_images_save(
         
         # 准备返回结果
         relative_paths = [os.path.relpath(path, ROOT_DIR) for path in image_paths]
+        count("pages", len(image_paths))
         
-        return {
+        return attach_timings({
             "success": True,
             "message": f"PDF已成功转换为{len(image_paths)}张图像",
             "results": {
@@ -933,10 +1070,16 @@ async def pdf_to_images_save(
                 "image_paths": relative_paths,
                 "output_dir": os.path.relpath(output_dir, ROOT_DIR)
             }
-        }
+        }, timer)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         return {
             "success": False,
             "message": f"PDF转图像任务失败: {str(e)}",
             "results": None
-        }
\ No newline at end of file
+        }
+    finally:
+        stop_timer(timer)
+        if upload is not None:
+            upload.close()
@@ -0,0 +1,509 @@
+import os
+import re
+import shutil
+import hashlib
+import tempfile
+from contextlib import aclosing
+from typing import Any, Callable, Coroutine, List, Optional, Union
+
+import aiofiles
+from fastapi import HTTPException, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.datastructures import FormData, Headers
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from pdf_extract_kit.utils.data_preprocess import is_pdf_bytes
+from pdf_extract_kit.utils.stage_timer import count
+
+# 上传文件大小上限，超过时拒绝(0表示不限制)
+UPLOAD_MAX_BYTES_ENV = "UPLOAD_MAX_BYTES"
+# 不超过此大小的上传只保存在内存中，更大的写入落盘目录
+UPLOAD_MEMORY_BYTES_ENV = "UPLOAD_MEMORY_BYTES"
+# 大文件的落盘目录，建议使用tmpfs(如/dev/shm)，默认为系统临时目录
+UPLOAD_SPOOL_DIR_ENV = "UPLOAD_SPOOL_DIR"
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MEMORY_BYTES = 16 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+# multipart请求体中表单字段和分隔符的余量
+FORM_OVERHEAD_BYTES = 64 * 1024
+# 请求scope中表单解析完成后的回调(见SpoolingRequest)
+ON_FORM_SCOPE_KEY = "pdf_extract_kit.on_form"
+
+_size_pattern = re.compile(r"^(\d+)\s*([KMG]?)I?B?$", re.IGNORECASE)
+_suffix_pattern = re.compile(r"^\.[a-z0-9]{1,8}$")
+_units = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+class UploadTooLargeError(ValueError):
+    """上传文件超过UPLOAD_MAX_BYTES。"""
+
+    def __init__(self, limit: int):
+        super().__init__(f"上传文件超过大小限制({limit}字节)")
+        self.limit = limit
+
+
+def parse_size(value: str) -> int:
+    """解析字节数，支持K、M、G后缀(1024进制)。
+
+    Args:
+        value: 如"16777216"、"16M"、"1GB"
+
+    Returns:
+        int: 字节数
+
+    Example:
+        >>> parse_size("16M")
+        16777216
+    """
+    match = _size_pattern.match(value.strip())
+    if match is None:
+        raise ValueError(f"无效的大小: {value}")
+    return int(match.group(1)) * _units[match.group(2).upper()]
+
+
+def _env_size(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return parse_size(value) if value else default
+
+
+def upload_max_bytes() -> int:
+    """上传文件大小上限(UPLOAD_MAX_BYTES)，0表示不限制。
+
+    Returns:
+        int: 字节数
+    """
+    return _env_size(UPLOAD_MAX_BYTES_ENV, DEFAULT_MAX_BYTES)
+
+
+def upload_memory_bytes() -> int:
+    """内存中保存的上传文件的最大大小(UPLOAD_MEMORY_BYTES)。
+
+    Returns:
+        int: 字节数
+    """
+    return _env_size(UPLOAD_MEMORY_BYTES_ENV, DEFAULT_MEMORY_BYTES)
+
+
+def upload_spool_dir() -> Optional[str]:
+    """大文件的落盘目录(UPLOAD_SPOOL_DIR)，未设置时为系统临时目录。
+
+    Returns:
+        Optional[str]: 目录路径
+    """
+    return os.getenv(UPLOAD_SPOOL_DIR_ENV) or None
+
+
+def safe_suffix(filename: Optional[str]) -> str:
+    """客户端文件名的扩展名，只保留短的字母数字扩展名，文件名本身不用于本地路径。
+
+    Args:
+        filename: 客户端提供的文件名
+
+    Returns:
+        str: 小写扩展名(含"."), 不合法时为空字符串
+    """
+    suffix = os.path.splitext(os.path.basename(filename or ""))[1].lower()
+    return suffix if _suffix_pattern.match(suffix) else ""
+
+
+class SpooledUpload:
+    """已接收的上传文件：小文件保存在内存中，大文件保存在落盘目录中。
+
+    Args:
+        filename: 客户端提供的文件名
+        content_type: 内容类型
+        spool_dir: 落盘目录，None时为系统临时目录
+
+    Example:
+        >>> upload = await spool_upload(file)
+        >>> try:
+        ...     results = task.predict_images(upload.source, output_dir)
+        ... finally:
+        ...     upload.close()
+    """
+
+    def __init__(self, filename: Optional[str], content_type: Optional[str], spool_dir: Optional[str] = None):
+        self.filename = filename
+        self.content_type = content_type
+        self.size = 0
+        self.sha256 = ""
+        self.path: Optional[str] = None
+        self._digest = hashlib.sha256()
+        self._chunks: List[bytes] = []
+        self._data: Optional[bytes] = None
+        self._spool_dir = spool_dir
+        self._temp_dir: Optional[str] = None
+        self._file = None
+
+    @property
+    def in_memory(self) -> bool:
+        return self.path is None
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """交给任务的输入：内存中的内容，或落盘文件的路径。"""
+        return self.data if self.in_memory else self.path
+
+    @property
+    def data(self) -> bytes:
+        """内存中的内容(仅in_memory时可用)。"""
+        if self._data is None:
+            self._data = b"".join(self._chunks)
+            self._chunks = []
+        return self._data
+
+    def new_spool_path(self, head: bytes) -> str:
+        """在落盘目录中创建文件路径，PDF内容使用.pdf扩展名，其余沿用客户端扩展名。"""
+        self._temp_dir = tempfile.mkdtemp(prefix="upload_", dir=self._spool_dir)
+        suffix = ".pdf" if is_pdf_bytes(head) else safe_suffix(self.filename)
+        return os.path.join(self._temp_dir, f"upload{suffix}")
+
+    async def write(self, chunk: bytes, memory_bytes: int) -> None:
+        """追加一个分块并更新SHA-256，总大小超过memory_bytes后转为写入落盘文件。"""
+        self.size += len(chunk)
+        self._digest.update(chunk)
+        self._chunks.append(chunk)
+        if self._file is None and self.size > memory_bytes:
+            self.path = self.new_spool_path(self._chunks[0][:1024])
+            self._file = open(self.path, "wb")
+        if self._file is not None:
+            # 使用同步文件对象，解析出错时close()可以直接关闭
+            await run_in_threadpool(self._file.writelines, self._chunks)
+            self._chunks = []
+
+    async def finish(self) -> None:
+        """接收结束，关闭落盘文件并计算SHA-256(可重复调用)。"""
+        if self._file is not None:
+            await run_in_threadpool(self._file.close)
+            self._file = None
+        if not self.sha256:
+            self.sha256 = self._digest.hexdigest()
+
+    async def read(self) -> bytes:
+        """读取全部内容。
+
+        Returns:
+            bytes: 文件内容
+        """
+        if self.in_memory:
+            return self.data
+        async with aiofiles.open(self.path, "rb") as f:
+            return await f.read()
+
+    async def to_path(self) -> str:
+        """返回文件路径，内存中的内容先写入落盘目录(供只接受路径的工具使用)。
+
+        Returns:
+            str: 文件路径
+        """
+        if self.in_memory:
+            data = self.data
+            path = self.new_spool_path(data[:1024])
+            async with aiofiles.open(path, "wb") as f:
+                await f.write(data)
+            self.path = path
+            self._data = None
+        return self.path
+
+    async def save(self, path: str) -> str:
+        """将内容保存到指定路径(持久化)。
+
+        Args:
+            path: 目标路径
+
+        Returns:
+            str: 目标路径
+        """
+        if self.in_memory:
+            async with aiofiles.open(path, "wb") as f:
+                await f.write(self.data)
+        else:
+            # 落盘目录可能在另一个文件系统(tmpfs)上，move会退化为复制
+            await run_in_threadpool(shutil.move, self.path, path)
+            self.path = path
+        return path
+
+    def close(self) -> None:
+        """释放内存中的内容并删除落盘文件。"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._chunks = []
+        self._data = None
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+
+
+class SpooledUploadFile(UploadFile):
+    """表单解析时直接写入SpooledUpload的UploadFile，由SpoolingRoute的路由使用。
+
+    表单解析只接收一份：不超过memory_bytes的保存在内存中，更大的写入spool_dir，
+    同时计算SHA-256和大小；超过max_bytes时抛出UploadTooLargeError。
+    spool_upload直接返回其中的SpooledUpload，不再复制。
+
+    Args:
+        upload: 接收内容的SpooledUpload
+        headers: 表单分段的头
+        max_bytes: 大小上限，0表示不限制
+        memory_bytes: 内存中保存的最大大小
+    """
+
+    def __init__(self, upload: SpooledUpload, headers: Headers, max_bytes: int, memory_bytes: int):
+        super().__init__(file=None, size=0, filename=upload.filename, headers=headers)
+        self.upload = upload
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._position = 0
+
+    async def write(self, data: bytes) -> None:
+        if self.max_bytes and self.upload.size + len(data) > self.max_bytes:
+            raise UploadTooLargeError(self.max_bytes)
+        await self.upload.write(data, self.memory_bytes)
+        self.size = self.upload.size
+
+    async def read(self, size: int = -1) -> bytes:
+        await self.upload.finish()
+        if self.upload.in_memory:
+            data = self.upload.data
+            end = len(data) if size < 0 else self._position + size
+            chunk = data[self._position:end]
+        else:
+            chunk = await run_in_threadpool(self._read_spooled, size)
+        self._position += len(chunk)
+        return chunk
+
+    def _read_spooled(self, size: int) -> bytes:
+        with open(self.upload.path, "rb") as f:
+            f.seek(self._position)
+            return f.read(size)
+
+    async def seek(self, offset: int) -> None:
+        # 表单解析在每个文件分段结束时调用seek(0)
+        await self.upload.finish()
+        self._position = offset
+
+    async def close(self) -> None:
+        self.upload.close()
+
+
+class SpoolingMultiPartParser(MultiPartParser):
+    """将文件分段直接接收到SpooledUploadFile中的表单解析器(替代Starlette的SpooledTemporaryFile)。
+
+    Args:
+        headers: 请求头
+        stream: 请求体
+        max_bytes: 单个文件的大小上限，0表示不限制
+        memory_bytes: 内存中保存的最大大小
+        spool_dir: 落盘目录，None时为系统临时目录
+    """
+
+    def __init__(self, headers: Headers, stream, *, max_bytes: int, memory_bytes: int,
+                 spool_dir: Optional[str] = None, **kwargs):
+        super().__init__(headers, stream, **kwargs)
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self.spool_dir = spool_dir
+
+    def on_headers_finished(self) -> None:
+        super().on_headers_finished()
+        part = self._current_part
+        if part.file is None:
+            return
+        # 替换父类为文件分段创建的SpooledTemporaryFile(尚未写入)
+        self._files_to_close_on_error.pop().close()
+        upload = SpooledUpload(part.file.filename, part.file.content_type, self.spool_dir)
+        self._files_to_close_on_error.append(upload)
+        part.file = SpooledUploadFile(upload, part.file.headers, self.max_bytes, self.memory_bytes)
+
+
+class SpoolingRequest(Request):
+    """multipart表单使用SpoolingMultiPartParser解析的请求，上传限制在每个请求读取环境变量。
+
+    中间件可以在scope[ON_FORM_SCOPE_KEY]中放入异步回调，表单解析完成后以表单为参数调用一次
+    (如请求记录，见src.api.capture)，此时上传文件已接收到SpooledUpload中。
+    """
+
+    async def _get_form(self, *, max_files: Union[int, float] = 1000, max_fields: Union[int, float] = 1000,
+                        **kwargs) -> FormData:
+        if self._form is not None:
+            return self._form
+        if self.headers.get("Content-Type", "").lower().startswith("multipart/form-data"):
+            try:
+                async with aclosing(self.stream()) as stream:
+                    parser = SpoolingMultiPartParser(
+                        self.headers,
+                        stream,
+                        max_bytes=upload_max_bytes(),
+                        memory_bytes=upload_memory_bytes(),
+                        spool_dir=upload_spool_dir(),
+                        max_files=max_files,
+                        max_fields=max_fields,
+                        **kwargs,
+                    )
+                    self._form = await parser.parse()
+            except MultiPartException as exc:
+                raise HTTPException(status_code=400, detail=exc.message)
+            except UploadTooLargeError as exc:
+                raise HTTPException(status_code=413, detail=str(exc))
+        form = await super()._get_form(max_files=max_files, max_fields=max_fields, **kwargs)
+        on_form = self.scope.get(ON_FORM_SCOPE_KEY)
+        if on_form is not None:
+            await on_form(form)
+        return form
+
+
+class SpoolingRoute(APIRoute):
+    """上传文件在表单解析时只接收一份(见SpooledUploadFile)的路由类。
+
+    Example:
+        >>> router = APIRouter(route_class=SpoolingRoute)
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def spooling_handler(request: Request) -> Response:
+            return await handler(SpoolingRequest(request.scope, request.receive))
+
+        return spooling_handler
+
+
+async def spool_upload(
+    upload_file: UploadFile,
+    max_bytes: Optional[int] = None,
+    memory_bytes: Optional[int] = None,
+    spool_dir: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> SpooledUpload:
+    """取得上传文件的SpooledUpload，同时得到SHA-256和大小。
+
+    SpoolingRoute的路由中，文件在表单解析时已经接收到SpooledUpload(见SpooledUploadFile)，
+    这里直接返回，不再复制。其他UploadFile分块复制：不超过memory_bytes的保存在内存中，
+    超过后写入spool_dir；超过max_bytes时停止复制并抛出UploadTooLargeError(请求体的大小
+    由UploadLimitMiddleware在接收时限制)。本地文件名不使用客户端提供的文件名。
+
+    Args:
+        upload_file: 上传的文件
+        max_bytes: 大小上限，None时为UPLOAD_MAX_BYTES，0表示不限制
+        memory_bytes: 内存中保存的最大大小，None时为UPLOAD_MEMORY_BYTES
+        spool_dir: 落盘目录，None时为UPLOAD_SPOOL_DIR
+        chunk_size: 每次读取的字节数
+
+    Returns:
+        SpooledUpload: 接收完成的文件，用完后需调用close()
+
+    Raises:
+        UploadTooLargeError: 文件超过大小上限
+
+    Example:
+        >>> upload = await spool_upload(file)
+        >>> upload.size, upload.sha256
+        (52341, '9f86d081884c7d65...')
+    """
+    max_bytes = upload_max_bytes() if max_bytes is None else max_bytes
+
+    # 表单解析时已知大小的直接拒绝，不再复制
+    if max_bytes and upload_file.size is not None and upload_file.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    if isinstance(upload_file, SpooledUploadFile):
+        upload = upload_file.upload
+        await upload.finish()
+        count("upload_bytes", upload.size)
+        return upload
+
+    memory_bytes = upload_memory_bytes() if memory_bytes is None else memory_bytes
+    spool_dir = upload_spool_dir() if spool_dir is None else spool_dir
+    upload = SpooledUpload(upload_file.filename, upload_file.content_type, spool_dir)
+    try:
+        try:
+            while True:
+                chunk = await upload_file.read(chunk_size)
+                if not chunk:
+                    break
+                if max_bytes and upload.size + len(chunk) > max_bytes:
+                    raise UploadTooLargeError(max_bytes)
+                await upload.write(chunk, memory_bytes)
+        finally:
+            await upload.finish()
+    except BaseException:
+        upload.close()
+        raise
+
+    await upload_file.seek(0)
+    count("upload_bytes", upload.size)
+    return upload
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadLimitMiddleware:
+    """ASGI中间件：请求体超过UPLOAD_MAX_BYTES(加表单余量)时返回413。
+
+    声明了超限Content-Length的请求在读取请求体之前拒绝；其余请求(如分块传输)在接收时
+    计数，超过后停止接收，应用随后发出的响应被替换为413。
+
+    Args:
+        app: ASGI应用
+        max_bytes: 大小上限，None时每个请求读取UPLOAD_MAX_BYTES，0表示不限制
+
+    Example:
+        >>> app.add_middleware(UploadLimitMiddleware)
+    """
+
+    def __init__(self, app, max_bytes: Optional[int] = None):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        limit = upload_max_bytes() if self.max_bytes is None else self.max_bytes
+        if scope["type"] != "http" or not limit:
+            await self.app(scope, receive, send)
+            return
+        too_large = JSONResponse(status_code=413, content={"detail": str(UploadTooLargeError(limit))})
+        limit += FORM_OVERHEAD_BYTES
+
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        if length.isdigit() and int(length) > limit:
+            await too_large(scope, receive, send)
+            return
+
+        state = {"received": 0, "exceeded": False, "started": False}
+
+        async def limited_receive():
+            if state["exceeded"]:
+                raise _BodyTooLarge()
+            message = await receive()
+            if message["type"] == "http.request":
+                state["received"] += len(message.get("body", b""))
+                if state["received"] > limit:
+                    state["exceeded"] = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def limited_send(message):
+            if state["exceeded"]:
+                # 应用处理了接收时的异常(如表单解析错误)，替换其响应
+                if message["type"] == "http.response.start" and not state["started"]:
+                    state["started"] = True
+                    await too_large(scope, receive, send)
+                return
+            if message["type"] == "http.response.start":
+                state["started"] = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except _BodyTooLarge:
+            if state["started"]:
+                raise
+            state["started"] = True
+            await too_large(scope, receive, send)
+        if state["exceeded"] and not state["started"]:
+            await too_large(scope, receive, send)
@@ -7,6 +7,10 @@ from pathlib import Path
 from typing import List, Dict, Optional, Any, Tuple
 import uuid
 from fastapi import UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from pdf_extract_kit.utils.stage_timer import StageTimer, timed
 
 
 def ensure_data_dir(directory: str) -> str:
@@ -75,28 +79,19 @@ def setup_logging(log_file: str = "data/logs/api.log", level: int = logging.INFO
     return logger
 
 
-async def save_upload_file_temp(upload_file: UploadFile) -> Tuple[str, str]:
-    """将上传的文件保存到临时目录。
-    
-    Args:
-        upload_file: 上传的文件
-    
+def create_temp_output_dir() -> Tuple[str, str]:
+    """创建临时目录及其中的输出目录(可视化结果等)。
+
     Returns:
-        Tuple[str, str]: 临时目录路径和临时文件路径
-    
+        Tuple[str, str]: 临时目录路径(处理完成后整体清理)和输出目录路径
+
     Example:
-        >>> temp_dir, temp_file = await save_upload_file_temp(upload_file)
+        >>> temp_dir, temp_output_dir = create_temp_output_dir()
     """
     temp_dir = tempfile.mkdtemp()
-    
-    temp_file = os.path.join(temp_dir, upload_file.filename)
-    
-    with open(temp_file, "wb") as buffer:
-        shutil.copyfileobj(upload_file.file, buffer)
-    
-    await upload_file.seek(0)
-    
-    return temp_dir, temp_file
+    temp_output_dir = os.path.join(temp_dir, "output")
+    os.makedirs(temp_output_dir, exist_ok=True)
+    return temp_dir, temp_output_dir
 
 
 def encode_image_to_base64(image_path: str) -> Dict[str, str]:
@@ -163,13 +158,94 @@ def convert_pdf_to_images(pdf_path: str, output_dir: str, dpi: int = 200, output
     os.makedirs(output_dir, exist_ok=True)
     
     # 转换PDF为图像
-    images = convert_from_path(pdf_path, dpi=dpi)
+    with timed("rasterization"):
+        images = convert_from_path(pdf_path, dpi=dpi)
     
     # 保存图像
     image_paths = []
-    for i, image in enumerate(images):
-        image_path = os.path.join(output_dir, f"page_{i+1}.{output_format}")
-        image.save(image_path, output_format.upper())
-        image_paths.append(image_path)
+    with timed("image_write"):
+        for i, image in enumerate(images):
+            image_path = os.path.join(output_dir, f"page_{i+1}.{output_format}")
+            image.save(image_path, output_format.upper())
+            image_paths.append(image_path)
+    
+    return image_paths 
+
+
+def start_timer(enabled: bool) -> Optional[StageTimer]:
+    """按需创建并激活当前请求的阶段计时器。
+    
+    Args:
+        enabled: 是否开启计时(请求参数timings)
+    
+    Returns:
+        Optional[StageTimer]: 已激活的计时器，未开启时返回None
+    
+    Example:
+        >>> timer = start_timer(True)
+        >>> with timed("inference"):
+        ...     run_model()
+    """
+    return StageTimer().activate() if enabled else None
+
+
+def attach_timings(response: Dict[str, Any], timer: Optional[StageTimer]) -> Any:
+    """将计时结果写入响应的results中。
     
-    return image_paths 
\ No newline at end of file
+    results为字典时写入results["timings"]；为列表时与可视化结果一样写入第一个元素，
+    第一个元素不是字典时在列表末尾追加{"timings": ...}。序列化(转换为JSON类型)本身
+    也计入serialization阶段，因此直接返回已编码好的JSONResponse，避免重复编码。
+    
+    Args:
+        response: 路由返回的响应字典
+        timer: start_timer返回的计时器，为None时原样返回response
+    
+    Returns:
+        Any: 未开启计时时为原响应字典，否则为JSONResponse
+    
+    Example:
+        >>> return attach_timings({"success": True, "message": "完成", "results": results}, timer)
+    """
+    if timer is None:
+        return response
+    
+    timer.deactivate()
+    with timer.stage("serialization"):
+        response = jsonable_encoder(response)
+    timings = timer.as_dict()
+    
+    results = response.get("results")
+    if isinstance(results, dict):
+        results["timings"] = timings
+    elif isinstance(results, list) and results and isinstance(results[0], dict):
+        results[0]["timings"] = timings
+    elif isinstance(results, list):
+        results.append({"timings": timings})
+    else:
+        response["results"] = {"timings": timings}
+    return JSONResponse(content=response)
+
+
+def stop_timer(timer: Optional[StageTimer]) -> None:
+    """请求结束(包括失败)时取消激活计时器。
+    
+    Args:
+        timer: start_timer返回的计时器
+    
+    Returns:
+        None
+    """
+    if timer is not None:
+        timer.deactivate()
+
+
+def count_detections(results: List[Any]) -> int:
+    """统计检测结果中的框数量。
+    
+    Args:
+        results: 路由转换后的检测结果列表，每项包含detections
+    
+    Returns:
+        int: 检测框总数
+    """
+    return sum(len(res.get("detections", [])) for res in results if isinstance(res, dict))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from pdf_extract_kit.utils.batch import Manifest, ProgressReporter, atomic_write_json
+
+
+def test_manifest_resume(tmp_path):
+    """测试重启后跳过已完成文档、恢复中断文档、按次数重试失败文档。"""
+    db_path = str(tmp_path / "manifest.sqlite")
+    manifest = Manifest(db_path)
+    assert manifest.add_documents(["a.pdf", "b.pdf", "c.pdf"]) == 3
+
+    manifest.start_document("a.pdf", 2)
+    manifest.page_done("a.pdf", 0)
+    manifest.page_done("a.pdf", 1)
+    manifest.finish_document("a.pdf", "a.json")
+    manifest.start_document("b.pdf", 3)
+    manifest.page_done("b.pdf", 0)  # 处理到一半时崩溃
+    manifest.start_document("c.pdf", 1)
+    manifest.fail_document("c.pdf", "boom")
+    manifest.close()
+
+    manifest = Manifest(db_path)
+    assert manifest.add_documents(["a.pdf", "b.pdf", "c.pdf", "d.pdf"]) == 1
+    assert manifest.reset_running() == 1
+    assert manifest.pending_documents(max_attempts=3) == ["b.pdf", "c.pdf", "d.pdf"]
+    assert manifest.pending_documents(max_attempts=1) == ["b.pdf", "d.pdf"]
+    assert manifest.done_pages("b.pdf") == {0}
+
+    counts = manifest.counts()
+    assert counts["documents"] == {"done": 1, "pending": 2, "failed": 1}
+    assert counts["pages_done"] == 3
+    assert counts["pages_known"] == 6 and counts["documents_known"] == 3
+
+
+def test_reset_running_max_attempts(tmp_path):
+    """测试使工作进程崩溃的文档达到重试次数后标记为失败，不再无限重试。"""
+    manifest = Manifest(str(tmp_path / "manifest.sqlite"))
+    manifest.add_documents(["a.pdf", "b.pdf"])
+    manifest.start_document("a.pdf", 1)
+    manifest.start_document("b.pdf", 1)
+    assert manifest.reset_running(max_attempts=2) == 2
+    assert manifest.status("a.pdf") == "pending"
+
+    manifest.start_document("a.pdf", 1)  # 第二次尝试时再次崩溃
+    assert manifest.reset_running(max_attempts=2) == 1
+    assert manifest.status("a.pdf") == "failed"
+    assert manifest.pending_documents(max_attempts=2) == ["b.pdf"]
+
+
+def test_progress_reporter_eta(tmp_path):
+    """测试按本次运行完成的页数计算速度，并用平均页数估计未打开文档。"""
+    manifest = Manifest(str(tmp_path / "manifest.sqlite"))
+    manifest.add_documents(["a.pdf", "b.pdf"])
+    reporter = ProgressReporter(manifest)
+    manifest.start_document("a.pdf", 4)
+    for page_no in range(2):
+        manifest.page_done("a.pdf", page_no)
+
+    snapshot = reporter.snapshot()
+    assert snapshot["pages_per_sec"] > 0
+    assert snapshot["pages_left"] == 6  # a 剩余 2 页 + b 按平均 4 页估计
+    assert snapshot["eta"] is not None
+    assert "pages/s" in reporter.format()
+
+
+def test_atomic_write_json(tmp_path):
+    """测试原子写入覆盖旧文件且不留下临时文件。"""
+    path = str(tmp_path / "out" / "doc.json")
+    atomic_write_json(path, {"v": 1})
+    atomic_write_json(path, [{"text": "中文"}])
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == [{"text": "中文"}]
+    assert os.listdir(tmp_path / "out") == ["doc.json"]
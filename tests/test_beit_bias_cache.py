@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import gc
+
+import pytest
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("timm")
+
+from pdf_extract_kit.tasks.layout_detection.models.layoutlmv3_util import beit
+from pdf_extract_kit.tasks.layout_detection.models.layoutlmv3_util.beit import RelativePositionBiasCache
+
+
+def tensor_of(nbytes):
+    return lambda: torch.zeros(nbytes // 4)
+
+
+def test_hit_and_evict():
+    """测试命中、按字节数淘汰最久未使用的条目、超过上限的条目不缓存、max_bytes为0时不缓存。"""
+    cache = RelativePositionBiasCache(max_bytes=800)
+    a = cache.get_or_compute(("a",), tensor_of(400))
+    cache.get_or_compute(("b",), tensor_of(400))
+    assert cache.get_or_compute(("a",), tensor_of(400)) is a
+    cache.get_or_compute(("c",), tensor_of(400))
+    assert list(cache.entries) == [("a",), ("c",)]
+    assert (cache.hits, cache.misses, cache.nbytes) == (1, 3, 800)
+
+    cache.get_or_compute(("big",), tensor_of(1200))
+    assert ("big",) not in cache.entries
+
+    off = RelativePositionBiasCache()
+    off.get_or_compute(("a",), tensor_of(400))
+    assert not off.entries
+
+
+def test_invalidate_on_update_and_collect(monkeypatch):
+    """测试权重原地更新后重新计算，模块被回收后其条目在下次访问时删除。"""
+    cache = RelativePositionBiasCache(max_bytes=1 << 20)
+    monkeypatch.setattr(beit, "RELATIVE_POSITION_BIAS_CACHE", cache)
+    attn = beit.Attention(dim=8, num_heads=2, window_size=(2, 2)).eval()
+    with torch.no_grad():
+        first = attn.relative_position_bias(None)
+        assert attn.relative_position_bias(None) is first
+        attn.relative_position_bias_table.add_(1)
+        second = attn.relative_position_bias(None)
+    assert second is not first
+    assert torch.allclose(second, first + 1)
+    assert cache.misses == 2 and len(cache.entries) == 2
+
+    del attn
+    gc.collect()
+    cache.get_or_compute(("other",), tensor_of(4))
+    assert list(cache.entries) == [("other",)]
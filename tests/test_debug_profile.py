@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import pstats
+import threading
+
+import pytest
+import rootutils
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from src.api import router_debug
+from src.api.profiler import sample_stacks
+
+
+def busy_loop(stop):
+    """被采样的工作线程。"""
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def slow_endpoint_work():
+    time.sleep(0.01)
+    return sum(range(10000))
+
+
+@pytest.fixture
+def debug_client(monkeypatch, tmp_path):
+    """启用调试端点和单请求分析中间件的测试应用。"""
+    monkeypatch.setenv(router_debug.ADMIN_TOKEN_ENV, "secret")
+    monkeypatch.setattr(router_debug, "PROFILE_DIR", str(tmp_path))
+    app = FastAPI()
+    app.include_router(router_debug.router, prefix="/debug")
+    app.middleware("http")(router_debug.profile_request_middleware)
+
+    @app.get("/work")
+    async def work():
+        return {"result": slow_endpoint_work()}
+
+    return TestClient(app)
+
+
+def test_sample_stacks():
+    """采样结果包含工作线程的调用栈，且不包含采样线程自身。"""
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        sampler = sample_stacks(0.2, rate=200)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert sampler.samples > 10
+    lines = sampler.collapsed().splitlines()
+    busy = [line for line in lines if line.startswith("busy-worker;")]
+    assert busy and all("busy_loop (tests/test_debug_profile.py:" in line for line in busy)
+    assert not any("sample_stacks" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_profile_endpoint_requires_token(client, debug_client, monkeypatch):
+    """未配置令牌时端点关闭，令牌错误时拒绝，正确时返回折叠栈。"""
+    monkeypatch.delenv(router_debug.ADMIN_TOKEN_ENV)
+    assert client.get("/debug/profile?seconds=0.1").status_code == 404
+    monkeypatch.setenv(router_debug.ADMIN_TOKEN_ENV, "secret")
+
+    assert debug_client.get("/debug/profile?seconds=0.1").status_code == 403
+    assert debug_client.get("/debug/profile?seconds=0.1", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert debug_client.get("/debug/profile?seconds=1000", headers={"X-Admin-Token": "secret"}).status_code == 422
+
+    response = debug_client.get("/debug/profile?seconds=0.1&rate=100", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert int(response.headers["X-Profile-Samples"]) > 0
+    assert response.text.strip()
+
+
+def test_profile_single_request(debug_client):
+    """带X-Profile-Request的请求生成可被pstats读取的cProfile结果。"""
+    response = debug_client.get("/work")
+    assert response.status_code == 200 and "X-Profile-Dump" not in response.headers
+
+    headers = {"X-Profile-Request": "1"}
+    assert debug_client.get("/work", headers=headers).status_code == 403
+    assert debug_client.get("/work", headers={**headers, "X-Admin-Token": "wrong"}).status_code == 403
+
+    response = debug_client.get("/work", headers={**headers, "X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    name = response.headers["X-Profile-Dump"]
+
+    dump = debug_client.get(f"/debug/profile/requests/{name}", headers={"X-Admin-Token": "secret"})
+    assert dump.status_code == 200
+    path = os.path.join(router_debug.PROFILE_DIR, name)
+    functions = {func for _, _, func in pstats.Stats(path).stats}
+    assert "slow_endpoint_work" in functions
+    assert debug_client.get("/debug/profile/requests/..%2F..%2Fmain.py",
+                            headers={"X-Admin-Token": "secret"}).status_code == 404
+
+
+def test_prune_dumps(tmp_path):
+    """只保留最新的分析结果，其他文件不受影响。"""
+    for i in range(5):
+        path = tmp_path / f"{i:032x}.prof"
+        path.write_bytes(b"")
+        os.utime(path, (1000 + i, 1000 + i))
+    (tmp_path / "notes.txt").write_text("x")
+
+    assert router_debug.prune_dumps(str(tmp_path), keep=2) == 3
+    assert sorted(os.listdir(tmp_path)) == [f"{3:032x}.prof", f"{4:032x}.prof", "notes.txt"]
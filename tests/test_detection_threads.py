@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import threading
+
+import pytest
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+sys.path.append(os.path.join(ROOT_DIR, "project", "pdf2markdown", "scripts"))
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+from pdf2markdown import detection_torch_threads
+
+
+def test_detection_threads_restored_after_overlap():
+    """测试重叠的并发检测共享保存的线程数，最后一个结束后恢复，检测之外不受影响。"""
+    original = torch.get_num_threads()
+    first_inside, release_first = threading.Event(), threading.Event()
+
+    def first():
+        with detection_torch_threads(1):
+            first_inside.set()
+            release_first.wait(5)
+
+    thread = threading.Thread(target=first)
+    thread.start()
+    first_inside.wait(5)
+    with detection_torch_threads(1):
+        assert torch.get_num_threads() == 1
+    assert torch.get_num_threads() == 1  # 第一个检测仍在运行
+    release_first.set()
+    thread.join()
+    assert torch.get_num_threads() == original
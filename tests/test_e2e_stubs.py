@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import fitz
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from benchmarks.e2e import stub_models
+from benchmarks.e2e.synthetic import KINDS, STUB_PROFILES, make_pdf
+from pdf_extract_kit.registry.registry import MODEL_REGISTRY
+from pdf_extract_kit.utils.data_preprocess import load_pdf
+
+
+def test_synthetic_pdfs_are_deterministic(tmp_path):
+    """每种页面类型都能生成指定页数的PDF，相同种子生成的页面内容相同。"""
+    for kind in KINDS:
+        path = make_pdf(kind, 2, str(tmp_path / f"{kind}.pdf"), seed=1)
+        with fitz.open(path) as doc:
+            assert len(doc) == 2
+            text = doc[0].get_text()
+        with fitz.open(make_pdf(kind, 2, str(tmp_path / f"{kind}_again.pdf"), seed=1)) as doc:
+            assert doc[0].get_text() == text
+        if kind == "scanned":
+            assert text == ""
+
+
+def test_stub_models_in_api(client, tmp_path):
+    """API路由通过注册表构建桩模型，检测数量与页面类型的配置一致，退出后恢复注册表。"""
+    image_path = str(tmp_path / "page.png")
+    load_pdf(make_pdf("table", 1, str(tmp_path / "table.pdf")))[0].save(image_path)
+    stub_models.configure(costs={"layout_ms": 0}, profile=STUB_PROFILES["table"])
+    try:
+        with stub_models.stub_api_models():
+            with open(image_path, "rb") as f:
+                response = client.post("/api/v1/layout-detection", files={"file": ("page.png", f, "image/png")})
+    finally:
+        stub_models.configure(costs=stub_models.DEFAULT_COSTS, profile=stub_models.DEFAULT_PROFILE)
+
+    data = response.json()
+    assert data["success"] is True
+    classes = [det["class_name"] for det in data["results"][0]["detections"]]
+    assert classes.count("table") == STUB_PROFILES["table"]["tables"]
+    assert len(classes) == STUB_PROFILES["table"]["regions"] + STUB_PROFILES["table"]["tables"]
+    assert not MODEL_REGISTRY.is_loaded("layout_detection_yolo")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+
+import cv2
+import fitz
+import numpy as np
+import pytest
+import rootutils
+from PIL import Image
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from pdf_extract_kit.tasks.base_task import BaseTask
+from pdf_extract_kit.tasks.ocr.task import OCRTask
+from pdf_extract_kit.utils import yolo_onnx
+from pdf_extract_kit.utils.data_preprocess import is_pdf_bytes, load_image
+
+
+class RecordingOCR:
+    """记录收到的图像，返回一个文本框。"""
+
+    def __init__(self):
+        self.images = []
+
+    def predict(self, image):
+        self.images.append(image)
+        return [{"category_type": "text", "poly": [0, 0, 1, 0, 1, 1, 0, 1], "text": "a", "score": 1.0}]
+
+
+@pytest.fixture
+def sample_inputs(tmp_path):
+    """同一张图像的路径、PNG字节、BGR数组和PIL图像，以及一个两页PDF的路径和内容。"""
+    rgb = np.random.default_rng(0).integers(0, 255, size=(24, 32, 3), dtype=np.uint8)
+    image = Image.fromarray(rgb)
+    image_path = str(tmp_path / "page.png")
+    image.save(image_path)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+
+    doc = fitz.open()
+    for _ in range(2):
+        doc.new_page(width=200, height=100).insert_text((20, 50), "text")
+    pdf_path = str(tmp_path / "doc.pdf")
+    doc.save(pdf_path)
+    with open(pdf_path, "rb") as f:
+        pdf_bytes = f.read()
+    return {"rgb": rgb, "path": image_path, "bytes": buffer.getvalue(), "bgr": rgb[..., ::-1].copy(),
+            "pil": image, "pdf_path": pdf_path, "pdf_bytes": pdf_bytes}
+
+
+def test_load_image_inputs(sample_inputs):
+    """路径、字节、BGR数组和PIL图像读取后像素一致，ONNX后端同样接受图像字节。"""
+    for key in ["path", "bytes", "bgr", "pil"]:
+        np.testing.assert_array_equal(np.asarray(load_image(sample_inputs[key])), sample_inputs["rgb"])
+    gray = cv2.cvtColor(sample_inputs["bgr"], cv2.COLOR_BGR2GRAY)
+    assert load_image(gray).mode == "RGB"
+    np.testing.assert_array_equal(yolo_onnx.load_image(sample_inputs["bytes"]), sample_inputs["rgb"])
+    assert is_pdf_bytes(sample_inputs["pdf_bytes"]) and not is_pdf_bytes(sample_inputs["bytes"])
+
+
+def test_tasks_accept_in_memory_inputs(sample_inputs):
+    """任务接受内存中的图像和PDF，结果与传入路径时相同。"""
+    task = BaseTask(model=None)
+    images = task.load_images([sample_inputs["path"], sample_inputs["bytes"], sample_inputs["bgr"]])
+    assert images[0] == sample_inputs["path"] and isinstance(images[1], Image.Image)
+    assert images[2] is sample_inputs["bgr"]
+    with pytest.raises(ValueError):
+        task.load_images(sample_inputs["pdf_bytes"])
+
+    from_path = task.load_pdf_images(sample_inputs["pdf_path"])
+    from_bytes = task.load_pdf_images(sample_inputs["pdf_bytes"], name="doc")
+    assert list(from_bytes) == list(from_path) == ["doc_page_0001", "doc_page_0002"]
+    assert all(np.array_equal(np.asarray(a), np.asarray(b)) for a, b in zip(from_path.values(), from_bytes.values()))
+
+    model = RecordingOCR()
+    results = OCRTask(model).process([sample_inputs["pdf_bytes"], sample_inputs["bytes"], sample_inputs["pil"]])
+    assert [len(res) for res in results] == [2, 1, 1]
+    assert isinstance(results[0][0], list) and len(model.images) == 4
+    np.testing.assert_array_equal(np.asarray(model.images[2]), sample_inputs["rgb"])
+
+
+def test_files_without_image_extension(sample_inputs, tmp_path):
+    """没有图像扩展名的文件(如落盘的上传)与内存中的字节一样解码，PDF内容仍被拒绝。"""
+    task = BaseTask(model=None)
+    spooled = tmp_path / "upload"
+    spooled.write_bytes(sample_inputs["bytes"])
+    bmp_path = str(tmp_path / "page.bmp")
+    sample_inputs["pil"].save(bmp_path)
+    for path in [str(spooled), bmp_path]:
+        images = task.load_images(path)
+        np.testing.assert_array_equal(np.asarray(images[0]), sample_inputs["rgb"])
+
+    spooled_pdf = tmp_path / "upload_pdf"
+    spooled_pdf.write_bytes(sample_inputs["pdf_bytes"])
+    junk = tmp_path / "notes.txt"
+    junk.write_text("not an image")
+    for path in [spooled_pdf, junk]:
+        with pytest.raises(ValueError):
+            task.load_images(str(path))
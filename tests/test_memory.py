@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import gc
+import threading
+
+import rootutils
+from PIL import Image
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from pdf_extract_kit.utils.memory import get_rss, get_peak_rss, PeakRSSTracker, MemoryManager, image_nbytes
+
+
+def test_rss_and_peak():
+    """测试当前RSS和峰值RSS可以读取。"""
+    assert get_rss() > 0
+    assert get_peak_rss() > 0
+
+
+def test_peak_rss_tracker_sees_allocation():
+    """测试在检查点采样时可以观察到临时分配带来的峰值。"""
+    tracker = PeakRSSTracker()
+    buffer = bytearray(64 * 2**20)
+    buffer[::4096] = b'\x01' * len(buffer[::4096])  # 触发实际分配的内存页
+    tracker.update()
+    del buffer
+    assert tracker.peak - tracker.start >= 32 * 2**20
+
+
+def test_image_nbytes():
+    """测试按未压缩像素计算图像大小。"""
+    assert image_nbytes(Image.new('RGB', (10, 20))) == 600
+    assert image_nbytes(Image.new('L', (10, 20))) == 200
+
+
+def test_memory_manager_cleans_only_above_high_water():
+    """测试只有超过高水位线时才执行清理。"""
+    manager = MemoryManager(rss_high_water=float('inf'))
+    manager.start_document()
+    assert not any(manager.maybe_cleanup() for _ in range(5))
+    stats = manager.end_document()
+    assert stats['checks'] == 5 and stats['cleanups'] == 0 and stats['peak_rss'] > 0
+
+    # 清理后仍超过高水位线时，依次跳过1、2、4次检查
+    manager = MemoryManager(rss_high_water=0, max_backoff=4)
+    manager.start_document()
+    ran = [manager.maybe_cleanup() for _ in range(15)]
+    stats = manager.end_document()
+    assert ran == [True, False, True, False, False, True, False, False, False, False,
+                   True, False, False, False, False]
+    assert stats['cleanups'] == 4 and stats['cleanup_time'] > 0
+
+
+def test_memory_manager_accounts_automatic_gc():
+    """测试文档处理期间自动触发的GC时间被计入，结束后回调被移除。"""
+    manager = MemoryManager.from_config({'rss_high_water_mb': 2 ** 30})
+    manager.start_document()
+    # 其他线程(如并发请求)触发的回收不计入本文档
+    other = threading.Thread(target=gc.collect)
+    other.start()
+    other.join()
+    assert manager.stats()['auto_gc_time'] == 0
+    gc.collect()  # 与解释器自动触发的回收走同一回调
+    stats = manager.end_document()
+    assert stats['auto_gc_time'] > 0
+    assert manager._gc_callback not in gc.callbacks
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import copy
+
+import numpy as np
+import pytest
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from pdf_extract_kit.utils.merge_blocks_and_spans import (
+    fill_spans_in_blocks,
+    calculate_overlap_area_in_bbox1_area_ratio,
+    calculate_overlap_area_in_bbox1_area_ratio_matrix,
+)
+
+
+def reference_fill_spans_in_blocks(blocks, spans, radio):
+    """原始的逐block扫描 + list.remove 实现，作为对照。"""
+    block_with_spans = []
+    for block in blocks:
+        L, U, R, D = block['poly'][0], block['poly'][1], block['poly'][2], block['poly'][5]
+        L, R = min(L, R), max(L, R)
+        U, D = min(U, D), max(U, D)
+        block_bbox = [L, U, R, D]
+        block_spans = [span for span in spans
+                       if calculate_overlap_area_in_bbox1_area_ratio(span["bbox"], block_bbox) > radio]
+        block_with_spans.append({'type': block["category_type"], 'bbox': block_bbox,
+                                 'saved_info': block, 'spans': block_spans})
+        for span in block_spans:
+            spans.remove(span)
+    return block_with_spans, spans
+
+
+def make_page(num_blocks, num_spans, seed):
+    """生成互相重叠的版面块和落在块内外的span。"""
+    rng = np.random.default_rng(seed)
+    blocks = []
+    for _ in range(num_blocks):
+        x0, y0 = rng.uniform(0, 1500), rng.uniform(0, 2000)
+        x1, y1 = x0 + rng.uniform(20, 600), y0 + rng.uniform(10, 300)
+        blocks.append({'category_type': 'plain text', 'poly': [x0, y0, x1, y0, x1, y1, x0, y1]})
+    spans = []
+    for i in range(num_spans):
+        x0, y0 = rng.uniform(0, 2000), rng.uniform(0, 2300)
+        spans.append({'type': 'text', 'bbox': [x0, y0, x0 + rng.uniform(0, 150), y0 + rng.uniform(0, 30)],
+                      'content': str(i)})
+    return blocks, spans
+
+
+@pytest.mark.parametrize("num_blocks,num_spans", [(0, 10), (5, 0), (20, 300), (60, 3000)])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_fill_spans_in_blocks_matches_reference(num_blocks, num_spans, seed):
+    """测试向量化分配与原实现的首次匹配语义一致，且spans被原地修改。"""
+    blocks, spans = make_page(num_blocks, num_spans, seed)
+    ref_blocks, ref_spans = reference_fill_spans_in_blocks(blocks, copy.deepcopy(spans), 0.6)
+
+    block_with_spans, remaining = fill_spans_in_blocks(blocks, spans, 0.6)
+    assert remaining is spans
+    assert remaining == ref_spans
+    assert block_with_spans == ref_blocks
+
+
+def test_overlap_ratio_matrix_matches_scalar():
+    """测试批量重叠比例与标量函数一致，包括零面积和不相交的情况。"""
+    bboxes1 = [[0, 0, 10, 10], [5, 5, 5, 20], [100, 100, 110, 110], [8, 8, 12, 12]]
+    bboxes2 = [[0, 0, 10, 10], [10, 10, 20, 20], [-5, -5, 3, 30]]
+    matrix = calculate_overlap_area_in_bbox1_area_ratio_matrix(bboxes1, bboxes2)
+    for i, bbox1 in enumerate(bboxes1):
+        for j, bbox2 in enumerate(bboxes2):
+            assert matrix[i, j] == calculate_overlap_area_in_bbox1_area_ratio(bbox1, bbox2)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+import fitz
+import pytest
+import rootutils
+from PIL import Image
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+sys.path.append(os.path.join(ROOT_DIR, "project", "pdf2markdown", "scripts"))
+
+pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+from pdf2markdown import PDF2MARKDOWN
+
+
+CROPS_PER_PAGE = 2
+
+
+def make_task(mfr_window, pipeline=None):
+    """不加载模型的任务：每页检测出两个10x10的公式框，记录每次公式识别的批大小。"""
+    task = PDF2MARKDOWN(None, None, None, None, pipeline=pipeline, mfr_window=mfr_window)
+    task.batches = []
+
+    def detect_page(image, page_no):
+        items = [{'category_type': 'inline', 'poly': [0] * 8, 'latex': ''} for _ in range(CROPS_PER_PAGE)]
+        page_res = {'layout_dets': list(items), 'page_info': {'page_no': page_no}}
+        return page_res, items, [Image.new('RGB', (10, 10)) for _ in items]
+
+    def recognize_formulas(latex_filling_list, mf_image_list):
+        if mf_image_list:
+            task.batches.append(len(mf_image_list))
+        for item in latex_filling_list:
+            item['latex'] = 'x'
+
+    task.detect_page = detect_page
+    task.recognize_formulas = recognize_formulas
+    return task
+
+
+@pytest.mark.parametrize("mfr_window, expected", [
+    (None, [12]),
+    ({'max_crops': 5}, [6, 6]),
+    ({'max_bytes': 700}, [4, 4, 4]),  # 每个公式框300字节
+])
+def test_mfr_window_flush(mfr_window, expected):
+    """测试待识别公式框达到max_crops或max_bytes时提前识别，剩余的在文档末尾识别。"""
+    task = make_task(mfr_window)
+    pages = task.process_single_pdf([Image.new('RGB', (50, 50)) for _ in range(6)])
+    assert task.batches == expected
+    assert all(item['latex'] == 'x' for page in pages for item in page['layout_dets'])
+
+
+@pytest.mark.parametrize("mfr_window, expected", [(None, [2, 2, 2, 2]), ({'max_crops': 3}, [4, 4])])
+def test_mfr_window_pipelined(tmp_path, mfr_window, expected):
+    """测试流水线模式下公式识别在窗口内跨页合批，无窗口时逐页识别。"""
+    pdf_path = str(tmp_path / "doc.pdf")
+    doc = fitz.open()
+    for _ in range(4):
+        doc.new_page(width=100, height=100)
+    doc.save(pdf_path)
+
+    task = make_task(mfr_window, pipeline={'dpi': 72})
+    results = task.process_single_pdf_pipelined(pdf_path)
+    assert task.batches == expected
+    assert [item['page_res']['page_info']['page_no'] for item in results] == [0, 1, 2, 3]
@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from benchmarks.micro import layouts
+from benchmarks.micro.baseline import compare
+from pdf_extract_kit.utils.merge_blocks_and_spans import fill_spans_in_blocks
+
+
+def test_layouts_are_deterministic():
+    """生成的版面包含指定数量的span，相同种子结果相同，文本span都能分配到版面块中。"""
+    for num_spans in [10, 100, 1000]:
+        layout = layouts.make_layout(num_spans, seed=3)
+        assert len(layout["spans"]) == num_spans
+        assert layout == layouts.make_layout(num_spans, seed=3)
+        blocks = [b for b in layout["blocks"] if b["category_type"] != "figure"]
+        _, left = fill_spans_in_blocks(blocks, list(layout["spans"]), 0.6)
+        assert left == []
+    assert layouts.make_layout(1000, seed=3) != layouts.make_layout(1000, seed=4)
+
+
+def test_compare_flags_regressions():
+    """超过阈值的变慢标记为回归，明显变快标记为改进，基线中没有的用例标记为新增。"""
+    baseline = {"results": {"a/10": {"best_ms": 1.0}, "b/10": {"best_ms": 1.0}, "c/10": {"best_ms": 1.0}}}
+    results = {"a/10": {"best_ms": 1.3}, "b/10": {"best_ms": 1.1}, "c/10": {"best_ms": 0.5}, "d/10": {"best_ms": 1.0}}
+    status = {row["key"]: row["status"] for row in compare(results, baseline, threshold=0.2)}
+    assert status == {"a/10": "regression", "b/10": "ok", "c/10": "improvement", "d/10": "new"}
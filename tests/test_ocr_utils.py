@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from pdf_extract_kit.utils.ocr_utils import (
+    sorted_boxes,
+    merge_det_boxes,
+    update_det_boxes,
+    remove_intervals,
+    merge_spans_to_line,
+    merge_overlapping_spans,
+    points_to_bbox,
+    bbox_to_points,
+)
+
+
+def reference_sorted_boxes(dt_boxes):
+    """原始的逐对冒泡实现，作为对照。"""
+    num_boxes = dt_boxes.shape[0]
+    _boxes = list(sorted(dt_boxes, key=lambda x: (x[0][1], x[0][0])))
+    for i in range(num_boxes - 1):
+        for j in range(i, -1, -1):
+            if abs(_boxes[j + 1][0][1] - _boxes[j][0][1]) < 10 and \
+                    (_boxes[j + 1][0][0] < _boxes[j][0][0]):
+                _boxes[j], _boxes[j + 1] = _boxes[j + 1], _boxes[j]
+            else:
+                break
+    return _boxes
+
+
+def reference_merge_det_boxes(dt_boxes):
+    """原始的字典往返实现，作为对照。"""
+    lines = merge_spans_to_line([{'bbox': points_to_bbox(box)} for box in dt_boxes])
+    new_dt_boxes = []
+    for line in lines:
+        for span in merge_overlapping_spans([span['bbox'] for span in line]):
+            new_dt_boxes.append(bbox_to_points(span))
+    return new_dt_boxes
+
+
+def reference_update_det_boxes(dt_boxes, mfd_res):
+    """原始的文本框×公式框两两比较实现，作为对照。"""
+    def is_overlaps_y_exceeds_threshold(bbox1, bbox2, overlap_ratio_threshold=0.8):
+        _, y0_1, _, y1_1 = bbox1
+        _, y0_2, _, y1_2 = bbox2
+        overlap = max(0, min(y1_1, y1_2) - max(y0_1, y0_2))
+        min_height = min(y1_1 - y0_1, y1_2 - y0_2)
+        return (overlap / min_height) > overlap_ratio_threshold
+
+    new_dt_boxes = []
+    for text_box in dt_boxes:
+        text_bbox = points_to_bbox(text_box)
+        masks_list = []
+        for mf_box in mfd_res:
+            mf_bbox = mf_box['bbox']
+            if is_overlaps_y_exceeds_threshold(text_bbox, mf_bbox):
+                masks_list.append([mf_bbox[0], mf_bbox[2]])
+        for text_remove_mask in remove_intervals([text_bbox[0], text_bbox[2]], masks_list):
+            new_dt_boxes.append(bbox_to_points([text_remove_mask[0], text_bbox[1], text_remove_mask[1], text_bbox[3]]))
+    return new_dt_boxes
+
+
+def make_formula_boxes(dt_boxes, num_formulas, seed):
+    """在文本框所在的行上生成整数坐标的公式框。"""
+    rng = np.random.default_rng(seed)
+    mfd_res = []
+    for _ in range(num_formulas):
+        box = dt_boxes[rng.integers(len(dt_boxes))]
+        x0 = int(rng.uniform(box[0][0] - 20, box[1][0]))
+        y0 = int(box[0][1] + rng.normal(0, 2))
+        height = int(box[2][1] - box[0][1] + rng.normal(0, 3))
+        mfd_res.append({'bbox': [x0, y0, x0 + int(rng.uniform(5, 80)), y0 + max(height, 1)]})
+    return mfd_res
+
+
+def make_page_boxes(num_boxes, seed):
+    """生成按行排列、带抖动和重叠的文本框。"""
+    rng = np.random.default_rng(seed)
+    boxes = []
+    y = 10.0
+    while len(boxes) < num_boxes:
+        height = rng.uniform(12, 30)
+        x = rng.uniform(0, 40)
+        for _ in range(rng.integers(1, 12)):
+            width = rng.uniform(5, 120)
+            jitter = rng.normal(0, 3)
+            x0, y0 = x, y + jitter
+            boxes.append([[x0, y0], [x0 + width, y0], [x0 + width, y0 + height], [x0, y0 + height]])
+            x += width + rng.uniform(-10, 25)
+        y += height * rng.uniform(0.3, 1.5)
+    boxes = np.array(boxes[:num_boxes], dtype=np.float32)
+    return boxes[rng.permutation(len(boxes))]
+
+
+def assert_same_boxes(actual, expected):
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        np.testing.assert_array_equal(a, e)
+
+
+@pytest.mark.parametrize("num_boxes", [0, 1, 2, 50, 1000])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_sorted_boxes_matches_reference(num_boxes, seed):
+    """测试向量化排序与原实现输出一致。"""
+    dt_boxes = make_page_boxes(num_boxes, seed) if num_boxes else np.zeros((0, 4, 2), dtype=np.float32)
+    assert_same_boxes(sorted_boxes(dt_boxes), reference_sorted_boxes(dt_boxes))
+
+
+def make_scanned_boxes(num_lines, seed):
+    """生成行距较大、同一行内y坐标随机抖动的文本框(扫描页面的常见情况)。"""
+    rng = np.random.default_rng(seed)
+    boxes = []
+    for line in range(num_lines):
+        y = 20.0 + 32 * line
+        x = rng.uniform(0, 40)
+        for _ in range(rng.integers(1, 15)):
+            width = rng.uniform(5, 120)
+            y0 = y + rng.uniform(-4, 4)
+            boxes.append([[x, y0], [x + width, y0], [x + width, y0 + 20], [x, y0 + 20]])
+            x += width + rng.uniform(2, 25)
+    boxes = np.array(boxes, dtype=np.float32)
+    return boxes[rng.permutation(len(boxes))]
+
+
+@pytest.mark.parametrize("num_lines", [1, 40, 400])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_sorted_boxes_jittered_lines(num_lines, seed):
+    """测试行内y坐标抖动(需要逐行按x重排)时排序与原实现一致。"""
+    dt_boxes = make_scanned_boxes(num_lines, seed)
+    assert_same_boxes(sorted_boxes(dt_boxes), reference_sorted_boxes(dt_boxes))
+
+
+@pytest.mark.parametrize("num_boxes", [1, 2, 50, 1000])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_merge_det_boxes_matches_reference(num_boxes, seed):
+    """测试向量化合并与原实现输出一致。"""
+    dt_boxes = sorted_boxes(make_page_boxes(num_boxes, seed))
+    assert_same_boxes(merge_det_boxes(dt_boxes), reference_merge_det_boxes(dt_boxes))
+
+
+@pytest.mark.parametrize("num_formulas", [0, 1, 10, 300])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_update_det_boxes_matches_reference(num_formulas, seed):
+    """测试区间索引版公式切分与原实现输出一致。"""
+    dt_boxes = merge_det_boxes(sorted_boxes(make_page_boxes(500, seed)))
+    mfd_res = make_formula_boxes(dt_boxes, num_formulas, seed)
+    assert_same_boxes(update_det_boxes(dt_boxes, mfd_res), reference_update_det_boxes(dt_boxes, mfd_res))
+
+
+def test_update_det_boxes_splits_around_formula():
+    """测试文本框被同一行的公式切成左右两段。"""
+    dt_boxes = [bbox_to_points([0, 0, 100, 20])]
+    new_boxes = update_det_boxes(dt_boxes, [{'bbox': [40, 0, 60, 20]}])
+    assert [points_to_bbox(box) for box in new_boxes] == [[0, 0, 39, 20], [61, 0, 100, 20]]
+
+
+def test_merge_det_boxes_empty():
+    """测试空输入。"""
+    assert merge_det_boxes([]) == []
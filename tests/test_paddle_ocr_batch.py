@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+from types import SimpleNamespace
+
+import cv2
+import fitz
+import numpy as np
+import pytest
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+pytest.importorskip("paddleocr")
+
+from pdf_extract_kit.utils.config_loader import load_config
+from pdf_extract_kit.tasks.ocr.models.paddle_ocr import ModifiedPaddleOCR, check_images
+
+
+class RecordingRecognizer:
+    """按宽度返回文本的识别器，记录每个批次。"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, crops):
+        self.batches.append([crop.shape[1] / crop.shape[0] for crop in crops])
+        return [(f"w{crop.shape[1]}", 1.0) for crop in crops], 0.0
+
+
+def text_page(lines, size):
+    img = np.full((size[1], size[0], 3), 255, dtype=np.uint8)
+    for i, line in enumerate(lines):
+        cv2.putText(img, line, (40, 80 + 70 * i), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
+    return img
+
+
+def test_recognition_order_after_width_sort():
+    """识别按宽高比排序分批，结果按输入顺序返回。"""
+    ocr = ModifiedPaddleOCR.__new__(ModifiedPaddleOCR)
+    ocr.use_angle_cls = False
+    ocr.args = SimpleNamespace(rec_batch_num=2, save_crop_res=False)
+    ocr.text_recognizer = RecordingRecognizer()
+    widths = [300, 40, 160, 90, 40, 500, 20]
+    crops = [np.zeros((32, w, 3), dtype=np.uint8) for w in widths]
+
+    rec_res, _ = ocr.recognize_crops(crops, cls=False)
+    assert [text for text, _ in rec_res] == [f"w{w}" for w in widths]
+    ratios = [ratio for batch in ocr.text_recognizer.batches for ratio in batch]
+    assert ratios == sorted(ratios) and max(len(batch) for batch in ocr.text_recognizer.batches) == 2
+
+
+def test_check_images_rejects_pdf(tmp_path):
+    """图像列表中的PDF(多页)给出明确错误。"""
+    pdf_path = str(tmp_path / "doc.pdf")
+    doc = fitz.open()
+    doc.new_page()
+    doc.save(pdf_path)
+    img = text_page(["a"], (200, 100))
+    assert check_images([img])[0] is img
+    with pytest.raises(ValueError):
+        check_images([img, pdf_path])
+
+
+def test_batch_matches_single():
+    """批量检测和识别的结果与逐张处理相同。"""
+    config = load_config(os.path.join(ROOT_DIR, "configs/ocr.yaml"))["tasks"]["ocr"]["model_config"]
+    if not all(os.path.isdir(os.path.join(ROOT_DIR, config[key])) for key in ["det_model_dir", "rec_model_dir"]):
+        pytest.skip("PaddleOCR models not downloaded")
+    config = {key: os.path.join(ROOT_DIR, value) if key.endswith("_dir") else value for key, value in config.items()}
+    ocr = ModifiedPaddleOCR({**config, "show_log": False, "det_batch_num": 4})
+    imgs = [text_page(["Hello world", "batch 1"], (800, 600)), text_page(["Second page"], (800, 600)),
+            text_page(["Other size", "line two", "3"], (640, 900)), text_page(["Same size again"], (800, 600))]
+
+    batched = ocr.ocr_batch(imgs, cls=False)
+    single = [ocr.ocr_batch([img], cls=False)[0] for img in imgs]
+    assert [[text for _, (text, _) in res or []] for res in batched] == \
+        [[text for _, (text, _) in res or []] for res in single]
+    for res_b, res_s in zip(batched, single):
+        for (box_b, _), (box_s, _) in zip(res_b or [], res_s or []):
+            np.testing.assert_allclose(box_b, box_s, atol=1)
+    assert ocr.ocr(imgs, cls=False) == batched
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import time
+import threading
+
+import pytest
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from pdf_extract_kit.utils.pipeline import Pipeline, Stage, BatchStage
+
+
+def test_pipeline_keeps_input_order():
+    """测试多worker阶段乱序完成时，输出仍按输入顺序排列。"""
+    def jitter(x):
+        time.sleep(0.001 * (x % 3))
+        return x
+
+    pipeline = Pipeline([
+        Stage('double', lambda x: x * 2),
+        Stage('jitter', jitter, num_workers=3),
+        Stage('inc', lambda x: x + 1),
+    ], queue_size=2)
+    assert pipeline.run(range(50)) == [x * 2 + 1 for x in range(50)]
+    assert [s['items'] for s in pipeline.stats()] == [50, 50, 50]
+
+
+def test_pipeline_overlaps_stages():
+    """测试相邻阶段并行执行：两个各耗时 n*t 的阶段总耗时应明显小于 2*n*t。"""
+    def slow(x):
+        time.sleep(0.02)
+        return x
+
+    pipeline = Pipeline([Stage('a', slow), Stage('b', slow)], queue_size=1)
+    start = time.perf_counter()
+    pipeline.run(range(10))
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.02 * 10 * 1.6
+    assert all(s['utilization'] > 0.5 for s in pipeline.stats())
+    assert 'bottleneck' in pipeline.report()
+
+
+def test_pipeline_bounded_queue_backpressure():
+    """测试有界队列限制生产者最多领先消费者 queue_size 个左右的元素。"""
+    produced = []
+    lock = threading.Lock()
+    max_ahead = [0]
+
+    def produce(x):
+        with lock:
+            produced.append(x)
+        return x
+
+    def consume(x):
+        time.sleep(0.005)
+        with lock:
+            max_ahead[0] = max(max_ahead[0], len(produced) - x)
+        return x
+
+    Pipeline([Stage('produce', produce), Stage('consume', consume)], queue_size=2).run(range(20))
+    # 队列容量 2 + 正在处理的 1 个 + 生产者手上的 1 个
+    assert max_ahead[0] <= 4
+
+
+def test_pipeline_propagates_errors():
+    """测试任一阶段抛出的异常会在 run 中重新抛出，且不会死锁。"""
+    def fail(x):
+        if x == 5:
+            raise RuntimeError("boom")
+        return x
+
+    pipeline = Pipeline([Stage('ok', lambda x: x), Stage('fail', fail), Stage('tail', lambda x: x)], queue_size=1)
+    with pytest.raises(RuntimeError, match="boom"):
+        pipeline.run(range(100))
+
+
+def test_batch_stage_groups_items():
+    """测试批处理阶段按full条件分组处理，输入结束时处理剩余元素，输出仍按输入顺序。"""
+    batches = []
+
+    def total(items):
+        batches.append(list(items))
+        return [x * 10 for x in items]
+
+    pipeline = Pipeline([
+        Stage('id', lambda x: x),
+        BatchStage('batch', total, full=lambda items: sum(items) >= 10),
+        Stage('inc', lambda x: x + 1),
+    ], queue_size=1)
+    assert pipeline.run(range(10)) == [x * 10 + 1 for x in range(10)]
+    assert batches == [[0, 1, 2, 3, 4], [5, 6], [7, 8], [9]]
+    assert pipeline.stats()[1]['items'] == 10
+
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sys
+import subprocess
+
+import pytest
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from pdf_extract_kit.registry.registry import Registry
+
+
+def test_lazy_entry_resolved_on_first_get(tmp_path, monkeypatch):
+    """测试惰性条目在首次get时才导入模块，模块自行注册后替换惰性条目。"""
+    registry = Registry()
+    module_dir = tmp_path / "lazy_pkg"
+    module_dir.mkdir()
+    (module_dir / "__init__.py").write_text("")
+    (module_dir / "model.py").write_text(
+        "from tests_registry_holder import registry\n"
+        "@registry.register('lazy_model')\n"
+        "class LazyModel:\n"
+        "    pass\n"
+    )
+    holder = type(sys)("tests_registry_holder")
+    holder.registry = registry
+    monkeypatch.setitem(sys.modules, "tests_registry_holder", holder)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    registry.register_lazy("lazy_model", "lazy_pkg.model")
+    assert "lazy_pkg.model" not in sys.modules
+    assert registry.list_items() == ["lazy_model"]
+    assert not registry.is_loaded("lazy_model")
+
+    assert registry.get("lazy_model").__name__ == "LazyModel"
+    assert "lazy_pkg.model" in sys.modules
+    assert registry.is_loaded("lazy_model")
+    assert registry.list_items() == ["lazy_model"]
+
+
+def test_lazy_entry_errors():
+    """测试重复注册、模块未注册、缺失依赖时的报错。"""
+    registry = Registry()
+    registry.register_lazy("a", "json")
+    with pytest.raises(ValueError):
+        registry.register_lazy("a", "json")
+    with pytest.raises(ValueError, match="was not registered"):
+        registry.get("a")
+    registry.register_lazy("b", "module_that_does_not_exist_xyz")
+    with pytest.raises(ImportError):
+        registry.get("b")
+    with pytest.raises(ValueError, match="not found"):
+        registry.get("c")
+
+
+def test_import_tasks_does_not_import_models():
+    """测试导入任务包不会导入模型依赖，模型名称仍然全部可见。"""
+    code = (
+        "import sys\n"
+        "import pdf_extract_kit.tasks\n"
+        "from pdf_extract_kit.registry.registry import MODEL_REGISTRY\n"
+        "assert 'ocr_ppocr' in MODEL_REGISTRY.list_items()\n"
+        "assert 'layout_detection_yolo' in MODEL_REGISTRY.list_items()\n"
+        "heavy = [m for m in ('torch', 'paddle', 'paddleocr', 'ultralytics', 'doclayout_yolo', 'unimernet') if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=str(ROOT_DIR), check=True)
+
+
+def test_override_restores_previous_entry():
+    """测试override临时替换已注册或惰性条目，退出后恢复原状。"""
+    registry = Registry()
+    registry.register("real")(int)
+    registry.register_lazy("lazy", "json")
+
+    with registry.override("real", str), registry.override("lazy", float), registry.override("new", list):
+        assert registry.get("real") is str
+        assert registry.get("lazy") is float
+        assert registry.get("new") is list
+
+    assert registry.get("real") is int
+    assert not registry.is_loaded("lazy") and "lazy" in registry.list_items()
+    assert "new" not in registry.list_items()
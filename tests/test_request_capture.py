@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import hashlib
+
+import pytest
+import rootutils
+from fastapi import APIRouter, FastAPI, File, Form, UploadFile
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from src.api import capture
+from src.api.uploads import SpoolingRoute
+from benchmarks.load.replay import load_log, run_closed, run_open, summarize, timeline
+
+
+@pytest.fixture
+def capture_client(monkeypatch, tmp_path):
+    """启用请求记录中间件的测试应用，/api/v1/echo 返回上传文件的SHA-256和参数。"""
+    monkeypatch.setenv(capture.CAPTURE_DIR_ENV, str(tmp_path))
+    app = FastAPI()
+    app.middleware("http")(capture.capture_request_middleware)
+    router = APIRouter(route_class=SpoolingRoute)
+
+    @router.post("/api/v1/echo")
+    async def echo(file: UploadFile = File(...), lang: str = Form("ch")):
+        data = await file.read()
+        if lang == "fail":
+            return JSONResponse({"detail": "失败"}, status_code=500)
+        return {"sha256": hashlib.sha256(data).hexdigest(), "lang": lang, "in_memory": file.upload.in_memory}
+
+    @router.post("/other")
+    async def other():
+        return {}
+
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_capture_and_replay(capture_client, tmp_path):
+    """记录的请求包含端点、参数和按哈希保存的上传文件，回放时路由收到相同的内容。"""
+    pdf, image = b"%PDF-1.4 fake" * 100, b"\x89PNG fake"
+    assert capture_client.post("/api/v1/echo", files={"file": ("a.pdf", pdf)}, data={"lang": "en"}).json()["lang"] == "en"
+    capture_client.post("/api/v1/echo", files={"file": ("b.png", image, "image/png")})
+    capture_client.post("/api/v1/echo", files={"file": ("c.pdf", pdf)}, data={"lang": "fail"})
+    capture_client.post("/other")
+
+    lines = (tmp_path / capture.CAPTURE_LOG).read_text(encoding="utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [r["endpoint"] for r in records] == ["/api/v1/echo"] * 3
+    assert records[0]["params"] == {"lang": "en"} and records[1]["params"] == {}
+    assert [r["status"] for r in records] == [200, 200, 500]
+    assert records[1]["files"][0]["filename"] == "b.png" and records[1]["files"][0]["content_type"] == "image/png"
+    assert {p.name for p in (tmp_path / capture.PAYLOAD_DIR).iterdir()} == {
+        hashlib.sha256(pdf).hexdigest(), hashlib.sha256(image).hexdigest()}
+
+    log = load_log(str(tmp_path / capture.CAPTURE_LOG))
+    results = run_closed(capture_client, log, concurrency=2, total=6)
+    assert len(results) == 6
+    summary = summarize(results)
+    assert summary["overall"]["errors"] == 2 and summary["endpoints"]["/api/v1/echo"]["requests"] == 6
+    assert sum(row["completed"] for row in timeline(results, 0.5)) == 6
+
+    results = run_open(capture_client, log[:2], rate=50, total=4, arrival="uniform")
+    assert len(results) == 4 and all(r["error"] is None for r in results)
+    assert all(r["latency"] >= r["finished"] - r["sent"] for r in results)
+
+
+def test_capture_spooled_upload(capture_client, monkeypatch, tmp_path):
+    """落盘的上传文件从落盘目录复制到payloads，中间件不缓存请求体。"""
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    monkeypatch.setenv("UPLOAD_MEMORY_BYTES", "16K")
+    monkeypatch.setenv("UPLOAD_SPOOL_DIR", str(spool_dir))
+    data = b"%PDF-1.4 " + bytes(range(256)) * 256
+    digest = hashlib.sha256(data).hexdigest()
+
+    response = capture_client.post("/api/v1/echo", files={"file": ("a.pdf", data)})
+    assert response.json() == {"sha256": digest, "lang": "ch", "in_memory": False}
+    record = json.loads((tmp_path / capture.CAPTURE_LOG).read_text(encoding="utf-8"))
+    assert record["files"][0]["sha256"] == digest and record["files"][0]["size"] == len(data)
+    assert (tmp_path / capture.PAYLOAD_DIR / digest).read_bytes() == data
+    assert not list(spool_dir.iterdir())
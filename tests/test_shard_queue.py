@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import time
+import multiprocessing
+
+import pytest
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from pdf_extract_kit.utils.shard_queue import ShardQueue, LeaseLost
+
+
+def drain_queue(root, worker_id):
+    """模拟一个worker进程：不断领取分片直到没有剩余。"""
+    queue = ShardQueue(root, lease_seconds=30)
+    while True:
+        lease = queue.claim(worker_id)
+        if lease is None:
+            return
+        lease.complete([{'path': path, 'worker': worker_id} for path in lease.documents()])
+
+
+def test_workers_process_every_shard_once(tmp_path):
+    """测试多个进程并发领取时，每个文档恰好被处理一次，合并结果保持分片顺序。"""
+    root = str(tmp_path / "queue")
+    paths = [f"doc_{i:03d}.pdf" for i in range(57)]
+    assert ShardQueue(root).create(paths, shard_size=5) == 12
+    assert ShardQueue(root).create(paths, shard_size=5) == 0
+
+    ctx = multiprocessing.get_context('spawn')
+    workers = [ctx.Process(target=drain_queue, args=(root, f"w{i}")) for i in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(60)
+        assert p.exitcode == 0
+
+    queue = ShardQueue(root)
+    assert queue.status() == {'total': 12, 'done': 12, 'leased': 0, 'expired': 0, 'pending': 0}
+    output = str(tmp_path / "results.jsonl")
+    assert queue.merge(output) == 57
+    with open(output, encoding='utf-8') as f:
+        assert [json.loads(line)['path'] for line in f] == paths
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    """测试worker失联后租约过期，分片被其他worker重新领取，原worker续约失败。"""
+    queue = ShardQueue(str(tmp_path / "queue"), lease_seconds=0.2)
+    queue.create(["a.pdf"], shard_size=1)
+
+    dead = queue.claim("dead")
+    assert dead is not None
+    assert queue.claim("other") is None
+    assert queue.status()['leased'] == 1
+
+    time.sleep(0.3)
+    assert queue.status()['expired'] == 1
+    alive = queue.claim("alive")
+    assert alive is not None and alive.shard_id == dead.shard_id
+    with pytest.raises(LeaseLost):
+        dead.renew()
+    alive.renew()
+    alive.complete([{'path': 'a.pdf'}])
+    assert queue.claim("other") is None
+    assert queue.status()['done'] == 1
+
+
+def test_renewed_lease_is_not_broken(tmp_path):
+    """测试租约在被判定过期之后又被续约时，其他worker不会删除续约后的租约。"""
+    queue = ShardQueue(str(tmp_path / "queue"), lease_seconds=0.2)
+    queue.create(["a.pdf"], shard_size=1)
+    owner = queue.claim("owner")
+    time.sleep(0.3)
+
+    expired = queue._read_lease(owner.shard_id)
+    owner.renew()
+    queue._read_lease = lambda shard_id: expired  # 其他worker读到的仍是过期的内容
+    assert queue._break_expired_lease(owner.shard_id) is False
+    del queue._read_lease
+    assert queue._read_lease(owner.shard_id)['token'] == owner.token
+    owner.renew()
+    assert queue.claim("other") is None
+    assert os.listdir(str(tmp_path / "queue" / "leases")) == [f"{owner.shard_id}.lease"]
+
+
+def test_incomplete_lease_expires(tmp_path):
+    """测试创建者写入中途退出留下的不完整租约按修改时间过期，之后分片可被领取。"""
+    queue = ShardQueue(str(tmp_path / "queue"), lease_seconds=60)
+    queue.create(["a.pdf"], shard_size=1)
+    lease_path = queue._lease_path("shard_000000")
+    with open(lease_path, "w") as f:
+        f.write('{"worker": "w", "tok')
+    assert queue.claim("other") is None
+
+    os.utime(lease_path, (time.time() - 120, time.time() - 120))
+    lease = queue.claim("other")
+    assert lease is not None
+    lease.renew()
+
+
+def test_merge_requires_all_shards_done(tmp_path):
+    """测试仍有分片未完成时拒绝合并。"""
+    queue = ShardQueue(str(tmp_path / "queue"))
+    queue.create(["a.pdf", "b.pdf"], shard_size=1)
+    queue.claim("w").complete([{'path': 'a.pdf'}])
+    with pytest.raises(RuntimeError):
+        queue.merge(str(tmp_path / "results.jsonl"))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import json
+import time
+
+import fitz
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from pdf_extract_kit.utils.data_preprocess import load_pdf
+from pdf_extract_kit.utils.stage_timer import StageTimer, count, current_timer, timed
+from src.api.utils import attach_timings, start_timer, stop_timer
+
+
+def test_stage_times_are_exclusive():
+    """嵌套阶段的耗时不重复计入外层阶段，同名阶段累加。"""
+    timer = StageTimer().activate()
+    try:
+        with timed("inference"):
+            time.sleep(0.02)
+            with timed("rasterization"):
+                time.sleep(0.05)
+        with timed("inference"):
+            time.sleep(0.01)
+        count("pages", 2)
+        count("pages")
+    finally:
+        timer.deactivate()
+
+    timings = timer.as_dict()
+    assert list(timings["stages_ms"]) == ["rasterization", "inference"]
+    assert timings["stages_ms"]["rasterization"] >= 50
+    assert 30 <= timings["stages_ms"]["inference"] < 70  # 不含嵌套的50ms
+    assert timings["total_ms"] >= sum(timings["stages_ms"].values())
+    assert timings["counts"] == {"pages": 3}
+
+
+def test_timed_without_timer_is_noop(tmp_path):
+    """未开启计时时timed/count不做任何事，load_pdf在开启时记录rasterization。"""
+    pdf_path = str(tmp_path / "sample.pdf")
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "timings")
+    doc.save(pdf_path)
+
+    assert current_timer() is None
+    with timed("anything"):
+        count("pages")
+    assert len(load_pdf(pdf_path)) == 1
+
+    timer = start_timer(True)
+    try:
+        load_pdf(pdf_path)
+    finally:
+        stop_timer(timer)
+    assert current_timer() is None
+    assert "rasterization" in timer.as_dict()["stages_ms"]
+
+
+def test_attach_timings():
+    """timings写入results，未开启时响应保持不变。"""
+    response = {"success": True, "message": "完成", "results": [{"detections": []}]}
+    assert attach_timings(response, None) is response
+
+    for results, path in [({"markdown": "x"}, lambda r: r["timings"]),
+                          ([{"detections": []}], lambda r: r[0]["timings"]),
+                          ([[{"text": "a"}]], lambda r: r[-1]["timings"]),
+                          (None, lambda r: r["timings"])]:
+        timer = start_timer(True)
+        with timed("upload_read"):
+            pass
+        body = json.loads(attach_timings({"success": True, "message": "完成", "results": results}, timer).body)
+        timings = path(body["results"])
+        assert set(timings["stages_ms"]) == {"upload_read", "serialization"}
+        assert current_timer() is None
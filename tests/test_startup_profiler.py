@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sys
+import json
+import time
+import types
+import threading
+
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from pdf_extract_kit.utils import startup_profiler
+from pdf_extract_kit.utils.startup_profiler import StartupProfiler
+
+
+def test_import_timing_self_and_cumulative(tmp_path, monkeypatch):
+    """测试导入钩子记录每个模块的自身耗时和累计耗时。"""
+    (tmp_path / "sp_outer.py").write_text("import time\nimport sp_inner\ntime.sleep(0.02)\n")
+    (tmp_path / "sp_inner.py").write_text("import time\ntime.sleep(0.05)\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    profiler = StartupProfiler(str(tmp_path / "report"))
+    profiler.install_import_hook()
+    try:
+        import sp_outer  # noqa: F401
+    finally:
+        profiler.remove_import_hook()
+        sys.modules.pop("sp_outer", None)
+        sys.modules.pop("sp_inner", None)
+
+    outer, inner = profiler.imports["sp_outer"], profiler.imports["sp_inner"]
+    assert inner["self"] >= 0.05
+    assert outer["cumulative"] >= 0.07
+    assert 0.02 <= outer["self"] < 0.05
+
+
+def test_model_events_and_report(tmp_path):
+    """测试模型构建、首次推理事件以及JSON/文本报告。"""
+    class FakeModel:
+        def __init__(self):
+            time.sleep(0.01)
+
+        def predict(self, x):
+            time.sleep(0.01)
+            return x
+
+    profiler = StartupProfiler(str(tmp_path / "report"))
+    with profiler.model_construction("fake_model"):
+        model = FakeModel()
+    profiler.watch_first_inference(model, "fake_model")
+    assert model.predict(1) == 1
+    assert model.predict(2) == 2
+    assert "predict" not in model.__dict__  # 首次调用后恢复原方法
+    profiler.mark_ready()
+
+    with open(tmp_path / "report.json", encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["ready_after"] is not None
+    assert report["events"]["model_construction"][0]["name"] == "fake_model"
+    first_inference = report["events"]["first_inference"][0]
+    assert first_inference["name"] == "fake_model.predict" and first_inference["count"] == 1
+    assert "fake_model.predict" in (tmp_path / "report.txt").read_text(encoding="utf-8")
+
+
+def test_concurrent_weight_loads(tmp_path, monkeypatch):
+    """测试并发构建模型时权重加载归属各自的模型，最后一个构建结束后恢复原函数。"""
+    def load(path):
+        time.sleep(0.01)
+        return path
+
+    fake_torch = types.ModuleType("torch")
+    fake_torch.load = load
+    monkeypatch.setitem(sys.modules, "torch", fake_torch)
+    monkeypatch.setattr(startup_profiler, "WEIGHT_LOADERS", [("torch", "load")])
+    profiler = StartupProfiler(str(tmp_path / "report"))
+    barrier = threading.Barrier(2)
+
+    def build(model_name):
+        with profiler.model_construction(model_name):
+            barrier.wait(5)
+            sys.modules["torch"].load(f"{model_name}.pt")
+            barrier.wait(5)
+
+    threads = [threading.Thread(target=build, args=(name,)) for name in ["model_a", "model_b"]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fake_torch.load is load
+    loads = {entry["name"]: entry["info"]["path"] for entry in profiler.report()["events"]["weight_load"]}
+    assert loads == {"model_a:torch.load": "model_a.pt", "model_b:torch.load": "model_b.pt"}
+    fake_torch.load("other.pt")  # 构建之外的调用不计时
+    assert len(profiler.report()["events"]["weight_load"]) == 2
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+import pytest
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from pdf_extract_kit.utils import thread_budget
+from pdf_extract_kit.utils.thread_budget import ThreadBudget, THREAD_ENV_VARS, env_config, split_cores
+
+
+@pytest.fixture
+def clean_budget(monkeypatch):
+    """隔离进程级的线程预算和环境变量，结束后恢复环境变量、绑核和已导入库的线程数。"""
+    environ = dict(os.environ)
+    affinity = os.sched_getaffinity(0) if hasattr(os, 'sched_getaffinity') else None
+    cv2, torch = sys.modules.get('cv2'), sys.modules.get('torch')
+    cv2_threads = cv2.getNumThreads() if cv2 is not None else None
+    torch_threads = torch.get_num_threads() if torch is not None else None
+
+    monkeypatch.setattr(thread_budget, '_budget', None)
+    for name in list(os.environ):
+        if name in THREAD_ENV_VARS or name.startswith(thread_budget.ENV_PREFIX):
+            del os.environ[name]
+    try:
+        yield monkeypatch
+    finally:
+        os.environ.clear()
+        os.environ.update(environ)
+        if affinity is not None:
+            os.sched_setaffinity(0, affinity)
+        if cv2_threads is not None:
+            cv2.setNumThreads(cv2_threads)
+        if torch_threads is not None:
+            torch.set_num_threads(torch_threads)
+
+
+def test_split_cores():
+    """核心被切成大小相差不超过1的连续分组，核心不足时轮流共享。"""
+    assert split_cores(range(10), 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    assert split_cores(range(4), 1) == [[0, 1, 2, 3]]
+    assert split_cores(range(2), 3) == [[0], [1], [0]]
+
+
+def test_budget_from_config():
+    """每条流水线分到自己的一份核心，Paddle配置中显式设置的键优先。"""
+    budget = ThreadBudget.from_config({'cores': list(range(16)), 'pipelines': 4, 'pipeline_index': 2,
+                                       'pin_cores': True, 'paddle_mkldnn': False})
+    assert budget.cores == [8, 9, 10, 11]
+    assert budget.threads == 4 and budget.opencv_threads == 4
+    assert budget.pin_cores
+    assert budget.env()['OMP_NUM_THREADS'] == '4'
+    assert budget.paddle_config({'lang': 'ch'}) == {'lang': 'ch', 'cpu_threads': 4, 'enable_mkldnn': False}
+    assert budget.paddle_config({'cpu_threads': 2})['cpu_threads'] == 2
+    assert [b.threads for b in budget.split(2)] == [2, 2]
+
+    # 没有pipeline_index时不绑核
+    assert not ThreadBudget(cores=range(8), pipelines=2, pin_cores=True).pin_cores
+
+
+def test_env_config_overrides(clean_budget):
+    """THREAD_BUDGET_* 环境变量覆盖配置中的单个键。"""
+    assert env_config({'THREAD_BUDGET_PIPELINES': '3', 'THREAD_BUDGET_PIN_CORES': 'true'}) == \
+        {'pipelines': 3, 'pin_cores': True}
+
+    assert thread_budget.apply_thread_budget() is None
+    clean_budget.setenv('THREAD_BUDGET_PIPELINES', '2')
+    budget = thread_budget.apply_thread_budget({'cores': 4, 'pipelines': 4})
+    assert budget.pipelines == 2 and budget.threads == len(split_cores(budget.all_cores, 2)[0])
+    assert thread_budget.get_thread_budget() is budget
+    assert os.environ['OMP_NUM_THREADS'] == str(budget.threads)
+
+
+def test_loader_ignores_config_threads(clean_budget):
+    """加载任务时不应用配置中的threads，API客户端的配置不能修改进程的线程预算。"""
+    from pdf_extract_kit.registry.registry import TASK_REGISTRY, MODEL_REGISTRY
+    from pdf_extract_kit.utils.config_loader import initialize_tasks_and_models
+
+    config = {'threads': {'cores': 4, 'pipelines': 4},
+              'tasks': {'stub_task': {'model': 'stub_model', 'model_config': {}}}}
+    with TASK_REGISTRY.override('stub_task', lambda model: model), \
+            MODEL_REGISTRY.override('stub_model', lambda model_config: object()):
+        initialize_tasks_and_models(config)
+    assert thread_budget.get_thread_budget() is None
+    assert 'OMP_NUM_THREADS' not in os.environ
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import builtins
+from types import SimpleNamespace
+
+import pytest
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("unimernet")
+
+from pdf_extract_kit.tasks.formula_recognition.models import unimernet
+from pdf_extract_kit.tasks.formula_recognition.models.unimernet import FormulaRecognitionUniMERNet
+
+
+class FakeEncoderDecoder(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.encoder = torch.nn.Sequential(torch.nn.Linear(4, 4))
+        self.decoder = torch.nn.Sequential(torch.nn.Linear(4, 4))
+
+    def get_encoder(self):
+        return self.encoder
+
+    def get_decoder(self):
+        return self.decoder
+
+
+def make_model(precision, int8_modules=("encoder", "decoder"), device="cpu"):
+    """不加载权重的模型：model.model.model为只含线性层的编码器-解码器。"""
+    model = FormulaRecognitionUniMERNet.__new__(FormulaRecognitionUniMERNet)
+    model.device = torch.device(device)
+    model.precision = precision
+    model.int8_modules = list(int8_modules)
+    model.model = torch.nn.Module()
+    model.model.model = SimpleNamespace(model=FakeEncoderDecoder())
+    return model
+
+
+def is_quantized(module):
+    linears = [m for m in module.modules() if type(m).__name__ == "Linear"]
+    return all("quantized" in type(m).__module__ for m in linears)
+
+
+def test_int8_quantizes_selected_modules():
+    """测试int8只量化int8_modules中的子模块。"""
+    model = make_model("int8", ["encoder"])
+    model.apply_precision()
+    encoder_decoder = model.model.model.model
+    assert is_quantized(encoder_decoder.encoder)
+    assert not is_quantized(encoder_decoder.decoder)
+
+
+def test_bf16_falls_back_without_cpu_support(monkeypatch):
+    """测试CPU不支持bf16或使用GPU时回退到fp32，支持时使用bf16 autocast。"""
+    monkeypatch.setattr(unimernet, "cpu_supports_bf16", lambda: False)
+    model = make_model("bf16")
+    model.apply_precision()
+    assert model.precision == "fp32"
+
+    model = make_model("bf16", device="cuda")
+    model.apply_precision()
+    assert model.precision == "fp32"
+
+    monkeypatch.setattr(unimernet, "cpu_supports_bf16", lambda: True)
+    model = make_model("bf16")
+    model.apply_precision()
+    assert model.precision == "bf16"
+    assert isinstance(model.model.maybe_autocast(), torch.autocast)
+
+
+def test_cpu_supports_bf16_reads_cpuinfo(monkeypatch):
+    """测试没有mkldnn查询接口时根据/proc/cpuinfo的标志判断。"""
+    monkeypatch.setattr(unimernet.torch, "ops", SimpleNamespace(mkldnn=SimpleNamespace()))
+    real_open = builtins.open
+    for flags, expected in [("fpu avx512f avx512_bf16", True), ("fpu amx_bf16", True), ("fpu avx2", False)]:
+        monkeypatch.setattr(builtins, "open", lambda path, *args, **kwargs: io.StringIO(flags)
+                            if path == "/proc/cpuinfo" else real_open(path, *args, **kwargs))
+        assert unimernet.cpu_supports_bf16() is expected
+
+
+def test_invalid_config(monkeypatch):
+    """测试未知的precision或int8_modules在初始化时报错。"""
+    monkeypatch.setattr(FormulaRecognitionUniMERNet, "load_model_and_processor", lambda self: (None, None))
+    with pytest.raises(ValueError, match="precision"):
+        FormulaRecognitionUniMERNet({"model_path": "", "precision": "fp16"})
+    with pytest.raises(ValueError, match="int8_modules"):
+        FormulaRecognitionUniMERNet({"model_path": "", "precision": "int8", "int8_modules": ["encoder", "lm_head"]})
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import base64
+import asyncio
+import hashlib
+
+import pytest
+import rootutils
+from fastapi import APIRouter, FastAPI, File, Request, UploadFile
+from fastapi.testclient import TestClient
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from main import app
+from starlette.formparsers import MultiPartParser
+
+from src.api.uploads import (SpooledUploadFile, SpoolingRoute, UploadLimitMiddleware, UploadTooLargeError,
+                             parse_size, spool_upload)
+
+
+def make_upload(data, filename):
+    return UploadFile(io.BytesIO(data), filename=filename)
+
+
+def test_spool_upload(tmp_path):
+    """小文件保存在内存中，大文件落盘(不使用客户端文件名)，并计算SHA-256和大小。"""
+    data = b"%PDF-1.4\n" + os.urandom(5000)
+    digest = hashlib.sha256(data).hexdigest()
+
+    small = asyncio.run(spool_upload(make_upload(data, "a.pdf"), max_bytes=0, memory_bytes=len(data),
+                                     spool_dir=str(tmp_path), chunk_size=1024))
+    assert small.in_memory and small.source == data
+    assert (small.size, small.sha256) == (len(data), digest)
+    assert not os.listdir(tmp_path)
+
+    large = asyncio.run(spool_upload(make_upload(data, "../../etc/passwd"), max_bytes=0, memory_bytes=2048,
+                                     spool_dir=str(tmp_path), chunk_size=1024))
+    assert not large.in_memory and large.path.startswith(str(tmp_path)) and large.path.endswith("upload.pdf")
+    assert (large.size, large.sha256) == (len(data), digest)
+    assert asyncio.run(large.read()) == data
+    large.close()
+    assert not os.listdir(tmp_path)
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_upload(make_upload(data, "a.pdf"), max_bytes=4096, memory_bytes=1024,
+                                 spool_dir=str(tmp_path), chunk_size=1024))
+    assert not os.listdir(tmp_path)
+    assert parse_size("16M") == 16 * 1024 * 1024 and parse_size("512") == 512
+
+
+def test_upload_size_limits(monkeypatch, tmp_path):
+    """超过UPLOAD_MAX_BYTES的请求返回413，落盘的上传处理后被删除。"""
+    client = TestClient(app)
+    data = os.urandom(200 * 1024)
+    monkeypatch.setenv("UPLOAD_MEMORY_BYTES", "64K")
+    monkeypatch.setenv("UPLOAD_SPOOL_DIR", str(tmp_path))
+
+    response = client.post("/api/v1/upload", files={"file": ("a.png", data, "image/png")})
+    assert response.status_code == 200
+    assert base64.b64decode(response.json()["file_data"]) == data
+    assert not os.listdir(tmp_path)
+
+    monkeypatch.setenv("UPLOAD_MAX_BYTES", "100K")
+    response = client.post("/api/v1/upload", files={"file": ("a.png", data, "image/png")})
+    assert response.status_code == 413
+
+
+def test_upload_limit_counts_received_bytes(monkeypatch):
+    """未声明Content-Length的请求在接收时计数，超限返回413；任务路由的超限同样返回413。"""
+    body_app = FastAPI()
+    body_app.add_middleware(UploadLimitMiddleware, max_bytes=100 * 1024)
+
+    @body_app.post("/body")
+    async def read_body(request: Request):
+        return {"size": len(await request.body())}
+
+    def chunked(size):
+        return (b"x" * 16 * 1024 for _ in range(size // (16 * 1024)))
+
+    body_client = TestClient(body_app)
+    response = body_client.post("/body", content=chunked(128 * 1024))
+    assert response.status_code == 200 and response.json() == {"size": 128 * 1024}
+    assert body_client.post("/body", content=chunked(320 * 1024)).status_code == 413
+    assert body_client.post("/body", content=b"x" * 320 * 1024).status_code == 413
+
+    # 在表单余量之内，表单解析时拒绝
+    monkeypatch.setenv("UPLOAD_MAX_BYTES", "100K")
+    data = os.urandom(120 * 1024)
+    response = TestClient(app).post("/api/v1/layout-detection", files={"file": ("a.png", data, "image/png")})
+    assert response.status_code == 413
+
+
+def test_spooling_route_receives_once(monkeypatch, tmp_path):
+    """SpoolingRoute的上传在表单解析时直接写入UPLOAD_SPOOL_DIR，spool_upload不再复制。"""
+    monkeypatch.setenv("UPLOAD_MEMORY_BYTES", "64K")
+    monkeypatch.setenv("UPLOAD_SPOOL_DIR", str(tmp_path))
+    spool_max_size = MultiPartParser.spool_max_size
+    router = APIRouter(route_class=SpoolingRoute)
+
+    @router.post("/spool")
+    async def spool(file: UploadFile = File(...)):
+        assert isinstance(file, SpooledUploadFile)
+        upload = await spool_upload(file)
+        assert upload is file.upload
+        try:
+            return {"in_memory": upload.in_memory, "sha256": upload.sha256, "files": len(os.listdir(tmp_path)),
+                    "head": (await file.read(4)).decode()}
+        finally:
+            upload.close()
+
+    spool_app = FastAPI()
+    spool_app.include_router(router)
+    client = TestClient(spool_app)
+
+    for size, in_memory, files in [(1024, True, 0), (200 * 1024, False, 1)]:
+        data = b"%PDF" + os.urandom(size)
+        response = client.post("/spool", files={"file": ("a.pdf", data, "application/pdf")})
+        assert response.status_code == 200
+        assert response.json() == {"in_memory": in_memory, "sha256": hashlib.sha256(data).hexdigest(),
+                                   "files": files, "head": "%PDF"}
+        assert not os.listdir(tmp_path)
+
+    monkeypatch.setenv("UPLOAD_MAX_BYTES", "100K")
+    response = client.post("/spool", files={"file": ("a.pdf", os.urandom(200 * 1024), "application/pdf")})
+    assert response.status_code == 413
+    assert not os.listdir(tmp_path)
+    assert MultiPartParser.spool_max_size == spool_max_size
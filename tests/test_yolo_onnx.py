@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+import rootutils
+
+ROOT_DIR = rootutils.setup_root(__file__, indicator=".project-root", pythonpath=True)
+
+from pdf_extract_kit.utils.yolo_onnx import (
+    YOLOResult,
+    decode_predictions,
+    letterbox,
+    nms,
+    scale_boxes,
+)
+
+
+def reference_nms(boxes, scores, iou_thres):
+    """逐对计算IoU的朴素NMS，作为对照。"""
+    def iou(a, b):
+        w = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+        h = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+        inter = w * h
+        return inter / ((a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter + 1e-7)
+
+    keep = []
+    for i in sorted(range(len(scores)), key=lambda i: -scores[i]):
+        if all(iou(boxes[i], boxes[j]) <= iou_thres for j in keep):
+            keep.append(i)
+    return keep
+
+
+def random_boxes(num, seed):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 500, size=(num, 2))
+    wh = rng.uniform(5, 120, size=(num, 2))
+    return np.concatenate([xy, xy + wh], axis=1).astype(np.float32), rng.uniform(0, 1, size=num).astype(np.float32)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_nms_matches_reference(seed):
+    """向量化NMS与朴素实现保留相同的框。"""
+    boxes, scores = random_boxes(200, seed)
+    assert nms(boxes, scores, 0.45).tolist() == reference_nms(boxes, scores, 0.45)
+
+
+def test_letterbox_and_scale_boxes_roundtrip():
+    """letterbox后的坐标经scale_boxes能映射回原图。"""
+    image = np.zeros((1100, 850, 3), dtype=np.uint8)
+    square = letterbox(image, 1280)
+    rect = letterbox(image, 1280, auto=True)
+    assert square.shape == (1280, 1280, 3)
+    assert rect.shape[0] == 1280 and rect.shape[1] % 32 == 0 and rect.shape[1] < 1280
+    assert square[0, 0].tolist() == [114, 114, 114]
+
+    boxes = np.array([[10, 20, 300, 400], [0, 0, 850, 1100]], dtype=np.float32)
+    for letterboxed in [square, rect]:
+        gain = min(letterboxed.shape[0] / 1100, letterboxed.shape[1] / 850)
+        pad_x = (letterboxed.shape[1] - 850 * gain) / 2
+        pad_y = (letterboxed.shape[0] - 1100 * gain) / 2
+        model_boxes = boxes * gain + np.array([pad_x, pad_y, pad_x, pad_y], dtype=np.float32)
+        restored = scale_boxes(model_boxes, letterboxed.shape[:2], (1100, 850))
+        np.testing.assert_allclose(restored, boxes, atol=1.0)
+
+
+def test_decode_yolov8_output():
+    """YOLOv8格式输出：xywh解码、置信度过滤、按类别NMS。"""
+    nc = 2
+    # (cx, cy, w, h, score_cls0, score_cls1)
+    anchors = np.array([
+        [100, 100, 40, 20, 0.9, 0.1],
+        [101, 100, 40, 20, 0.8, 0.1],   # 与第一个框重叠，同类别，被抑制
+        [101, 101, 40, 20, 0.1, 0.7],   # 与第一个框重叠，但类别不同，保留
+        [300, 300, 10, 10, 0.1, 0.2],   # 低于置信度阈值
+    ], dtype=np.float32)
+    dets = decode_predictions(anchors.T, nc, conf_thres=0.25, iou_thres=0.45)
+    assert dets.shape == (2, 6)
+    np.testing.assert_allclose(dets[0], [80, 90, 120, 110, 0.9, 0])
+    assert dets[1, 5] == 1
+
+    agnostic = decode_predictions(anchors.T, nc, conf_thres=0.25, iou_thres=0.45, agnostic=True)
+    assert len(agnostic) == 1
+
+
+def test_decode_end2end_output():
+    """YOLOv10/DocLayout-YOLO端到端输出只做置信度过滤，不做NMS。"""
+    rows = np.zeros((300, 6), dtype=np.float32)
+    rows[0] = [10, 10, 50, 50, 0.6, 3]
+    rows[1] = [12, 12, 50, 50, 0.9, 3]
+    rows[2] = [0, 0, 5, 5, 0.1, 1]
+    dets = decode_predictions(rows, nc=10, conf_thres=0.25, iou_thres=0.45)
+    assert dets[:, 4].tolist() == pytest.approx([0.9, 0.6])
+
+
+def test_result_matches_torch_result_interface():
+    """结果对象支持pdf2markdown中 boxes.xyxy.cpu() / conf.item() 的用法。"""
+    result = YOLOResult(np.array([[1.4, 2.6, 30.2, 40.9, 0.87, 2]]), (100, 80), {2: 'abandon'})
+    items = []
+    for xyxy, conf, cla in zip(result.boxes.xyxy.cpu(), result.boxes.conf.cpu(), result.boxes.cls.cpu()):
+        items.append(([int(p.item()) for p in xyxy], round(float(conf.item()), 2), int(cla.item())))
+    assert items == [([1, 2, 30, 40], 0.87, 2)]
+    assert len(YOLOResult(np.zeros((0, 6)), (100, 80), {})) == 0